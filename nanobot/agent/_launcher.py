@@ -0,0 +1,82 @@
+"""Resource-limiting launcher for pooled subprocesses.
+
+Run as ``python -I -S _launcher.py <usage_fd> <rlimits_json> <cgroup_dir> -- argv...``.
+It joins the cgroup (if any), starts *argv* with the rlimits applied,
+reaps it with ``wait4`` and writes the child's resource usage as JSON to
+*usage_fd*.  Standard streams are inherited untouched.
+
+Kept stdlib-only and free of nanobot imports so it starts fast.  Being
+single-threaded, it can safely use ``preexec_fn``, which the gateway (a
+multi-threaded asyncio process) cannot.
+"""
+
+import json
+import os
+import resource
+import signal
+import subprocess
+import sys
+import time
+
+
+def main(argv: list[str]) -> int:
+    usage_fd = int(argv[1])
+    limits: dict[str, int] = json.loads(argv[2])
+    cgroup = argv[3]
+    command = argv[5:]
+
+    if cgroup:
+        try:
+            with open(os.path.join(cgroup, "cgroup.procs"), "w") as f:
+                f.write(str(os.getpid()))
+        except OSError as e:
+            print(f"nanobot launcher: cannot join cgroup {cgroup}: {e}", file=sys.stderr)
+
+    def apply_limits() -> None:
+        for name, value in limits.items():
+            # CPU gets a grace second: SIGXCPU at the soft limit, SIGKILL at the hard one
+            hard = value + 1 if name == "RLIMIT_CPU" else value
+            resource.setrlimit(getattr(resource, name), (value, hard))
+
+    start = time.monotonic()
+    try:
+        child = subprocess.Popen(command, preexec_fn=apply_limits)
+    except OSError as e:
+        print(f"nanobot launcher: {e}", file=sys.stderr)
+        return 127
+
+    def forward(signum: int, _frame: object) -> None:
+        try:
+            child.send_signal(signum)
+        except ProcessLookupError:
+            pass
+
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(sig, forward)
+
+    while True:
+        try:
+            _, status, ru = os.wait4(child.pid, 0)
+            break
+        except InterruptedError:
+            continue
+    child.returncode = 0  # Already reaped; stop Popen.__del__ from waiting again
+
+    killed_by = os.WTERMSIG(status) if os.WIFSIGNALED(status) else None
+    usage = {
+        "maxrss_kb": ru.ru_maxrss,
+        "utime": ru.ru_utime,
+        "stime": ru.ru_stime,
+        "wall": time.monotonic() - start,
+        "signal": killed_by,
+    }
+    try:
+        os.write(usage_fd, json.dumps(usage).encode())
+        os.close(usage_fd)
+    except OSError:
+        pass
+    return 128 + killed_by if killed_by else os.WEXITSTATUS(status)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
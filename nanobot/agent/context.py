@@ -8,6 +8,7 @@ from typing import Any
 
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.skills import SkillsLoader
+from nanobot.media.store import MediaStore
 
 
 class ContextBuilder:
@@ -20,8 +21,9 @@ class ContextBuilder:
     
     BOOTSTRAP_FILES = ["AGENTS.md", "SOUL.md", "USER.md", "TOOLS.md", "IDENTITY.md"]
     
-    def __init__(self, workspace: Path):
+    def __init__(self, workspace: Path, media: MediaStore | None = None):
         self.workspace = workspace
+        self.media = media or MediaStore()
         self.memory = MemoryStore(workspace)
         self.skills = SkillsLoader(workspace)
     
@@ -165,11 +167,13 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
         
         images = []
         for path in media:
-            p = Path(path)
             mime, _ = mimetypes.guess_type(path)
-            if not p.is_file() or not mime or not mime.startswith("image/"):
+            if not mime or not mime.startswith("image/"):
                 continue
-            b64 = base64.b64encode(p.read_bytes()).decode()
+            data = self.media.read(path)
+            if data is None:
+                continue
+            b64 = base64.b64encode(data).decode()
             images.append({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}})
         
         if not images:
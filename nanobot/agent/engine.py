@@ -2,15 +2,19 @@
 
 import asyncio
 import json
-from collections.abc import Callable, Awaitable
+import time
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 from loguru import logger
 
-_HEARTBEAT_INTERVAL = 30  # seconds between "still running" notifications
-
+from nanobot.agent.tools.base import ToolProgress, tool_progress
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.providers.base import LLMProvider
+from nanobot.telemetry import recording, tracing
+from nanobot.telemetry.metrics import LLM_ERRORS, LLM_LATENCY
+
+_HEARTBEAT_INTERVAL = 30  # seconds between "still running" notifications
 
 
 def summarize_tool_actions(messages: list[dict[str, Any]], start_index: int) -> str:
@@ -75,17 +79,47 @@ async def _execute_with_heartbeat(
     name: str,
     arguments: dict[str, Any],
     on_tool_call: Callable[[str, dict[str, Any]], Awaitable[None]] | None,
+    cancel_event: asyncio.Event | None = None,
 ) -> str:
-    """Execute a tool, sending periodic heartbeat notifications for slow calls."""
-    task = asyncio.create_task(tools.execute(name, arguments))
+    """Execute a tool, sending periodic heartbeat notifications for slow calls.
+
+    Heartbeats carry the latest line the tool reported via
+    ``report_progress`` (e.g. the last line of exec output), if any.
+    If *cancel_event* fires, the tool task is cancelled rather than
+    awaited to completion.
+    """
+    progress = ToolProgress()
+    token = tool_progress.set(progress)
+    try:
+        task = asyncio.create_task(tools.execute(name, arguments))  # copies the context
+    finally:
+        tool_progress.reset(token)
+    cancel_wait = asyncio.create_task(cancel_event.wait()) if cancel_event else None
+    waiters = {task, cancel_wait} if cancel_wait else {task}
     elapsed = 0
-    while True:
-        done, _ = await asyncio.wait({task}, timeout=_HEARTBEAT_INTERVAL)
-        if done:
-            return task.result()
-        elapsed += _HEARTBEAT_INTERVAL
-        if on_tool_call:
-            await on_tool_call(name, {"_heartbeat": True, "elapsed": elapsed})
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                waiters, timeout=_HEARTBEAT_INTERVAL, return_when=asyncio.FIRST_COMPLETED,
+            )
+            if task in done:
+                return task.result()
+            if cancel_wait in done:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                return "Error: cancelled by user"
+            elapsed += _HEARTBEAT_INTERVAL
+            if on_tool_call:
+                beat: dict[str, Any] = {"_heartbeat": True, "elapsed": elapsed}
+                if progress.latest:
+                    beat["progress"] = progress.latest
+                await on_tool_call(name, beat)
+    finally:
+        if cancel_wait:
+            cancel_wait.cancel()
+        if not task.done():
+            # We were cancelled ourselves; don't leave the tool running
+            task.cancel()
 
 
 async def run_tool_loop(
@@ -116,18 +150,29 @@ async def run_tool_loop(
     """
     prefix = f"{log_prefix} " if log_prefix else ""
     empty_retries = 0
+    recorder = recording.current_recorder()
 
-    for _ in range(max_iterations):
+    for iteration in range(max_iterations):
         # Check cancellation before each iteration
         if cancel_event and cancel_event.is_set():
             logger.info(f"{prefix}Tool loop cancelled by user")
             return "[Operation cancelled by user]"
 
-        response = await provider.chat(
-            messages=messages,
-            tools=tools.get_definitions(),
-            model=model,
-        )
+        started = time.monotonic()
+        with tracing.span("llm.chat", model=model, iteration=iteration) as sp:
+            response = await provider.chat(
+                messages=messages,
+                tools=tools.get_definitions(),
+                model=model,
+            )
+            if sp:
+                sp.set(finish_reason=response.finish_reason, tool_calls=len(response.tool_calls))
+        elapsed = time.monotonic() - started
+        LLM_LATENCY.observe(elapsed, model=model)
+        if recorder:
+            recorder.record_chat(messages, model, response, elapsed)
+        if response.finish_reason == "error":
+            LLM_ERRORS.inc(model=model)
 
         if not response.has_tool_calls:
             # Some models return empty content with no tool calls — nudge once
@@ -178,9 +223,14 @@ async def run_tool_loop(
             logger.info(f"{prefix}Tool call: {tool_call.name}({args_str[:200]})")
             if on_tool_call:
                 await on_tool_call(tool_call.name, tool_call.arguments)
+            started = time.monotonic()
             result = await _execute_with_heartbeat(
-                tools, tool_call.name, tool_call.arguments, on_tool_call,
+                tools, tool_call.name, tool_call.arguments, on_tool_call, cancel_event,
             )
+            if recorder:
+                recorder.record_tool(
+                    tool_call.name, tool_call.arguments, result, time.monotonic() - started,
+                )
             messages.append({
                 "role": "tool",
                 "tool_call_id": tool_call.id,
@@ -1,31 +1,41 @@
 """Agent loop: the core processing engine."""
 
 import asyncio
+import random
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
-from nanobot.bus.events import InboundMessage, OutboundMessage
-from nanobot.bus.queue import MessageBus
-from nanobot.providers.base import LLMProvider
-from nanobot.agent.commands import CommandContext, CommandResult, build_command_registry
+from nanobot.agent.commands import CommandContext, build_command_registry
 from nanobot.agent.context import ContextBuilder
 from nanobot.agent.engine import run_tool_loop
-from nanobot.agent.tools.registry import ToolRegistry
-from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
-from nanobot.agent.tools.shell import ExecTool
-from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
+from nanobot.agent.process_pool import ProcessPool, ResourceLimits
+from nanobot.agent.subagent import SubagentManager
+from nanobot.agent.tools.cron import CronTool
+from nanobot.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
 from nanobot.agent.tools.history import HistorySearchTool
 from nanobot.agent.tools.message import MessageTool
-from nanobot.agent.tools.spawn import SpawnTool
-from nanobot.agent.tools.cron import CronTool
 from nanobot.agent.tools.parallel import ParallelTool
-from nanobot.agent.subagent import SubagentManager
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_session import ShellSessionManager
+from nanobot.agent.tools.spawn import SpawnTool
+from nanobot.agent.tools.web import WebFetchCache, WebFetchTool, WebSearchCache, WebSearchTool
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import MessageBus
 from nanobot.extensions.base import ExtensionContext
 from nanobot.extensions.manager import ExtensionManager
+from nanobot.media.store import media_store
+from nanobot.providers.base import LLMProvider, innermost, session_scope
 from nanobot.session.manager import SessionManager
+from nanobot.telemetry import metrics, recording, tracing
 
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from nanobot.config.schema import Config, ExecToolConfig, WebToolsConfig
+    from nanobot.cron.service import CronService
 
 _SLOW_TOOLS = {"exec", "web_search", "web_fetch", "spawn"}
 
@@ -83,9 +93,15 @@ class AgentLoop:
         restrict_to_workspace: bool = False,
         config: "Config | None" = None,
         extensions: "ExtensionManager | None" = None,
+        web_config: "WebToolsConfig | None" = None,
     ):
-        from nanobot.config.schema import ExecToolConfig, Config
-        from nanobot.cron.service import CronService
+        from nanobot.config.schema import (
+            ExecToolConfig,
+            ParallelToolConfig,
+            ProcessLimitsConfig,
+            WebToolsConfig,
+        )
+        from nanobot.utils.helpers import get_data_path
         self.bus = bus
         self.provider = provider
         self.workspace = workspace
@@ -93,11 +109,47 @@ class AgentLoop:
         self.max_iterations = max_iterations
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
+        self.web_config = web_config or WebToolsConfig()
         self.cron_service = cron_service
         self.restrict_to_workspace = restrict_to_workspace
         self.config = config
 
-        self.context = ContextBuilder(workspace)
+        # Shared by the main agent and subagents so pages fetched once are reused
+        fetch_cfg = self.web_config.fetch
+        self.web_fetch_cache = WebFetchCache(
+            get_data_path() / "cache" / "web",
+            max_bytes=fetch_cfg.cache_max_mb * 1024 * 1024,
+            default_ttl=fetch_cfg.cache_ttl,
+        ) if fetch_cfg.cache_enabled else None
+        search_cfg = self.web_config.search
+        self.web_search_cache = WebSearchCache(
+            ttl=search_cfg.cache_ttl, qps=search_cfg.qps, burst=search_cfg.burst,
+        )
+
+        # One pool caps exec, persistent shells and terminal commands together
+        proc_cfg = config.tools.processes if config else ProcessLimitsConfig()
+        self.process_pool = ProcessPool(
+            max_concurrent=proc_cfg.max_concurrent,
+            max_per_session=proc_cfg.max_per_session,
+            limits=ResourceLimits(
+                cpu_seconds=proc_cfg.cpu_seconds,
+                memory_mb=proc_cfg.memory_mb,
+                open_files=proc_cfg.open_files,
+                max_procs=proc_cfg.max_procs,
+            ),
+            cgroup_parent=proc_cfg.cgroup_parent or None,
+        )
+        # Shared by every parallel batch, including subagents' nested fan-outs
+        self.parallel_config = config.tools.parallel if config else ParallelToolConfig()
+        self.parallel_budget = asyncio.Semaphore(self.parallel_config.global_concurrency)
+        self.shell_sessions = ShellSessionManager(
+            str(workspace),
+            max_shells=self.exec_config.max_shells,
+            idle_timeout=self.exec_config.shell_idle_timeout,
+            pool=self.process_pool,
+        ) if self.exec_config.persistent else None
+
+        self.context = ContextBuilder(workspace, media=media_store(config))
         self.sessions = SessionManager(workspace)
         self.tools = ToolRegistry()
         self.subagents = SubagentManager(
@@ -108,12 +160,25 @@ class AgentLoop:
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
             restrict_to_workspace=restrict_to_workspace,
+            web_config=self.web_config,
+            web_fetch_cache=self.web_fetch_cache,
+            web_search_cache=self.web_search_cache,
+            process_pool=self.process_pool,
+            parallel_config=self.parallel_config,
+            parallel_budget=self.parallel_budget,
         )
 
         # Command framework
         allowed = config.commands.allowed if config else None
         self.command_registry = build_command_registry(config=config, allowed=allowed)
 
+        # Optional turn recording for offline replay benchmarks
+        rec_cfg = config.agents.recording if config else None
+        self.recording_writer = recording.RecordingWriter(
+            Path(rec_cfg.dir).expanduser() if rec_cfg.dir else get_data_path() / "recordings"
+        ) if rec_cfg and rec_cfg.enabled else None
+        self.recording_sample_rate = rec_cfg.sample_rate if rec_cfg else 0.0
+
         # Debug levels per session (runtime state, not persisted)
         self.debug_levels: dict[str, str] = {}
 
@@ -128,6 +193,7 @@ class AgentLoop:
         # Per-session injection handles for running terminal subprocesses
         self._injection_handles: dict[str, Any] = {}  # InjectionHandle
         self._register_default_tools()
+        self._register_metrics()
 
     def _register_default_tools(self) -> None:
         """Register the default set of tools."""
@@ -144,11 +210,24 @@ class AgentLoop:
             timeout=self.exec_config.timeout,
             restrict_to_workspace=self.restrict_to_workspace,
             allowed_git_repos=self.exec_config.allowed_git_repos,
+            max_output=self.exec_config.max_output,
+            spill_dir=self.workspace / ".exec-output" if self.exec_config.spill_output else None,
+            spill_max_bytes=self.exec_config.spill_max_mb * 1024 * 1024,
+            shell_sessions=self.shell_sessions,
+            process_pool=self.process_pool,
         ))
 
         # Web tools
-        self.tools.register(WebSearchTool(api_key=self.brave_api_key))
-        self.tools.register(WebFetchTool())
+        self.tools.register(WebSearchTool(
+            api_key=self.brave_api_key,
+            max_results=self.web_config.search.max_results,
+            cache=self.web_search_cache,
+        ))
+        self.tools.register(WebFetchTool(
+            max_chars=self.web_config.fetch.max_chars,
+            cache=self.web_fetch_cache,
+            max_bytes=self.web_config.fetch.max_bytes,
+        ))
 
         # Message tool
         message_tool = MessageTool(send_callback=self.bus.publish_outbound)
@@ -166,13 +245,29 @@ class AgentLoop:
             self.tools.register(CronTool(self.cron_service))
 
         # Parallel execution tool (fire-wait-resume)
-        self.tools.register(ParallelTool(registry=self.tools))
+        self.tools.register(ParallelTool(
+            registry=self.tools,
+            max_concurrency=self.parallel_config.max_concurrency,
+            task_timeout=self.parallel_config.task_timeout,
+            batch_timeout=self.parallel_config.batch_timeout,
+            budget=self.parallel_budget,
+        ))
+
+    def _register_metrics(self) -> None:
+        """Expose live queue/task counts as scrape-time gauges."""
+        metrics.BUS_DEPTH.set_function(lambda: self.bus.inbound_size, direction="inbound")
+        metrics.BUS_DEPTH.set_function(lambda: self.bus.outbound_size, direction="outbound")
+        metrics.ACTIVE_SESSIONS.set_function(
+            lambda: sum(1 for t in self._processing_tasks.values() if not t.done())
+        )
+        metrics.SUBAGENTS_RUNNING.set_function(self.subagents.get_running_count)
+        metrics.PROCESSES.set_function(lambda: self.process_pool.running, state="running")
+        metrics.PROCESSES.set_function(lambda: self.process_pool.waiting, state="waiting")
 
     def _make_progress_callback(
         self, channel: str, chat_id: str, session_key: str,
     ) -> "Callable[[str, dict[str, Any]], Awaitable[None]]":
         """Create a callback that respects debug level for progress messages."""
-        from collections.abc import Callable, Awaitable
 
         async def _notify(name: str, args: dict[str, Any]) -> None:
             level = self.debug_levels.get(session_key, "moderate")
@@ -184,9 +279,12 @@ class AgentLoop:
                 elapsed = args["elapsed"]
                 mins, secs = divmod(elapsed, 60)
                 label = f"{mins}m{secs}s" if mins else f"{secs}s"
+                content = f"⏳ Still running... ({label})"
+                if args.get("progress"):
+                    content += f"\n`{args['progress']}`"
                 await self.bus.publish_outbound(OutboundMessage(
-                    channel=channel, chat_id=chat_id,
-                    content=f"⏳ Still running... ({label})",
+                    channel=channel, chat_id=chat_id, content=content,
+                    metadata={"progress": True},
                 ))
                 return
 
@@ -202,6 +300,7 @@ class AgentLoop:
                 await self.bus.publish_outbound(OutboundMessage(
                     channel=channel, chat_id=chat_id,
                     content=f"🔧 `{name}({args_display})`",
+                    metadata={"progress": True},
                 ))
                 return
 
@@ -219,6 +318,7 @@ class AgentLoop:
             await self.bus.publish_outbound(OutboundMessage(
                 channel=channel, chat_id=chat_id,
                 content=f"⏳ `{name}`: {detail}",
+                metadata={"progress": True},
             ))
 
         return _notify
@@ -228,7 +328,7 @@ class AgentLoop:
     ) -> None:
         """Set streaming progress and message callbacks on the provider (OAuth CLI only)."""
         from nanobot.providers.anthropic_oauth import AnthropicOAuthProvider
-        if not isinstance(self.provider, AnthropicOAuthProvider):
+        if not isinstance(innermost(self.provider), AnthropicOAuthProvider):
             return
 
         level = self.debug_levels.get(session_key, "moderate")
@@ -240,6 +340,7 @@ class AgentLoop:
         async def _on_progress(text: str) -> None:
             await self.bus.publish_outbound(OutboundMessage(
                 channel=channel, chat_id=chat_id, content=text,
+                metadata={"progress": True},
             ))
 
         async def _on_message(content: str, media: list[str]) -> None:
@@ -324,6 +425,7 @@ class AgentLoop:
                 )
             except asyncio.TimeoutError:
                 continue
+            tracing.record("bus.inbound_wait", msg.trace, msg.queued_at)
 
             try:
                 # Commands dispatch immediately — never block.
@@ -333,8 +435,7 @@ class AgentLoop:
                 if self.command_registry.is_interrupt(msg.content) or \
                    (not is_terminal and self.command_registry.is_command(msg.content)):
                     response = await self._dispatch_command(msg)
-                    if response:
-                        await self.bus.publish_outbound(response)
+                    await self._publish_traced(msg, response)
                     continue
 
                 sk = msg.session_key
@@ -354,7 +455,7 @@ class AgentLoop:
                     )
                     gated = await self.extensions.pre_process(msg, None, ctx)
                     if gated is not None:
-                        await self.bus.publish_outbound(OutboundMessage(
+                        await self._publish_traced(msg, OutboundMessage(
                             channel=msg.channel, chat_id=msg.chat_id,
                             content=gated,
                         ))
@@ -365,6 +466,9 @@ class AgentLoop:
                     injected = await handle.inject(msg.content, media)
                     if injected:
                         logger.info(f"Injected message into running terminal [{sk}]")
+                        if msg.trace:
+                            msg.trace.set(injected=True)
+                            msg.trace.end()
                         continue
                     # Injection failed (process died) — fall through to normal path
 
@@ -372,7 +476,8 @@ class AgentLoop:
                 # conversation history stays consistent
                 existing = self._processing_tasks.get(sk)
                 if existing and not existing.done():
-                    await existing
+                    with tracing.span("session.wait", parent=msg.trace):
+                        await existing
                     self._processing_tasks.pop(sk, None)
 
                 cancel_event = asyncio.Event()
@@ -382,12 +487,35 @@ class AgentLoop:
                 )
             except Exception as e:
                 logger.error(f"Error handling message: {e}")
-                await self.bus.publish_outbound(OutboundMessage(
+                await self._publish_traced(msg, OutboundMessage(
                     channel=msg.channel,
                     chat_id=msg.chat_id,
                     content=f"Sorry, I encountered an error: {str(e)}"
                 ))
 
+    def _start_recording(self, msg: InboundMessage, session: Any) -> recording.TurnRecorder | None:
+        """Begin recording this turn if recording is on and the turn is sampled."""
+        if not self.recording_writer or random.random() >= self.recording_sample_rate:
+            return None
+        return recording.TurnRecorder(
+            session_key=msg.session_key, channel=msg.channel, chat_id=msg.chat_id,
+            content=msg.content, media=list(msg.media),
+            session_messages=session.messages, session_metadata=session.metadata,
+        )
+
+    async def _publish_traced(self, msg: InboundMessage, response: OutboundMessage | None) -> None:
+        """Publish the reply to *msg*, handing its trace to the outbound dispatcher.
+
+        The dispatcher ends the root span after ``channel.send``; with no
+        reply the trace ends here.
+        """
+        if response is None:
+            if msg.trace:
+                msg.trace.end()
+            return
+        response.trace = msg.trace
+        await self.bus.publish_outbound(response)
+
     def stop(self) -> None:
         """Stop the agent loop."""
         self._running = False
@@ -397,6 +525,13 @@ class AgentLoop:
         self, msg: InboundMessage, cancel_event: asyncio.Event,
     ) -> None:
         """Process a message and publish the response. Wraps _process_message for task use."""
+        with tracing.activate(msg.trace):
+            await self._process_and_respond_traced(msg, cancel_event)
+
+    async def _process_and_respond_traced(
+        self, msg: InboundMessage, cancel_event: asyncio.Event,
+    ) -> None:
+        response: OutboundMessage | None = None
         try:
             if self.config and self.config.terminal.enabled:
                 # Terminal mode: run extension hooks around the terminal command
@@ -407,34 +542,36 @@ class AgentLoop:
                 )
 
                 # HOOK: pre_process — credit gating (blocks zero-credit users)
-                gated = await self.extensions.pre_process(msg, None, ctx)
+                with tracing.span("hooks.pre_process"):
+                    gated = await self.extensions.pre_process(msg, None, ctx)
                 if gated is not None:
-                    await self.bus.publish_outbound(OutboundMessage(
+                    response = OutboundMessage(
                         channel=msg.channel, chat_id=msg.chat_id, content=gated,
-                    ))
-                    return
-
-                response = await self._process_terminal_message(msg, cancel_event)
-
-                # HOOK: transform_response — credit deduction after successful answer
-                # Skip on errors so users aren't charged for failed requests.
-                if response and response.content and not response.error:
-                    response.content = await self.extensions.transform_response(
-                        response.content, ctx,
                     )
+                else:
+                    with tracing.span("terminal.command"):
+                        response = await self._process_terminal_message(msg, cancel_event)
+
+                    # HOOK: transform_response — credit deduction after successful answer
+                    # Skip on errors so users aren't charged for failed requests.
+                    if response and response.content and not response.error:
+                        response.content = await self.extensions.transform_response(
+                            response.content, ctx,
+                        )
             else:
                 response = await self._process_message(msg, cancel_event)
-            if response:
-                await self.bus.publish_outbound(response)
         except Exception as e:
             logger.error(f"Error processing message: {e}")
-            await self.bus.publish_outbound(OutboundMessage(
+            if msg.trace:
+                msg.trace.error = str(e)
+            response = OutboundMessage(
                 channel=msg.channel,
                 chat_id=msg.chat_id,
                 content=f"Sorry, I encountered an error: {str(e)}"
-            ))
+            )
         finally:
             self.cancel_events.pop(msg.session_key, None)
+        await self._publish_traced(msg, response)
 
     async def _process_terminal_message(
         self, msg: InboundMessage, cancel_event: asyncio.Event | None = None,
@@ -456,6 +593,7 @@ class AgentLoop:
                 publish=self.bus.publish_outbound,
                 cancel_event=cancel_event,
                 on_handle_ready=_register_handle,
+                pool=self.process_pool,
             )
         finally:
             self._injection_handles.pop(sk, None)
@@ -492,29 +630,36 @@ class AgentLoop:
         )
 
         # HOOK: pre_process — allows extensions to short-circuit before LLM call
-        gated_response = await self.extensions.pre_process(msg, session, ctx)
+        with tracing.span("hooks.pre_process"):
+            gated_response = await self.extensions.pre_process(msg, session, ctx)
         if gated_response is not None:
             session.add_message("user", msg.content)
             session.add_message("assistant", gated_response)
-            await self.extensions.pre_session_save(session, ctx)
-            self.sessions.save(session)
+            with tracing.span("session.save"):
+                await self.extensions.pre_session_save(session, ctx)
+                self.sessions.save(session)
             return OutboundMessage(
                 channel=msg.channel, chat_id=msg.chat_id, content=gated_response,
             )
 
-        # HOOK: transform_history
-        history = session.get_history()
-        history = await self.extensions.transform_history(history, session, ctx)
+        recorder = self._start_recording(msg, session)
 
-        # HOOK: transform_messages
-        messages = self.context.build_messages(
-            history=history,
-            current_message=msg.content,
-            media=msg.media if msg.media else None,
-            channel=msg.channel,
-            chat_id=msg.chat_id,
-        )
-        messages = await self.extensions.transform_messages(messages, ctx)
+        with tracing.span("context.build") as sp:
+            # HOOK: transform_history
+            history = session.get_history()
+            history = await self.extensions.transform_history(history, session, ctx)
+
+            # HOOK: transform_messages
+            messages = self.context.build_messages(
+                history=history,
+                current_message=msg.content,
+                media=msg.media if msg.media else None,
+                channel=msg.channel,
+                chat_id=msg.chat_id,
+            )
+            messages = await self.extensions.transform_messages(messages, ctx)
+            if sp:
+                sp.set(messages=len(messages))
 
         _maybe_nudge_tool_use(messages)
 
@@ -524,23 +669,27 @@ class AgentLoop:
         # Agent loop
         pre_loop_len = len(messages)
         try:
-            final_content = await run_tool_loop(
-                provider=self.provider,
-                tools=self.tools,
-                messages=messages,
-                model=self.model,
-                max_iterations=self.max_iterations,
-                on_tool_call=self._make_progress_callback(msg.channel, msg.chat_id, msg.session_key),
-                cancel_event=cancel_event,
-            )
+            with recording.recording(recorder), session_scope(msg.session_key):
+                final_content = await run_tool_loop(
+                    provider=self.provider,
+                    tools=self.tools,
+                    messages=messages,
+                    model=self.model,
+                    max_iterations=self.max_iterations,
+                    on_tool_call=self._make_progress_callback(msg.channel, msg.chat_id, msg.session_key),
+                    cancel_event=cancel_event,
+                )
         finally:
             self._clear_provider_progress()
+        if recorder and self.recording_writer:
+            self.recording_writer.write(recorder.finish(final_content))
 
         if not final_content:
             final_content = "I processed your request but wasn't able to generate a text response. Could you try rephrasing or asking again?"
 
         # HOOK: transform_response
-        final_content = await self.extensions.transform_response(final_content, ctx)
+        with tracing.span("hooks.transform_response"):
+            final_content = await self.extensions.transform_response(final_content, ctx)
 
         # Log response preview
         preview = final_content[:120] + "..." if len(final_content) > 120 else final_content
@@ -566,8 +715,9 @@ class AgentLoop:
         session.add_message("assistant", final_content)
 
         # HOOK: pre_session_save
-        await self.extensions.pre_session_save(session, ctx)
-        self.sessions.save(session)
+        with tracing.span("session.save"):
+            await self.extensions.pre_session_save(session, ctx)
+            self.sessions.save(session)
 
         return OutboundMessage(
             channel=msg.channel,
@@ -627,14 +777,15 @@ class AgentLoop:
         # Agent loop (limited for announce handling)
         pre_loop_len = len(messages)
         try:
-            final_content = await run_tool_loop(
-                provider=self.provider,
-                tools=self.tools,
-                messages=messages,
-                model=self.model,
-                max_iterations=self.max_iterations,
-                on_tool_call=self._make_progress_callback(origin_channel, origin_chat_id, session_key),
-            )
+            with session_scope(session_key):
+                final_content = await run_tool_loop(
+                    provider=self.provider,
+                    tools=self.tools,
+                    messages=messages,
+                    model=self.model,
+                    max_iterations=self.max_iterations,
+                    on_tool_call=self._make_progress_callback(origin_channel, origin_chat_id, session_key),
+                )
         finally:
             self._clear_provider_progress()
 
@@ -0,0 +1,310 @@
+"""Resource-limited subprocess pool shared by exec and terminal mode."""
+
+import asyncio
+import itertools
+import json
+import os
+import signal
+import sys
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from loguru import logger
+
+_LAUNCHER = str(Path(__file__).with_name("_launcher.py"))
+_cgroup_seq = itertools.count(1)
+
+
+@dataclass
+class ResourceLimits:
+    """Per-command rlimits. Zero means unlimited."""
+
+    cpu_seconds: int = 0
+    memory_mb: int = 0  # Address space (RLIMIT_AS); prefer a cgroup for RSS limits
+    open_files: int = 0
+    max_procs: int = 0  # RLIMIT_NPROC counts all processes of the user, not just this tree
+
+    def rlimits(self) -> dict[str, int]:
+        limits = {
+            "RLIMIT_CPU": self.cpu_seconds,
+            "RLIMIT_AS": self.memory_mb * 1024 * 1024,
+            "RLIMIT_NOFILE": self.open_files,
+            "RLIMIT_NPROC": self.max_procs,
+        }
+        return {name: value for name, value in limits.items() if value > 0}
+
+
+@dataclass
+class ProcessUsage:
+    """Resource usage of one finished command."""
+
+    peak_rss_kb: int = 0
+    cpu_user: float = 0.0
+    cpu_system: float = 0.0
+    wall: float = 0.0
+    queued: float = 0.0  # Seconds spent waiting for a pool slot
+    signal: int | None = None
+
+    @property
+    def cpu_seconds(self) -> float:
+        return self.cpu_user + self.cpu_system
+
+    def summary(self) -> str:
+        text = f"cpu {self.cpu_seconds:.2f}s, peak rss {self.peak_rss_kb / 1024:.1f} MB, wall {self.wall:.2f}s"
+        if self.queued >= 0.01:
+            text += f", queued {self.queued:.2f}s"
+        return text
+
+    def limit_hit(self) -> str | None:
+        """Describe the resource limit that killed the command, if any."""
+        if self.signal == signal.SIGXCPU:
+            return "CPU time limit exceeded"
+        if self.signal == signal.SIGKILL:
+            return "killed (SIGKILL: timeout, /stop, or memory limit)"
+        return None
+
+
+@dataclass
+class _Spawned:
+    process: asyncio.subprocess.Process
+    usage_fd: int
+    cgroup: Path | None
+
+
+@dataclass
+class ProcessSlot:
+    """A held pool slot. Processes spawned through it are reaped when it is released."""
+
+    pool: "ProcessPool"
+    session_key: str | None
+    queued: float = 0.0
+    usage: list[ProcessUsage] = field(default_factory=list)
+    _spawned: list[_Spawned] = field(default_factory=list)
+
+    async def spawn_shell(self, command: str, **kwargs: Any) -> asyncio.subprocess.Process:
+        """Start ``/bin/sh -c command`` under the pool's limits."""
+        return await self.spawn_exec("/bin/sh", "-c", command, **kwargs)
+
+    async def spawn_exec(self, *argv: str, **kwargs: Any) -> asyncio.subprocess.Process:
+        spawned = await self.pool._spawn(list(argv), kwargs)
+        self._spawned.append(spawned)
+        return spawned.process
+
+    async def _release(self) -> None:
+        for spawned in self._spawned:
+            usage = await self.pool._finish(spawned)
+            if usage:
+                usage.queued = self.queued
+                self.usage.append(usage)
+                logger.debug(f"Process [{self.session_key or '-'}] finished: {usage.summary()}")
+        self._spawned.clear()
+
+
+class ProcessPool:
+    """
+    Concurrency-capped launcher for user commands.
+
+    At most ``max_concurrent`` commands run at once, and at most
+    ``max_per_session`` per session key; extra callers wait in FIFO order.
+    Every command is started through a small launcher that applies the
+    rlimits, optionally moves it into its own cgroup v2 directory under
+    ``cgroup_parent`` (memory.max / pids.max), and reports peak RSS and
+    CPU time via ``wait4``.  Processes get their own process group so
+    they can be killed as a tree.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_per_session: int = 2,
+        limits: ResourceLimits | None = None,
+        cgroup_parent: str | None = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_session = max_per_session
+        self.limits = limits or ResourceLimits()
+        self.cgroup_parent = Path(cgroup_parent) if cgroup_parent else None
+        self._global = asyncio.Semaphore(max_concurrent)
+        self._sessions: dict[str, tuple[asyncio.Semaphore, int]] = {}
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+
+    @asynccontextmanager
+    async def slot(self, session_key: str | None = None) -> AsyncIterator[ProcessSlot]:
+        """Wait for a free slot (per-session first, then global) and hold it."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        session_sem = self._session_sem(session_key)
+        self.waiting += 1
+        try:
+            if session_sem:
+                await session_sem.acquire()
+            try:
+                await self._global.acquire()
+            except BaseException:
+                if session_sem:
+                    session_sem.release()
+                raise
+        except BaseException:
+            self._drop_session_sem(session_key)
+            raise
+        finally:
+            self.waiting -= 1
+
+        held = ProcessSlot(self, session_key, queued=loop.time() - start)
+        if held.queued >= 1:
+            logger.info(f"Process slot for {session_key or '-'} granted after {held.queued:.1f}s wait")
+        self.running += 1
+        try:
+            yield held
+        finally:
+            try:
+                await held._release()
+            finally:
+                self.running -= 1
+                self.completed += 1
+                self._global.release()
+                if session_sem:
+                    session_sem.release()
+                self._drop_session_sem(session_key)
+
+    async def spawn_detached(self, *argv: str, **kwargs: Any) -> asyncio.subprocess.Process:
+        """Start a long-lived process under the limits without holding a slot.
+
+        Used for persistent shells, which are idle most of the time; the
+        caller takes a slot per command instead.  No usage is collected.
+        """
+        spawned = await self._spawn(list(argv), kwargs)
+        os.close(spawned.usage_fd)
+        return spawned.process
+
+    def stats(self) -> dict[str, int]:
+        return {"running": self.running, "waiting": self.waiting, "completed": self.completed}
+
+    def _session_sem(self, key: str | None) -> asyncio.Semaphore | None:
+        if key is None or self.max_per_session <= 0:
+            return None
+        sem, refs = self._sessions.get(key, (None, 0))
+        if sem is None:
+            sem = asyncio.Semaphore(self.max_per_session)
+        self._sessions[key] = (sem, refs + 1)
+        return sem
+
+    def _drop_session_sem(self, key: str | None) -> None:
+        if key is None or key not in self._sessions:
+            return
+        sem, refs = self._sessions[key]
+        if refs <= 1:
+            del self._sessions[key]
+        else:
+            self._sessions[key] = (sem, refs - 1)
+
+    async def _spawn(self, argv: list[str], kwargs: dict[str, Any]) -> _Spawned:
+        cgroup = self._make_cgroup()
+        read_fd, write_fd = os.pipe()
+        launcher = [
+            sys.executable, "-I", "-S", _LAUNCHER,
+            str(write_fd), json.dumps(self.limits.rlimits()), str(cgroup or ""), "--", *argv,
+        ]
+        kwargs = {**kwargs, "start_new_session": True}
+        kwargs["pass_fds"] = (*kwargs.get("pass_fds", ()), write_fd)
+        try:
+            process = await asyncio.create_subprocess_exec(*launcher, **kwargs)
+        except BaseException:
+            os.close(read_fd)
+            self._remove_cgroup(cgroup)
+            raise
+        finally:
+            os.close(write_fd)
+        return _Spawned(process, read_fd, cgroup)
+
+    async def _finish(self, spawned: _Spawned) -> ProcessUsage | None:
+        """Make sure the process tree is gone, then collect its usage."""
+        process = spawned.process
+        if process.returncode is None:
+            kill_process_group(process)
+        await process.wait()
+        try:
+            raw = os.read(spawned.usage_fd, 4096)
+        except OSError:
+            raw = b""
+        finally:
+            os.close(spawned.usage_fd)
+
+        usage = None
+        if raw:
+            try:
+                data = json.loads(raw)
+                usage = ProcessUsage(
+                    peak_rss_kb=data["maxrss_kb"], cpu_user=data["utime"], cpu_system=data["stime"],
+                    wall=data["wall"], signal=data["signal"],
+                )
+            except (ValueError, KeyError):
+                usage = None
+        elif process.returncode == -signal.SIGKILL:
+            usage = ProcessUsage(signal=signal.SIGKILL)
+
+        if spawned.cgroup:
+            peak = _read_int(spawned.cgroup / "memory.peak")
+            if usage and peak:
+                usage.peak_rss_kb = max(usage.peak_rss_kb, peak // 1024)
+            self._remove_cgroup(spawned.cgroup)
+        return usage
+
+    def _make_cgroup(self) -> Path | None:
+        if not self.cgroup_parent:
+            return None
+        path = self.cgroup_parent / f"nanobot-{os.getpid()}-{next(_cgroup_seq)}"
+        try:
+            path.mkdir()
+            if self.limits.memory_mb:
+                (path / "memory.max").write_text(str(self.limits.memory_mb * 1024 * 1024))
+                (path / "memory.swap.max").write_text("0")
+            if self.limits.max_procs:
+                (path / "pids.max").write_text(str(self.limits.max_procs))
+        except OSError as e:
+            logger.warning(f"cgroup v2 unavailable under {self.cgroup_parent} ({e}); using rlimits only")
+            self._remove_cgroup(path)
+            self.cgroup_parent = None
+            return None
+        return path
+
+    @staticmethod
+    def _remove_cgroup(path: Path | None) -> None:
+        if path is None:
+            return
+        try:
+            path.rmdir()
+        except OSError:
+            pass
+
+
+def kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """SIGKILL a pooled process together with everything it started."""
+    if process.returncode is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        process.kill()
+
+
+def _read_int(path: Path) -> int | None:
+    try:
+        return int(path.read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+_default_pool: ProcessPool | None = None
+
+
+def get_default_pool() -> ProcessPool:
+    """Pool used when no configured pool is passed in (tests, standalone tools)."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = ProcessPool()
+    return _default_pool
@@ -3,19 +3,24 @@
 import asyncio
 import uuid
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
-from nanobot.bus.events import InboundMessage
-from nanobot.bus.queue import MessageBus
-from nanobot.providers.base import LLMProvider
 from nanobot.agent.engine import run_tool_loop
+from nanobot.agent.process_pool import ProcessPool
+from nanobot.agent.tools.filesystem import ListDirTool, ReadFileTool, WriteFileTool
+from nanobot.agent.tools.parallel import ParallelTool
 from nanobot.agent.tools.registry import ToolRegistry
-from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
-from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
-from nanobot.agent.tools.parallel import ParallelTool
+from nanobot.agent.tools.web import WebFetchCache, WebFetchTool, WebSearchCache, WebSearchTool
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, detach_session
+from nanobot.telemetry import recording
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import ExecToolConfig, ParallelToolConfig, WebToolsConfig
 
 
 class SubagentManager:
@@ -36,8 +41,14 @@ class SubagentManager:
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
+        web_config: "WebToolsConfig | None" = None,
+        web_fetch_cache: WebFetchCache | None = None,
+        web_search_cache: WebSearchCache | None = None,
+        process_pool: ProcessPool | None = None,
+        parallel_config: "ParallelToolConfig | None" = None,
+        parallel_budget: asyncio.Semaphore | None = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ExecToolConfig, ParallelToolConfig, WebToolsConfig
         self.provider = provider
         self.workspace = workspace
         self.bus = bus
@@ -45,6 +56,12 @@ class SubagentManager:
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.restrict_to_workspace = restrict_to_workspace
+        self.web_config = web_config or WebToolsConfig()
+        self.web_fetch_cache = web_fetch_cache
+        self.web_search_cache = web_search_cache
+        self.process_pool = process_pool
+        self.parallel_config = parallel_config or ParallelToolConfig()
+        self.parallel_budget = parallel_budget
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
     
     async def spawn(
@@ -99,6 +116,8 @@ class SubagentManager:
     ) -> None:
         """Execute the subagent task and announce the result."""
         logger.info(f"Subagent [{task_id}] starting task: {label}")
+        recording.detach()  # Not part of the turn that spawned it
+        detach_session()  # Nor of its conversation: don't lease or resume the parent's CLI session
         
         try:
             # Build subagent tools (no message tool, no spawn tool)
@@ -111,10 +130,28 @@ class SubagentManager:
                 working_dir=str(self.workspace),
                 timeout=self.exec_config.timeout,
                 restrict_to_workspace=self.restrict_to_workspace,
+                max_output=self.exec_config.max_output,
+                spill_dir=self.workspace / ".exec-output" if self.exec_config.spill_output else None,
+                spill_max_bytes=self.exec_config.spill_max_mb * 1024 * 1024,
+                process_pool=self.process_pool,
+            ))
+            tools.register(WebSearchTool(
+                api_key=self.brave_api_key,
+                max_results=self.web_config.search.max_results,
+                cache=self.web_search_cache,
+            ))
+            tools.register(WebFetchTool(
+                max_chars=self.web_config.fetch.max_chars,
+                cache=self.web_fetch_cache,
+                max_bytes=self.web_config.fetch.max_bytes,
+            ))
+            tools.register(ParallelTool(
+                registry=tools,
+                max_concurrency=self.parallel_config.max_concurrency,
+                task_timeout=self.parallel_config.task_timeout,
+                batch_timeout=self.parallel_config.batch_timeout,
+                budget=self.parallel_budget,
             ))
-            tools.register(WebSearchTool(api_key=self.brave_api_key))
-            tools.register(WebFetchTool())
-            tools.register(ParallelTool(registry=tools))
 
             # Build messages with subagent-specific prompt
             system_prompt = self._build_subagent_prompt(task)
@@ -18,14 +18,19 @@ import os
 import re
 import shlex
 import signal
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AsyncExitStack, asynccontextmanager
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
+from nanobot.agent.process_pool import ProcessPool, ProcessSlot, get_default_pool
 from nanobot.bus.events import InboundMessage, OutboundMessage
-from nanobot.config.schema import TerminalConfig
+from nanobot.providers.keypool import KeyPool
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import TerminalConfig
 
 # ---------------------------------------------------------------------------
 # Injection handle (follow-up messages into a running subprocess)
@@ -136,9 +141,14 @@ def _ensure_user_data_dir(workspace: str, chat_id: str) -> str:
 def _build_input_envelope(
     msg: InboundMessage,
     workspace: str,
-    config: TerminalConfig,
+    config: "TerminalConfig",
+    leased: dict[str, str] | None = None,
 ) -> str:
-    """Build the JSON input envelope written to the subprocess's stdin."""
+    """Build the JSON input envelope written to the subprocess's stdin.
+
+    *leased* maps provider names to the key leased for this run; it is
+    passed as ``api_key`` next to the full ``api_keys`` list.
+    """
     user_data_dir = _ensure_user_data_dir(workspace, msg.chat_id)
     envelope: dict[str, Any] = {
         "version": 1,
@@ -155,6 +165,7 @@ def _build_input_envelope(
         envelope["providers"] = {
             name: {
                 "api_keys": p.api_keys,
+                **({"api_key": leased[name]} if leased and name in leased else {}),
                 **({"models": p.models} if p.models else {}),
                 **({"base_url": p.base_url} if p.base_url else {}),
             }
@@ -168,7 +179,7 @@ def _build_input_envelope(
 # Error visibility
 # ---------------------------------------------------------------------------
 
-def _should_reveal(config: TerminalConfig, chat_id: str) -> bool:
+def _should_reveal(config: "TerminalConfig", chat_id: str) -> bool:
     """Check if errors should be revealed based on config and chat_id."""
     if config.reveal_errors is True:
         return True
@@ -224,15 +235,16 @@ _PROVIDER_ENV_MAP: dict[str, str] = {
 }
 
 
-def _build_env(config: TerminalConfig) -> dict[str, str] | None:
+def _build_env(config: "TerminalConfig", leased: dict[str, str] | None = None) -> dict[str, str] | None:
     """Build the subprocess environment.
 
     Merges static ``config.env`` vars and injects provider API keys as
     standard environment variables (e.g. ``ANTHROPIC_API_KEY``) so that
     SDKs like litellm, openai, google-genai work out of the box.
 
-    When a provider has multiple keys, the first is set as the standard
-    env var and all are available as ``{NAME}_API_KEYS`` (comma-separated).
+    When a provider has multiple keys, the leased one (or the first) is
+    set as the standard env var and all are available as
+    ``{NAME}_API_KEYS`` (comma-separated).
     """
     has_extras = bool(config.env) or bool(config.providers)
     if not has_extras:
@@ -244,7 +256,7 @@ def _build_env(config: TerminalConfig) -> dict[str, str] | None:
             continue
         env_var = _PROVIDER_ENV_MAP.get(name)
         if env_var:
-            env[env_var] = provider.api_keys[0]
+            env[env_var] = (leased or {}).get(name) or provider.api_keys[0]
         # Always set {NAME}_API_KEYS with all keys (comma-separated)
         env[f"{name.upper()}_API_KEYS"] = ",".join(provider.api_keys)
     # Static env vars from config (override provider defaults if set)
@@ -252,6 +264,24 @@ def _build_env(config: TerminalConfig) -> dict[str, str] | None:
     return env
 
 
+@asynccontextmanager
+async def _lease_keys(config: "TerminalConfig") -> AsyncIterator[dict[str, str]]:
+    """Lease one key per multi-key provider for the duration of a run.
+
+    Pools share per-key state with the LLM path, so micro-agents and the
+    agent loop spread load over the same keys.
+    """
+    async with AsyncExitStack() as stack:
+        leased: dict[str, str] = {}
+        for name, provider in config.providers.items():
+            if not provider.api_keys or (len(provider.api_keys) < 2 and not (provider.rpm or provider.tpm)):
+                continue
+            pool = KeyPool(name, provider.api_keys, rpm=provider.rpm, tpm=provider.tpm)
+            lease = await stack.enter_async_context(pool.lease())
+            leased[name] = lease.key
+        yield leased
+
+
 # ---------------------------------------------------------------------------
 # Cancellation watcher (shared by both protocols)
 # ---------------------------------------------------------------------------
@@ -293,11 +323,13 @@ async def execute_terminal_command(
     stdin_data: str | None = None,
     env: dict[str, str] | None = None,
     cancel_event: asyncio.Event | None = None,
+    slot: ProcessSlot | None = None,
 ) -> OutboundMessage:
     """Execute a user message as a shell command via a template.
 
     The ``{message}`` placeholder in *template* is replaced with the
-    shell-escaped user text.
+    shell-escaped user text.  With a pool *slot*, the process is started
+    under the pool's resource limits.
     """
     command = _build_command(template, msg)
 
@@ -305,8 +337,9 @@ async def execute_terminal_command(
     logger.info(f"Terminal exec [{msg.session_key}]: {preview}")
 
     watcher: asyncio.Task | None = None
+    spawn = slot.spawn_shell if slot else asyncio.create_subprocess_shell
     try:
-        process = await asyncio.create_subprocess_shell(
+        process = await spawn(
             command,
             stdin=asyncio.subprocess.PIPE if stdin_data else asyncio.subprocess.DEVNULL,
             stdout=asyncio.subprocess.PIPE,
@@ -385,11 +418,13 @@ async def execute_terminal_command(
 
 async def _execute_terminal_rich(
     msg: InboundMessage,
-    config: TerminalConfig,
+    config: "TerminalConfig",
     workspace: str,
     publish: Callable[[OutboundMessage], Awaitable[None]],
     cancel_event: asyncio.Event | None = None,
     on_handle_ready: Callable[[InjectionHandle], None] | None = None,
+    slot: ProcessSlot | None = None,
+    leased: dict[str, str] | None = None,
 ) -> OutboundMessage | None:
     """Execute with the rich JSONL protocol.
 
@@ -399,14 +434,15 @@ async def _execute_terminal_rich(
     messages were already published).
     """
     command = _build_command(config.command, msg)
-    stdin_data = _build_input_envelope(msg, workspace, config)
-    env = _build_env(config)
+    stdin_data = _build_input_envelope(msg, workspace, config, leased)
+    env = _build_env(config, leased)
 
     preview = command[:120] + "..." if len(command) > 120 else command
     logger.info(f"Terminal rich [{msg.session_key}]: {preview}")
 
+    spawn = slot.spawn_shell if slot else asyncio.create_subprocess_shell
     try:
-        process = await asyncio.create_subprocess_shell(
+        process = await spawn(
             command,
             stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
@@ -647,11 +683,12 @@ def _project_root(workspace: str) -> str:
 
 async def run_terminal_command(
     msg: InboundMessage,
-    config: TerminalConfig,
+    config: "TerminalConfig",
     workspace: str,
     publish: Callable[[OutboundMessage], Awaitable[None]],
     cancel_event: asyncio.Event | None = None,
     on_handle_ready: Callable[[InjectionHandle], None] | None = None,
+    pool: ProcessPool | None = None,
 ) -> OutboundMessage | None:
     """Execute a terminal command using the configured protocol.
 
@@ -664,21 +701,31 @@ async def run_terminal_command(
     :class:`InjectionHandle` once the subprocess is running.  The caller
     can use the handle to inject follow-up messages into the subprocess's
     stdin while it is still running.
-    """
-    if config.protocol == "rich":
-        return await _execute_terminal_rich(
-            msg, config, workspace, publish, cancel_event, on_handle_ready,
-        )
 
-    # Plain mode — delegate to the original implementation
-    stdin_data = _build_input_envelope(msg, workspace, config)
-    env = _build_env(config)
-    return await execute_terminal_command(
-        msg=msg,
-        template=config.command,
-        workspace=workspace,
-        timeout=config.timeout,
-        stdin_data=stdin_data,
-        env=env,
-        cancel_event=cancel_event,
-    )
+    The command waits for a slot in *pool* (global and per-session
+    concurrency caps) and runs under its resource limits, holding one
+    leased API key per multi-key provider.
+    """
+    pool = pool or get_default_pool()
+    async with pool.slot(msg.session_key) as slot, _lease_keys(config) as leased:
+        if config.protocol == "rich":
+            result = await _execute_terminal_rich(
+                msg, config, workspace, publish, cancel_event, on_handle_ready, slot, leased,
+            )
+        else:
+            # Plain mode — delegate to the original implementation
+            stdin_data = _build_input_envelope(msg, workspace, config, leased)
+            env = _build_env(config, leased)
+            result = await execute_terminal_command(
+                msg=msg,
+                template=config.command,
+                workspace=workspace,
+                timeout=config.timeout,
+                stdin_data=stdin_data,
+                env=env,
+                cancel_event=cancel_event,
+                slot=slot,
+            )
+    if slot.usage:
+        logger.info(f"Terminal process [{msg.session_key}] usage: {slot.usage[-1].summary()}")
+    return result
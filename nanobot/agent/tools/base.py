@@ -1,9 +1,37 @@
 """Base class for agent tools."""
 
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
 from typing import Any
 
 
+class ToolProgress:
+    """Latest progress line reported by a running tool.
+
+    The engine installs one per tool call (see ``tool_progress``) and
+    includes ``latest`` in its periodic heartbeat, so long-running tools
+    can surface live output without knowing about channels.
+    """
+
+    def __init__(self) -> None:
+        self.latest: str | None = None
+
+    def update(self, line: str) -> None:
+        line = line.strip()
+        if line:
+            self.latest = line[-200:]
+
+
+tool_progress: ContextVar[ToolProgress | None] = ContextVar("tool_progress", default=None)
+
+
+def report_progress(line: str) -> None:
+    """Report a progress line for the current tool call (no-op outside the engine)."""
+    progress = tool_progress.get()
+    if progress is not None:
+        progress.update(line)
+
+
 class Tool(ABC):
     """
     Abstract base class for agent tools.
@@ -2,11 +2,12 @@
 
 import asyncio
 import json
-from typing import Any, TYPE_CHECKING
+import time
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import Tool, report_progress
 
 if TYPE_CHECKING:
     from nanobot.agent.tools.registry import ToolRegistry
@@ -19,12 +20,27 @@ _DENY_LIST = frozenset({"parallel", "message", "spawn"})
 class ParallelTool(Tool):
     """Execute multiple tool calls concurrently (fire-wait-resume).
 
-    Launches all sub-tasks at once via asyncio.gather, blocks until every
-    task finishes, then returns all results in a single string.
+    Runs at most ``max_concurrency`` sub-tasks at a time, each bounded by a
+    per-task timeout and the whole batch by a batch deadline.  Sub-tasks
+    that overrun are cancelled and reported as timed out; finished results
+    are always returned.  An optional ``budget`` semaphore is shared with
+    subagents so nested fan-outs cannot multiply past a global limit.
+    Cancelling the call (``/stop``) cancels every running sub-task.
     """
 
-    def __init__(self, registry: "ToolRegistry"):
+    def __init__(
+        self,
+        registry: "ToolRegistry",
+        max_concurrency: int = 5,
+        task_timeout: float = 120,
+        batch_timeout: float = 300,
+        budget: asyncio.Semaphore | None = None,
+    ):
         self._registry = registry
+        self.max_concurrency = max_concurrency
+        self.task_timeout = task_timeout
+        self.batch_timeout = batch_timeout
+        self.budget = budget
 
     @property
     def name(self) -> str:
@@ -34,7 +50,8 @@ class ParallelTool(Tool):
     def description(self) -> str:
         return (
             "Execute multiple tool calls concurrently (fire-wait-resume). "
-            "All tasks run in parallel; the call returns only after every task finishes. "
+            f"Up to {self.max_concurrency} tasks run at a time; the call returns once every task "
+            "has finished, failed or timed out, with a status table and each result. "
             "Use this when you need to perform several independent operations at once, "
             "such as reading multiple files or running unrelated commands. "
             "Do NOT include tools that depend on each other's results."
@@ -58,16 +75,26 @@ class ParallelTool(Tool):
                                 "type": "object",
                                 "description": "Arguments to pass to the tool",
                             },
+                            "timeout": {
+                                "type": "number",
+                                "description": f"Seconds before this task is abandoned (max {self.task_timeout:g})",
+                            },
                         },
                         "required": ["tool", "arguments"],
                     },
                     "description": "List of independent tool calls to execute concurrently",
                 },
+                "timeout": {
+                    "type": "number",
+                    "description": f"Deadline in seconds for the whole batch (max {self.batch_timeout:g})",
+                },
             },
             "required": ["tasks"],
         }
 
-    async def execute(self, tasks: list[dict[str, Any]], **kwargs: Any) -> str:
+    async def execute(
+        self, tasks: list[dict[str, Any]], timeout: float | None = None, **kwargs: Any,
+    ) -> str:
         if not tasks:
             return "Error: tasks list is empty"
         if len(tasks) > 10:
@@ -81,27 +108,111 @@ class ParallelTool(Tool):
             if not self._registry.has(tool_name):
                 return f"Error: tool '{tool_name}' not found (task {i + 1})"
 
-        # Fire — launch all concurrently
-        logger.info(f"Parallel: launching {len(tasks)} tasks")
-        coros = [
-            self._registry.execute(task["tool"], task.get("arguments", {}))
-            for task in tasks
-        ]
-        results = await asyncio.gather(*coros, return_exceptions=True)
+        batch_timeout = min(timeout or self.batch_timeout, self.batch_timeout)
+        logger.info(
+            f"Parallel: launching {len(tasks)} tasks "
+            f"(concurrency {self.max_concurrency}, batch deadline {batch_timeout:g}s)"
+        )
+        start = time.monotonic()
+        limiter = asyncio.Semaphore(self.max_concurrency)
+        outcomes: list[_Outcome] = [_Outcome() for _ in tasks]
+        running = {
+            asyncio.create_task(self._run_one(task, limiter, outcome)): outcome
+            for task, outcome in zip(tasks, outcomes)
+        }
 
-        # Format results
+        pending = set(running)
+        try:
+            deadline = start + batch_timeout
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED,
+                )
+                finished = len(tasks) - len(pending)
+                for t in done:
+                    o = running[t]
+                    report_progress(f"parallel {finished}/{len(tasks)}: {o.tool} {o.status}")
+        finally:
+            # Batch deadline or cancellation: stop whatever is still going
+            for t in pending:
+                t.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            for t in pending:
+                o = running[t]
+                if o.status == "pending":
+                    o.status = "not started" if o.started is None else "timed out"
+                    o.result = f"Error: batch deadline of {batch_timeout:g}s exceeded"
+                    if o.started is not None:
+                        o.elapsed = time.monotonic() - o.started
+
+        return self._format(tasks, outcomes, time.monotonic() - start)
+
+    async def _run_one(
+        self, task: dict[str, Any], limiter: asyncio.Semaphore, outcome: "_Outcome",
+    ) -> None:
+        outcome.tool = task["tool"]
+        task_timeout = min(task.get("timeout") or self.task_timeout, self.task_timeout)
+        async with limiter, (self.budget or _NO_BUDGET):
+            outcome.started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(
+                    self._registry.execute(task["tool"], task.get("arguments", {})),
+                    timeout=task_timeout,
+                )
+            except asyncio.TimeoutError:
+                outcome.status = "timed out"
+                outcome.result = f"Error: task timed out after {task_timeout:g}s"
+            except Exception as e:
+                outcome.status = "error"
+                outcome.result = f"Error: {e}"
+            else:
+                outcome.status = "error" if result.startswith("Error") else "completed"
+                outcome.result = result
+            outcome.elapsed = time.monotonic() - outcome.started
+
+    @staticmethod
+    def _format(tasks: list[dict[str, Any]], outcomes: list["_Outcome"], elapsed: float) -> str:
+        counts: dict[str, int] = {}
+        for o in outcomes:
+            counts[o.status] = counts.get(o.status, 0) + 1
+        summary = ", ".join(f"{n} {status}" for status, n in counts.items())
+
+        table = ["| # | tool | status | time |", "|---|------|--------|------|"]
         parts: list[str] = []
-        for i, (task, result) in enumerate(zip(tasks, results), 1):
+        for i, (task, o) in enumerate(zip(tasks, outcomes), 1):
             tool_name = task["tool"]
+            table.append(f"| {i} | {tool_name} | {o.status} | {o.elapsed:.1f}s |")
+
             args_brief = json.dumps(task.get("arguments", {}), ensure_ascii=False)
             if len(args_brief) > 120:
                 args_brief = args_brief[:120] + "..."
+            parts.append(f"[{i}] {tool_name}({args_brief}):\n{o.result}")
 
-            if isinstance(result, Exception):
-                body = f"Error: {result}"
-            else:
-                body = result
+        header = f"Parallel: {summary} in {elapsed:.1f}s\n\n" + "\n".join(table)
+        return header + "\n\n---\n\n" + "\n\n---\n\n".join(parts)
+
+
+class _Outcome:
+    """Mutable per-task record filled in as the task runs."""
+
+    def __init__(self) -> None:
+        self.tool = ""
+        self.status = "pending"
+        self.result = ""
+        self.started: float | None = None
+        self.elapsed = 0.0
+
+
+class _NoBudget:
+    async def __aenter__(self) -> None:
+        return None
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
 
-            parts.append(f"[{i}] {tool_name}({args_brief}):\n{body}")
 
-        return "\n\n---\n\n".join(parts)
+_NO_BUDGET = _NoBudget()
@@ -1,8 +1,11 @@
 """Tool registry for dynamic tool management."""
 
+import time
 from typing import Any
 
 from nanobot.agent.tools.base import ContextAwareTool, Tool
+from nanobot.telemetry import tracing
+from nanobot.telemetry.metrics import TOOL_CALLS, TOOL_LATENCY
 
 
 class ToolRegistry:
@@ -59,13 +62,22 @@ class ToolRegistry:
         if not tool:
             return f"Error: Tool '{name}' not found"
 
-        try:
-            errors = tool.validate_params(params)
-            if errors:
-                return f"Error: Invalid parameters for tool '{name}': " + "; ".join(errors)
-            return await tool.execute(**params)
-        except Exception as e:
-            return f"Error executing {name}: {str(e)}"
+        start = time.monotonic()
+        with tracing.span(f"tool.{name}") as sp:
+            try:
+                errors = tool.validate_params(params)
+                if errors:
+                    result = f"Error: Invalid parameters for tool '{name}': " + "; ".join(errors)
+                else:
+                    result = await tool.execute(**params)
+            except Exception as e:
+                result = f"Error executing {name}: {str(e)}"
+            status = "error" if isinstance(result, str) and result.startswith("Error") else "ok"
+            if sp:
+                sp.set(status=status, result_chars=len(result))
+        TOOL_LATENCY.observe(time.monotonic() - start, tool=name)
+        TOOL_CALLS.inc(tool=name, status=status)
+        return result
     
     @property
     def tool_names(self) -> list[str]:
@@ -2,16 +2,127 @@
 
 import asyncio
 import fnmatch
+import itertools
 import os
 import re
+import shlex
+import time
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
-from nanobot.agent.tools.base import Tool
+from loguru import logger
 
+from nanobot.agent.process_pool import (
+    ProcessPool,
+    ProcessUsage,
+    get_default_pool,
+    kill_process_group,
+)
+from nanobot.agent.tools.base import ContextAwareTool, report_progress
+from nanobot.agent.tools.shell_session import ShellSession, ShellSessionManager, ShellTimeoutError
 
-class ExecTool(Tool):
-    """Tool to execute shell commands."""
+_READ_CHUNK = 64 * 1024
+_MAX_SPILL_FILES = 20  # Older spill files are pruned
+_spill_seq = itertools.count(1)
+
+
+class _OutputCapture:
+    """Bounded capture of one output stream: the first and last bytes only.
+
+    Everything up to ``limit`` bytes is kept verbatim.  Past that, the first
+    half is frozen as the head and the tail is a ring buffer of the most
+    recent ``limit // 2`` bytes, so memory stays O(limit) however much the
+    command prints.  With a ``spill_path`` the complete stream is also
+    written to disk (up to ``spill_max_bytes``) once it overflows.
+    """
+
+    def __init__(self, limit: int, spill_path: Path | None = None, spill_max_bytes: int = 0):
+        self.limit = limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self.spill_path = spill_path
+        self.spill_max_bytes = spill_max_bytes
+        self.spilled = 0
+        self._spill: IO[bytes] | None = None
+
+    @property
+    def overflowed(self) -> bool:
+        return self.total > self.limit
+
+    def feed(self, chunk: bytes) -> None:
+        if not self.overflowed and self.total + len(chunk) > self.limit:
+            self._start_spill()
+        self.total += len(chunk)
+        self._write_spill(chunk)
+
+        half = self.limit // 2
+        if len(self.head) < half:
+            take = half - len(self.head)
+            self.head += chunk[:take]
+            chunk = chunk[take:]
+        self.tail += chunk
+        if len(self.tail) > self.limit - len(self.head):
+            # Until overflow the tail holds the unbroken remainder; after, only the last half
+            keep = self.limit - len(self.head) if not self.overflowed else half
+            del self.tail[:-keep]
+
+    def render(self) -> str:
+        head = self.head.decode("utf-8", errors="replace")
+        tail = self.tail.decode("utf-8", errors="replace")
+        if not self.overflowed:
+            return head + tail
+        omitted = self.total - len(self.head) - len(self.tail)
+        note = f"\n... (truncated, {omitted} bytes omitted"
+        if self.spilled:
+            note += f"; full output saved to {self.spill_path}"
+            if self.spilled < self.total:
+                note += f" (first {self.spilled} bytes)"
+            note += ", page through it with sed -n / grep"
+        return head + note + ") ...\n" + tail
+
+    def close(self) -> None:
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+
+    def _start_spill(self) -> None:
+        if not self.spill_path or not self.spill_max_bytes:
+            return
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spill = open(self.spill_path, "wb")
+        except OSError as e:
+            logger.warning(f"Cannot spill exec output to {self.spill_path}: {e}")
+            self.spill_path = None
+            return
+        # Nothing has been dropped yet, so head + tail is the full stream so far
+        self._write_spill(bytes(self.head) + bytes(self.tail))
+
+    def _write_spill(self, data: bytes) -> None:
+        if not self._spill:
+            return
+        room = self.spill_max_bytes - self.spilled
+        if room <= 0:
+            return
+        self._spill.write(data[:room])
+        self.spilled += min(len(data), room)
+
+
+# Session key of the message being processed. set_context() runs inside each
+# session's task, so a ContextVar keeps concurrent sessions on their own shells.
+_session_key: ContextVar[str | None] = ContextVar("exec_session_key", default=None)
+
+
+class ExecTool(ContextAwareTool):
+    """Tool to execute shell commands.
+
+    With ``shell_sessions`` set, commands run in a persistent bash per
+    session so ``cd``, ``export`` and ``source`` carry over between calls.
+    Without it (or with no session context, e.g. subagents) every call
+    spawns a fresh ``/bin/sh``.
+    """
 
     def __init__(
         self,
@@ -21,8 +132,18 @@ class ExecTool(Tool):
         allow_patterns: list[str] | None = None,
         restrict_to_workspace: bool = False,
         allowed_git_repos: list[str] | None = None,
+        max_output: int = 10000,
+        spill_dir: Path | None = None,
+        spill_max_bytes: int = 50 * 1024 * 1024,
+        shell_sessions: ShellSessionManager | None = None,
+        process_pool: ProcessPool | None = None,
     ):
         self.timeout = timeout
+        self.shell_sessions = shell_sessions
+        self.process_pool = process_pool
+        self.max_output = max_output
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes
         self.working_dir = working_dir
         self.deny_patterns = deny_patterns or [
             r"\brm\s+-[rf]{1,2}\b",          # rm -r, rm -rf, rm -fr
@@ -38,6 +159,9 @@ class ExecTool(Tool):
         self.restrict_to_workspace = restrict_to_workspace
         self.allowed_git_repos = allowed_git_repos or []
     
+    def set_context(self, channel: str, chat_id: str) -> None:
+        _session_key.set(f"{channel}:{chat_id}")
+
     @property
     def name(self) -> str:
         return "exec"
@@ -58,6 +182,7 @@ class ExecTool(Tool):
                 "working_dir": {
                     "type": "string",
                     "description": "Optional working directory for the command"
+                    + (" (persistent shell: cd's there first)" if self.shell_sessions is not None else "")
                 }
             },
             "required": ["command"]
@@ -68,49 +193,132 @@ class ExecTool(Tool):
         guard_error = self._guard_command(command, cwd)
         if guard_error:
             return guard_error
-        
+
+        key = _session_key.get()
+        if self.shell_sessions is not None and key:
+            shell = await self.shell_sessions.acquire(key)
+            if shell:
+                # A restricted shell starts every command from the checked cwd,
+                # so an earlier `cd` cannot carry later commands out of it
+                if working_dir or self.restrict_to_workspace:
+                    command = f"cd -- {shlex.quote(cwd)} && {command}"
+                return await self._execute_persistent(shell, command)
+
+        pool = self.process_pool or get_default_pool()
+        stdout, stderr = self._captures()
+        timed_out = False
         try:
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=cwd,
-            )
-            
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=self.timeout
+            async with pool.slot(key) as slot:
+                process = await slot.spawn_shell(
+                    command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=cwd,
                 )
-            except asyncio.TimeoutError:
-                process.kill()
-                await process.wait()
-                return f"Error: Command timed out after {self.timeout} seconds"
-            
-            output_parts = []
-            
-            if stdout:
-                output_parts.append(stdout.decode("utf-8", errors="replace"))
-            
-            if stderr:
-                stderr_text = stderr.decode("utf-8", errors="replace")
-                if stderr_text.strip():
-                    output_parts.append(f"STDERR:\n{stderr_text}")
-            
-            if process.returncode != 0:
-                output_parts.append(f"\nExit code: {process.returncode}")
-            
-            result = "\n".join(output_parts) if output_parts else "(no output)"
-            
-            # Truncate very long output
-            max_len = 10000
-            if len(result) > max_len:
-                result = result[:max_len] + f"\n... (truncated, {len(result) - max_len} more chars)"
-            
-            return result
-            
+                try:
+                    await asyncio.wait_for(
+                        asyncio.gather(
+                            self._pump(process.stdout, stdout),
+                            self._pump(process.stderr, stderr),
+                            process.wait(),
+                        ),
+                        timeout=self.timeout,
+                    )
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    kill_process_group(process)
         except Exception as e:
             return f"Error executing command: {str(e)}"
+        finally:
+            stdout.close()
+            stderr.close()
+
+        error = f"Error: Command timed out after {self.timeout} seconds" if timed_out else ""
+        result = self._format_output(stdout, stderr, process.returncode, error)
+        return result + self._usage_note(slot.usage[0] if slot.usage else None, timed_out)
+
+    @staticmethod
+    def _usage_note(usage: ProcessUsage | None, timed_out: bool) -> str:
+        """Resource footer for heavy or limit-killed commands; empty for quick ones."""
+        if usage is None:
+            return ""
+        note = ""
+        limit = usage.limit_hit()
+        if limit and not timed_out:
+            note += f"\n{limit}"
+        if limit or usage.wall >= 1 or usage.cpu_seconds >= 1:
+            note += f"\n[{usage.summary()}]"
+        return note
+
+    async def _execute_persistent(self, shell: ShellSession, command: str) -> str:
+        """Run *command* in a session's persistent shell."""
+        pool = self.process_pool or get_default_pool()
+        async with shell.lock, pool.slot(_session_key.get()):
+            stdout, stderr = self._captures()
+            status: int | None = None
+            error = ""
+            try:
+                status = await shell.run(command, self.timeout, stdout, stderr)
+            except ShellTimeoutError as e:
+                error = f"Error: {e} (shell session was reset)"
+            except RuntimeError:
+                error = "Shell session exited; a fresh shell will be started on the next command"
+            except Exception as e:
+                return f"Error executing command: {str(e)}"
+            finally:
+                stdout.close()
+                stderr.close()
+        return self._format_output(stdout, stderr, status, error)
+
+    def _format_output(
+        self, stdout: _OutputCapture, stderr: _OutputCapture, status: int | None, error: str,
+    ) -> str:
+        if stdout.spilled or stderr.spilled:
+            self._prune_spill_files()
+
+        output_parts = []
+        if stdout.total:
+            output_parts.append(stdout.render())
+        if stderr.total:
+            stderr_text = stderr.render()
+            if stderr_text.strip():
+                output_parts.append(f"STDERR:\n{stderr_text}")
+
+        if error:
+            output_parts.append(f"\n{error}")
+        elif status:
+            output_parts.append(f"\nExit code: {status}")
+
+        return "\n".join(output_parts) if output_parts else "(no output)"
+
+    def _captures(self) -> tuple[_OutputCapture, _OutputCapture]:
+        """Fresh stdout/stderr captures; stderr gets half the budget."""
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_spill_seq)}"
+        captures = []
+        for suffix, limit in (("out", self.max_output), ("err", self.max_output // 2)):
+            spill_path = self.spill_dir / f"exec-{stamp}.{suffix}.log" if self.spill_dir else None
+            captures.append(_OutputCapture(limit, spill_path, self.spill_max_bytes))
+        return captures[0], captures[1]
+
+    async def _pump(self, stream: asyncio.StreamReader | None, capture: _OutputCapture) -> None:
+        """Read *stream* to EOF into *capture*, reporting the latest line as progress."""
+        if stream is None:
+            return
+        while chunk := await stream.read(_READ_CHUNK):
+            capture.feed(chunk)
+            lines = chunk.decode("utf-8", errors="replace").splitlines()
+            if lines:
+                report_progress(lines[-1])
+
+    def _prune_spill_files(self) -> None:
+        if not self.spill_dir or not self.spill_dir.is_dir():
+            return
+        files = sorted(self.spill_dir.glob("exec-*.log"), key=lambda p: p.stat().st_mtime)
+        for old in files[:-_MAX_SPILL_FILES]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
 
     def _guard_command(self, command: str, cwd: str) -> str | None:
         """Best-effort safety guard for potentially destructive commands."""
@@ -0,0 +1,231 @@
+"""Persistent bash sessions for the exec tool."""
+
+import asyncio
+import secrets
+import time
+from typing import Protocol
+
+from loguru import logger
+
+from nanobot.agent.process_pool import ProcessPool, get_default_pool, kill_process_group
+from nanobot.agent.tools.base import report_progress
+
+_READ_CHUNK = 64 * 1024
+_REAP_INTERVAL = 60  # seconds between idle-shell sweeps
+
+
+class OutputSink(Protocol):
+    def feed(self, chunk: bytes) -> None: ...
+
+
+class ShellTimeoutError(Exception):
+    """A command did not finish in time; its shell has been killed."""
+
+
+class ShellSession:
+    """
+    One long-lived ``bash`` process that runs commands sequentially.
+
+    Each command is written to the shell's stdin wrapped in a brace group
+    (so ``cd``/``export``/``source`` persist) with stdin detached, followed
+    by ``printf`` of a per-session random sentinel on stdout and stderr.
+    The reader treats everything before the sentinel as the command's
+    output and parses the exit status that follows it.
+
+    The shell (and the pool launcher above it) runs in its own process
+    group so a timeout can kill it together with everything it started.
+    """
+
+    def __init__(self, cwd: str, pool: ProcessPool | None = None):
+        self.cwd = cwd
+        self.pool = pool or get_default_pool()
+        self.process: asyncio.subprocess.Process | None = None
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+        self._token = f"__NANOBOT_{secrets.token_hex(8)}__"
+        self._seq = 0
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self) -> None:
+        # bash exits on stdin EOF, so shells never outlive the nanobot process.
+        # Started through the pool so rlimits apply to every command it runs.
+        self.process = await self.pool.spawn_detached(
+            "bash", "--noprofile", "--norc",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+        )
+
+    async def run(
+        self, command: str, timeout: float, stdout: OutputSink, stderr: OutputSink,
+    ) -> int:
+        """Run *command*, streaming output into the sinks. Returns the exit status.
+
+        Raises ShellTimeoutError (after killing the shell) if the command does
+        not finish within *timeout* seconds, and RuntimeError if the shell
+        exits mid-command (e.g. the command ran ``exit``).
+        """
+        if not self.is_alive:
+            raise RuntimeError("shell is not running")
+        assert self.process and self.process.stdin
+        self._seq += 1
+        marker = f"{self._token}{self._seq}"
+        script = (
+            f"{{ {command}\n}} </dev/null\n"
+            f"__nb_rc=$?; printf '\\n{marker}:%d\\n' \"$__nb_rc\"; printf '\\n{marker}:\\n' >&2\n"
+        )
+        self.last_used = time.monotonic()
+        try:
+            self.process.stdin.write(script.encode())
+            await self.process.stdin.drain()
+            status, _ = await asyncio.wait_for(
+                asyncio.gather(
+                    self._read_until(self.process.stdout, marker.encode(), stdout),
+                    self._read_until(self.process.stderr, marker.encode(), stderr),
+                ),
+                timeout=timeout,
+            )
+        except asyncio.CancelledError:
+            # The command may still be writing; its output must not leak into the next one
+            await self.close()
+            raise
+        except asyncio.TimeoutError:
+            await self.close()
+            raise ShellTimeoutError(f"Command timed out after {timeout} seconds")
+        except (BrokenPipeError, ConnectionResetError, EOFError) as e:
+            await self.close()
+            raise RuntimeError("shell exited during the command") from e
+        finally:
+            self.last_used = time.monotonic()
+        return int(status or 0)
+
+    @staticmethod
+    async def _read_until(
+        stream: asyncio.StreamReader | None, marker: bytes, sink: OutputSink,
+    ) -> str:
+        """Feed *stream* into *sink* until ``\\n<marker>:<status>\\n``; return status."""
+        if stream is None:
+            return ""
+        needle = b"\n" + marker + b":"
+        buf = b""
+        while True:
+            chunk = await stream.read(_READ_CHUNK)
+            if not chunk:
+                raise EOFError
+            buf += chunk
+            idx = buf.find(needle)
+            if idx >= 0:
+                end = buf.find(b"\n", idx + len(needle))
+                if end < 0:
+                    continue  # Status line not complete yet
+                if idx:
+                    sink.feed(buf[:idx])
+                    lines = buf[:idx].decode("utf-8", errors="replace").splitlines()
+                    if lines:
+                        report_progress(lines[-1])
+                return buf[idx + len(needle):end].decode()
+            # Hold back a possible partial marker; everything before it is output
+            safe = len(buf) - len(needle)
+            if safe > 0:
+                sink.feed(buf[:safe])
+                lines = buf[:safe].decode("utf-8", errors="replace").splitlines()
+                if lines:
+                    report_progress(lines[-1])
+                buf = buf[safe:]
+
+    async def close(self) -> None:
+        """Kill the shell and its process group."""
+        if self.process is None:
+            return
+        kill_process_group(self.process)
+        await self.process.wait()
+        self.process = None
+
+
+class ShellSessionManager:
+    """
+    Keeps at most ``max_shells`` persistent shells keyed by session.
+
+    Shells idle for longer than ``idle_timeout`` are reaped by a background
+    task.  When the cap is reached the least recently used idle shell is
+    closed to make room; if every shell is busy, ``acquire`` returns None
+    and the caller falls back to a one-shot subprocess.
+    """
+
+    def __init__(
+        self,
+        cwd: str,
+        max_shells: int = 8,
+        idle_timeout: float = 900,
+        pool: ProcessPool | None = None,
+    ):
+        self.cwd = cwd
+        self.pool = pool
+        self.max_shells = max_shells
+        self.idle_timeout = idle_timeout
+        self._shells: dict[str, ShellSession] = {}
+        self._reaper: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._shells)
+
+    async def acquire(self, key: str) -> ShellSession | None:
+        """Return the live shell for *key*, starting one if needed."""
+        shell = self._shells.get(key)
+        if shell and shell.is_alive:
+            return shell
+        if shell:
+            self._shells.pop(key, None)
+
+        if len(self._shells) >= self.max_shells:
+            idle = [(s.last_used, k) for k, s in self._shells.items() if not s.lock.locked()]
+            if not idle:
+                logger.warning(f"All {self.max_shells} persistent shells busy; running one-shot")
+                return None
+            _, victim = min(idle)
+            await self.close(victim)
+
+        shell = ShellSession(self.cwd, self.pool)
+        await shell.start()
+        self._shells[key] = shell
+        self._ensure_reaper()
+        logger.debug(f"Started persistent shell for {key} ({len(self._shells)} live)")
+        return shell
+
+    async def close(self, key: str) -> None:
+        shell = self._shells.pop(key, None)
+        if shell:
+            await shell.close()
+
+    async def close_all(self) -> None:
+        for key in list(self._shells):
+            await self.close(key)
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+
+    async def reap_idle(self) -> int:
+        """Close shells idle past ``idle_timeout``. Returns how many were closed."""
+        now = time.monotonic()
+        stale = [
+            k for k, s in self._shells.items()
+            if not s.lock.locked() and (now - s.last_used > self.idle_timeout or not s.is_alive)
+        ]
+        for key in stale:
+            await self.close(key)
+        if stale:
+            logger.debug(f"Reaped {len(stale)} idle shells")
+        return len(stale)
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_loop())
+
+    async def _reap_loop(self) -> None:
+        while self._shells:
+            await asyncio.sleep(min(_REAP_INTERVAL, self.idle_timeout))
+            await self.reap_idle()
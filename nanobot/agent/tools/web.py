@@ -1,19 +1,43 @@
 """Web tools: web_search and web_fetch."""
 
+import asyncio
 import html
 import json
 import os
 import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from pathlib import Path
 from typing import Any
 from urllib.parse import urlparse
 
 import httpx
+from loguru import logger
 
 from nanobot.agent.tools.base import Tool
+from nanobot.telemetry.metrics import WEB_CACHE_LOOKUPS
+from nanobot.utils.cache import DiskCache
+from nanobot.utils.ratelimit import TokenBucket
 
 # Shared constants
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) AppleWebKit/537.36"
 MAX_REDIRECTS = 5  # Limit redirects to prevent DoS attacks
+BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
+TEXT_TYPES = ("text/", "application/json", "application/xml", "application/xhtml",
+              "application/javascript", "application/rss", "application/atom", "+json", "+xml")
+
+# HTML parsing and markdown conversion are CPU-bound; run them off the event loop
+_extract_pool: ThreadPoolExecutor | None = None
+
+
+def _get_extract_pool() -> ThreadPoolExecutor:
+    global _extract_pool
+    if _extract_pool is None:
+        _extract_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="web-extract")
+    return _extract_pool
 
 
 def _strip_tags(text: str) -> str:
@@ -43,6 +67,216 @@ def _validate_url(url: str) -> tuple[bool, str]:
         return False, str(e)
 
 
+def _is_text_type(ctype: str) -> bool:
+    """True for content types worth extracting; an empty type is sniffed later."""
+    ctype = ctype.split(";", 1)[0].strip().lower()
+    return not ctype or any(t in ctype for t in TEXT_TYPES)
+
+
+def _parse_http_date(value: str | None) -> float | None:
+    """Parse an HTTP date header into a Unix timestamp."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _freshness_lifetime(headers: httpx.Headers, default_ttl: int) -> float | None:
+    """Compute how long a response may be served without revalidation (RFC 9111).
+
+    The fetch cache is shared across users, so it behaves like a shared
+    cache: ``private`` and ``no-store`` responses are not stored and
+    ``s-maxage`` wins over ``max-age``.  Returns None when the response
+    must not be stored, 0 when it must be revalidated on every use.
+    """
+    directives: dict[str, str] = {}
+    for part in headers.get("cache-control", "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip().strip('"')
+
+    if "no-store" in directives or "private" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0
+
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(0, int(directives[name]))
+            except ValueError:
+                return 0
+
+    expires = headers.get("expires")
+    if expires is not None:
+        expires_at = _parse_http_date(expires)
+        date = _parse_http_date(headers.get("date")) or time.time()
+        return max(0.0, expires_at - date) if expires_at else 0
+
+    # Heuristic freshness: 10% of the time since last modification
+    last_modified = _parse_http_date(headers.get("last-modified"))
+    if last_modified:
+        return min(default_ttl, max(0.0, (time.time() - last_modified) * 0.1))
+    return default_ttl
+
+
+def _retry_after(value: str | None, default: float = 1.0) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        when = _parse_http_date(value)
+        return max(0.0, when - time.time()) if when else default
+
+
+def _ms_since(start: float) -> float:
+    return round((time.monotonic() - start) * 1000, 1)
+
+
+class WebFetchCache:
+    """Disk-backed cache of extracted web_fetch results.
+
+    Entries are keyed by URL and extract mode and hold the extracted text
+    plus the validators (ETag / Last-Modified) needed to revalidate stale
+    entries with a conditional request.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 100 * 1024 * 1024, default_ttl: int = 3600):
+        self._store = DiskCache(directory, max_bytes=max_bytes)
+        self.default_ttl = default_ttl
+        self.counts: dict[str, int] = {"hit": 0, "revalidated": 0, "miss": 0, "bypass": 0}
+
+    @staticmethod
+    def _key(url: str, extract_mode: str) -> str:
+        return f"{extract_mode}:{url}"
+
+    def get(self, url: str, extract_mode: str) -> dict[str, Any] | None:
+        """Return the cached entry (fresh or stale), or None."""
+        return self._store.get(self._key(url, extract_mode))
+
+    def put(
+        self, url: str, extract_mode: str, entry: dict[str, Any], headers: httpx.Headers,
+    ) -> bool:
+        """Store *entry* according to the response's caching headers. Returns True if stored."""
+        lifetime = _freshness_lifetime(headers, self.default_ttl)
+        if lifetime is None:
+            self._store.delete(self._key(url, extract_mode))
+            return False
+        validators = {
+            "etag": headers.get("etag") or entry.get("etag"),
+            "last_modified": headers.get("last-modified") or entry.get("last_modified"),
+        }
+        if lifetime == 0 and not any(validators.values()):
+            return False  # Must revalidate but nothing to revalidate with
+        self._store.set(self._key(url, extract_mode), {
+            **entry,
+            **validators,
+            "expires_at": time.time() + lifetime,
+        })
+        return True
+
+    @staticmethod
+    def is_fresh(entry: dict[str, Any]) -> bool:
+        return time.time() < entry.get("expires_at", 0)
+
+    @staticmethod
+    def conditional_headers(entry: dict[str, Any]) -> dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a stale entry."""
+        headers: dict[str, str] = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record(self, outcome: str) -> None:
+        """Count a lookup outcome: hit, revalidated, miss or bypass."""
+        self.counts[outcome] = self.counts.get(outcome, 0) + 1
+        WEB_CACHE_LOOKUPS.inc(tool="web_fetch", outcome=outcome)
+
+    def stats(self) -> dict[str, int]:
+        """Lookup counters plus store size, for metrics and debugging."""
+        return {**self.counts, "evictions": self._store.evictions, "bytes": self._store.size_bytes}
+
+
+class WebSearchCache:
+    """In-memory search result cache with single-flight coalescing and rate limiting.
+
+    One instance is shared by every WebSearchTool in the process (main agent
+    and subagents), so identical queries from concurrent sessions or a
+    ParallelTool batch cost one upstream request.  Upstream calls go through
+    a token bucket sized to the Brave plan's QPS.
+    """
+
+    def __init__(self, ttl: int = 900, max_entries: int = 512, qps: float = 1.0, burst: int = 1):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.limiter = TokenBucket(rate=qps, burst=burst)
+        self._entries: OrderedDict[tuple[str, int], tuple[float, list[dict[str, Any]]]] = OrderedDict()
+        self._inflight: dict[tuple[str, int], asyncio.Task[list[dict[str, Any]]]] = {}
+        self.counts: dict[str, int] = {"hit": 0, "coalesced": 0, "miss": 0, "throttled": 0}
+
+    @staticmethod
+    def key(query: str, count: int) -> tuple[str, int]:
+        """Normalize case and whitespace so trivially different queries share an entry."""
+        return " ".join(query.lower().split()), count
+
+    async def get_or_fetch(
+        self,
+        query: str,
+        count: int,
+        fetch: Callable[[], Awaitable[list[dict[str, Any]]]],
+    ) -> list[dict[str, Any]]:
+        """Return cached results for (query, count), joining or starting an upstream fetch."""
+        key = self.key(query, count)
+        cached = self._entries.get(key)
+        if cached and time.monotonic() < cached[0]:
+            self._entries.move_to_end(key)
+            self.record("hit")
+            return cached[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.record("coalesced")
+        else:
+            self.record("miss")
+            inflight = asyncio.create_task(self._fetch(key, fetch))
+            inflight.add_done_callback(lambda t: t.cancelled() or t.exception())  # Retrieved even if all callers left
+            self._inflight[key] = inflight
+        # The fetch runs detached and shielded, so no caller's cancellation
+        # (including the one that started it) fails the others
+        return await asyncio.shield(inflight)
+
+    async def _fetch(
+        self,
+        key: tuple[str, int],
+        fetch: Callable[[], Awaitable[list[dict[str, Any]]]],
+    ) -> list[dict[str, Any]]:
+        try:
+            waited = await self.limiter.acquire()
+            if waited > 0.05:
+                self.record("throttled")
+            results = await fetch()
+            self._entries[key] = (time.monotonic() + self.ttl, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return results
+        finally:
+            self._inflight.pop(key, None)
+
+    def record(self, outcome: str) -> None:
+        self.counts[outcome] += 1
+        WEB_CACHE_LOOKUPS.inc(tool="web_search", outcome=outcome)
+
+    def stats(self) -> dict[str, int]:
+        return {**self.counts, "entries": len(self._entries)}
+
+
 class WebSearchTool(Tool):
     """Search the web using Brave Search API."""
     
@@ -57,9 +291,15 @@ class WebSearchTool(Tool):
         "required": ["query"]
     }
     
-    def __init__(self, api_key: str | None = None, max_results: int = 5):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_results: int = 5,
+        cache: WebSearchCache | None = None,
+    ):
         self.api_key = api_key or os.environ.get("BRAVE_API_KEY", "")
         self.max_results = max_results
+        self.cache = cache
     
     async def execute(self, query: str, count: int | None = None, **kwargs: Any) -> str:
         if not self.api_key:
@@ -67,16 +307,10 @@ class WebSearchTool(Tool):
         
         try:
             n = min(max(count or self.max_results, 1), 10)
-            async with httpx.AsyncClient() as client:
-                r = await client.get(
-                    "https://api.search.brave.com/res/v1/web/search",
-                    params={"q": query, "count": n},
-                    headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
-                    timeout=10.0
-                )
-                r.raise_for_status()
-            
-            results = r.json().get("web", {}).get("results", [])
+            if self.cache:
+                results = await self.cache.get_or_fetch(query, n, lambda: self._search(query, n))
+            else:
+                results = await self._search(query, n)
             if not results:
                 return f"No results for: {query}"
             
@@ -89,6 +323,29 @@ class WebSearchTool(Tool):
         except Exception as e:
             return f"Error: {e}"
 
+    async def _search(self, query: str, count: int) -> list[dict[str, Any]]:
+        """Call the Brave API, backing off once if it answers 429."""
+        async with httpx.AsyncClient() as client:
+            for attempt in range(2):
+                r = await client.get(
+                    BRAVE_SEARCH_URL,
+                    params={"q": query, "count": count},
+                    headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
+                    timeout=10.0
+                )
+                if r.status_code == 429 and attempt == 0:
+                    delay = _retry_after(r.headers.get("retry-after"))
+                    logger.warning(f"Brave search rate limited, retrying in {delay:.1f}s")
+                    if self.cache:
+                        self.cache.limiter.pause(delay)
+                        await self.cache.limiter.acquire()
+                    else:
+                        await asyncio.sleep(delay)
+                    continue
+                r.raise_for_status()
+                break
+        return r.json().get("web", {}).get("results", [])[:count]
+
 
 class WebFetchTool(Tool):
     """Fetch and extract content from a URL using Readability."""
@@ -100,55 +357,153 @@ class WebFetchTool(Tool):
         "properties": {
             "url": {"type": "string", "description": "URL to fetch"},
             "extractMode": {"type": "string", "enum": ["markdown", "text"], "default": "markdown"},
-            "maxChars": {"type": "integer", "minimum": 100}
+            "maxChars": {"type": "integer", "minimum": 100},
+            "fresh": {"type": "boolean", "description": "Bypass the cache and re-download the page"}
         },
         "required": ["url"]
     }
     
-    def __init__(self, max_chars: int = 50000):
+    def __init__(
+        self,
+        max_chars: int = 50000,
+        cache: WebFetchCache | None = None,
+        max_bytes: int = 5 * 1024 * 1024,
+    ):
         self.max_chars = max_chars
+        self.cache = cache
+        self.max_bytes = max_bytes
     
-    async def execute(self, url: str, extractMode: str = "markdown", maxChars: int | None = None, **kwargs: Any) -> str:
-        from readability import Document
-
+    async def execute(
+        self,
+        url: str,
+        extractMode: str = "markdown",
+        maxChars: int | None = None,
+        fresh: bool = False,
+        **kwargs: Any,
+    ) -> str:
         max_chars = maxChars or self.max_chars
+        start = time.monotonic()
+        timings: dict[str, float] = {}
 
         # Validate URL before fetching
         is_valid, error_msg = _validate_url(url)
         if not is_valid:
             return json.dumps({"error": f"URL validation failed: {error_msg}", "url": url})
 
+        cached = None
+        if self.cache and not fresh:
+            cached = self.cache.get(url, extractMode)
+            if cached and self.cache.is_fresh(cached):
+                return self._result(url, cached, max_chars, "hit", start, timings)
+
         try:
+            headers = {"User-Agent": USER_AGENT}
+            if cached:
+                headers.update(WebFetchCache.conditional_headers(cached))
             async with httpx.AsyncClient(
                 follow_redirects=True,
                 max_redirects=MAX_REDIRECTS,
                 timeout=30.0
             ) as client:
-                r = await client.get(url, headers={"User-Agent": USER_AGENT})
-                r.raise_for_status()
-            
-            ctype = r.headers.get("content-type", "")
-            
-            # JSON
-            if "application/json" in ctype:
-                text, extractor = json.dumps(r.json(), indent=2), "json"
-            # HTML
-            elif "text/html" in ctype or r.text[:256].lower().startswith(("<!doctype", "<html")):
-                doc = Document(r.text)
-                content = self._to_markdown(doc.summary()) if extractMode == "markdown" else _strip_tags(doc.summary())
-                text = f"# {doc.title()}\n\n{content}" if doc.title() else content
-                extractor = "readability"
-            else:
-                text, extractor = r.text, "raw"
-            
-            truncated = len(text) > max_chars
-            if truncated:
-                text = text[:max_chars]
-            
-            return json.dumps({"url": url, "finalUrl": str(r.url), "status": r.status_code,
-                              "extractor": extractor, "truncated": truncated, "length": len(text), "text": text})
+                async with client.stream("GET", url, headers=headers) as r:
+                    timings["headersMs"] = _ms_since(start)
+                    if r.status_code == 304 and cached:
+                        self.cache.put(url, extractMode, cached, r.headers)
+                        return self._result(url, cached, max_chars, "revalidated", start, timings)
+                    r.raise_for_status()
+
+                    ctype = r.headers.get("content-type", "")
+                    if not _is_text_type(ctype):
+                        return json.dumps({"error": f"Unsupported content type: {ctype}", "url": url})
+                    length = r.headers.get("content-length")
+                    if length and length.isdigit() and int(length) > self.max_bytes:
+                        return json.dumps({
+                            "error": f"Response too large: {length} bytes (limit {self.max_bytes})",
+                            "url": url,
+                        })
+
+                    mark = time.monotonic()
+                    body, clipped = await self._read_capped(r)
+                    timings["downloadMs"] = _ms_since(mark)
+                    encoding = r.encoding or "utf-8"
+                    final_url, status, resp_headers = str(r.url), r.status_code, r.headers
+
+            mark = time.monotonic()
+            loop = asyncio.get_running_loop()
+            text, extractor = await loop.run_in_executor(
+                _get_extract_pool(), self._extract, body, encoding, ctype, extractMode,
+            )
+            timings["extractMs"] = _ms_since(mark)
+
+            entry = {"finalUrl": final_url, "status": status, "extractor": extractor, "text": text}
+            if clipped:
+                # A partial page must never be served from cache as if it were whole
+                entry["bytesTruncated"] = True
+            elif self.cache:
+                self.cache.put(url, extractMode, entry, resp_headers)
+            return self._result(url, entry, max_chars, "bypass" if fresh else "miss", start, timings)
         except Exception as e:
             return json.dumps({"error": str(e), "url": url})
+
+    async def _read_capped(self, response: httpx.Response) -> tuple[bytes, bool]:
+        """Read a streamed body up to ``max_bytes``. Returns (body, was_clipped)."""
+        chunks: list[bytes] = []
+        size = 0
+        stream = response.aiter_bytes()
+        async for chunk in stream:
+            remaining = self.max_bytes - size
+            if len(chunk) >= remaining:
+                chunks.append(chunk[:remaining])
+                clipped = len(chunk) > remaining or bool(await anext(stream, b""))
+                # Stop pulling from the socket; leaving the stream context closes it
+                return b"".join(chunks), clipped
+            chunks.append(chunk)
+            size += len(chunk)
+        return b"".join(chunks), False
+
+    def _extract(self, body: bytes, encoding: str, ctype: str, extract_mode: str) -> tuple[str, str]:
+        """Decode and extract a downloaded body. Runs in the extraction pool."""
+        raw = body.decode(encoding, errors="replace")
+        if "json" in ctype:
+            try:
+                return json.dumps(json.loads(raw), indent=2), "json"
+            except ValueError:
+                return raw, "raw"  # Clipped or malformed JSON
+        if "text/html" in ctype or "xhtml" in ctype or raw[:256].lstrip().lower().startswith(("<!doctype", "<html")):
+            return self._extract_html(raw, extract_mode), "readability"
+        return raw, "raw"
+
+    def _result(
+        self,
+        url: str,
+        entry: dict[str, Any],
+        max_chars: int,
+        cache_status: str,
+        start: float,
+        timings: dict[str, float],
+    ) -> str:
+        """Serialize a fetch result, truncating the text to *max_chars*."""
+        text = entry["text"]
+        truncated = len(text) > max_chars or entry.get("bytesTruncated", False)
+        if len(text) > max_chars:
+            text = text[:max_chars]
+        elapsed_ms = _ms_since(start)
+        if self.cache:
+            self.cache.record(cache_status)
+        logger.debug(f"web_fetch {cache_status if self.cache else 'fetch'} for {url}: "
+                     f"{timings} total {elapsed_ms} ms")
+        return json.dumps({"url": url, "finalUrl": entry["finalUrl"], "status": entry["status"],
+                          "extractor": entry["extractor"], "truncated": truncated, "length": len(text),
+                          "cache": cache_status if self.cache else "off", "elapsedMs": elapsed_ms,
+                          "timingsMs": timings, "text": text})
+
+    def _extract_html(self, raw: str, extract_mode: str) -> str:
+        """Run readability and convert the main content to markdown or plain text."""
+        from readability import Document
+
+        doc = Document(raw)
+        content = self._to_markdown(doc.summary()) if extract_mode == "markdown" else _strip_tags(doc.summary())
+        return f"# {doc.title()}\n\n{content}" if doc.title() else content
     
     def _to_markdown(self, html: str) -> str:
         """Convert HTML to markdown."""
@@ -0,0 +1,10 @@
+"""Offline load-testing harness for AgentLoop (``nanobot bench``)."""
+
+from nanobot.bench.channel import SyntheticChannel
+from nanobot.bench.provider import FaultModel, LatencyModel, ScriptedProvider
+from nanobot.bench.runner import BenchConfig, BenchReport, run_bench
+
+__all__ = [
+    "BenchConfig", "BenchReport", "FaultModel", "LatencyModel",
+    "ScriptedProvider", "SyntheticChannel", "run_bench",
+]
@@ -0,0 +1,95 @@
+"""Synthetic chat channel that drives concurrent sessions through the bus."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BaseChannel
+
+# Progress notifications published while a turn is still running
+_PROGRESS_PREFIXES = ("⏳", "🔧")
+
+
+@dataclass
+class TurnResult:
+    session: int
+    turn: int
+    latency: float  # Seconds from channel receive to final reply
+    error: bool
+
+
+@dataclass
+class _Pending:
+    future: asyncio.Future[OutboundMessage]
+    progress: list[str] = field(default_factory=list)
+
+
+class SyntheticChannel(BaseChannel):
+    """
+    Simulated users: each session sends a message, waits for the reply,
+    optionally "thinks", and sends the next one.
+
+    Messages enter through ``_handle_message`` and replies come back via
+    ``send`` exactly as for a real platform, so the whole path through
+    the MessageBus and AgentLoop is exercised.
+    """
+
+    name = "bench"
+
+    def __init__(self, bus: MessageBus, turn_timeout: float = 120.0):
+        super().__init__(config=None, bus=bus)
+        self.turn_timeout = turn_timeout
+        self.results: list[TurnResult] = []
+        self.progress_messages = 0
+        self._pending: dict[str, _Pending] = {}
+
+    async def start(self) -> None:
+        self._running = True
+
+    async def stop(self) -> None:
+        self._running = False
+        for pending in self._pending.values():
+            pending.future.cancel()
+
+    async def send(self, msg: OutboundMessage) -> None:
+        pending = self._pending.get(msg.chat_id)
+        if pending is None:
+            return
+        if msg.content.startswith(_PROGRESS_PREFIXES):
+            self.progress_messages += 1
+            pending.progress.append(msg.content)
+            return
+        if not pending.future.done():
+            pending.future.set_result(msg)
+
+    async def drive(self, sessions: int, turns: int, think_time: float = 0.0) -> None:
+        """Run *sessions* simulated users for *turns* messages each, concurrently."""
+        await asyncio.gather(*(self._session(i, turns, think_time) for i in range(sessions)))
+
+    async def _session(self, index: int, turns: int, think_time: float) -> None:
+        chat_id = f"s{index}"
+        loop = asyncio.get_running_loop()
+        for turn in range(turns):
+            pending = _Pending(loop.create_future())
+            self._pending[chat_id] = pending
+            start = time.perf_counter()
+            await self._handle_message(
+                sender_id=f"user{index}", chat_id=chat_id,
+                content=f"bench session {index} turn {turn}",
+            )
+            try:
+                reply = await asyncio.wait_for(pending.future, self.turn_timeout)
+                error = _is_error(reply)
+            except asyncio.TimeoutError:
+                error = True
+            finally:
+                self._pending.pop(chat_id, None)
+            self.results.append(TurnResult(index, turn, time.perf_counter() - start, error))
+            if think_time:
+                await asyncio.sleep(think_time)
+
+
+def _is_error(reply: OutboundMessage) -> bool:
+    return reply.error or reply.content.startswith(("Sorry, I encountered an error", "Error"))
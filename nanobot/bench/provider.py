@@ -0,0 +1,125 @@
+"""Deterministic LLM provider stand-in for benchmarks."""
+
+import asyncio
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Any
+
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+
+# Tools every AgentLoop registers that are cheap and need no network
+DEFAULT_SCRIPT: list[tuple[str, dict[str, Any]]] = [
+    ("list_dir", {"path": "."}),
+    ("read_file", {"path": "bench.txt"}),
+]
+
+
+@dataclass
+class LatencyModel:
+    """Simulated LLM latency in milliseconds.
+
+    ``fixed`` always returns the mean, ``uniform`` draws from [0, 2*mean],
+    ``lognormal`` has the given mean and a long right tail controlled by
+    ``sigma``, which is closest to what real APIs look like.
+    """
+
+    kind: str = "lognormal"
+    mean_ms: float = 50.0
+    sigma: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        if self.mean_ms <= 0:
+            return 0.0
+        if self.kind == "fixed":
+            return self.mean_ms
+        if self.kind == "uniform":
+            return rng.uniform(0, 2 * self.mean_ms)
+        if self.kind == "lognormal":
+            mu = math.log(self.mean_ms) - self.sigma ** 2 / 2
+            return rng.lognormvariate(mu, self.sigma)
+        raise ValueError(f"Unknown latency distribution: {self.kind}")
+
+
+@dataclass
+class FaultModel:
+    """Per-call fault injection probabilities."""
+
+    error_rate: float = 0.0  # Return finish_reason="error" (what providers do on API errors)
+    exception_rate: float = 0.0  # Raise from chat() (unexpected provider failure)
+    spike_rate: float = 0.0  # Add spike_ms of extra latency
+    spike_ms: float = 2000.0
+
+
+@dataclass
+class ScriptedProvider(LLMProvider):
+    """
+    Replays a fixed tool-call sequence for every user turn, then answers.
+
+    The position in the script is derived from the conversation itself
+    (tool calls since the last user message), so one instance can serve
+    any number of concurrent sessions.  Latency and faults are drawn
+    from an RNG seeded by (seed, user message, step), which makes a run
+    reproducible regardless of how sessions interleave.
+    """
+
+    script: list[tuple[str, dict[str, Any]]] = field(default_factory=lambda: list(DEFAULT_SCRIPT))
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    faults: FaultModel = field(default_factory=FaultModel)
+    seed: int = 0
+    model: str = "bench/scripted"
+    calls: int = 0
+
+    def __post_init__(self) -> None:
+        super().__init__()
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        self.calls += 1
+        prompt, step = self._position(messages)
+        rng = random.Random(f"{self.seed}:{prompt}:{step}")
+
+        delay = self.latency.sample(rng)
+        if rng.random() < self.faults.spike_rate:
+            delay += self.faults.spike_ms
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        if rng.random() < self.faults.exception_rate:
+            raise RuntimeError("injected provider exception")
+        if rng.random() < self.faults.error_rate:
+            return LLMResponse(content="Error calling LLM: injected fault", finish_reason="error")
+
+        if step < len(self.script):
+            name, args = self.script[step]
+            return LLMResponse(
+                content="",
+                tool_calls=[ToolCallRequest(id=f"call_{step}", name=name, arguments=dict(args))],
+                finish_reason="tool_calls",
+                usage={"prompt_tokens": len(messages), "completion_tokens": 1},
+            )
+        return LLMResponse(
+            content=f"ok: {prompt[:40]}",
+            usage={"prompt_tokens": len(messages), "completion_tokens": 4},
+        )
+
+    @staticmethod
+    def _position(messages: list[dict[str, Any]]) -> tuple[str, int]:
+        """Return (last user message text, tool calls made since it)."""
+        step = 0
+        for msg in reversed(messages):
+            if msg.get("role") == "user":
+                content = msg.get("content")
+                return (content if isinstance(content, str) else str(content)), step
+            if msg.get("role") == "assistant" and msg.get("tool_calls"):
+                step += len(msg["tool_calls"])
+        return "", step
+
+    def get_default_model(self) -> str:
+        return self.model
@@ -0,0 +1,256 @@
+"""Replay recorded turns through AgentLoop with the provider and tools mocked.
+
+Each turn from a recording (``agents.recording``) is restored into a
+scratch session and pushed through ``AgentLoop._process_message``.  The
+provider answers with the recorded responses in order and tools return
+their recorded results, so context building, extensions (compaction),
+session saving and the tool loop itself run for real while nothing
+touches the network.
+
+Context inputs (bootstrap files, memory, skills) are copied from the
+given workspace into a scratch one, so replays never write into the real
+workspace (compaction archives, sessions).
+
+Per-stage wall time comes from the tracing spans; prompt size is
+estimated for every replayed request and compared with the recorded
+one, which shows the effect of context or compaction changes.
+"""
+
+import json
+import shutil
+import tempfile
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.extensions.compaction import estimate_messages_tokens
+from nanobot.extensions.manager import ExtensionManager
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.telemetry import tracing
+from nanobot.utils.helpers import ensure_dir
+
+# Span names folded into report stages
+_STAGES = {
+    "hooks.pre_process": "pre_process",
+    "context.build": "context",
+    "llm.chat": "llm",
+    "hooks.transform_response": "transform_response",
+    "session.save": "session_save",
+}
+
+
+class ReplayProvider(LLMProvider):
+    """Answers with one recorded turn's responses, in order."""
+
+    def __init__(self, model: str = "replay") -> None:
+        super().__init__()
+        self.model = model
+        self._responses: list[dict[str, Any]] = []
+        self._final: str | None = None
+        self.prompt_tokens: list[int] = []
+
+    def load(self, turn: dict[str, Any]) -> None:
+        self._responses = [call["response"] for call in turn["calls"]]
+        self._final = turn.get("final")
+        self.prompt_tokens = []
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        self.prompt_tokens.append(estimate_messages_tokens(messages))
+        if not self._responses:
+            # The replayed loop asked for more than was recorded; end the turn
+            return LLMResponse(content=self._final or "")
+        r = self._responses.pop(0)
+        return LLMResponse(
+            content=r.get("content"),
+            tool_calls=[
+                ToolCallRequest(
+                    id=tc["id"], name=tc["name"], arguments=tc["arguments"],
+                    provider_specific_fields=tc.get("providerSpecificFields") or {},
+                )
+                for tc in r.get("toolCalls", [])
+            ],
+            finish_reason=r.get("finishReason", "stop"),
+            usage=r.get("usage") or {},
+        )
+
+    @property
+    def exhausted(self) -> bool:
+        return not self._responses
+
+    def get_default_model(self) -> str:
+        return self.model
+
+
+class ReplayRegistry(ToolRegistry):
+    """The agent's real tool definitions, with execution served from a recording."""
+
+    def __init__(self, base: ToolRegistry) -> None:
+        super().__init__()
+        self._tools = dict(base._tools)
+        self._results: list[dict[str, Any]] = []
+        self.mismatches = 0
+
+    def load(self, turn: dict[str, Any]) -> None:
+        self._results = list(turn["tools"])
+        self.mismatches = 0
+
+    async def execute(self, name: str, params: dict[str, Any]) -> str:
+        with tracing.span(f"tool.{name}"):
+            if not self._results:
+                self.mismatches += 1
+                return f"Error: no recorded result for tool '{name}'"
+            recorded = self._results.pop(0)
+            if recorded["name"] != name:
+                self.mismatches += 1
+            return recorded["result"]
+
+
+class _MemoryExporter:
+    def __init__(self) -> None:
+        self.spans: list[tracing.Span] = []
+
+    def export(self, spans: list[tracing.Span]) -> None:
+        self.spans.extend(spans)
+
+
+@dataclass
+class ReplayReport:
+    turns: int = 0
+    divergent_turns: int = 0  # Replayed tool loop did not follow the recording
+    stages_ms: dict[str, float] = field(default_factory=dict)  # Mean per turn
+    total_ms: float = 0.0  # Mean agent time per turn (excludes the mocked LLM)
+    recorded_prompt_tokens: int = 0  # Sum over all LLM calls
+    replayed_prompt_tokens: int = 0
+    recorded_llm_ms: float = 0.0  # Mean recorded LLM time per turn, for scale
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def format(self) -> str:
+        lines = [
+            f"{'turns':<22}{self.turns} ({self.divergent_turns} divergent)",
+            f"{'agent time/turn':<22}{self.total_ms:.2f}ms",
+        ]
+        for stage, ms in sorted(self.stages_ms.items()):
+            lines.append(f"  {stage:<20}{ms:.2f}ms")
+        lines += [
+            f"{'prompt tokens':<22}{self.replayed_prompt_tokens} (recorded {self.recorded_prompt_tokens})",
+            f"{'recorded llm/turn':<22}{self.recorded_llm_ms:.0f}ms",
+        ]
+        return "\n".join(lines)
+
+    def compare(self, baseline: dict[str, Any]) -> list[tuple[str, float, float, float]]:
+        """Rows of (metric, baseline, current, % change) against a saved report."""
+        rows = []
+
+        def row(name: str, old: float, new: float) -> None:
+            change = (new - old) / old * 100 if old else 0.0
+            rows.append((name, old, new, change))
+
+        row("total_ms", baseline.get("total_ms", 0.0), self.total_ms)
+        for stage in sorted(set(self.stages_ms) | set(baseline.get("stages_ms", {}))):
+            row(f"stages_ms.{stage}", baseline.get("stages_ms", {}).get(stage, 0.0),
+                self.stages_ms.get(stage, 0.0))
+        row("replayed_prompt_tokens", baseline.get("replayed_prompt_tokens", 0),
+            self.replayed_prompt_tokens)
+        return rows
+
+
+def _scratch_workspace(source: Path | None, target: Path) -> Path:
+    """Copy what ContextBuilder reads from *source* into *target*."""
+    from nanobot.agent.context import ContextBuilder
+
+    workspace = ensure_dir(target / "workspace")
+    if source is None or not source.is_dir():
+        return workspace
+    for name in ContextBuilder.BOOTSTRAP_FILES:
+        if (source / name).is_file():
+            shutil.copy2(source / name, workspace / name)
+    for name in ("memory", "skills"):
+        if (source / name).is_dir():
+            shutil.copytree(source / name, workspace / name)
+    return workspace
+
+
+async def replay_turns(
+    turns: list[dict[str, Any]],
+    extensions: ExtensionManager | None = None,
+    repeat: int = 1,
+    workspace: Path | None = None,
+) -> ReplayReport:
+    """Replay *turns* (from ``recording.load_turns``) *repeat* times each."""
+    from nanobot.agent.loop import AgentLoop
+
+    exporter = _MemoryExporter()
+    tracer = tracing.get_tracer()
+    saved_exporters = tracer.exporters
+    tracer.exporters = [exporter]
+
+    report = ReplayReport()
+    stage_totals: dict[str, float] = defaultdict(float)
+    agent_total = 0.0
+    try:
+        with tempfile.TemporaryDirectory(prefix="nanobot-replay-") as tmp:
+            provider = ReplayProvider()
+            agent = AgentLoop(
+                bus=MessageBus(), provider=provider, extensions=extensions,
+                workspace=_scratch_workspace(workspace, Path(tmp)),
+            )
+            agent.sessions.sessions_dir = ensure_dir(Path(tmp) / "sessions")
+            tools = ReplayRegistry(agent.tools)
+            agent.tools = tools
+
+            for turn in turns:
+                for _ in range(repeat):
+                    provider.load(turn)
+                    tools.load(turn)
+                    session = agent.sessions.get_or_create(turn["sessionKey"])
+                    session.messages = json.loads(json.dumps(turn["session"]["messages"]))
+                    session.metadata = json.loads(json.dumps(turn["session"]["metadata"]))
+
+                    exporter.spans.clear()
+                    root = tracing.Span("replay")
+                    msg = InboundMessage(
+                        channel=turn["channel"], sender_id="replay", chat_id=turn["chatId"],
+                        content=turn["content"], media=turn.get("media", []),
+                    )
+                    with tracing.activate(root):
+                        await agent._process_message(msg)
+                    root.end()
+
+                    tool_ms = 0.0
+                    for span in exporter.spans:
+                        if span.name.startswith("tool."):
+                            tool_ms += span.duration_ms
+                        elif span.name in _STAGES:
+                            stage_totals[_STAGES[span.name]] += span.duration_ms
+                    stage_totals["tools"] += tool_ms
+                    agent_total += root.duration_ms - sum(
+                        s.duration_ms for s in exporter.spans if s.name == "llm.chat"
+                    )
+
+                    report.turns += 1
+                    if tools.mismatches or not provider.exhausted:
+                        report.divergent_turns += 1
+                    report.replayed_prompt_tokens += sum(provider.prompt_tokens)
+                    report.recorded_prompt_tokens += sum(c["promptTokensEst"] for c in turn["calls"])
+                    report.recorded_llm_ms += sum(c["elapsedMs"] for c in turn["calls"])
+    finally:
+        tracer.exporters = saved_exporters
+
+    n = max(1, report.turns)
+    report.stages_ms = {k: v / n for k, v in stage_totals.items()}
+    report.total_ms = agent_total / n
+    report.recorded_llm_ms /= n
+    return report
@@ -0,0 +1,180 @@
+"""Run AgentLoop against the scripted provider and synthetic channel."""
+
+import asyncio
+import gc
+import math
+import os
+import resource
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.bench.channel import SyntheticChannel
+from nanobot.bench.provider import DEFAULT_SCRIPT, FaultModel, LatencyModel, ScriptedProvider
+from nanobot.bus.queue import MessageBus
+
+
+@dataclass
+class BenchConfig:
+    sessions: int = 20
+    turns: int = 5  # Messages per session
+    tool_calls: int = 2  # Scripted tool calls before each answer
+    think_time: float = 0.0  # Seconds a simulated user waits between messages
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    faults: FaultModel = field(default_factory=FaultModel)
+    seed: int = 0
+    turn_timeout: float = 120.0
+    workspace: Path | None = None  # Default: a temporary directory
+
+
+@dataclass
+class BenchReport:
+    sessions: int
+    turns: int
+    errors: int
+    duration_s: float
+    messages_per_s: float
+    latency_ms: dict[str, float]  # p50 / p95 / p99 / max
+    loop_lag_ms: dict[str, float]  # p99 / max event-loop scheduling delay
+    llm_calls: int
+    rss_per_idle_session_kb: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def format(self) -> str:
+        lat = self.latency_ms
+        lag = self.loop_lag_ms
+        return "\n".join([
+            f"sessions        {self.sessions}",
+            f"turns           {self.turns} ({self.errors} errors)",
+            f"duration        {self.duration_s:.2f}s",
+            f"throughput      {self.messages_per_s:.1f} msg/s",
+            f"turn latency    p50 {lat['p50']:.1f}ms  p95 {lat['p95']:.1f}ms  "
+            f"p99 {lat['p99']:.1f}ms  max {lat['max']:.1f}ms",
+            f"loop lag        p99 {lag['p99']:.1f}ms  max {lag['max']:.1f}ms",
+            f"llm calls       {self.llm_calls}",
+            f"rss/idle sess.  {self.rss_per_idle_session_kb:.1f} KB",
+        ])
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * pct / 100))
+    return ordered[rank - 1]
+
+
+class LoopLagMonitor:
+    """Samples how late ``asyncio.sleep(interval)`` wakes up."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+
+def current_rss_kb() -> int:
+    """Resident set size now (Linux), falling back to the peak elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def run_bench(config: BenchConfig) -> BenchReport:
+    """Drive ``config.sessions`` concurrent users through a real AgentLoop."""
+    from nanobot.agent.loop import AgentLoop
+    from nanobot.utils.helpers import ensure_dir
+
+    with tempfile.TemporaryDirectory(prefix="nanobot-bench-") as tmp:
+        workspace = config.workspace or Path(tmp)
+        (workspace / "bench.txt").write_text("benchmark fixture\n" * 20)
+
+        # Tool paths are resolved against the process cwd, so anchor them in the workspace
+        script = [
+            (name, {**args, "path": str(workspace / args["path"])})
+            for name, args in (DEFAULT_SCRIPT[i % len(DEFAULT_SCRIPT)] for i in range(config.tool_calls))
+        ]
+        provider = ScriptedProvider(
+            script=script, latency=config.latency, faults=config.faults, seed=config.seed,
+        )
+        bus = MessageBus()
+        agent = AgentLoop(bus=bus, provider=provider, workspace=workspace)
+        # Keep benchmark sessions out of ~/.nanobot/sessions
+        agent.sessions.sessions_dir = ensure_dir(Path(tmp) / "sessions")
+
+        channel = SyntheticChannel(bus, turn_timeout=config.turn_timeout)
+        bus.subscribe_outbound(channel.name, channel.send)
+        await channel.start()
+
+        gc.collect()
+        rss_before = current_rss_kb()
+        monitor = LoopLagMonitor()
+        agent_task = asyncio.create_task(agent.run())
+        dispatch_task = asyncio.create_task(bus.dispatch_outbound())
+        monitor.start()
+        started = time.perf_counter()
+        try:
+            await channel.drive(config.sessions, config.turns, config.think_time)
+        finally:
+            duration = time.perf_counter() - started
+            await monitor.stop()
+            agent.stop()
+            bus.stop()
+            for task in (agent_task, dispatch_task):
+                task.cancel()
+            await asyncio.gather(agent_task, dispatch_task, return_exceptions=True)
+            await channel.stop()
+            if agent.shell_sessions is not None:
+                await agent.shell_sessions.close_all()
+
+        # Sessions stay cached in the SessionManager, so the growth is their idle cost
+        gc.collect()
+        rss_after = current_rss_kb()
+
+    latencies = [r.latency * 1000 for r in channel.results]
+    lags = [s * 1000 for s in monitor.samples]
+    report = BenchReport(
+        sessions=config.sessions,
+        turns=len(channel.results),
+        errors=sum(r.error for r in channel.results),
+        duration_s=duration,
+        messages_per_s=len(channel.results) / duration if duration else 0.0,
+        latency_ms={
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies, default=0.0),
+        },
+        loop_lag_ms={"p99": percentile(lags, 99), "max": max(lags, default=0.0)},
+        llm_calls=provider.calls,
+        rss_per_idle_session_kb=max(0, rss_after - rss_before) / max(1, config.sessions),
+    )
+    logger.info(f"Bench finished: {report.turns} turns in {duration:.2f}s")
+    return report
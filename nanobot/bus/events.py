@@ -2,7 +2,10 @@
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from nanobot.telemetry.tracing import Span
 
 
 @dataclass
@@ -16,6 +19,8 @@ class InboundMessage:
     timestamp: datetime = field(default_factory=datetime.now)
     media: list[str] = field(default_factory=list)  # Media URLs
     metadata: dict[str, Any] = field(default_factory=dict)  # Channel-specific data
+    trace: "Span | None" = field(default=None, repr=False, compare=False)  # Root span, if tracing
+    queued_at: float | None = field(default=None, repr=False, compare=False)  # Set by the bus
     
     @property
     def session_key(self) -> str:
@@ -34,5 +39,7 @@ class OutboundMessage:
     media: list[str] = field(default_factory=list)
     metadata: dict[str, Any] = field(default_factory=dict)
     error: bool = False  # True = error response (skip credit deduction)
+    trace: "Span | None" = field(default=None, repr=False, compare=False)  # Root span, if tracing
+    queued_at: float | None = field(default=None, repr=False, compare=False)  # Set by the bus
 
 
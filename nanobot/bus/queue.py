@@ -1,7 +1,8 @@
 """Async message queue for decoupled channel-agent communication."""
 
 import asyncio
-from typing import Callable, Awaitable
+import time
+from typing import Awaitable, Callable
 
 from loguru import logger
 
@@ -24,6 +25,7 @@ class MessageBus:
     
     async def publish_inbound(self, msg: InboundMessage) -> None:
         """Publish a message from a channel to the agent."""
+        msg.queued_at = time.time()
         await self.inbound.put(msg)
     
     async def consume_inbound(self) -> InboundMessage:
@@ -32,6 +34,7 @@ class MessageBus:
     
     async def publish_outbound(self, msg: OutboundMessage) -> None:
         """Publish a response from the agent to channels."""
+        msg.queued_at = time.time()
         await self.outbound.put(msg)
     
     async def consume_outbound(self) -> OutboundMessage:
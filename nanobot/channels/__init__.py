@@ -1,6 +1,18 @@
 """Chat channels module with plugin architecture."""
 
+from typing import TYPE_CHECKING, Any
+
 from nanobot.channels.base import BaseChannel
-from nanobot.channels.manager import ChannelManager
+
+if TYPE_CHECKING:
+    from nanobot.channels.manager import ChannelManager
 
 __all__ = ["BaseChannel", "ChannelManager"]
+
+
+def __getattr__(name: str) -> Any:
+    # The manager pulls in the config schema; channel SDKs load per enabled channel
+    if name == "ChannelManager":
+        from nanobot.channels.manager import ChannelManager
+        return ChannelManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
 """Base channel interface for chat platforms."""
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Any
 
@@ -7,6 +8,7 @@ from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
+from nanobot.telemetry import tracing
 
 
 class BaseChannel(ABC):
@@ -49,12 +51,16 @@ class BaseChannel(ABC):
         pass
     
     @abstractmethod
-    async def send(self, msg: OutboundMessage) -> None:
+    async def send(self, msg: OutboundMessage) -> asyncio.Future | None:
         """
         Send a message through this channel.
         
         Args:
             msg: The message to send.
+        
+        Returns:
+            None once sent, or, for channels that queue outbound messages,
+            a future that resolves when the message has been delivered.
         """
         pass
     
@@ -116,7 +122,10 @@ class BaseChannel(ABC):
             chat_id=str(chat_id),
             content=content,
             media=media or [],
-            metadata=metadata or {}
+            metadata=metadata or {},
+            trace=tracing.start_trace(
+                "message", channel=self.name, chat_id=str(chat_id), sender_id=str(sender_id),
+            ),
         )
         
         await self.bus.publish_inbound(msg)
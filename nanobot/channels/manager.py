@@ -1,14 +1,19 @@
 """Channel manager for coordinating chat channels."""
 
 import asyncio
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
-from nanobot.config.schema import Config
+from nanobot.media.store import media_store
+from nanobot.telemetry import tracing
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import Config
+    from nanobot.media.processing import MediaProcessor
 
 
 class ChannelManager:
@@ -21,14 +26,28 @@ class ChannelManager:
     - Route outbound messages
     """
     
-    def __init__(self, config: Config, bus: MessageBus):
+    def __init__(self, config: "Config", bus: MessageBus):
         self.config = config
         self.bus = bus
         self.channels: dict[str, BaseChannel] = {}
         self._dispatch_task: asyncio.Task | None = None
+        self.media = self._make_media_processor()
+        self.store = media_store(config)
         
         self._init_channels()
     
+    def _make_media_processor(self) -> "MediaProcessor":
+        """One ffmpeg/ffprobe pool and result cache for every channel."""
+        from pathlib import Path
+
+        from nanobot.media.processing import MediaProcessor
+        cfg = self.config.channels.media
+        return MediaProcessor(
+            cache_dir=Path(cfg.cache_dir).expanduser() if cfg.cache_dir else None,
+            max_workers=cfg.max_workers,
+            cache_max_bytes=cfg.cache_mb * 1024 * 1024,
+        )
+
     def _init_channels(self) -> None:
         """Initialize channels based on config."""
         
@@ -40,6 +59,8 @@ class ChannelManager:
                     self.config.channels.telegram,
                     self.bus,
                     groq_api_key=self.config.providers.groq.api_key,
+                    media=self.media,
+                    store=self.store,
                 )
                 logger.info("Telegram channel enabled")
             except ImportError as e:
@@ -61,7 +82,7 @@ class ChannelManager:
             try:
                 from nanobot.channels.discord import DiscordChannel
                 self.channels["discord"] = DiscordChannel(
-                    self.config.channels.discord, self.bus
+                    self.config.channels.discord, self.bus, store=self.store,
                 )
                 logger.info("Discord channel enabled")
             except ImportError as e:
@@ -127,20 +148,49 @@ class ChannelManager:
                     timeout=1.0
                 )
                 
+                tracing.record("bus.outbound_wait", msg.trace, msg.queued_at)
                 channel = self.channels.get(msg.channel)
                 if channel:
-                    try:
-                        await channel.send(msg)
-                    except Exception as e:
-                        logger.error(f"Error sending to {msg.channel}: {e}")
+                    await self._deliver(channel, msg)
                 else:
                     logger.warning(f"Unknown channel: {msg.channel}")
+                    if msg.trace:
+                        msg.trace.end()
                     
             except asyncio.TimeoutError:
                 continue
             except asyncio.CancelledError:
                 break
     
+    async def _deliver(self, channel: BaseChannel, msg: OutboundMessage) -> None:
+        """Send *msg*, ending its ``channel.send`` span and trace once it is delivered.
+
+        Channels that queue the message return a future for its delivery;
+        the trace stays open until that resolves.
+        """
+        span = msg.trace.child("channel.send", channel=msg.channel) if msg.trace else None
+
+        def finish(error: BaseException | None = None) -> None:
+            if error is not None:
+                logger.error(f"Error sending to {msg.channel}: {error}")
+            if span:
+                if error is not None:
+                    span.error = f"{type(error).__name__}: {error}"
+                span.end()
+                msg.trace.end()
+
+        try:
+            delivered = await channel.send(msg)
+        except Exception as e:
+            finish(e)
+            return
+        if delivered is None:
+            finish()
+        elif span:
+            delivered.add_done_callback(
+                lambda f: finish(None if f.cancelled() else f.exception()),
+            )
+
     def get_channel(self, name: str) -> BaseChannel | None:
         """Get a channel by name."""
         return self.channels.get(name)
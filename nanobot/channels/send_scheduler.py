@@ -0,0 +1,241 @@
+"""Outbound pacing for chat APIs with global and per-chat rate limits.
+
+``SendScheduler`` has two halves:
+
+- **Lanes** order work per chat.  Each submitted job (e.g. "send this
+  reply", which may be several API calls) runs after the chat's earlier
+  jobs, one at a time.  Final answers go before queued progress
+  updates; progress still queued when a later final answer is sent is
+  dropped as stale; and progress submitted while another progress
+  update for the chat is still queued is merged into it, so a burst of
+  tool notifications becomes one message.
+- **Buckets** pace every individual API call (:meth:`acquire`): one
+  global bucket, one per chat and, for group chats, a slower one per
+  group.  Calls made by progress jobs only take global tokens when no
+  final answer is waiting for one.
+
+Telegram's documented limits are about 30 messages/s overall, 1/s per
+chat (short bursts tolerated) and 20/min per group; staying under them
+avoids flood-wait penalties that stall a busy bot for tens of seconds.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+
+from nanobot.telemetry.metrics import CHANNEL_SEND_JOBS, CHANNEL_SEND_WAIT_SECONDS
+from nanobot.utils.ratelimit import TokenBucket
+
+FINAL = 0
+PROGRESS = 1
+
+_PRIORITY_NAMES = {FINAL: "final", PROGRESS: "progress"}
+
+# Priority of the lane job currently running (acquire() called outside a lane counts as final)
+_current_priority: contextvars.ContextVar[int] = contextvars.ContextVar("send_priority", default=FINAL)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    run: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    texts: list[str] | None = field(default=None, compare=False)  # Coalesced progress text
+
+
+@dataclass
+class _Lane:
+    bucket: TokenBucket
+    group: TokenBucket | None
+    jobs: list[_Job] = field(default_factory=list)
+    task: asyncio.Task | None = None
+    progress: _Job | None = None  # Queued progress job still accepting text
+
+
+class SendScheduler:
+    """Per-chat ordered, priority-aware send queue over global/chat/group token buckets."""
+
+    def __init__(
+        self,
+        channel: str,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        group_rate: float = 20 / 60,
+        group_burst: float = 5.0,
+        max_progress_chars: int = 3500,
+        is_group: Callable[[int], bool] = lambda chat_id: chat_id < 0,
+    ):
+        self.channel = channel
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_progress_chars = max_progress_chars
+        self.is_group = is_group
+        self._global = TokenBucket(rate=global_rate, burst=max(1.0, global_rate))
+        self._lanes: dict[int, _Lane] = {}
+        self._seq = itertools.count()
+        self._finals_waiting = 0
+
+    # ------------------------------------------------------------------
+    # Lanes
+    # ------------------------------------------------------------------
+
+    def submit(self, chat_id: int, run: Callable[[], Awaitable[Any]], progress: bool = False) -> asyncio.Future:
+        """Queue *run* for *chat_id*. The returned future resolves to its result."""
+        lane = self._lane(chat_id)
+        job = _Job(
+            priority=PROGRESS if progress else FINAL, seq=next(self._seq), run=run,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        if not progress:
+            lane.progress = None  # Progress queued before this is stale; don't merge newer text into it
+        self._push(chat_id, lane, job)
+        return job.future
+
+    def submit_progress(
+        self, chat_id: int, text: str, deliver: Callable[[str], Awaitable[Any]],
+    ) -> asyncio.Future:
+        """Queue a progress update, merged with one already waiting for this chat if it fits."""
+        lane = self._lane(chat_id)
+        pending = lane.progress
+        if pending and sum(len(t) + 1 for t in pending.texts) + len(text) <= self.max_progress_chars:
+            pending.texts.append(text)
+            CHANNEL_SEND_JOBS.inc(channel=self.channel, outcome="coalesced")
+            return pending.future
+        texts = [text]
+        job = _Job(
+            priority=PROGRESS, seq=next(self._seq), run=lambda: deliver("\n".join(texts)),
+            future=asyncio.get_running_loop().create_future(), texts=texts,
+        )
+        lane.progress = job
+        self._push(chat_id, lane, job)
+        return job.future
+
+    def _lane(self, chat_id: int) -> _Lane:
+        lane = self._lanes.get(chat_id)
+        if lane is None:
+            if len(self._lanes) > 1000:
+                self._prune()
+            lane = _Lane(
+                bucket=TokenBucket(rate=self.chat_rate, burst=self.chat_burst),
+                group=TokenBucket(rate=self.group_rate, burst=self.group_burst)
+                if self.is_group(chat_id) else None,
+            )
+            self._lanes[chat_id] = lane
+        return lane
+
+    def _prune(self) -> None:
+        """Forget idle chats whose buckets have fully refilled."""
+        for chat_id, lane in list(self._lanes.items()):
+            if lane.task is None and lane.bucket.available >= lane.bucket.burst:
+                if lane.group is None or lane.group.available >= lane.group.burst:
+                    del self._lanes[chat_id]
+
+    def _push(self, chat_id: int, lane: _Lane, job: _Job) -> None:
+        heapq.heappush(lane.jobs, job)
+        if lane.task is None:
+            lane.task = asyncio.create_task(self._drain_lane(chat_id, lane))
+
+    async def _drain_lane(self, chat_id: int, lane: _Lane) -> None:
+        try:
+            while lane.jobs:
+                job = heapq.heappop(lane.jobs)
+                if job is lane.progress:
+                    lane.progress = None  # Started: later progress starts a new message
+                if job.priority == FINAL:
+                    self._supersede(lane, job.seq)
+                await self._run(job)
+        finally:
+            lane.task = None
+
+    def _supersede(self, lane: _Lane, seq: int) -> None:
+        """Drop progress queued before a final answer that is about to be sent."""
+        stale = [j for j in lane.jobs if j.priority == PROGRESS and j.seq < seq]
+        if not stale:
+            return
+        lane.jobs = [j for j in lane.jobs if j not in stale]
+        heapq.heapify(lane.jobs)
+        for job in stale:
+            if job is lane.progress:
+                lane.progress = None
+            if not job.future.done():
+                job.future.set_result(None)
+            CHANNEL_SEND_JOBS.inc(channel=self.channel, outcome="superseded")
+
+    async def _run(self, job: _Job) -> None:
+        token = _current_priority.set(job.priority)
+        try:
+            result = await job.run()
+        except Exception as e:
+            logger.error(f"{self.channel} send failed: {e}")
+            if not job.future.done():
+                job.future.set_exception(e)
+                job.future.exception()  # Mark retrieved when nobody awaits it
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+            CHANNEL_SEND_JOBS.inc(channel=self.channel, outcome="sent")
+        finally:
+            _current_priority.reset(token)
+
+    async def drain(self) -> None:
+        """Wait until every queued job has run."""
+        while tasks := [lane.task for lane in self._lanes.values() if lane.task]:
+            await asyncio.wait(tasks)
+
+    # ------------------------------------------------------------------
+    # Buckets
+    # ------------------------------------------------------------------
+
+    async def acquire(self, chat_id: int, cost: int = 1) -> float:
+        """Wait until *cost* messages may be sent to *chat_id*. Returns seconds waited."""
+        started = time.monotonic()
+        priority = _current_priority.get()
+        lane = self._lane(chat_id)
+        await _take(lane.bucket, cost)
+        if lane.group:
+            await _take(lane.group, cost)
+        if priority == FINAL:
+            self._finals_waiting += 1
+            try:
+                await _take(self._global, cost)
+            finally:
+                self._finals_waiting -= 1
+        else:
+            # Progress yields the global budget to any waiting final answer
+            while self._finals_waiting or not self._global.try_acquire(min(cost, self._global.burst)):
+                await asyncio.sleep(1 / self._global.rate)
+            if cost > self._global.burst:
+                self._global.consume(cost - self._global.burst)
+        waited = time.monotonic() - started
+        CHANNEL_SEND_WAIT_SECONDS.observe(waited, channel=self.channel, priority=_PRIORITY_NAMES[priority])
+        return waited
+
+    def penalize(self, chat_id: int, seconds: float) -> None:
+        """Hold all sends to *chat_id* for *seconds* (the API asked us to back off)."""
+        self._lane(chat_id).bucket.pause(seconds)
+        CHANNEL_SEND_JOBS.inc(channel=self.channel, outcome="flood_wait")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "chats": len(self._lanes),
+            "queued": sum(len(lane.jobs) for lane in self._lanes.values()),
+        }
+
+
+async def _take(bucket: TokenBucket, cost: int) -> None:
+    """Acquire *cost* tokens, borrowing beyond the burst size (e.g. a 10-item album)."""
+    first = min(cost, bucket.burst)
+    await bucket.acquire(first)
+    if cost > first:
+        bucket.consume(cost - first)
@@ -1,21 +1,32 @@
 """Telegram channel implementation using python-telegram-bot."""
 
 import asyncio
-import json
+import hashlib
 import re
-import subprocess
-import tempfile
+import time
+from collections.abc import Awaitable
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
-from telegram import InputMediaPhoto, InputMediaVideo, Update
-from telegram.error import NetworkError, RetryAfter, TimedOut
-from telegram.ext import Application, MessageHandler, filters, ContextTypes
+from telegram import InputMediaPhoto, InputMediaVideo, Message, Update
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+from telegram.ext import Application, ContextTypes, MessageHandler, filters
 
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.send_scheduler import SendScheduler
 from nanobot.config.schema import TelegramConfig
+from nanobot.media.processing import MediaProcessor
+from nanobot.media.store import MediaStore
+from nanobot.telemetry.metrics import CHANNEL_INGEST_PENDING, CHANNEL_INGEST_SECONDS, MEDIA_SENDS
+from nanobot.utils.cache import DiskCache, cache_key
+from nanobot.utils.helpers import get_data_path
+
+if TYPE_CHECKING:
+    from nanobot.providers.transcription import GroqTranscriptionProvider
+    from nanobot.web.telegram import TelegramWebhookServer
 
 # File extensions grouped by Telegram send method
 _PHOTO_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
@@ -25,6 +36,8 @@ _GROUPABLE_EXTS = _PHOTO_EXTS | _VIDEO_EXTS  # can go into a media group
 
 _TG_MAX_LENGTH = 4096
 _TG_MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 MB Telegram Bot API limit
+_TG_MAX_PHOTO_SIZE = 10 * 1024 * 1024  # send_photo limit; larger photos are recompressed
+_TG_MAX_PHOTO_DIMENSIONS = 10000  # send_photo limit on width + height
 _VIDEO_PREVIEW_THRESHOLD = 10 * 1024 * 1024  # 10 MB — compress videos above this
 _VIDEO_PREVIEW_TARGET = 9 * 1024 * 1024       # ~9 MB target (with margin)
 _SEND_RETRIES = 3
@@ -32,109 +45,6 @@ _MEDIA_RETRIES = 3
 _VIDEO_WRITE_TIMEOUT = 180  # seconds — generous for slow VPS uploads
 
 
-def _probe_video(path: Path) -> dict[str, int]:
-    """Extract width, height, and duration from a video file via ffprobe.
-
-    Returns a dict with keys present only when successfully extracted,
-    e.g. {"width": 1080, "height": 1920, "duration": 12}.
-    """
-    try:
-        result = subprocess.run(
-            [
-                "ffprobe", "-v", "quiet", "-print_format", "json",
-                "-show_streams", "-select_streams", "v:0", str(path),
-            ],
-            capture_output=True, text=True, timeout=10,
-        )
-        if result.returncode != 0:
-            return {}
-        data = json.loads(result.stdout)
-        stream = data.get("streams", [{}])[0]
-        info: dict[str, int] = {}
-        if "width" in stream and "height" in stream:
-            info["width"] = int(stream["width"])
-            info["height"] = int(stream["height"])
-        # duration lives on the stream or container level
-        dur = stream.get("duration") or data.get("format", {}).get("duration")
-        if dur:
-            info["duration"] = int(float(dur))
-        return info
-    except Exception as e:
-        logger.debug(f"ffprobe failed for {path}: {e}")
-        return {}
-
-
-def _compress_video(
-    path: Path,
-    target_bytes: int = _VIDEO_PREVIEW_TARGET,
-    max_height: int = 720,
-) -> Path | None:
-    """Compress a video to fit within *target_bytes* using ffmpeg.
-
-    Applies bitrate reduction and resolution downscaling (capped at
-    *max_height*).  Returns path to the compressed temp file, or None
-    on failure.  The caller is responsible for deleting the temp file.
-    """
-    probe = _probe_video(path)
-    duration = probe.get("duration", 0)
-    if duration <= 0:
-        logger.warning(f"Cannot compress {path}: unknown duration")
-        return None
-
-    # Target bitrate (bits/s) = target_bytes * 8 / duration, leave room for audio
-    audio_bitrate = 96_000  # 96 kbps — lower for preview
-    video_bitrate = int((target_bytes * 8) / duration - audio_bitrate)
-    if video_bitrate < 100_000:  # below 100 kbps = unwatchable
-        logger.warning(f"Cannot compress {path}: would need < 100 kbps for {duration}s")
-        return None
-
-    # Build ffmpeg command
-    cmd = ["ffmpeg", "-y", "-i", str(path)]
-
-    # Downscale if video height exceeds max_height (never upscale)
-    height = probe.get("height", 0)
-    if height > max_height:
-        cmd.extend(["-vf", f"scale=-2:{max_height}"])
-
-    cmd.extend([
-        "-c:v", "libx264", "-preset", "fast",
-        "-b:v", str(video_bitrate),
-        "-c:a", "aac", "-b:a", "96k",
-        "-movflags", "+faststart",
-    ])
-
-    tmp = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
-    tmp.close()
-    cmd.append(tmp.name)
-
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
-        if result.returncode != 0:
-            logger.error(f"ffmpeg compression failed: {result.stderr[:500]}")
-            Path(tmp.name).unlink(missing_ok=True)
-            return None
-        compressed = Path(tmp.name)
-        compressed_size = compressed.stat().st_size
-        logger.info(
-            f"Compressed video {path.name}: "
-            f"{path.stat().st_size / 1024 / 1024:.1f} MB → "
-            f"{compressed_size / 1024 / 1024:.1f} MB"
-        )
-        # Reject if still over the preview threshold
-        if compressed_size > _VIDEO_PREVIEW_THRESHOLD:
-            logger.warning(
-                f"Compressed video still {compressed_size / 1024 / 1024:.1f} MB "
-                f"(limit {_VIDEO_PREVIEW_THRESHOLD / 1024 / 1024:.0f} MB), skipping"
-            )
-            compressed.unlink(missing_ok=True)
-            return None
-        return compressed
-    except Exception as e:
-        logger.error(f"ffmpeg compression error: {e}")
-        Path(tmp.name).unlink(missing_ok=True)
-        return None
-
-
 def _chunk_text(text: str, max_len: int = _TG_MAX_LENGTH) -> list[str]:
     """Split text into chunks that fit Telegram's message limit.
 
@@ -233,40 +143,95 @@ def _markdown_to_telegram_html(text: str) -> str:
     return text
 
 
+def _retry_seconds(e: RetryAfter) -> float:
+    """``RetryAfter.retry_after`` as seconds (an int or a timedelta depending on the PTB version)."""
+    delay = e.retry_after
+    return delay.total_seconds() if hasattr(delay, "total_seconds") else float(delay)
+
+
+def _media_kind(suffix: str) -> str:
+    """The Telegram send method family for a file extension."""
+    if suffix in _PHOTO_EXTS:
+        return "photo"
+    if suffix in _VIDEO_EXTS:
+        return "video"
+    if suffix in _AUDIO_EXTS:
+        return "audio"
+    return "document"
+
+
+def _sent_file_id(kind: str, message: Message | None) -> str | None:
+    """The file_id Telegram assigned to the media in a sent *message*."""
+    if message is None:
+        return None
+    if kind == "photo":
+        return message.photo[-1].file_id if message.photo else None
+    attachment = getattr(message, kind, None)
+    return attachment.file_id if attachment else None
+
+
 class TelegramChannel(BaseChannel):
     """
     Telegram channel using long polling.
     
-    Simple and reliable - no webhook/public IP needed.
+    Simple and reliable - no webhook/public IP needed.  Optionally
+    receives updates by webhook instead (``channels.telegram.webhook``).
     """
     
     name = "telegram"
     
-    def __init__(self, config: TelegramConfig, bus: MessageBus, groq_api_key: str = ""):
+    def __init__(
+        self,
+        config: TelegramConfig,
+        bus: MessageBus,
+        groq_api_key: str = "",
+        media: MediaProcessor | None = None,
+        store: MediaStore | None = None,
+    ):
         super().__init__(config, bus)
         self.config: TelegramConfig = config
         self.groq_api_key = groq_api_key
+        self.media = media or MediaProcessor()
+        self.store = store or MediaStore()
+        # Content hash → file_id of an earlier upload, so identical media is never re-sent
+        self._file_ids = DiskCache(get_data_path() / "cache" / "telegram_file_ids", max_bytes=16 * 1024 * 1024)
         self._app: Application | None = None
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
-        self._media_tasks: set[asyncio.Task] = set()  # background media uploads
+        self._inbound_tails: dict[int, asyncio.Task] = {}  # last inbound message still being ingested, per chat
+        self._transcriber: "GroqTranscriptionProvider | None" = None
+        self._webhook: "TelegramWebhookServer | None" = None
+        limits = config.send_limits
+        self._sender = SendScheduler(
+            self.name,
+            global_rate=limits.global_per_second,
+            chat_rate=limits.per_chat_per_second,
+            chat_burst=limits.chat_burst,
+            group_rate=limits.per_group_per_minute / 60,
+        )
     
     async def start(self) -> None:
-        """Start the Telegram bot with long polling."""
+        """Start the Telegram bot with long polling, or a webhook if configured."""
         if not self.config.token:
             logger.error("Telegram bot token not configured")
             return
         
         self._running = True
+        webhook = self.config.webhook
         
         # Build the application with generous timeouts for media uploads
-        self._app = (
+        builder = (
             Application.builder()
             .token(self.config.token)
             .read_timeout(60)
             .write_timeout(60)
             .connect_timeout(15)
-            .build()
+            .concurrent_updates(self.config.concurrent_updates)
         )
+        if self.config.api_base_url:
+            builder = builder.base_url(self.config.api_base_url)
+        if webhook.enabled:
+            builder = builder.updater(None)  # Updates arrive through our own HTTP server
+        self._app = builder.build()
         
         # Add /start command handler (must be before the general message handler)
         from telegram.ext import CommandHandler
@@ -280,9 +245,9 @@ class TelegramChannel(BaseChannel):
             )
         )
         
-        logger.info("Starting Telegram bot (polling mode)...")
+        logger.info(f"Starting Telegram bot ({'webhook' if webhook.enabled else 'polling'} mode)...")
         
-        # Initialize and start polling
+        # Initialize and start the application
         await self._app.initialize()
         await self._app.start()
         
@@ -290,37 +255,92 @@ class TelegramChannel(BaseChannel):
         bot_info = await self._app.bot.get_me()
         logger.info(f"Telegram bot @{bot_info.username} connected")
         
-        # Start polling (this runs until stopped)
-        await self._app.updater.start_polling(
-            allowed_updates=["message"],
-            drop_pending_updates=True  # Ignore old messages on startup
-        )
+        if webhook.enabled:
+            await self._start_webhook()
+        else:
+            # Start polling (this runs until stopped)
+            await self._app.updater.start_polling(
+                allowed_updates=["message"],
+                drop_pending_updates=True  # Ignore old messages on startup
+            )
         
         # Keep running until stopped
         while self._running:
             await asyncio.sleep(1)
+
+    async def _start_webhook(self) -> None:
+        """Serve the webhook and point Telegram at it.
+
+        Updates sent while we were down are kept by Telegram and delivered
+        now.  Several gateway processes can serve one bot behind a load
+        balancer: they derive the same secret from the token, and none of
+        them removes the webhook on shutdown.
+        """
+        from nanobot.web.telegram import TelegramWebhookServer
+
+        webhook = self.config.webhook
+        secret = webhook.secret_token or hashlib.sha256(
+            f"nanobot-webhook:{self.config.token}".encode()
+        ).hexdigest()[:32]
+        self._webhook = TelegramWebhookServer(
+            host=webhook.host,
+            port=webhook.port,
+            path=webhook.path,
+            secret_token=secret,
+            on_update=self._on_webhook_update,
+            queue_size=webhook.queue_size,
+        )
+        await self._webhook.start()
+        if webhook.url:
+            await self._app.bot.set_webhook(
+                url=webhook.url.rstrip("/") + webhook.path,
+                secret_token=secret,
+                allowed_updates=["message"],
+                max_connections=webhook.max_connections,
+                drop_pending_updates=False,
+            )
+        else:
+            logger.warning("Telegram webhook URL not configured; not registering it with Telegram")
+
+    async def _on_webhook_update(self, data: dict[str, Any]) -> None:
+        await self._app.process_update(Update.de_json(data, self._app.bot))
     
     async def stop(self) -> None:
-        """Stop the Telegram bot, waiting for in-flight media uploads."""
+        """Stop the Telegram bot, waiting for in-flight media uploads and inbound ingestion."""
         self._running = False
 
-        # Let pending media uploads finish before tearing down
-        if self._media_tasks:
-            logger.info(f"Waiting for {len(self._media_tasks)} media upload(s) to finish...")
-            await asyncio.wait(self._media_tasks)
+        # Stop accepting webhook updates; those already queued are processed
+        if self._webhook:
+            await self._webhook.stop()
+            self._webhook = None
+
+        # Let queued text and media uploads finish before tearing down
+        queued = self._sender.stats()["queued"]
+        if queued:
+            logger.info(f"Waiting for {queued} queued send(s) to finish...")
+        await self._sender.drain()
+        if self._inbound_tails:
+            logger.info(f"Waiting for {len(self._inbound_tails)} inbound message(s) to be ingested...")
+            await asyncio.wait(list(self._inbound_tails.values()))
+        if self._transcriber:
+            await self._transcriber.close()
 
         if self._app:
             logger.info("Stopping Telegram bot...")
-            await self._app.updater.stop()
+            if self._app.updater:
+                await self._app.updater.stop()
             await self._app.stop()
             await self._app.shutdown()
             self._app = None
     
-    async def send(self, msg: OutboundMessage) -> None:
+    async def send(self, msg: OutboundMessage) -> asyncio.Future | None:
         """Send a message through Telegram, including media if provided.
 
-        Text is sent immediately. Media uploads run in the background so
-        slow uploads don't block the outbound dispatcher.
+        Text, then media, are queued on the chat's send lane and paced
+        under Telegram's rate limits, so slow uploads never block the
+        outbound dispatcher; progress updates yield to final answers and
+        are merged while they wait.  Returns the future of the last job
+        queued for the message, which resolves once it is delivered.
         """
         if not self._app:
             logger.warning("Telegram bot not running")
@@ -332,17 +352,24 @@ class TelegramChannel(BaseChannel):
             logger.error(f"Invalid chat_id: {msg.chat_id}")
             return
 
-        # --- text first (fast) ---
+        delivered = None
+
+        # --- text first (queued in order, never blocks the dispatcher) ---
         if msg.content:
-            await self._send_text(chat_id, msg.content)
+            content = msg.content
+            if msg.metadata.get("progress") and not msg.media:
+                delivered = self._sender.submit_progress(
+                    chat_id, content, lambda text: self._send_text(chat_id, text),
+                )
+            else:
+                delivered = self._sender.submit(chat_id, lambda: self._send_text(chat_id, content))
 
-        # --- media in background (may be slow) ---
+        # --- media after its text, on the same lane (may be slow) ---
         if msg.media:
             files = self._resolve_media(msg.media)
             if files:
-                task = asyncio.create_task(self._upload_media(chat_id, files))
-                self._media_tasks.add(task)
-                task.add_done_callback(self._media_tasks.discard)
+                delivered = self._sender.submit(chat_id, lambda: self._upload_media(chat_id, files))
+        return delivered
 
     def _resolve_media(self, media: list[str]) -> list[Path]:
         """Validate media paths and return existing files."""
@@ -356,27 +383,30 @@ class TelegramChannel(BaseChannel):
         return files
 
     async def _upload_media(self, chat_id: int, files: list[Path]) -> None:
-        """Upload media files in the background. Errors are logged, never raised."""
-        compressed_temps: list[Path] = []
+        """Upload media files (a send lane job). Errors are logged, never raised."""
         try:
-            # Pre-compress oversized videos (> 10 MB → preview under 10 MB)
+            # Pre-compress oversized videos (> 10 MB → preview under 10 MB) and
+            # fit photos to send_photo limits.  Outputs are cached by content.
             processed: list[Path] = []
             for p in files:
-                if (
-                    p.suffix.lower() in _VIDEO_EXTS
-                    and p.stat().st_size > _VIDEO_PREVIEW_THRESHOLD
-                ):
+                suffix = p.suffix.lower()
+                if suffix in _VIDEO_EXTS and p.stat().st_size > _VIDEO_PREVIEW_THRESHOLD:
                     logger.info(
                         f"Video {p.name} is {p.stat().st_size / 1024 / 1024:.1f} MB "
                         f"(> {_VIDEO_PREVIEW_THRESHOLD / 1024 / 1024:.0f} MB), compressing..."
                     )
-                    compressed = _compress_video(p)
+                    compressed = await self.media.compress_video(
+                        p, _VIDEO_PREVIEW_TARGET, _VIDEO_PREVIEW_THRESHOLD,
+                    )
                     if compressed:
-                        compressed_temps.append(compressed)
                         processed.append(compressed)
                     else:
                         logger.warning(f"Skipping {p.name}: cannot compress under 10 MB")
                         continue  # drop — user wants ≤ 10 MB only
+                elif suffix in _PHOTO_EXTS and suffix != ".gif":
+                    processed.append(await self.media.fit_image(
+                        p, _TG_MAX_PHOTO_SIZE, _TG_MAX_PHOTO_DIMENSIONS,
+                    ))
                 else:
                     processed.append(p)
 
@@ -401,9 +431,6 @@ class TelegramChannel(BaseChannel):
                 await self._send_single_media(chat_id, p)
         except Exception as e:
             logger.error(f"Background media upload failed for chat {chat_id}: {e}")
-        finally:
-            for tmp in compressed_temps:
-                tmp.unlink(missing_ok=True)
 
     # ------------------------------------------------------------------
     # Helpers
@@ -417,28 +444,45 @@ class TelegramChannel(BaseChannel):
             if has_video else {}
         )
 
+        probes = {p: await self.media.probe(p) for p in files if p.suffix.lower() in _VIDEO_EXTS}
+        kinds = [_media_kind(p.suffix.lower()) for p in files]
+        digests = [await self.media.content_hash(p) for p in files]
+        cached = [self._cached_file_id(k, d) for k, d in zip(kinds, digests)]
+
         def _build_items() -> list:
             items = []
-            for p in files:
-                suffix = p.suffix.lower()
-                if suffix in _VIDEO_EXTS:
-                    probe = _probe_video(p)
-                    items.append(InputMediaVideo(
-                        media=open(p, "rb"), supports_streaming=True, **probe,
-                    ))
+            for p, file_id in zip(files, cached):
+                media = file_id or open(p, "rb")
+                if p in probes:
+                    items.append(InputMediaVideo(media=media, supports_streaming=True, **probes[p]))
                 else:
-                    items.append(InputMediaPhoto(media=open(p, "rb")))
+                    items.append(InputMediaPhoto(media=media))
             return items
 
         # Try sending the group with one retry before falling back
-        for attempt in range(2):
+        attempt = 0
+        while attempt < 2:
             media_items = _build_items()
             try:
-                await self._app.bot.send_media_group(
+                await self._sender.acquire(chat_id, cost=len(media_items))
+                messages = await self._app.bot.send_media_group(
                     chat_id=chat_id, media=media_items, **timeout_kw,
                 )
+                for kind, digest, file_id, message in zip(kinds, digests, cached, messages):
+                    self._remember_file_id(kind, digest, message, reused=bool(file_id))
                 logger.debug(f"Sent media group ({len(files)} items) to {chat_id}")
                 return
+            except BadRequest as e:
+                if not any(cached):
+                    logger.error(f"Failed to send media group: {e}")
+                    break
+                # A cached file_id was rejected — forget them all and upload
+                logger.warning(f"Cached file_id rejected in media group, uploading: {e}")
+                for kind, digest, file_id in zip(kinds, digests, cached):
+                    if file_id:
+                        self._forget_file_id(kind, digest)
+                cached = [None] * len(files)
+                continue
             except (NetworkError, TimedOut) as e:
                 if attempt == 0:
                     logger.warning(f"Media group timed out, retrying in 5s: {e}")
@@ -452,6 +496,7 @@ class TelegramChannel(BaseChannel):
                 for item in media_items:
                     if hasattr(item.media, "close"):
                         item.media.close()
+            attempt += 1
 
         # Fallback: send individually
         for p in files:
@@ -477,30 +522,44 @@ class TelegramChannel(BaseChannel):
     async def _send_single_media_inner(
         self, chat_id: int, file_path: Path, suffix: str,
     ) -> None:
-        """Send a single media file with retry on transient errors."""
-        is_video = suffix in _VIDEO_EXTS
+        """Send a single media file with retry on transient errors.
+
+        Reuses the file_id of an earlier upload of the same content when
+        one is cached, and uploads if Telegram rejects it.
+        """
+        kind = _media_kind(suffix)
+        is_video = kind == "video"
         # Videos get a much longer write timeout — VPS upload can be slow
         timeout_kw = (
             {"write_timeout": _VIDEO_WRITE_TIMEOUT, "read_timeout": _VIDEO_WRITE_TIMEOUT}
             if is_video else {}
         )
+        probe = await self.media.probe(file_path) if is_video else {}
+        digest = await self.media.content_hash(file_path)
+
+        file_id = self._cached_file_id(kind, digest)
+        if file_id:
+            try:
+                message = await self._send_media_as(chat_id, kind, file_id, probe)
+                self._remember_file_id(kind, digest, message, reused=True)
+                logger.debug(f"Sent media by file_id: {file_path}")
+                return
+            except BadRequest as e:
+                logger.warning(f"Cached file_id for {file_path.name} rejected, uploading: {e}")
+                self._forget_file_id(kind, digest)
+            except Exception as e:
+                logger.warning(f"Sending {file_path.name} by file_id failed, uploading: {e}")
+
         for attempt in range(_MEDIA_RETRIES):
             try:
                 with open(file_path, "rb") as f:
-                    if suffix in _PHOTO_EXTS:
-                        await self._app.bot.send_photo(chat_id=chat_id, photo=f)
-                    elif is_video:
-                        probe = _probe_video(file_path)
-                        await self._app.bot.send_video(
-                            chat_id=chat_id, video=f, supports_streaming=True,
-                            **probe, **timeout_kw,
-                        )
-                    elif suffix in _AUDIO_EXTS:
-                        await self._app.bot.send_audio(chat_id=chat_id, audio=f)
-                    else:
-                        await self._app.bot.send_document(chat_id=chat_id, document=f)
+                    message = await self._send_media_as(chat_id, kind, f, probe, **timeout_kw)
+                self._remember_file_id(kind, digest, message)
                 logger.debug(f"Sent media: {file_path}")
                 return
+            except BadRequest as e:
+                logger.error(f"Failed to send media {file_path}: {e}")
+                return
             except (NetworkError, TimedOut) as e:
                 if attempt < _MEDIA_RETRIES - 1:
                     wait = (attempt + 1) * 5
@@ -512,18 +571,58 @@ class TelegramChannel(BaseChannel):
                 else:
                     logger.error(f"Failed to send media {file_path} after {_MEDIA_RETRIES} attempts: {e}")
             except RetryAfter as e:
-                logger.warning(f"Rate limited, waiting {e.retry_after}s")
-                await asyncio.sleep(e.retry_after)
+                delay = _retry_seconds(e)
+                logger.warning(f"Rate limited, waiting {delay:.0f}s")
+                self._sender.penalize(chat_id, delay)
             except Exception as e:
                 logger.error(f"Failed to send media {file_path}: {e}")
                 return
 
+    async def _send_media_as(
+        self, chat_id: int, kind: str, media: Any, probe: dict[str, int], **timeout_kw: Any,
+    ) -> Message:
+        """Send *media* (an open file or a file_id) with the Telegram method for *kind*."""
+        bot = self._app.bot
+        await self._sender.acquire(chat_id)
+        if kind == "photo":
+            return await bot.send_photo(chat_id=chat_id, photo=media)
+        if kind == "video":
+            return await bot.send_video(
+                chat_id=chat_id, video=media, supports_streaming=True, **probe, **timeout_kw,
+            )
+        if kind == "audio":
+            return await bot.send_audio(chat_id=chat_id, audio=media)
+        return await bot.send_document(chat_id=chat_id, document=media)
+
+    # ------------------------------------------------------------------
+    # file_id cache
+    # ------------------------------------------------------------------
+
+    def _file_id_key(self, kind: str, digest: str) -> str:
+        # file_ids are only valid for the bot that received them
+        return cache_key("telegram-file-id", self.config.token.split(":", 1)[0], kind, digest)
+
+    def _cached_file_id(self, kind: str, digest: str) -> str | None:
+        entry = self._file_ids.get(self._file_id_key(kind, digest))
+        return entry.get("file_id") if entry else None
+
+    def _remember_file_id(self, kind: str, digest: str, message: Message | None, reused: bool = False) -> None:
+        MEDIA_SENDS.inc(channel=self.name, via="file_id" if reused else "upload")
+        file_id = _sent_file_id(kind, message)
+        if file_id and not reused:
+            self._file_ids.set(self._file_id_key(kind, digest), {"file_id": file_id})
+
+    def _forget_file_id(self, kind: str, digest: str) -> None:
+        MEDIA_SENDS.inc(channel=self.name, via="stale_file_id")
+        self._file_ids.delete(self._file_id_key(kind, digest))
+
     async def _send_text(self, chat_id: int, content: str) -> None:
         """Send text with chunking, HTML formatting, and retry."""
         chunks = _chunk_text(content)
         for chunk in chunks:
             if not await self._send_text_chunk(chat_id, chunk):
                 try:
+                    await self._sender.acquire(chat_id)
                     await self._app.bot.send_message(
                         chat_id=chat_id,
                         text="[Message delivery failed. Please retry your request.]",
@@ -547,13 +646,16 @@ class TelegramChannel(BaseChannel):
         """Send a message with retries for transient errors. Returns True on success."""
         for attempt in range(_SEND_RETRIES):
             try:
+                await self._sender.acquire(chat_id)
                 await self._app.bot.send_message(
                     chat_id=chat_id, text=text, parse_mode=parse_mode,
                 )
                 return True
             except RetryAfter as e:
-                logger.warning(f"Rate limited, waiting {e.retry_after}s")
-                await asyncio.sleep(e.retry_after)
+                # The next acquire() waits out the penalty
+                delay = _retry_seconds(e)
+                logger.warning(f"Rate limited, waiting {delay:.0f}s")
+                self._sender.penalize(chat_id, delay)
             except (NetworkError, TimedOut) as e:
                 if attempt < _SEND_RETRIES - 1:
                     wait = (attempt + 1) * 1.5
@@ -576,6 +678,7 @@ class TelegramChannel(BaseChannel):
         if not update.message or not update.effective_user:
             return
         
+        received = time.monotonic()
         message = update.message
         user = update.effective_user
         chat_id = message.chat_id
@@ -615,27 +718,70 @@ class TelegramChannel(BaseChannel):
             media_file = message.document
             media_type = "file"
         
-        # Download media if present
+        metadata = {
+            "message_id": message.message_id,
+            "user_id": user.id,
+            "username": user.username,
+            "first_name": user.first_name,
+            "is_group": message.chat.type != "private"
+        }
+        self._enqueue(chat_id, self._receive(
+            sender_id, chat_id, content_parts, media_paths, media_file, media_type, metadata, received,
+        ))
+
+    def _enqueue(self, chat_id: int, job: Awaitable[None]) -> None:
+        """Run *job* in the background once every earlier message from *chat_id* is published.
+
+        Downloads and transcription happen in the job, so the update
+        handler returns at once and other chats are never held up, while
+        messages within one chat reach the bus in the order received.
+        """
+        previous = self._inbound_tails.get(chat_id)
+        task = asyncio.create_task(self._receive_after(previous, job))
+        self._inbound_tails[chat_id] = task
+        CHANNEL_INGEST_PENDING.inc(channel=self.name)
+        task.add_done_callback(lambda t: self._inbound_done(chat_id, t))
+
+    async def _receive_after(self, previous: asyncio.Task | None, job: Awaitable[None]) -> None:
+        if previous:
+            await asyncio.wait([previous])
+        try:
+            await job
+        except Exception as e:
+            logger.error(f"Failed to process Telegram message: {e}")
+
+    def _inbound_done(self, chat_id: int, task: asyncio.Task) -> None:
+        CHANNEL_INGEST_PENDING.dec(channel=self.name)
+        if self._inbound_tails.get(chat_id) is task:
+            del self._inbound_tails[chat_id]
+
+    async def _receive(
+        self,
+        sender_id: str,
+        chat_id: int,
+        content_parts: list[str],
+        media_paths: list[str],
+        media_file: Any,
+        media_type: str | None,
+        metadata: dict[str, Any],
+        received: float,
+    ) -> None:
+        """Download and transcribe media, then forward the message to the bus."""
         if media_file and self._app:
             try:
                 file = await self._app.bot.get_file(media_file.file_id)
                 ext = self._get_extension(media_type, getattr(media_file, 'mime_type', None))
                 
-                # Save to workspace/media/
-                from pathlib import Path
-                media_dir = Path.home() / ".nanobot" / "media"
-                media_dir.mkdir(parents=True, exist_ok=True)
-                
-                file_path = media_dir / f"{media_file.file_id[:16]}{ext}"
-                await file.download_to_drive(str(file_path))
+                # Stream to disk, then file under its content hash in the shared store
+                incoming = self.store.incoming_path(ext)
+                await file.download_to_drive(str(incoming))
+                file_path = await self.store.put_file(incoming)
                 
                 media_paths.append(str(file_path))
                 
                 # Handle voice transcription
                 if media_type == "voice" or media_type == "audio":
-                    from nanobot.providers.transcription import GroqTranscriptionProvider
-                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key)
-                    transcription = await transcriber.transcribe(file_path)
+                    transcription = await self._get_transcriber().transcribe(file_path)
                     if transcription:
                         logger.info(f"Transcribed {media_type}: {transcription[:50]}...")
                         content_parts.append(f"[transcription: {transcription}]")
@@ -659,14 +805,15 @@ class TelegramChannel(BaseChannel):
             chat_id=str(chat_id),
             content=content,
             media=media_paths,
-            metadata={
-                "message_id": message.message_id,
-                "user_id": user.id,
-                "username": user.username,
-                "first_name": user.first_name,
-                "is_group": message.chat.type != "private"
-            }
+            metadata=metadata,
         )
+        CHANNEL_INGEST_SECONDS.observe(time.monotonic() - received, channel=self.name, kind=media_type or "text")
+
+    def _get_transcriber(self) -> "GroqTranscriptionProvider":
+        if self._transcriber is None:
+            from nanobot.providers.transcription import GroqTranscriptionProvider
+            self._transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key, media=self.media)
+        return self._transcriber
     
     def _get_extension(self, media_type: str, mime_type: str | None) -> str:
         """Get file extension based on media type."""
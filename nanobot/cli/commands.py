@@ -8,7 +8,7 @@ from loguru import logger
 from rich.console import Console
 from rich.table import Table
 
-from nanobot import __version__, __logo__
+from nanobot import __logo__, __version__
 
 app = typer.Typer(
     name="nanobot",
@@ -150,11 +150,10 @@ This file stores important information that should persist across sessions.
 
 def _make_provider(config):
     """Create LLM provider from config. Thin wrapper around factory with CLI error display."""
-    from nanobot.providers.factory import make_provider
+    from nanobot.providers.factory import make_provider, mode_of
     try:
         provider = make_provider(config)
-        # Check if OAuth was selected (provider class name check)
-        if type(provider).__name__ == "AnthropicOAuthProvider":
+        if mode_of(provider) == "oauth":
             console.print("[green]✓[/green] Using Anthropic OAuth via Claude CLI")
         return provider
     except ValueError as e:
@@ -173,26 +172,28 @@ def _make_provider(config):
 
 @app.command()
 def gateway(
-    port: int = typer.Option(18790, "--port", "-p", help="Gateway port"),
+    port: int | None = typer.Option(None, "--port", "-p", help="Gateway port (default: gateway.port)"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
 ):
     """Start the nanobot gateway."""
-    from nanobot.config.loader import load_config, get_data_dir
-    from nanobot.bus.queue import MessageBus
     from nanobot.agent.loop import AgentLoop
+    from nanobot.bus.queue import MessageBus
     from nanobot.channels.manager import ChannelManager
+    from nanobot.config.loader import get_data_dir, load_config
     from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
+    from nanobot.providers.cache import call_class
     
     if verbose:
         import sys
         logger.remove()
         logger.add(sys.stderr, level="DEBUG")
     
+    config = load_config()
+    port = port or config.gateway.port
     console.print(f"{__logo__} Starting nanobot gateway on port {port}...")
     
-    config = load_config()
     bus = MessageBus()
     provider = _make_provider(config)
     
@@ -233,6 +234,7 @@ def gateway(
         max_iterations=config.agents.defaults.max_tool_iterations,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        web_config=config.tools.web,
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         config=config,
@@ -242,12 +244,13 @@ def gateway(
     # Set cron callback (needs agent)
     async def on_cron_job(job: CronJob) -> str | None:
         """Execute a cron job through the agent."""
-        response = await agent.process_direct(
-            job.payload.message,
-            session_key=f"cron:{job.id}",
-            channel=job.payload.channel or "cli",
-            chat_id=job.payload.to or "direct",
-        )
+        with call_class("cron"):
+            response = await agent.process_direct(
+                job.payload.message,
+                session_key=f"cron:{job.id}",
+                channel=job.payload.channel or "cli",
+                chat_id=job.payload.to or "direct",
+            )
         if job.payload.deliver and job.payload.to:
             from nanobot.bus.events import OutboundMessage
             await bus.publish_outbound(OutboundMessage(
@@ -261,7 +264,8 @@ def gateway(
     # Create heartbeat service
     async def on_heartbeat(prompt: str) -> str:
         """Execute heartbeat through the agent."""
-        return await agent.process_direct(prompt, session_key="heartbeat")
+        with call_class("heartbeat"):
+            return await agent.process_direct(prompt, session_key="heartbeat")
     
     heartbeat = HeartbeatService(
         workspace=config.workspace_path,
@@ -283,6 +287,21 @@ def gateway(
         console.print(f"[green]✓[/green] Cron: {cron_status['jobs']} scheduled jobs")
     
     console.print(f"[green]✓[/green] Heartbeat: every 30m")
+
+    if config.gateway.tracing.enabled:
+        from nanobot.telemetry.tracing import configure_tracing
+
+        trace_cfg = config.gateway.tracing
+        trace_dir = Path(trace_cfg.dir).expanduser() if trace_cfg.dir else get_data_dir() / "traces"
+        configure_tracing(trace_dir, otlp_endpoint=trace_cfg.otlp_endpoint)
+        console.print(f"[green]✓[/green] Tracing: {trace_dir}")
+
+    metrics_server = None
+    if config.gateway.metrics:
+        from nanobot.web.gateway import GatewayServer
+
+        metrics_server = GatewayServer(config.gateway.metrics_host, port)
+        console.print(f"[green]✓[/green] Metrics: http://{config.gateway.metrics_host}:{port}/metrics")
     
     async def run():
         try:
@@ -293,6 +312,8 @@ def gateway(
             await heartbeat.start()
             if webhook_server:
                 await webhook_server.start()
+            if metrics_server:
+                await metrics_server.start()
             await asyncio.gather(
                 agent.run(),
                 channels.start_all(),
@@ -301,6 +322,8 @@ def gateway(
             console.print("\nShutting down...")
             if webhook_server:
                 await webhook_server.stop()
+            if metrics_server:
+                await metrics_server.stop()
             if credit_store:
                 await credit_store.close()
             heartbeat.stop()
@@ -324,9 +347,9 @@ def agent(
     session_id: str = typer.Option("cli:default", "--session", "-s", help="Session ID"),
 ):
     """Interact with the agent directly."""
-    from nanobot.config.loader import load_config
-    from nanobot.bus.queue import MessageBus
     from nanobot.agent.loop import AgentLoop
+    from nanobot.bus.queue import MessageBus
+    from nanobot.config.loader import load_config
     
     config = load_config()
     
@@ -339,6 +362,7 @@ def agent(
         workspace=config.workspace_path,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        web_config=config.tools.web,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         config=config,
     )
@@ -370,6 +394,137 @@ def agent(
         asyncio.run(run_interactive())
 
 
+@app.command()
+def bench(
+    sessions: int = typer.Option(20, "--sessions", "-n", help="Concurrent simulated users"),
+    turns: int = typer.Option(5, "--turns", "-t", help="Messages per session"),
+    tool_calls: int = typer.Option(2, "--tool-calls", help="Scripted tool calls per turn"),
+    latency_ms: float = typer.Option(50.0, "--latency-ms", help="Mean simulated LLM latency"),
+    distribution: str = typer.Option("lognormal", "--dist", help="fixed, uniform or lognormal"),
+    sigma: float = typer.Option(0.5, "--sigma", help="Lognormal tail width"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Fraction of LLM calls returning an error"),
+    exception_rate: float = typer.Option(0.0, "--exception-rate", help="Fraction of LLM calls raising"),
+    spike_rate: float = typer.Option(0.0, "--spike-rate", help="Fraction of LLM calls with a latency spike"),
+    spike_ms: float = typer.Option(2000.0, "--spike-ms", help="Extra latency of a spike"),
+    think_time: float = typer.Option(0.0, "--think-time", help="Seconds between a reply and the next message"),
+    seed: int = typer.Option(0, "--seed", help="Random seed"),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+    max_p95: float = typer.Option(0.0, "--max-p95", help="Exit 1 if p95 turn latency (ms) exceeds this"),
+    max_errors: int = typer.Option(-1, "--max-errors", help="Exit 1 if more turns than this fail"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Show agent logs"),
+):
+    """Benchmark AgentLoop offline with a scripted provider and synthetic users."""
+    import json
+    import sys
+
+    from nanobot.bench import BenchConfig, FaultModel, LatencyModel, run_bench
+
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG" if verbose else "WARNING")
+
+    config = BenchConfig(
+        sessions=sessions,
+        turns=turns,
+        tool_calls=tool_calls,
+        think_time=think_time,
+        latency=LatencyModel(kind=distribution, mean_ms=latency_ms, sigma=sigma),
+        faults=FaultModel(
+            error_rate=error_rate, exception_rate=exception_rate,
+            spike_rate=spike_rate, spike_ms=spike_ms,
+        ),
+        seed=seed,
+    )
+    report = asyncio.run(run_bench(config))
+
+    if as_json:
+        console.print_json(json.dumps(report.to_dict()))
+    else:
+        console.print(f"{__logo__} nanobot bench\n")
+        console.print(report.format())
+
+    failed = []
+    if max_p95 and report.latency_ms["p95"] > max_p95:
+        failed.append(f"p95 {report.latency_ms['p95']:.1f}ms > {max_p95:.1f}ms")
+    if max_errors >= 0 and report.errors > max_errors:
+        failed.append(f"{report.errors} errors > {max_errors}")
+    if failed:
+        console.print(f"[red]Bench thresholds exceeded: {'; '.join(failed)}[/red]")
+        raise typer.Exit(1)
+
+
+@app.command()
+def replay(
+    files: list[Path] = typer.Argument(..., help="Recording JSONL files (agents.recording)"),
+    repeat: int = typer.Option(3, "--repeat", "-r", help="Replays per turn, to smooth timings"),
+    with_extensions: bool = typer.Option(
+        True, "--extensions/--no-extensions", help="Load configured extensions (compaction, ...)",
+    ),
+    baseline: Path = typer.Option(None, "--baseline", "-b", help="Report JSON to compare against"),
+    save: Path = typer.Option(None, "--save", help="Write this report as JSON (a future baseline)"),
+    max_regression: float = typer.Option(
+        0.0, "--max-regression", help="Exit 1 if agent time or prompt tokens grow by more than this %",
+    ),
+    workspace: Path = typer.Option(
+        None, "--workspace", "-w", help="Copy context files from here (default: configured workspace)",
+    ),
+):
+    """Replay recorded turns offline and measure per-stage time and prompt size."""
+    import json
+    import sys
+
+    from nanobot.bench.replay import replay_turns
+    from nanobot.config.loader import load_config
+    from nanobot.extensions.manager import ExtensionManager
+    from nanobot.telemetry.recording import load_turns
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    turns = [turn for path in files for turn in load_turns(path)]
+    if not turns:
+        console.print("[yellow]No recorded turns found[/yellow]")
+        raise typer.Exit(1)
+
+    config = load_config()
+
+    async def run():
+        ext_mgr = ExtensionManager()
+        if with_extensions:
+            await ext_mgr.load_from_config(config.extensions)
+        return await replay_turns(
+            turns, extensions=ext_mgr, repeat=repeat, workspace=workspace or config.workspace_path,
+        )
+
+    report = asyncio.run(run())
+    console.print(f"{__logo__} nanobot replay\n")
+    console.print(report.format())
+
+    if save:
+        save.write_text(json.dumps(report.to_dict(), indent=2))
+        console.print(f"\nSaved report to {save}")
+
+    if baseline:
+        table = Table(title=f"vs {baseline}")
+        table.add_column("Metric")
+        table.add_column("Baseline", justify="right")
+        table.add_column("Current", justify="right")
+        table.add_column("Change", justify="right")
+        regressions = []
+        for name, old, new, change in report.compare(json.loads(baseline.read_text())):
+            change_text = f"{change:+.1f}%"
+            if change > max(max_regression, 5):
+                change_text = f"[red]{change_text}[/red]"
+            elif change < -5:
+                change_text = f"[green]{change_text}[/green]"
+            table.add_row(name, f"{old:.2f}", f"{new:.2f}", change_text)
+            if max_regression and name in ("total_ms", "replayed_prompt_tokens") and change > max_regression:
+                regressions.append(f"{name} {change:+.1f}%")
+        console.print(table)
+        if regressions:
+            console.print(f"[red]Regression over {max_regression}%: {', '.join(regressions)}[/red]")
+            raise typer.Exit(1)
+
+
 # ============================================================================
 # Channel Commands
 # ============================================================================
@@ -719,7 +874,7 @@ def experiment_list(
 @app.command()
 def status():
     """Show nanobot status."""
-    from nanobot.config.loader import load_config, get_config_path
+    from nanobot.config.loader import get_config_path, load_config
 
     config_path = get_config_path()
     config = load_config()
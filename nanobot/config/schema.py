@@ -14,12 +14,36 @@ class WhatsAppConfig(BaseModel):
     allow_from: list[str] = Field(default_factory=list)  # Allowed phone numbers
 
 
+class TelegramWebhookConfig(BaseModel):
+    """Receive Telegram updates by webhook instead of long polling."""
+    enabled: bool = False
+    url: str = ""  # Public HTTPS base URL Telegram posts to, e.g. "https://bot.example.com"
+    path: str = "/telegram/webhook"
+    host: str = "0.0.0.0"
+    port: int = 8443
+    secret_token: str = ""  # Default: derived from the bot token (same for every gateway process)
+    queue_size: int = 1000  # Updates accepted but not yet processed; beyond this Telegram gets a 503
+    max_connections: int = 40  # Concurrent connections Telegram opens to the webhook
+
+
+class TelegramSendLimitsConfig(BaseModel):
+    """Proactive pacing of Bot API sends, kept under Telegram's flood limits."""
+    global_per_second: float = 30.0
+    per_chat_per_second: float = 1.0
+    chat_burst: float = 3.0  # Messages a chat may receive back to back before pacing kicks in
+    per_group_per_minute: float = 20.0
+
+
 class TelegramConfig(BaseModel):
     """Telegram channel configuration."""
     enabled: bool = False
     token: str = ""  # Bot token from @BotFather
     allow_from: list[str] = Field(default_factory=list)  # Allowed user IDs or usernames
     proxy: str | None = None  # HTTP/SOCKS5 proxy URL, e.g. "http://127.0.0.1:7890" or "socks5://127.0.0.1:1080"
+    concurrent_updates: int = 64  # Updates handled at once; messages within a chat stay in order
+    webhook: TelegramWebhookConfig = Field(default_factory=TelegramWebhookConfig)
+    send_limits: TelegramSendLimitsConfig = Field(default_factory=TelegramSendLimitsConfig)
+    api_base_url: str = ""  # Bot API server, e.g. a local one; default https://api.telegram.org/bot
 
 
 class FeishuConfig(BaseModel):
@@ -41,8 +65,18 @@ class DiscordConfig(BaseModel):
     intents: int = 37377  # GUILDS + GUILD_MESSAGES + DIRECT_MESSAGES + MESSAGE_CONTENT
 
 
+class MediaConfig(BaseModel):
+    """Media storage and processing (ffmpeg/ffprobe) shared by all channels."""
+    max_workers: int = 2  # Concurrent ffmpeg/ffprobe processes
+    cache_dir: str = ""  # Default: ~/.nanobot/cache/media
+    cache_mb: int = 500  # Compressed/resized outputs kept for reuse
+    store_dir: str = ""  # Inbound attachments, content-addressed. Default: ~/.nanobot/media
+    store_mb: int = 2048  # Disk quota for inbound attachments (LRU, unreferenced first)
+
+
 class ChannelsConfig(BaseModel):
     """Configuration for chat channels."""
+    media: MediaConfig = Field(default_factory=MediaConfig)
     whatsapp: WhatsAppConfig = Field(default_factory=WhatsAppConfig)
     telegram: TelegramConfig = Field(default_factory=TelegramConfig)
     discord: DiscordConfig = Field(default_factory=DiscordConfig)
@@ -64,15 +98,69 @@ class ModelAlias(BaseModel):
     mode: str = "api"  # "api" or "oauth"
 
 
+class RecordingConfig(BaseModel):
+    """Record turns (LLM requests/responses and tool results) for `nanobot replay`."""
+    enabled: bool = False
+    dir: str = ""  # Default: ~/.nanobot/recordings
+    sample_rate: float = 1.0  # Fraction of turns to record
+
+
+class LLMCacheConfig(BaseModel):
+    """Exact-match cache for repeated LLM requests (API-key providers only)."""
+    enabled: bool = False
+    dir: str = ""  # Default: ~/.nanobot/cache/llm
+    max_mb: int = 100  # LRU eviction above this size
+    ttl: int = 86400  # Seconds an answer stays reusable (0 = until evicted)
+    classes: list[str] = Field(default_factory=lambda: ["cron", "heartbeat"])  # Call classes to cache
+    temperature_zero: bool = True  # Also cache any call made at temperature 0
+
+
+class ResilienceConfig(BaseModel):
+    """Retries, hedging, circuit breakers and fallbacks around LLM calls."""
+    enabled: bool = True
+    max_retries: int = 2  # Extra attempts for transient errors (429, 5xx, timeouts)
+    backoff_base: float = 0.5  # Seconds; full-jitter exponential backoff
+    backoff_max: float = 8.0
+    hedge: bool = False  # Duplicate slow requests to the first fallback
+    hedge_min_delay: float = 2.0  # Never hedge before this many seconds
+    breaker_failures: int = 5  # Consecutive failures that open a model's circuit
+    breaker_cooldown: float = 30.0  # Seconds before a trial request is let through
+    # Model ID or alias → aliases/model IDs to try in order; "*" applies to any model
+    fallbacks: dict[str, list[str]] = Field(default_factory=dict)
+
+
+class ClaudeWorkersConfig(BaseModel):
+    """Long-lived Claude CLI processes for OAuth mode, one per active session."""
+    enabled: bool = False
+    max_workers: int = 4  # Further sessions queue until a worker is free
+    max_turns: int = 50  # Restart a worker after this many turns
+    max_rss_mb: int = 1024  # Restart a worker whose memory grows past this
+    idle_timeout: int = 600  # Seconds before an unused worker is stopped
+
+
+class ClaudeResumeConfig(BaseModel):
+    """Continue Claude CLI conversations with --resume, sending only new messages (OAuth mode)."""
+    enabled: bool = True
+    max_sessions: int = 1000  # Least recently used mappings are forgotten beyond this
+
+
 class AgentsConfig(BaseModel):
     """Agent configuration."""
     defaults: AgentDefaults = Field(default_factory=AgentDefaults)
     model_aliases: dict[str, ModelAlias] = Field(default_factory=dict)
+    recording: RecordingConfig = Field(default_factory=RecordingConfig)
+    llm_cache: LLMCacheConfig = Field(default_factory=LLMCacheConfig)
+    resilience: ResilienceConfig = Field(default_factory=ResilienceConfig)
+    claude_workers: ClaudeWorkersConfig = Field(default_factory=ClaudeWorkersConfig)
+    claude_resume: ClaudeResumeConfig = Field(default_factory=ClaudeResumeConfig)
 
 
 class ProviderConfig(BaseModel):
     """LLM provider configuration."""
     api_key: str = ""
+    api_keys: list[str] = Field(default_factory=list)  # Extra keys; calls rotate across all of them
+    rpm: int = 0  # Requests per minute allowed per key (0 = untracked)
+    tpm: int = 0  # Tokens per minute allowed per key (0 = untracked)
     api_base: str | None = None
     extra_headers: dict[str, str] | None = None  # Custom headers (e.g. APP-Code for AiHubMix)
     # OAuth token from `claude setup-token` (for Claude Pro/Max subscription)
@@ -94,33 +182,83 @@ class ProvidersConfig(BaseModel):
     aihubmix: ProviderConfig = Field(default_factory=ProviderConfig)  # AiHubMix API gateway
 
 
+class TracingConfig(BaseModel):
+    """Per-message span tracing."""
+    enabled: bool = False
+    dir: str = ""  # JSONL output directory (default: ~/.nanobot/traces)
+    otlp_endpoint: str = ""  # e.g. http://localhost:4318 to also send to an OTLP/HTTP collector
+
+
 class GatewayConfig(BaseModel):
     """Gateway/server configuration."""
     host: str = "0.0.0.0"
     port: int = 18790
+    metrics: bool = True  # Serve Prometheus metrics at /metrics on metricsHost:port
+    metrics_host: str = "127.0.0.1"  # Unauthenticated: widen only behind a firewall or proxy
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
 
 
 class WebSearchConfig(BaseModel):
     """Web search tool configuration."""
     api_key: str = ""  # Brave Search API key
     max_results: int = 5
+    cache_ttl: int = 900  # Seconds to reuse results for an identical query (0 disables)
+    qps: float = 1.0  # Brave plan rate limit (free tier: 1 request/s)
+    burst: int = 1
+
+
+class WebFetchConfig(BaseModel):
+    """Web fetch tool configuration."""
+    max_chars: int = 50000
+    max_bytes: int = 5 * 1024 * 1024  # Download cap; larger bodies are clipped or refused
+    cache_enabled: bool = True  # Cache extracted pages on disk (~/.nanobot/cache/web)
+    cache_max_mb: int = 100  # LRU eviction above this size
+    cache_ttl: int = 3600  # Freshness (s) for responses without caching headers
 
 
 class WebToolsConfig(BaseModel):
     """Web tools configuration."""
     search: WebSearchConfig = Field(default_factory=WebSearchConfig)
+    fetch: WebFetchConfig = Field(default_factory=WebFetchConfig)
 
 
 class ExecToolConfig(BaseModel):
     """Shell exec tool configuration."""
     timeout: int = 60
     allowed_git_repos: list[str] = Field(default_factory=list)  # Whitelist for git clone (e.g. "github.com/user/*")
+    max_output: int = 10000  # Bytes of stdout returned to the model (head + tail)
+    spill_output: bool = True  # Save full output of truncated commands to workspace/.exec-output
+    spill_max_mb: int = 50
+    persistent: bool = False  # Keep one bash per session so cd/export/source persist
+    max_shells: int = 8  # Cap on live persistent shells
+    shell_idle_timeout: int = 900  # Seconds before an idle persistent shell is closed
+
+
+class ProcessLimitsConfig(BaseModel):
+    """Concurrency caps and resource limits for exec and terminal subprocesses (0 = unlimited)."""
+    max_concurrent: int = 8  # Commands running at once across all sessions
+    max_per_session: int = 2  # Commands running at once per session; extra ones queue
+    cpu_seconds: int = 900  # RLIMIT_CPU per command
+    memory_mb: int = 0  # RLIMIT_AS per command (virtual memory; breaks some JITs)
+    open_files: int = 4096  # RLIMIT_NOFILE
+    max_procs: int = 0  # RLIMIT_NPROC (per user) / pids.max in the cgroup
+    cgroup_parent: str = ""  # Writable cgroup v2 dir, e.g. /sys/fs/cgroup/nanobot.slice
+
+
+class ParallelToolConfig(BaseModel):
+    """Parallel tool limits."""
+    max_concurrency: int = 5  # Sub-tasks running at once within one batch
+    task_timeout: int = 120  # Seconds per sub-task
+    batch_timeout: int = 300  # Seconds per batch
+    global_concurrency: int = 16  # Sub-tasks running at once across all sessions and subagents
 
 
 class ToolsConfig(BaseModel):
     """Tools configuration."""
     web: WebToolsConfig = Field(default_factory=WebToolsConfig)
     exec: ExecToolConfig = Field(default_factory=ExecToolConfig)
+    processes: ProcessLimitsConfig = Field(default_factory=ProcessLimitsConfig)
+    parallel: ParallelToolConfig = Field(default_factory=ParallelToolConfig)
     restrict_to_workspace: bool = False  # If true, restrict all tool access to workspace directory
 
 
@@ -161,11 +299,14 @@ class CommandsConfig(BaseModel):
 class TerminalProviderConfig(BaseModel):
     """A provider available to terminal micro-agents.
 
-    Supports multiple API keys for rotation (micro-agent picks one).
+    Supports multiple API keys for rotation: each run leases the
+    least-loaded key (``api_key`` in the envelope) from a shared pool.
     """
     api_keys: list[str] = Field(default_factory=list)
     models: list[str] = Field(default_factory=list)  # available model IDs
     base_url: str | None = None
+    rpm: int = 0  # Per-key budgets shared with the LLM path's key pool (0 = untracked)
+    tpm: int = 0
 
 
 class TerminalConfig(BaseModel):
@@ -10,6 +10,7 @@ from typing import Any, Callable, Coroutine
 from loguru import logger
 
 from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronSchedule, CronStore
+from nanobot.telemetry.metrics import CRON_LAG, CRON_RUNS
 
 
 def _now_ms() -> int:
@@ -217,6 +218,9 @@ class CronService:
     async def _execute_job(self, job: CronJob) -> None:
         """Execute a single job."""
         start_ms = _now_ms()
+        due_ms = job.state.next_run_at_ms
+        if due_ms and start_ms >= due_ms:  # Skip forced runs ahead of schedule
+            CRON_LAG.observe((start_ms - due_ms) / 1000)
         logger.info(f"Cron: executing job '{job.name}' ({job.id})")
         
         try:
@@ -232,6 +236,7 @@ class CronService:
             job.state.last_status = "error"
             job.state.last_error = str(e)
             logger.error(f"Cron: job '{job.name}' failed: {e}")
+        CRON_RUNS.inc(status=job.state.last_status)
         
         job.state.last_run_at_ms = start_ms
         job.updated_at_ms = _now_ms()
@@ -7,6 +7,7 @@ from typing import Any
 from loguru import logger
 
 from nanobot.extensions.base import Extension, ExtensionContext
+from nanobot.telemetry.metrics import COMPACTED_MESSAGES, COMPACTIONS
 from nanobot.utils.helpers import ensure_dir, safe_filename
 
 # Rough approximation: 1 token ≈ 4 characters for English text.
@@ -157,6 +158,8 @@ class CompactionExtension(Extension):
         session.metadata["compaction_summary"] = summary
         session.metadata["archive_path"] = str(archive_path)
         session.metadata["archived_count"] = prev_archived + archived_count
+        COMPACTIONS.inc()
+        COMPACTED_MESSAGES.inc(archived_count)
 
         logger.info(
             f"Compacted session {session.key}: archived {archived_count} messages "
@@ -1,38 +1,95 @@
-"""Unix domain socket listener for the MCP bridge.
+"""Unix domain socket bridge for the MCP server.
 
 Runs in nanobot's asyncio event loop.  Receives tool calls from the
 MCP stdio server (a subprocess of the Claude CLI) and routes them to
 the appropriate callbacks (message bus, progress).
+
+One ``MCPBridge`` listener serves the whole process.  Each CLI call (or
+persistent CLI worker) registers its callbacks and gets a token, which
+the MCP server sends with every request over a single long-lived
+connection.  Requests carry an ``id`` and are handled concurrently, so
+responses may come back out of order.
+
+``send_progress`` is a notification (no ``id``, no reply).  Progress
+text is batched per token and forwarded as one update per window, and
+always flushed before a ``send_message`` so ordering is kept.  Media
+travel as file paths and are never read by the bridge.
 """
 
 import asyncio
 import json
 import os
+import secrets
 import sys
 import tempfile
 import uuid
+from dataclasses import dataclass, field
 from typing import Any
 
 from loguru import logger
 
 from nanobot.providers.base import MessageCallback, ProgressCallback
 
-
-async def start_listener(
-    message_cb: MessageCallback | None,
-    progress_cb: ProgressCallback | None,
-) -> tuple[str, asyncio.AbstractServer]:
-    """Start a Unix socket listener and return (socket_path, server).
-
-    The caller is responsible for closing the server and cleaning up the socket file.
-    """
-    socket_path = os.path.join(
-        tempfile.gettempdir(), f"nanobot-mcp-{uuid.uuid4().hex[:12]}.sock",
-    )
-
-    async def handle_client(
-        reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
-    ) -> None:
+_PROGRESS_WINDOW = 1.0  # seconds of progress text merged into one update
+
+
+@dataclass
+class _Route:
+    message_cb: MessageCallback | None
+    progress_cb: ProgressCallback | None
+    pending: list[str] = field(default_factory=list)
+    flush_task: asyncio.Task | None = None
+
+
+class MCPBridge:
+    """Process-wide socket listener multiplexing MCP requests by token."""
+
+    def __init__(self, socket_path: str | None = None, progress_window: float = _PROGRESS_WINDOW):
+        self.socket_path = socket_path or os.path.join(
+            tempfile.gettempdir(), f"nanobot-mcp-{uuid.uuid4().hex[:12]}.sock",
+        )
+        self.progress_window = progress_window
+        self._routes: dict[str, _Route] = {}
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_unix_server(
+            self._handle_client, path=self.socket_path, limit=2 * 1024 * 1024,
+        )
+        os.chmod(self.socket_path, 0o600)
+        logger.debug(f"MCP bridge listening on {self.socket_path}")
+
+    async def close(self) -> None:
+        for token in list(self._routes):
+            await self.unregister(token)
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def register(self, message_cb: MessageCallback | None, progress_cb: ProgressCallback | None) -> str:
+        """Route requests carrying the returned token to these callbacks."""
+        token = secrets.token_hex(16)
+        self._routes[token] = _Route(message_cb, progress_cb)
+        return token
+
+    async def unregister(self, token: str) -> None:
+        route = self._routes.pop(token, None)
+        if route:
+            await self._flush(route)
+
+    def mcp_config(self, token: str) -> dict[str, Any]:
+        return generate_mcp_config(self.socket_path, token)
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
         try:
             while True:
                 data = await reader.readline()
@@ -44,67 +101,112 @@ async def start_listener(
                 try:
                     request = json.loads(line)
                 except json.JSONDecodeError:
-                    _write_response(writer, {"ok": False, "error": "Invalid JSON"})
-                    await writer.drain()
+                    await _write_response(writer, write_lock, {"ok": False, "error": "Invalid JSON"})
                     continue
-
-                method = request.get("method", "")
-                params = request.get("params", {})
-                response = await _dispatch(method, params, message_cb, progress_cb)
-                _write_response(writer, response)
-                await writer.drain()
+                task = asyncio.create_task(self._handle_request(request, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
         except asyncio.CancelledError:
             pass
         except Exception as e:
             logger.debug(f"MCP socket client error: {e}")
         finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
             writer.close()
 
-    server = await asyncio.start_unix_server(handle_client, path=socket_path)
-    os.chmod(socket_path, 0o600)
-    logger.debug(f"MCP socket listener started: {socket_path}")
-    return socket_path, server
-
-
-async def _dispatch(
-    method: str,
-    params: dict[str, Any],
-    message_cb: MessageCallback | None,
-    progress_cb: ProgressCallback | None,
-) -> dict[str, Any]:
-    """Route a tool call to the appropriate callback."""
-    if method == "send_message":
-        if not message_cb:
-            return {"ok": False, "error": "No message callback configured"}
-        content = params.get("content", "")
-        media = params.get("media", [])
-        try:
-            await message_cb(content, media)
+    async def _handle_request(
+        self, request: dict[str, Any], writer: asyncio.StreamWriter, write_lock: asyncio.Lock,
+    ) -> None:
+        route = self._routes.get(request.get("token", ""))
+        if route is None:
+            response = {"ok": False, "error": "Unknown or expired bridge token"}
+        else:
+            response = await self._dispatch(request.get("method", ""), request.get("params", {}), route)
+        if "id" in request:
+            response["id"] = request["id"]
+            await _write_response(writer, write_lock, response)
+
+    async def _dispatch(self, method: str, params: dict[str, Any], route: _Route) -> dict[str, Any]:
+        """Route a tool call to the appropriate callback."""
+        if method == "send_message":
+            if not route.message_cb:
+                return {"ok": False, "error": "No message callback configured"}
+            content = params.get("content", "")
+            media = params.get("media", [])
+            missing = [p for p in media if not os.path.isfile(p)]
+            if missing:
+                return {"ok": False, "error": f"Media not found: {', '.join(missing)}"}
+            await self._flush(route)
+            try:
+                await route.message_cb(content, media)
+                return {"ok": True}
+            except Exception as e:
+                logger.error(f"MCP send_message error: {e}")
+                return {"ok": False, "error": str(e)}
+
+        if method == "send_progress":
+            if not route.progress_cb:
+                return {"ok": False, "error": "No progress callback configured"}
+            text = params.get("text", "")
+            if text:
+                route.pending.append(text)
+                if route.flush_task is None:
+                    route.flush_task = asyncio.create_task(self._flush_later(route))
             return {"ok": True}
-        except Exception as e:
-            logger.error(f"MCP send_message error: {e}")
-            return {"ok": False, "error": str(e)}
 
-    if method == "send_progress":
-        if not progress_cb:
-            return {"ok": False, "error": "No progress callback configured"}
-        text = params.get("text", "")
+        return {"ok": False, "error": f"Unknown method: {method}"}
+
+    # ------------------------------------------------------------------
+    # Progress batching
+    # ------------------------------------------------------------------
+
+    async def _flush_later(self, route: _Route) -> None:
+        await asyncio.sleep(self.progress_window)
+        route.flush_task = None
+        await self._send_progress(route)
+
+    async def _flush(self, route: _Route) -> None:
+        if route.flush_task:
+            route.flush_task.cancel()
+            route.flush_task = None
+        await self._send_progress(route)
+
+    @staticmethod
+    async def _send_progress(route: _Route) -> None:
+        if not route.pending or not route.progress_cb:
+            return
+        text = "\n".join(route.pending)
+        route.pending.clear()
         try:
-            await progress_cb(text)
-            return {"ok": True}
+            await route.progress_cb(text)
         except Exception as e:
             logger.error(f"MCP send_progress error: {e}")
-            return {"ok": False, "error": str(e)}
 
-    return {"ok": False, "error": f"Unknown method: {method}"}
+
+_bridge: MCPBridge | None = None
+_bridge_lock = asyncio.Lock()
+
+
+async def get_bridge() -> MCPBridge:
+    """The process-wide bridge, started on first use."""
+    global _bridge
+    async with _bridge_lock:
+        if _bridge is None:
+            bridge = MCPBridge()
+            await bridge.start()
+            _bridge = bridge
+    return _bridge
 
 
-def _write_response(writer: asyncio.StreamWriter, response: dict[str, Any]) -> None:
+async def _write_response(writer: asyncio.StreamWriter, lock: asyncio.Lock, response: dict[str, Any]) -> None:
     """Write a JSON response line to the socket."""
-    writer.write((json.dumps(response) + "\n").encode())
+    async with lock:
+        writer.write((json.dumps(response) + "\n").encode())
+        await writer.drain()
 
 
-def generate_mcp_config(socket_path: str) -> dict[str, Any]:
+def generate_mcp_config(socket_path: str, token: str = "") -> dict[str, Any]:
     """Generate MCP config dict for Claude CLI's --mcp-config flag."""
     return {
         "mcpServers": {
@@ -114,6 +216,7 @@ def generate_mcp_config(socket_path: str) -> dict[str, Any]:
                 "args": ["-m", "nanobot.mcp.server"],
                 "env": {
                     "NANOBOT_SOCKET": socket_path,
+                    "NANOBOT_TOKEN": token,
                 },
             },
         },
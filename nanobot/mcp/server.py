@@ -3,6 +3,8 @@
 Runs as a subprocess of Claude CLI via --mcp-config.
 Connects back to nanobot via Unix domain socket to forward
 tool calls (send_message, send_progress) to the message bus.
+One connection is kept open for the life of the server; every
+request carries the NANOBOT_TOKEN that routes it to its session.
 
 Protocol: JSON-RPC 2.0 over stdin/stdout (MCP spec 2025-06-18).
 """
@@ -13,6 +15,7 @@ import socket
 import sys
 
 NANOBOT_SOCKET = os.environ.get("NANOBOT_SOCKET", "")
+NANOBOT_TOKEN = os.environ.get("NANOBOT_TOKEN", "")
 
 TOOLS = [
     {
@@ -65,35 +68,73 @@ TOOLS = [
 ]
 
 
-def _send_to_nanobot(method: str, params: dict) -> dict:
-    """Send a request to nanobot over Unix domain socket."""
-    if not NANOBOT_SOCKET:
-        return {"ok": False, "error": "NANOBOT_SOCKET not set"}
+class _Connection:
+    """Persistent socket to nanobot's bridge, reconnected on failure."""
+
+    def __init__(self, path: str, token: str):
+        self.path = path
+        self.token = token
+        self._sock: socket.socket | None = None
+        self._reader = None
+        self._next_id = 0
 
-    try:
+    def _connect(self) -> None:
         sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        sock.connect(NANOBOT_SOCKET)
         sock.settimeout(30.0)
-
-        request = json.dumps({"method": method, "params": params}) + "\n"
-        sock.sendall(request.encode())
-
-        # Read response (newline-delimited)
-        data = b""
-        while True:
-            chunk = sock.recv(4096)
-            if not chunk:
-                break
-            data += chunk
-            if b"\n" in data:
-                break
-        sock.close()
-
-        if data:
-            return json.loads(data.decode().strip())
+        sock.connect(self.path)
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    def request(self, method: str, params: dict, wait: bool = True) -> dict:
+        """Send a request; with ``wait=False`` it is a notification and nothing is read back."""
+        for attempt in range(2):
+            sent = False
+            try:
+                if self._sock is None:
+                    self._connect()
+                msg = {"token": self.token, "method": method, "params": params}
+                if wait:
+                    self._next_id += 1
+                    msg["id"] = self._next_id
+                self._sock.sendall((json.dumps(msg) + "\n").encode())
+                sent = True
+                if not wait:
+                    return {"ok": True}
+                while True:
+                    line = self._reader.readline()
+                    if not line:
+                        raise ConnectionError("nanobot closed the connection")
+                    response = json.loads(line)
+                    if response.get("id") == msg["id"]:
+                        return response
+            except (OSError, ValueError) as e:
+                self.close()
+                # A stale connection fails on send; never resend a delivered request
+                if attempt or sent:
+                    return {"ok": False, "error": str(e)}
         return {"ok": False, "error": "No response from nanobot"}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
+
+
+_connection: _Connection | None = None
+
+
+def _send_to_nanobot(method: str, params: dict, wait: bool = True) -> dict:
+    """Send a request to nanobot over the shared Unix domain socket."""
+    global _connection
+    if not NANOBOT_SOCKET:
+        return {"ok": False, "error": "NANOBOT_SOCKET not set"}
+    if _connection is None:
+        _connection = _Connection(NANOBOT_SOCKET, NANOBOT_TOKEN)
+    return _connection.request(method, params, wait)
 
 
 def _write(msg: dict) -> None:
@@ -127,14 +168,17 @@ def _handle_tools_call(msg_id: int | str, params: dict) -> dict:
     arguments = params.get("arguments", {})
 
     if tool_name == "send_message":
+        # Media go by path; resolve them here since nanobot runs in another cwd
+        media = [os.path.abspath(os.path.expanduser(p)) for p in arguments.get("media", [])]
         result = _send_to_nanobot("send_message", {
             "content": arguments.get("content", ""),
-            "media": arguments.get("media", []),
+            "media": media,
         })
     elif tool_name == "send_progress":
+        # Fire-and-forget: nanobot batches progress updates
         result = _send_to_nanobot("send_progress", {
             "text": arguments.get("text", ""),
-        })
+        }, wait=False)
     else:
         return {
             "jsonrpc": "2.0",
@@ -0,0 +1,462 @@
+"""Async media processing shared by all channels.
+
+``MediaProcessor`` runs ffprobe/ffmpeg as asyncio subprocesses, at most
+``max_workers`` at a time, so compressing a video never blocks the
+event loop.  Work is keyed by the SHA-256 of the input file's content:
+
+- probe results are kept in a small JSON ``DiskCache``;
+- compressed videos and resized images are kept as files in
+  ``<cache_dir>/out`` (size-capped, least recently used evicted first),
+  so sending the same asset twice reuses the first result;
+- identical jobs running at the same time share one subprocess.
+
+Audio for speech recognition is downmixed to 16 kHz mono Opus and can be
+split on silence into pieces that are transcribed separately.
+
+Returned output paths belong to the cache; callers must not delete them.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, TypeVar
+
+from loguru import logger
+
+from nanobot.telemetry.metrics import MEDIA_JOBS
+from nanobot.utils.cache import DiskCache, cache_key
+from nanobot.utils.helpers import ensure_dir
+
+T = TypeVar("T")
+
+_HASH_CHUNK = 1024 * 1024
+_FAILED = "failed"  # Cached outcome for inputs that cannot be processed
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+
+
+class MediaProcessor:
+    """Bounded async ffmpeg/ffprobe runner with content-addressed result caching."""
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        max_workers: int = 2,
+        cache_max_bytes: int = 500 * 1024 * 1024,
+        ffmpeg: str = "ffmpeg",
+        ffprobe: str = "ffprobe",
+        min_age: float = 600,
+    ):
+        self.cache_dir = cache_dir or Path.home() / ".nanobot" / "cache" / "media"
+        self.out_dir = self.cache_dir / "out"
+        self.cache_max_bytes = cache_max_bytes
+        self.min_age = min_age
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+        self._slots = asyncio.Semaphore(max_workers)
+        self._results = DiskCache(self.cache_dir / "results", max_bytes=16 * 1024 * 1024)
+        self._hashes: dict[tuple[str, int, int], str] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    # ------------------------------------------------------------------
+    # Plumbing
+    # ------------------------------------------------------------------
+
+    async def run(self, args: list[str], timeout: float) -> tuple[int, bytes, bytes]:
+        """Run a command in a worker slot. Returns (returncode, stdout, stderr); -1 on timeout."""
+        async with self._slots:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                )
+            except FileNotFoundError:
+                return 127, b"", f"{args[0]} not found".encode()
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                return -1, b"", f"timed out after {timeout:.0f}s".encode()
+            except asyncio.CancelledError:
+                proc.kill()
+                await proc.wait()
+                raise
+            return proc.returncode, stdout, stderr
+
+    async def content_hash(self, path: Path) -> str:
+        """SHA-256 of the file, hashed off the event loop and memoized by (path, size, mtime)."""
+        st = path.stat()
+        memo = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+        digest = self._hashes.get(memo)
+        if digest is None:
+            digest = await asyncio.to_thread(_hash_file, path)
+            if len(self._hashes) > 4096:
+                self._hashes.clear()
+            self._hashes[memo] = digest
+        return digest
+
+    async def _once(self, key: str, job: Callable[[], Awaitable[T]]) -> T:
+        """Run *job* unless the same *key* is already running; then share its result."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(job())
+            task.add_done_callback(lambda t: self._job_done(key, t))
+            self._inflight[key] = task
+        # The job runs detached and shielded, so no caller's cancellation
+        # (including the one that started it) fails the others
+        return await asyncio.shield(task)
+
+    def _job_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved even if all callers left
+
+    def _output(self, key: str, suffix: str) -> Path:
+        return self.out_dir / f"{key[:32]}{suffix}"
+
+    def _cached_output(self, path: Path) -> Path | None:
+        if not path.exists():
+            return None
+        try:
+            os.utime(path)  # LRU clock
+        except OSError:
+            pass
+        return path
+
+    def _evict(self) -> None:
+        """Trim ``out_dir`` to 90% of the cap, least recently used first.
+
+        Temp files of running encodes (dotfiles), outputs of jobs still in
+        flight and anything touched in the last ``min_age`` seconds (just
+        written or just handed to a caller) are left alone.
+        """
+        busy = {key[:32] for key in self._inflight}
+        cutoff = time.time() - self.min_age
+        entries = []
+        for p in self.out_dir.glob("*"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.cache_max_bytes:
+            return
+        target = int(self.cache_max_bytes * 0.9)
+        for mtime, size, p in sorted(entries):
+            if total <= target:
+                break
+            if p.name.startswith(".") or p.stem in busy or mtime >= cutoff:
+                continue
+            p.unlink(missing_ok=True)
+            total -= size
+
+    # ------------------------------------------------------------------
+    # Probe
+    # ------------------------------------------------------------------
+
+    async def probe(self, path: Path) -> dict[str, int]:
+        """Width, height and duration of the first video stream (keys present only when known).
+
+        Works for images too (width and height).
+        """
+        digest = await self.content_hash(path)
+        key = cache_key("probe", digest)
+        cached = self._results.get(key)
+        if cached is not None:
+            MEDIA_JOBS.inc(kind="probe", outcome="hit")
+            return cached.get("info", {})
+        return await self._once(key, lambda: self._probe(path, key))
+
+    async def _probe(self, path: Path, key: str) -> dict[str, int]:
+        code, stdout, _ = await self.run([
+            self.ffprobe, "-v", "quiet", "-print_format", "json",
+            "-show_streams", "-show_format", "-select_streams", "v:0", str(path),
+        ], timeout=30)
+        if code != 0:
+            MEDIA_JOBS.inc(kind="probe", outcome="failed")
+            return {}
+        try:
+            data = json.loads(stdout)
+            stream = (data.get("streams") or [{}])[0]
+            info: dict[str, int] = {}
+            if "width" in stream and "height" in stream:
+                info["width"] = int(stream["width"])
+                info["height"] = int(stream["height"])
+            # duration lives on the stream or container level
+            dur = stream.get("duration") or data.get("format", {}).get("duration")
+            if dur:
+                info["duration"] = int(float(dur))
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.debug(f"ffprobe output unreadable for {path}: {e}")
+            MEDIA_JOBS.inc(kind="probe", outcome="failed")
+            return {}
+        self._results.set(key, {"info": info})
+        MEDIA_JOBS.inc(kind="probe", outcome="done")
+        return info
+
+    # ------------------------------------------------------------------
+    # Video
+    # ------------------------------------------------------------------
+
+    async def compress_video(
+        self, path: Path, target_bytes: int, limit_bytes: int, max_height: int = 720,
+    ) -> Path | None:
+        """A copy of the video re-encoded to about *target_bytes*, or None if it won't fit *limit_bytes*.
+
+        Applies bitrate reduction and resolution downscaling (capped at
+        *max_height*).  Inputs that cannot be compressed are remembered too.
+        """
+        digest = await self.content_hash(path)
+        key = cache_key("video", digest, target_bytes, limit_bytes, max_height)
+        out = self._output(key, ".mp4")
+        if self._cached_output(out):
+            MEDIA_JOBS.inc(kind="video", outcome="hit")
+            return out
+        if (self._results.get(key) or {}).get("outcome") == _FAILED:
+            MEDIA_JOBS.inc(kind="video", outcome="hit")
+            return None
+        return await self._once(key, lambda: self._compress_video(path, key, out, target_bytes, limit_bytes, max_height))
+
+    async def _compress_video(
+        self, path: Path, key: str, out: Path, target_bytes: int, limit_bytes: int, max_height: int,
+    ) -> Path | None:
+        probe = await self.probe(path)
+        duration = probe.get("duration", 0)
+        if duration <= 0:
+            logger.warning(f"Cannot compress {path}: unknown duration")
+            return self._failed("video", key)
+
+        # Target bitrate (bits/s) = target_bytes * 8 / duration, leave room for audio
+        audio_bitrate = 96_000  # 96 kbps — lower for preview
+        video_bitrate = int((target_bytes * 8) / duration - audio_bitrate)
+        if video_bitrate < 100_000:  # below 100 kbps = unwatchable
+            logger.warning(f"Cannot compress {path}: would need < 100 kbps for {duration}s")
+            return self._failed("video", key)
+
+        cmd = [self.ffmpeg, "-y", "-i", str(path)]
+        # Downscale if video height exceeds max_height (never upscale)
+        if probe.get("height", 0) > max_height:
+            cmd.extend(["-vf", f"scale=-2:{max_height}"])
+        cmd.extend([
+            "-c:v", "libx264", "-preset", "fast",
+            "-b:v", str(video_bitrate),
+            "-c:a", "aac", "-b:a", "96k",
+            "-movflags", "+faststart",
+        ])
+
+        started = time.monotonic()
+        produced = await self._encode(cmd, out, timeout=600)
+        if produced is None:
+            MEDIA_JOBS.inc(kind="video", outcome="failed")
+            return None
+        size = produced.stat().st_size
+        logger.info(
+            f"Compressed video {path.name}: "
+            f"{path.stat().st_size / 1024 / 1024:.1f} MB → {size / 1024 / 1024:.1f} MB "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+        if size > limit_bytes:
+            logger.warning(
+                f"Compressed video still {size / 1024 / 1024:.1f} MB "
+                f"(limit {limit_bytes / 1024 / 1024:.0f} MB), skipping"
+            )
+            produced.unlink(missing_ok=True)
+            return self._failed("video", key)
+        MEDIA_JOBS.inc(kind="video", outcome="done")
+        return produced
+
+    # ------------------------------------------------------------------
+    # Images
+    # ------------------------------------------------------------------
+
+    async def fit_image(self, path: Path, max_bytes: int, max_dimension_sum: int) -> Path:
+        """The image itself if within limits, else a downscaled/recompressed JPEG copy.
+
+        Falls back to the original when it cannot be processed.
+        """
+        size = path.stat().st_size
+        probe = await self.probe(path)
+        dims = probe.get("width", 0) + probe.get("height", 0)
+        if size <= max_bytes and dims <= max_dimension_sum:
+            return path
+
+        digest = await self.content_hash(path)
+        key = cache_key("image", digest, max_bytes, max_dimension_sum)
+        out = self._output(key, ".jpg")
+        if self._cached_output(out):
+            MEDIA_JOBS.inc(kind="image", outcome="hit")
+            return out
+        if (self._results.get(key) or {}).get("outcome") == _FAILED:
+            MEDIA_JOBS.inc(kind="image", outcome="hit")
+            return path
+        fitted = await self._once(key, lambda: self._fit_image(path, key, out, probe, max_bytes, max_dimension_sum))
+        return fitted or path
+
+    async def _fit_image(
+        self, path: Path, key: str, out: Path, probe: dict[str, int], max_bytes: int, max_dimension_sum: int,
+    ) -> Path | None:
+        width, height = probe.get("width", 0), probe.get("height", 0)
+        scale = 1.0
+        if width and height and width + height > max_dimension_sum:
+            scale = max_dimension_sum / (width + height)
+        # Lower JPEG quality, then shrink further, until it fits
+        for quality in (3, 6, 10):
+            cmd = [self.ffmpeg, "-y", "-i", str(path)]
+            if scale < 1.0:
+                cmd.extend(["-vf", f"scale=trunc(iw*{scale:.4f}/2)*2:-2"])
+            cmd.extend(["-frames:v", "1", "-q:v", str(quality)])
+            produced = await self._encode(cmd, out, timeout=120)
+            if produced is None:
+                break
+            if produced.stat().st_size <= max_bytes:
+                logger.info(
+                    f"Resized image {path.name}: {path.stat().st_size / 1024 / 1024:.1f} MB → "
+                    f"{produced.stat().st_size / 1024 / 1024:.1f} MB"
+                )
+                MEDIA_JOBS.inc(kind="image", outcome="done")
+                return produced
+            produced.unlink(missing_ok=True)
+            scale *= 0.75
+        logger.warning(f"Cannot fit image {path.name} under {max_bytes / 1024 / 1024:.0f} MB")
+        return self._failed("image", key)
+
+    # ------------------------------------------------------------------
+    # Audio
+    # ------------------------------------------------------------------
+
+    async def prepare_audio(self, path: Path) -> Path | None:
+        """A 16 kHz mono Opus copy of *path* for speech recognition, or None if ffmpeg fails."""
+        digest = await self.content_hash(path)
+        key = cache_key("audio", digest)
+        out = self._output(key, ".ogg")
+        if self._cached_output(out):
+            MEDIA_JOBS.inc(kind="audio", outcome="hit")
+            return out
+        if (self._results.get(key) or {}).get("outcome") == _FAILED:
+            MEDIA_JOBS.inc(kind="audio", outcome="hit")
+            return None
+        return await self._once(key, lambda: self._prepare_audio(path, key, out))
+
+    async def _prepare_audio(self, path: Path, key: str, out: Path) -> Path | None:
+        produced = await self._encode([
+            self.ffmpeg, "-y", "-i", str(path), "-vn",
+            "-ac", "1", "-ar", "16000",
+            "-c:a", "libopus", "-b:a", "24k", "-application", "voip",
+        ], out, timeout=600)
+        if produced is None:
+            return self._failed("audio", key)
+        MEDIA_JOBS.inc(kind="audio", outcome="done")
+        return produced
+
+    async def split_audio(self, path: Path, max_seconds: int) -> list[Path]:
+        """*path* cut into pieces of at most *max_seconds*, preferably in silences.
+
+        Returns ``[path]`` when it is short enough or cannot be split.
+        Pieces are stream copies, so *path* should already be in a
+        container that supports cutting (such as :meth:`prepare_audio` output).
+        """
+        duration = (await self.probe(path)).get("duration", 0)
+        if duration <= max_seconds:
+            return [path]
+        digest = await self.content_hash(path)
+        key = cache_key("split", digest, max_seconds)
+        cached = self._results.get(key)
+        if cached is not None:
+            cuts = cached["cuts"]
+        else:
+            silences = await self._silences(path)
+            cuts = _cut_points(duration, silences, max_seconds)
+            self._results.set(key, {"cuts": cuts})
+        bounds = [0.0, *cuts, None]
+        pieces = await asyncio.gather(*(
+            self._cut(path, key, i, bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)
+        ))
+        if any(p is None for p in pieces):
+            return [path]
+        MEDIA_JOBS.inc(kind="split", outcome="done")
+        return pieces
+
+    async def _silences(self, path: Path) -> list[tuple[float, float]]:
+        """(start, end) of the silent stretches in *path*, per ffmpeg's silencedetect."""
+        code, _, stderr = await self.run([
+            self.ffmpeg, "-hide_banner", "-nostats", "-i", str(path),
+            "-af", "silencedetect=noise=-35dB:d=0.4", "-f", "null", "-",
+        ], timeout=300)
+        if code != 0:
+            return []
+        silences = []
+        start = None
+        for match in _SILENCE_RE.finditer(stderr.decode(errors="replace")):
+            if match.group(1) == "start":
+                start = float(match.group(2))
+            elif start is not None:
+                silences.append((start, float(match.group(2))))
+                start = None
+        return silences
+
+    async def _cut(self, path: Path, key: str, index: int, start: float, end: float | None) -> Path | None:
+        out = self._output(cache_key(key, index), path.suffix)
+        if self._cached_output(out):
+            return out
+        cmd = [self.ffmpeg, "-y", "-i", str(path), "-ss", f"{start:.3f}"]
+        if end is not None:
+            cmd.extend(["-to", f"{end:.3f}"])
+        cmd.extend(["-c", "copy"])
+        return await self._encode(cmd, out, timeout=120)
+
+    # ------------------------------------------------------------------
+
+    async def _encode(self, cmd: list[str], out: Path, timeout: float) -> Path | None:
+        """Run an ffmpeg *cmd* writing to a temp file, then move it to *out*."""
+        ensure_dir(self.out_dir)
+        tmp = out.with_name(f".{out.stem}.{os.getpid()}.tmp{out.suffix}")
+        code, _, stderr = await self.run([*cmd, str(tmp)], timeout=timeout)
+        if code != 0 or not tmp.exists():
+            logger.error(f"ffmpeg failed: {stderr.decode(errors='replace')[-500:]}")
+            tmp.unlink(missing_ok=True)
+            return None
+        os.replace(tmp, out)
+        self._evict()
+        return out
+
+    def _failed(self, kind: str, key: str) -> None:
+        self._results.set(key, {"outcome": _FAILED}, ttl=7 * 86400)
+        MEDIA_JOBS.inc(kind=kind, outcome="failed")
+        return None
+
+    def stats(self) -> dict[str, Any]:
+        sizes = [p.stat().st_size for p in self.out_dir.glob("*") if p.is_file()] if self.out_dir.is_dir() else []
+        return {"outputs": len(sizes), "output_bytes": sum(sizes), "running": len(self._inflight)}
+
+
+def _cut_points(duration: float, silences: list[tuple[float, float]], max_seconds: int) -> list[float]:
+    """Offsets splitting *duration* into pieces of at most *max_seconds*.
+
+    Each cut is the middle of the last silence in the second half of the
+    window, or a hard cut at the window end when there is none.
+    """
+    cuts: list[float] = []
+    position = 0.0
+    while duration - position > max_seconds:
+        limit = position + max_seconds
+        quiet = [
+            (start + end) / 2 for start, end in silences
+            if position + max_seconds / 2 < (start + end) / 2 <= limit
+        ]
+        position = max(quiet) if quiet else limit
+        cuts.append(round(position, 3))
+    return cuts
+
+
+def _hash_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
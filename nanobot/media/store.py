@@ -0,0 +1,253 @@
+"""Content-addressed store for inbound media shared by all channels.
+
+Every downloaded attachment is written once to ``<root>/<sha256[:32]><ext>``
+(default root ``~/.nanobot/media``).  Downloads stream to a temp file in
+``<root>/.incoming`` while being hashed and are then renamed into place,
+so receiving the same photo twice keeps one copy.
+
+File mtimes are the LRU clock: reads through the store bump them.  When
+the store grows past ``max_bytes`` it is garbage collected down to 90%
+of the quota.  Before evicting, the store counts references to each file
+in the session and archive JSONL files under ``reference_dirs``:
+unreferenced files go first, oldest first, and referenced files are only
+evicted when that is not enough.  Files younger than ``min_age`` are
+never evicted, since a message that has just been received may not be
+saved to its session yet.
+
+Files in the root that predate the store (older ad-hoc names) are
+managed the same way.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import time
+import uuid
+from collections import Counter
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from nanobot.telemetry.metrics import MEDIA_STORE_OPS
+from nanobot.utils.helpers import ensure_dir, get_data_path
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import Config
+
+_HASH_CHUNK = 1024 * 1024
+_DIGEST_LEN = 32
+_INCOMING = ".incoming"
+
+
+class MediaStore:
+    """Deduplicating, size-capped media directory with reference-aware LRU eviction."""
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        max_bytes: int = 2 * 1024 * 1024 * 1024,
+        reference_dirs: list[Path] | None = None,
+        min_age: float = 3600,
+    ):
+        self.root = root or get_data_path() / "media"
+        self.max_bytes = max_bytes
+        self.reference_dirs = reference_dirs or []
+        self.min_age = min_age
+        self._size: int | None = None  # lazily computed total bytes on disk
+        self._gc_task: asyncio.Task | None = None
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    def incoming_path(self, suffix: str = "") -> Path:
+        """A fresh temp path to download into before :meth:`put_file`."""
+        return ensure_dir(self.root / _INCOMING) / f"{uuid.uuid4().hex}{suffix}"
+
+    async def put_stream(self, chunks: AsyncIterator[bytes], suffix: str = "") -> Path:
+        """Write *chunks* to disk while hashing them and return the stored path."""
+        tmp = self.incoming_path(suffix)
+        hasher = hashlib.sha256()
+        try:
+            with open(tmp, "wb") as f:
+                async for chunk in chunks:
+                    hasher.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return self._commit(tmp, hasher.hexdigest(), suffix)
+
+    async def put_file(self, path: Path, suffix: str | None = None) -> Path:
+        """Move a downloaded file (e.g. from :meth:`incoming_path`) into the store."""
+        digest = await asyncio.to_thread(_sha256, path)
+        return self._commit(path, digest, path.suffix if suffix is None else suffix)
+
+    def _commit(self, tmp: Path, digest: str, suffix: str) -> Path:
+        name = digest[:_DIGEST_LEN]
+        existing = self._find(name)
+        if existing:
+            tmp.unlink(missing_ok=True)
+            self.touch(existing)
+            MEDIA_STORE_OPS.inc(op="deduplicated")
+            return existing
+        target = self.root / f"{name}{suffix.lower()}"
+        size = tmp.stat().st_size
+        os.replace(tmp, target)
+        if self._size is not None:
+            self._size += size
+        MEDIA_STORE_OPS.inc(op="stored")
+        self._maybe_gc()
+        return target
+
+    def _find(self, name: str) -> Path | None:
+        for path in self.root.glob(f"{name}*"):
+            if path.is_file():
+                return path
+        return None
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def contains(self, path: str | Path) -> bool:
+        return Path(path).parent == self.root
+
+    def touch(self, path: Path) -> None:
+        """Mark *path* as recently used."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def read(self, path: str | Path) -> bytes | None:
+        """Read a media file, bumping it in the LRU order if it is ours."""
+        p = Path(path)
+        try:
+            data = p.read_bytes()
+        except OSError:
+            return None
+        if self.contains(p):
+            self.touch(p)
+        return data
+
+    # ------------------------------------------------------------------
+    # Garbage collection
+    # ------------------------------------------------------------------
+
+    def size_bytes(self) -> int:
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def _maybe_gc(self) -> None:
+        if self.size_bytes() <= self.max_bytes:
+            return
+        if self._gc_task and not self._gc_task.done():
+            return
+        try:
+            self._gc_task = asyncio.get_running_loop().create_task(asyncio.to_thread(self.gc))
+        except RuntimeError:
+            self.gc()
+
+    def references(self) -> Counter[str]:
+        """How many session/archive files mention each stored file name."""
+        pattern = re.compile(re.escape(str(self.root)) + r"/([^\s\"'\]\\/]+)")
+        refs: Counter[str] = Counter()
+        for directory in self.reference_dirs:
+            if not directory.is_dir():
+                continue
+            for path in directory.rglob("*.jsonl"):
+                try:
+                    text = path.read_text(encoding="utf-8", errors="replace")
+                except OSError:
+                    continue
+                refs.update(set(pattern.findall(text)))
+        return refs
+
+    def gc(self) -> int:
+        """Evict files until the store is under 90% of its quota. Returns files removed."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        self._size = total
+        if total <= self.max_bytes:
+            return 0
+        target = int(self.max_bytes * 0.9)
+        refs = self.references()
+        cutoff = time.time() - self.min_age
+        candidates = sorted(
+            (e for e in entries if e[0] < cutoff),
+            key=lambda e: (refs.get(e[2].name, 0) > 0, e[0]),
+        )
+        removed = 0
+        for _, size, path in candidates:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            MEDIA_STORE_OPS.inc(op="evicted")
+            if refs.get(path.name):
+                logger.info(f"Media store over quota, evicted referenced {path.name}")
+        self._size = total
+        if removed:
+            logger.debug(f"Media store GC removed {removed} files, {total / 1024 / 1024:.0f} MB left")
+        self._sweep_incoming(cutoff)
+        return removed
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        if not self.root.is_dir():
+            return entries
+        for path in self.root.iterdir():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if path.is_file():
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _sweep_incoming(self, cutoff: float) -> None:
+        """Drop temp files left behind by interrupted downloads."""
+        for path in (self.root / _INCOMING).glob("*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+
+    def stats(self) -> dict[str, Any]:
+        return {"root": str(self.root), "bytes": self.size_bytes(), "max_bytes": self.max_bytes}
+
+
+def media_store(config: "Config | None" = None) -> MediaStore:
+    """The media store configured by ``channels.media``.
+
+    References are counted in ``~/.nanobot/sessions`` and the workspace's
+    ``sessions/`` directory, which holds compaction archives.
+    """
+    reference_dirs = [get_data_path() / "sessions"]
+    if config is None:
+        return MediaStore(reference_dirs=reference_dirs)
+    cfg = config.channels.media
+    reference_dirs.append(config.workspace_path / "sessions")
+    return MediaStore(
+        root=Path(cfg.store_dir).expanduser() if cfg.store_dir else None,
+        max_bytes=cfg.store_mb * 1024 * 1024,
+        reference_dirs=reference_dirs,
+    )
+
+
+def _sha256(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            hasher.update(chunk)
+    return hasher.hexdigest()
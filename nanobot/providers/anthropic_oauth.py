@@ -7,26 +7,70 @@ The OAuth token is passed via CLAUDE_CODE_OAUTH_TOKEN env var.
 Streams stdout line-by-line using --output-format stream-json --verbose
 to provide real-time progress feedback while the CLI works.
 
-When message_callback is set, starts an MCP bridge so the CLI can send
-messages (with media) back to the user through nanobot's channel layer.
+When message_callback is set, registers with the MCP bridge so the CLI can
+send messages (with media) back to the user through nanobot's channel layer.
+
+With a ``ClaudeWorkerPool``, calls made inside a session (see
+``session_scope``) reuse a long-lived CLI process for that session
+instead of spawning one per call.  With a ``ClaudeSessionStore``, a
+session's next call resumes its CLI conversation (``--resume``) and
+sends only the messages added since, even across processes.
 """
 
 import asyncio
 import json
 import os
 import shutil
-import tempfile
 import time
-from typing import Any
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
-from nanobot.providers.base import LLMProvider, LLMResponse, ProgressCallback
+from nanobot.providers.base import (
+    LLMProvider,
+    LLMResponse,
+    ProgressCallback,
+    current_session,
+    stable_prompt,
+)
+from nanobot.providers.claude_sessions import digest
+from nanobot.telemetry.metrics import CLI_PROMPT_BYTES, CLI_TURN_SECONDS
+
+if TYPE_CHECKING:
+    from nanobot.providers.claude_sessions import ClaudeSessionStore
+    from nanobot.providers.claude_workers import ClaudeWorkerPool
 
 _MIN_PROGRESS_INTERVAL = 3.0  # seconds between progress messages
 _READ_TIMEOUT = 30.0  # seconds before sending a heartbeat
 
 
+@dataclass
+class CLITurn:
+    """Events of one CLI turn, up to its ``result`` event (or EOF)."""
+    result: str | None = None
+    is_error: bool = False
+    usage: dict[str, Any] = field(default_factory=dict)
+    text: list[str] = field(default_factory=list)  # Non-JSON output lines
+    session_id: str | None = None
+
+    def response(self) -> LLMResponse:
+        # Prefer explicit result event
+        if self.result is not None:
+            return LLMResponse(
+                content=self.result,
+                finish_reason="error" if self.is_error else "stop",
+                usage=self.usage,
+            )
+
+        # Fallback: no result event (GitHub issue #1920)
+        if self.text:
+            logger.warning("No result event from Claude CLI; using accumulated text")
+            return LLMResponse(content="\n".join(self.text), finish_reason="stop")
+
+        return LLMResponse(content="Claude CLI produced no output", finish_reason="error")
+
+
 class AnthropicOAuthProvider(LLMProvider):
     """LLM provider using Claude CLI with OAuth token.
 
@@ -40,11 +84,15 @@ class AnthropicOAuthProvider(LLMProvider):
         oauth_token: str,
         default_model: str = "anthropic/claude-opus-4-6",
         claude_bin: str | None = None,
+        workers: "ClaudeWorkerPool | None" = None,
+        sessions: "ClaudeSessionStore | None" = None,
     ):
         super().__init__()
         self.oauth_token = oauth_token
         self.default_model = default_model
         self.claude_bin = claude_bin or shutil.which("claude") or "claude"
+        self.workers = workers
+        self.sessions = sessions
 
     async def chat(
         self,
@@ -58,44 +106,49 @@ class AnthropicOAuthProvider(LLMProvider):
         if "/" in model:
             model = model.split("/", 1)[1]
 
+        session_key = current_session()
+        if self.workers is not None and session_key:
+            return await self._chat_pooled(session_key, messages, model)
+
+        history = self._history(messages) if self.sessions and session_key else []
+        resume = self.sessions.resumable(session_key, model, history) if history else None
+        if resume:
+            started = time.monotonic()
+            prompt = self._delta(messages, len(resume["digests"]))
+            response, turn = await self._run_once(prompt, model, ["--resume", resume["id"]])
+            if turn.result is not None and not turn.is_error:
+                self._report("continued", messages, prompt, started)
+                self._remember(session_key, model, history, turn)
+                return response
+            logger.warning(f"Resuming Claude CLI session {resume['id']} failed; sending full prompt")
+            self.sessions.drop(session_key)
+
+        started = time.monotonic()
         prompt = self._build_prompt(messages)
-
-        # Claude CLI args — prompt is piped via stdin to avoid ARG_MAX limits
-        args = [
-            self.claude_bin,
-            "-p",
-            "--model", model,
-            "--output-format", "stream-json",
-            "--verbose",
-            "--dangerously-skip-permissions",
-        ]
-
-        env = {
-            **os.environ,
-            "CLAUDE_CODE_OAUTH_TOKEN": self.oauth_token,
-            "CLAUDE_CODE_ENTRYPOINT": "cli",
-        }
+        response, turn = await self._run_once(prompt, model)
+        self._report("full", messages, prompt, started)
+        if session_key:
+            self._remember(session_key, model, history, turn)
+        return response
+
+    async def _run_once(
+        self, prompt: str, model: str, extra_args: list[str] | None = None,
+    ) -> tuple[LLMResponse, CLITurn]:
+        """Run one ``claude -p`` process for *prompt*."""
+        args = [*self._cli_args(model), *(extra_args or [])]
+        env = self._cli_env()
 
         # MCP bridge setup — gives CLI access to nanobot's message bus
-        socket_path: str | None = None
-        socket_server: asyncio.AbstractServer | None = None
-        mcp_config_path: str | None = None
+        bridge = None
+        token: str | None = None
 
         if self.message_callback:
             try:
-                from nanobot.mcp.listener import start_listener, generate_mcp_config
-
-                socket_path, socket_server = await start_listener(
-                    message_cb=self.message_callback,
-                    progress_cb=self.progress_callback,
-                )
-                mcp_config = generate_mcp_config(socket_path)
-                mcp_config_path = socket_path.replace(".sock", ".json")
-                with open(mcp_config_path, "w") as f:
-                    json.dump(mcp_config, f)
+                from nanobot.mcp.listener import get_bridge
 
-                args.extend(["--mcp-config", mcp_config_path])
-                logger.debug(f"MCP bridge enabled: {socket_path}")
+                bridge = await get_bridge()
+                token = bridge.register(self.message_callback, self.progress_callback)
+                args.extend(["--mcp-config", json.dumps(bridge.mcp_config(token))])
             except Exception as e:
                 logger.warning(f"Failed to start MCP bridge: {e}")
                 # Continue without MCP — CLI still works, just can't send messages
@@ -113,28 +166,93 @@ class AnthropicOAuthProvider(LLMProvider):
 
         except FileNotFoundError:
             logger.error(f"Claude CLI not found at: {self.claude_bin}")
-            return LLMResponse(
-                content="Claude CLI not found. Install with: npm install -g @anthropic-ai/claude-code",
-                finish_reason="error",
-            )
+            return _cli_missing(), CLITurn()
         except Exception as e:
             logger.error(f"Claude CLI error: {e}")
-            return LLMResponse(content=f"Error: {str(e)}", finish_reason="error")
+            return LLMResponse(content=f"Error: {str(e)}", finish_reason="error"), CLITurn()
         finally:
-            # Clean up MCP bridge
-            if socket_server:
-                socket_server.close()
-                await socket_server.wait_closed()
-            if socket_path and os.path.exists(socket_path):
-                os.unlink(socket_path)
-            if mcp_config_path and os.path.exists(mcp_config_path):
-                os.unlink(mcp_config_path)
+            if token:
+                await bridge.unregister(token)
+
+    def _cli_args(self, model: str) -> list[str]:
+        # Claude CLI args — prompt is piped via stdin to avoid ARG_MAX limits
+        return [
+            self.claude_bin,
+            "-p",
+            "--model", model,
+            "--output-format", "stream-json",
+            "--verbose",
+            "--dangerously-skip-permissions",
+        ]
+
+    def _cli_env(self) -> dict[str, str]:
+        return {
+            **os.environ,
+            "CLAUDE_CODE_OAUTH_TOKEN": self.oauth_token,
+            "CLAUDE_CODE_ENTRYPOINT": "cli",
+        }
+
+    async def _chat_pooled(self, session_key: str, messages: list[dict[str, Any]], model: str) -> LLMResponse:
+        """Run the call on the session's persistent worker, sending only new messages when possible."""
+        progress_cb = self.progress_callback
+        history = self._history(messages)
+        args = [*self._cli_args(model), "--input-format", "stream-json"]
+        # Only used if the lease has to spawn a fresh worker for this session
+        resume = self.sessions.resumable(session_key, model, history) if self.sessions else None
+        spawn_args = [*args, "--resume", resume["id"]] if resume else args
+
+        try:
+            async with self.workers.lease(
+                session_key, model, spawn_args, self._cli_env(),
+                mcp=self.message_callback is not None, progress_cb=progress_cb,
+            ) as worker:
+                worker.message_callback = self.message_callback
+                worker.progress_callback = progress_cb
+
+                # A worker with no turns yet was just spawned with spawn_args
+                if worker.turns:
+                    known = worker.transcript
+                else:
+                    known = resume["digests"] if resume else []
+                if known and len(history) > len(known) and history[:len(known)] == known:
+                    mode, prompt = "continued", self._delta(messages, len(known))
+                else:
+                    if worker.turns:
+                        # History diverged from what the CLI holds; start over
+                        await worker.restart(args)
+                    mode, prompt = "full", self._build_prompt(messages)
+
+                started = time.monotonic()
+                turn = await worker.run(prompt, progress_cb)
+                if mode == "continued" and worker.turns == 1 and (turn.result is None or turn.is_error):
+                    logger.warning(f"Resuming Claude CLI session {resume['id']} failed; sending full prompt")
+                    self.sessions.drop(session_key)
+                    await worker.restart(args)
+                    mode, prompt = "full", self._build_prompt(messages)
+                    turn = await worker.run(prompt, progress_cb)
+                if turn.result is None and not worker.alive:
+                    err = worker.stderr or "unknown error"
+                    logger.error(f"Claude CLI worker exited: {err}")
+                    if self.sessions and mode == "continued":
+                        self.sessions.drop(session_key)
+                    return LLMResponse(content=f"Claude CLI error: {err}", finish_reason="error")
+
+                self._report(mode, messages, prompt, started)
+                worker.transcript = self._remember(session_key, model, history, turn)
+                return turn.response()
+
+        except FileNotFoundError:
+            logger.error(f"Claude CLI not found at: {self.claude_bin}")
+            return _cli_missing()
+        except Exception as e:
+            logger.error(f"Claude CLI worker error: {e}")
+            return LLMResponse(content=f"Error: {str(e)}", finish_reason="error")
 
     async def _stream_response(
         self,
         proc: asyncio.subprocess.Process,
         prompt: str,
-    ) -> LLMResponse:
+    ) -> tuple[LLMResponse, CLITurn]:
         """Stream stdout from the Claude CLI, forwarding progress and collecting the result."""
         # Capture callback at call time for concurrency safety
         progress_cb = self.progress_callback
@@ -150,98 +268,56 @@ class AnthropicOAuthProvider(LLMProvider):
         except Exception as e:
             logger.warning(f"Failed to write to Claude CLI stdin: {e}")
 
-        # Streaming state
-        result_content: str | None = None
-        result_usage: dict[str, Any] = {}
-        is_error = False
-        last_progress_time = 0.0
-        start_time = time.monotonic()
-        accumulated_text: list[str] = []
-
-        try:
-            while True:
-                try:
-                    line_bytes = await asyncio.wait_for(
-                        proc.stdout.readline(),
-                        timeout=_READ_TIMEOUT,
-                    )
-                except asyncio.TimeoutError:
-                    # No output for 30s — send heartbeat
-                    if progress_cb:
-                        elapsed = int(time.monotonic() - start_time)
-                        mins, secs = divmod(elapsed, 60)
-                        label = f"{mins}m{secs}s" if mins else f"{secs}s"
-                        try:
-                            await progress_cb(f"⏳ Still working... ({label})")
-                        except Exception:
-                            pass
-                    continue
-
-                if not line_bytes:
-                    break  # EOF — process closed stdout
-
-                line = line_bytes.decode("utf-8", errors="replace").rstrip("\n\r")
-                if not line:
-                    continue
-
-                # Parse JSON event
-                try:
-                    event = json.loads(line)
-                except json.JSONDecodeError:
-                    accumulated_text.append(line)
-                    continue
-
-                if not isinstance(event, dict):
-                    accumulated_text.append(line)
-                    continue
-
-                event_type = event.get("type", "")
-
-                if event_type == "result":
-                    result_content = event.get("result", "")
-                    is_error = event.get("is_error", False)
-                    if "cost_usd" in event:
-                        result_usage["cost_usd"] = event["cost_usd"]
-                    if "total_cost_usd" in event:
-                        result_usage["total_cost_usd"] = event["total_cost_usd"]
-
-                elif event_type == "assistant":
-                    last_progress_time = await self._handle_assistant_event(
-                        event, progress_cb, last_progress_time,
-                    )
-
-                elif event_type == "system":
-                    logger.debug(f"Claude CLI init: {json.dumps(event)[:200]}")
-
-                else:
-                    logger.debug(f"Claude CLI event '{event_type}': {line[:200]}")
-
-        except Exception as e:
-            logger.error(f"Error reading Claude CLI stdout: {e}")
+        turn = await read_turn(proc.stdout, progress_cb)
 
         # Wait for stderr and process exit
         stderr_output = await stderr_task
         await proc.wait()
 
-        if proc.returncode != 0 and result_content is None:
+        if proc.returncode != 0 and turn.result is None:
             err = stderr_output or "unknown error"
             logger.error(f"Claude CLI error (exit {proc.returncode}): {err}")
-            return LLMResponse(content=f"Claude CLI error: {err}", finish_reason="error")
-
-        # Prefer explicit result event
-        if result_content is not None:
-            return LLMResponse(
-                content=result_content,
-                finish_reason="error" if is_error else "stop",
-                usage=result_usage,
-            )
+            return LLMResponse(content=f"Claude CLI error: {err}", finish_reason="error"), turn
+        return turn.response(), turn
 
-        # Fallback: no result event (GitHub issue #1920)
-        if accumulated_text:
-            logger.warning("No result event from Claude CLI; using accumulated text")
-            return LLMResponse(content="\n".join(accumulated_text), finish_reason="stop")
+    def _history(self, messages: list[dict[str, Any]]) -> list[str]:
+        """Digests to detect continuations of a CLI conversation.
 
-        return LLMResponse(content="Claude CLI produced no output", finish_reason="error")
+        The first is the system prompt's (minus its clock line): the CLI
+        keeps the one it was first given, so when memory, skills or
+        bootstrap files change it the conversation must be rebuilt.  The
+        rest are the non-system messages'.
+        """
+        system = messages[0].get("content") if messages and messages[0].get("role") == "system" else ""
+        system = stable_prompt(system) if isinstance(system, str) else json.dumps(system)
+        return [digest(system), *(digest(self._build_prompt([m])) for m in messages if m.get("role") != "system")]
+
+    def _delta(self, messages: list[dict[str, Any]], known: int) -> str:
+        """Prompt made of the non-system messages not covered by *known* history digests."""
+        conversation = [m for m in messages if m.get("role") != "system"]
+        return self._build_prompt(conversation[known - 1:])
+
+    def _remember(self, session_key: str, model: str, history: list[str], turn: CLITurn) -> list[str]:
+        """Record what the CLI has seen after a turn; returns the new transcript ([] if unusable)."""
+        if turn.result is None or turn.is_error:
+            if self.sessions:
+                self.sessions.drop(session_key)
+            return []
+        reply = digest(self._build_prompt([{"role": "assistant", "content": turn.result}]))
+        transcript = [*history, reply]
+        if self.sessions and turn.session_id:
+            self.sessions.put(session_key, turn.session_id, model, transcript)
+        return transcript
+
+    def _report(self, mode: str, messages: list[dict[str, Any]], prompt: str, started: float) -> None:
+        elapsed = time.monotonic() - started
+        sent = len(prompt.encode())
+        CLI_PROMPT_BYTES.inc(sent, kind="sent")
+        CLI_TURN_SECONDS.observe(elapsed, mode=mode)
+        if mode == "continued":
+            saved = max(0, len(self._build_prompt(messages).encode()) - sent)
+            CLI_PROMPT_BYTES.inc(saved, kind="saved")
+            logger.debug(f"Continued Claude CLI conversation: sent {sent}B, saved {saved}B ({elapsed:.1f}s)")
 
     @staticmethod
     async def _handle_assistant_event(
@@ -327,6 +403,84 @@ class AnthropicOAuthProvider(LLMProvider):
         return self.default_model
 
 
+async def read_turn(stdout: asyncio.StreamReader, progress_cb: ProgressCallback | None) -> CLITurn:
+    """Read stream-json events until a ``result`` event or EOF, forwarding progress."""
+    turn = CLITurn()
+    last_progress_time = 0.0
+    start_time = time.monotonic()
+
+    try:
+        while True:
+            try:
+                line_bytes = await asyncio.wait_for(stdout.readline(), timeout=_READ_TIMEOUT)
+            except asyncio.TimeoutError:
+                # No output for 30s — send heartbeat
+                if progress_cb:
+                    elapsed = int(time.monotonic() - start_time)
+                    mins, secs = divmod(elapsed, 60)
+                    label = f"{mins}m{secs}s" if mins else f"{secs}s"
+                    try:
+                        await progress_cb(f"⏳ Still working... ({label})")
+                    except Exception:
+                        pass
+                continue
+
+            if not line_bytes:
+                break  # EOF — process closed stdout
+
+            line = line_bytes.decode("utf-8", errors="replace").rstrip("\n\r")
+            if not line:
+                continue
+
+            # Parse JSON event
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                turn.text.append(line)
+                continue
+
+            if not isinstance(event, dict):
+                turn.text.append(line)
+                continue
+
+            event_type = event.get("type", "")
+            if event.get("session_id"):
+                turn.session_id = event["session_id"]
+
+            if event_type == "result":
+                turn.result = event.get("result", "")
+                turn.is_error = event.get("is_error", False)
+                if "cost_usd" in event:
+                    turn.usage["cost_usd"] = event["cost_usd"]
+                if "total_cost_usd" in event:
+                    turn.usage["total_cost_usd"] = event["total_cost_usd"]
+                break
+
+            elif event_type == "assistant":
+                last_progress_time = await AnthropicOAuthProvider._handle_assistant_event(
+                    event, progress_cb, last_progress_time,
+                )
+
+            elif event_type == "system":
+                logger.debug(f"Claude CLI init: {json.dumps(event)[:200]}")
+
+            else:
+                logger.debug(f"Claude CLI event '{event_type}': {line[:200]}")
+
+    except Exception as e:
+        logger.error(f"Error reading Claude CLI stdout: {e}")
+
+    return turn
+
+
+def _cli_missing() -> LLMResponse:
+    return LLMResponse(
+        content="Claude CLI not found. Install with: npm install -g @anthropic-ai/claude-code",
+        finish_reason="error",
+        not_started=True,
+    )
+
+
 def _tool_detail(name: str, tool_input: dict[str, Any]) -> str:
     """Extract a brief description from a tool's input."""
     if name == "Bash":
@@ -1,7 +1,10 @@
 """Base LLM provider interface."""
 
+import re
 from abc import ABC, abstractmethod
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -11,6 +14,36 @@ ProgressCallback = Callable[[str], Awaitable[None]]
 # Async callback for sending messages with media (content, media_paths)
 MessageCallback = Callable[[str, list[str]], Awaitable[None]]
 
+# The agent's system prompt embeds the time (ContextBuilder._get_identity)
+_CLOCK_LINE = re.compile(r"^(## Current Time\n).*$", re.MULTILINE)
+
+# Session the current chat() call belongs to, for providers that keep
+# per-conversation state (set by the agent loop around the tool loop)
+_session: ContextVar[str | None] = ContextVar("nanobot_provider_session", default=None)
+
+
+@contextmanager
+def session_scope(session_key: str | None) -> Iterator[None]:
+    token = _session.set(session_key)
+    try:
+        yield
+    finally:
+        _session.reset(token)
+
+
+def current_session() -> str | None:
+    return _session.get()
+
+
+def stable_prompt(text: str) -> str:
+    """*text* without the current-time line, which changes every minute."""
+    return _CLOCK_LINE.sub(r"\1", text)
+
+
+def detach_session() -> None:
+    """Leave the session scope in this context (e.g. a subagent spawned mid-turn)."""
+    _session.set(None)
+
 
 @dataclass
 class ToolCallRequest:
@@ -28,6 +61,8 @@ class LLMResponse:
     tool_calls: list[ToolCallRequest] = field(default_factory=list)
     finish_reason: str = "stop"
     usage: dict[str, int] = field(default_factory=dict)
+    retryable: bool = False  # Error is transient (rate limit, timeout, 5xx)
+    not_started: bool = False  # Error before anything ran (safe to send elsewhere)
     
     @property
     def has_tool_calls(self) -> bool:
@@ -77,3 +112,46 @@ class LLMProvider(ABC):
     def get_default_model(self) -> str:
         """Get the default model for this provider."""
         pass
+
+
+class WrappingProvider(LLMProvider):
+    """Base for providers that add behaviour around another provider.
+
+    The agent loop sets streaming callbacks on whatever provider it holds;
+    wrappers forward them to every provider they may delegate to.
+    """
+
+    def __init__(self, inner: LLMProvider):
+        self.inner = inner
+        super().__init__(inner.api_key, inner.api_base)
+
+    def delegates(self) -> list[LLMProvider]:
+        return [self.inner]
+
+    @property
+    def progress_callback(self) -> ProgressCallback | None:
+        return self.inner.progress_callback
+
+    @progress_callback.setter
+    def progress_callback(self, value: ProgressCallback | None) -> None:
+        for provider in self.delegates():
+            provider.progress_callback = value
+
+    @property
+    def message_callback(self) -> MessageCallback | None:
+        return self.inner.message_callback
+
+    @message_callback.setter
+    def message_callback(self, value: MessageCallback | None) -> None:
+        for provider in self.delegates():
+            provider.message_callback = value
+
+    def get_default_model(self) -> str:
+        return self.inner.get_default_model()
+
+
+def innermost(provider: LLMProvider) -> LLMProvider:
+    """The provider at the bottom of a stack of wrappers."""
+    while isinstance(provider, WrappingProvider):
+        provider = provider.inner
+    return provider
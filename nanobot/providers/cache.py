@@ -0,0 +1,154 @@
+"""Exact-match response cache for LLM providers.
+
+``CachingProvider`` wraps any ``LLMProvider`` and answers ``chat`` calls
+from a ``DiskCache`` when an identical request (model, messages, tool
+definitions, max_tokens, temperature) was answered before.  Only some
+calls are cacheable: those made under one of the configured call classes
+(see ``call_class``; cron jobs and heartbeat ticks by default) and,
+optionally, any call at temperature 0.  Error responses are never stored.
+
+Messages are normalised before keying: system prompts lose their
+current-time line, and calls of the configured classes are keyed on the
+current turn only (from its user message on), since their sessions grow
+with every scheduled run.
+
+Tool calls in a cached response still run for real; only the paid LLM
+request is skipped.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import (
+    LLMProvider,
+    LLMResponse,
+    ToolCallRequest,
+    WrappingProvider,
+    stable_prompt,
+)
+from nanobot.telemetry.metrics import LLM_CACHE_LOOKUPS
+from nanobot.utils.cache import DiskCache, cache_key
+
+_call_class: ContextVar[str] = ContextVar("nanobot_llm_call_class", default="chat")
+
+
+@contextmanager
+def call_class(name: str) -> Iterator[None]:
+    """Tag provider calls made in this context (e.g. "cron", "heartbeat")."""
+    token = _call_class.set(name)
+    try:
+        yield
+    finally:
+        _call_class.reset(token)
+
+
+def current_call_class() -> str:
+    return _call_class.get()
+
+
+class CachingProvider(WrappingProvider):
+    """Serves repeated deterministic requests from disk instead of the wrapped provider."""
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        directory: Path,
+        max_bytes: int = 100 * 1024 * 1024,
+        ttl: int = 86400,
+        classes: list[str] | None = None,
+        temperature_zero: bool = True,
+    ):
+        super().__init__(inner)
+        self.ttl = ttl
+        self.classes = set(classes if classes is not None else ["cron", "heartbeat"])
+        self.temperature_zero = temperature_zero
+        self._store = DiskCache(directory, max_bytes=max_bytes)
+
+    def cacheable(self, temperature: float) -> bool:
+        return current_call_class() in self.classes or (self.temperature_zero and temperature == 0)
+
+    @staticmethod
+    def key(
+        model: str,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        max_tokens: int,
+        temperature: float,
+        turn_only: bool = False,
+    ) -> str:
+        return cache_key("chat", model, _normalise(messages, turn_only), tools or [], max_tokens, temperature)
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        if not self.cacheable(temperature):
+            return await self.inner.chat(messages, tools, model, max_tokens, temperature)
+
+        model = model or self.inner.get_default_model()
+        turn_only = current_call_class() in self.classes
+        key = self.key(model, messages, tools, max_tokens, temperature, turn_only)
+        cached = self._store.get(key)
+        if cached is not None:
+            LLM_CACHE_LOOKUPS.inc(outcome="hit")
+            logger.debug(f"LLM cache hit ({current_call_class()}, {model})")
+            return self._decode(cached)
+
+        LLM_CACHE_LOOKUPS.inc(outcome="miss")
+        response = await self.inner.chat(messages, tools, model, max_tokens, temperature)
+        if response.finish_reason != "error":
+            self._store.set(key, self._encode(response), ttl=self.ttl or None)
+        return response
+
+    @staticmethod
+    def _encode(response: LLMResponse) -> dict[str, Any]:
+        return asdict(response)
+
+    @staticmethod
+    def _decode(entry: dict[str, Any]) -> LLMResponse:
+        return LLMResponse(
+            content=entry.get("content"),
+            tool_calls=[ToolCallRequest(**tc) for tc in entry.get("tool_calls", [])],
+            finish_reason=entry.get("finish_reason", "stop"),
+            usage=entry.get("usage") or {},
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self._store.hits, "misses": self._store.misses,
+            "evictions": self._store.evictions, "bytes": self._store.size_bytes,
+        }
+
+
+def _normalise(messages: list[dict[str, Any]], turn_only: bool) -> list[dict[str, Any]]:
+    """*messages* as keyed: no clock in system prompts and, if *turn_only*, no earlier turns.
+
+    Earlier turns include system notes placed among them (e.g. the agent
+    loop's tool-use nudge, which depends on the history); only the leading
+    system prompt is kept.
+    """
+    prompt = 0
+    while prompt < len(messages) and messages[prompt].get("role") == "system":
+        prompt += 1
+    start = prompt
+    if turn_only:
+        users = [i for i, m in enumerate(messages) if m.get("role") == "user"]
+        start = max(users[-1] if users else 0, prompt)
+    normalised = []
+    for i, m in enumerate(messages):
+        if prompt <= i < start:
+            continue
+        if m.get("role") == "system" and isinstance(m.get("content"), str):
+            m = {**m, "content": stable_prompt(m["content"])}
+        normalised.append(m)
+    return normalised
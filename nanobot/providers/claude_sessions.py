@@ -0,0 +1,82 @@
+"""Maps nanobot sessions to Claude CLI conversations for ``--resume``.
+
+After each successful OAuth turn the provider records the CLI's
+``session_id`` together with digests of the system prompt and of every
+non-system message the CLI has now seen.  The next call in the same
+nanobot session can then run ``claude -p --resume <id>`` and send only
+the messages appended since.  If the history no longer extends the recorded one (compaction,
+``/undo``, ``/clear``) or the model changed, the mapping is not used and
+the full prompt is rebuilt.
+
+The CLI keeps the system prompt it was first given, so it is digested
+too, minus its current-time line: the clock alone doesn't end a
+conversation, but any other change (memory, skills, bootstrap files)
+does.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+
+def digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8", errors="replace")).hexdigest()[:16]
+
+
+class ClaudeSessionStore:
+    """JSON file of ``session_key -> {id, model, digests, updated}``."""
+
+    def __init__(self, path: Path, max_sessions: int = 1000):
+        self.path = path
+        self.max_sessions = max_sessions
+        self._entries: dict[str, dict[str, Any]] | None = None
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text())
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable Claude session map {self.path}: {e}")
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        entries = self._load()
+        if len(entries) > self.max_sessions:
+            oldest = sorted(entries, key=lambda k: entries[k].get("updated", 0))
+            for key in oldest[:len(entries) - self.max_sessions]:
+                del entries[key]
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(entries))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save Claude session map: {e}")
+
+    def resumable(self, session_key: str, model: str, history: list[str]) -> dict[str, Any] | None:
+        """The mapping for *session_key* if *history* (digests) strictly extends it."""
+        entry = self._load().get(session_key)
+        if not entry or entry.get("model") != model:
+            return None
+        known = entry.get("digests", [])
+        if not known or len(history) <= len(known) or history[:len(known)] != known:
+            return None
+        return entry
+
+    def put(self, session_key: str, cli_session: str, model: str, history: list[str]) -> None:
+        self._load()[session_key] = {
+            "id": cli_session, "model": model, "digests": history, "updated": time.time(),
+        }
+        self._save()
+
+    def drop(self, session_key: str) -> None:
+        if self._load().pop(session_key, None) is not None:
+            self._save()
@@ -0,0 +1,317 @@
+"""Pool of long-lived Claude CLI workers for the OAuth provider.
+
+Spawning ``claude -p`` costs seconds of Node start-up and hundreds of MB
+of RSS per call.  A worker instead runs the CLI once with
+``--input-format stream-json`` and feeds it one user message per turn,
+reading stream-json events until the turn's ``result`` event.
+
+Workers are leased per session: the CLI keeps the conversation, so a
+session whose history still extends the worker's transcript only sends
+the new messages.  Anything else (compaction, ``/clear``, a different
+model) restarts the worker and resends the full prompt.
+
+The pool caps the number of processes.  When it is full, a new session
+takes over the least recently used idle worker, or queues until one is
+released.  Workers are retired when their process has died, after
+``max_turns`` turns, when their RSS exceeds ``max_rss_mb``, and after
+``idle_timeout`` seconds unused.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.anthropic_oauth import CLITurn, read_turn
+from nanobot.providers.base import MessageCallback, ProgressCallback
+
+
+class ClaudeWorker:
+    """One ``claude`` process in stream-json input mode, bound to a session."""
+
+    def __init__(self, session_key: str, model: str, args: list[str], env: dict[str, str], mcp: bool = False):
+        self.session_key = session_key
+        self.model = model
+        self.args = args
+        self.env = env
+        self.mcp = mcp
+        self.proc: asyncio.subprocess.Process | None = None
+        self.busy = False
+        self.turns = 0
+        self.transcript: list[str] = []  # Rendered non-system messages the CLI has seen
+        self.last_used = time.monotonic()
+        # Callbacks of the call currently using this worker (MCP bridge targets)
+        self.message_callback: MessageCallback | None = None
+        self.progress_callback: ProgressCallback | None = None
+        self._stderr: deque[str] = deque(maxlen=20)
+        self._stderr_task: asyncio.Task | None = None
+        self._bridge = None
+        self._token = ""
+        self._mcp_config: str | None = None  # Inline --mcp-config JSON for this worker's bridge token
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    @property
+    def stderr(self) -> str:
+        return "\n".join(self._stderr)
+
+    def rss_mb(self) -> float | None:
+        """Resident memory of the CLI process (Linux only)."""
+        if self.proc is None:
+            return None
+        try:
+            with open(f"/proc/{self.proc.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        return None
+
+    async def start(self) -> None:
+        args = list(self.args)
+        if self.mcp and self._mcp_config is None:
+            try:
+                await self._register_mcp()
+            except Exception as e:
+                logger.warning(f"Failed to start MCP bridge: {e}")
+        if self._mcp_config:
+            args.extend(["--mcp-config", self._mcp_config])
+
+        self.proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self.env,
+            limit=2 * 1024 * 1024,  # 2MB — CLI can emit large JSON lines
+        )
+        self._stderr.clear()
+        self._stderr_task = asyncio.create_task(self._drain_stderr(self.proc))
+        self.turns = 0
+        self.transcript = []
+        logger.debug(f"Claude worker for {self.session_key} started (pid {self.proc.pid})")
+
+    async def _register_mcp(self) -> None:
+        from nanobot.mcp.listener import get_bridge
+
+        async def send_message(content: str, media: list[str]) -> None:
+            if not self.message_callback:
+                raise RuntimeError("No message callback configured")
+            await self.message_callback(content, media)
+
+        async def send_progress(text: str) -> None:
+            if self.progress_callback:
+                await self.progress_callback(text)
+
+        self._bridge = await get_bridge()
+        self._token = self._bridge.register(send_message, send_progress)
+        self._mcp_config = json.dumps(self._bridge.mcp_config(self._token))
+
+    async def _drain_stderr(self, proc: asyncio.subprocess.Process) -> None:
+        try:
+            async for line in proc.stderr:
+                self._stderr.append(line.decode("utf-8", errors="replace").rstrip())
+        except Exception:
+            pass
+
+    async def run(self, prompt: str, progress_cb: ProgressCallback | None) -> CLITurn:
+        """Send one user message and read events until its ``result``."""
+        event = {"type": "user", "message": {"role": "user", "content": prompt}}
+        self.proc.stdin.write((json.dumps(event) + "\n").encode())
+        await self.proc.stdin.drain()
+        turn = await read_turn(self.proc.stdout, progress_cb)
+        self.turns += 1
+        return turn
+
+    async def stop(self) -> None:
+        proc, self.proc = self.proc, None
+        if proc is not None and proc.returncode is None:
+            try:
+                proc.stdin.close()
+                await asyncio.wait_for(proc.wait(), timeout=5)
+            except Exception:
+                proc.kill()
+                await proc.wait()
+        if self._stderr_task:
+            self._stderr_task.cancel()
+            self._stderr_task = None
+
+    async def restart(self, args: list[str] | None = None) -> None:
+        await self.stop()
+        if args is not None:
+            self.args = args
+        await self.start()
+
+    async def close(self) -> None:
+        await self.stop()
+        if self._bridge is not None:
+            await self._bridge.unregister(self._token)
+            self._bridge = self._mcp_config = None
+        logger.debug(f"Claude worker for {self.session_key} closed")
+
+
+class ClaudeWorkerPool:
+    """Caps, leases, recycles and reaps ``ClaudeWorker`` processes."""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_turns: int = 50,
+        max_rss_mb: int = 1024,
+        idle_timeout: float = 600.0,
+    ):
+        self.max_workers = max_workers
+        self.max_turns = max_turns
+        self.max_rss_mb = max_rss_mb
+        self.idle_timeout = idle_timeout
+        self._workers: dict[str, ClaudeWorker] = {}
+        self._cond = asyncio.Condition()
+        self._queued = 0
+        self.spawned = 0
+        self.recycled = 0
+
+    def _retire_reason(self, worker: ClaudeWorker) -> str | None:
+        if not worker.alive:
+            return "exited"
+        if self.max_turns and worker.turns >= self.max_turns:
+            return f"{worker.turns} turns"
+        rss = worker.rss_mb()
+        if self.max_rss_mb and rss is not None and rss > self.max_rss_mb:
+            return f"RSS {rss:.0f}MB"
+        return None
+
+    def _claim(
+        self, session_key: str, model: str, mcp: bool,
+    ) -> tuple[ClaudeWorker | None, ClaudeWorker | None]:
+        """Under the lock: (worker to use, worker to close); (None, None) means wait."""
+        worker = self._workers.get(session_key)
+        if worker is not None:
+            if worker.busy:
+                return None, None  # Same session already mid-turn
+            if worker.model != model or (mcp and not worker.mcp):
+                del self._workers[session_key]
+                return None, worker
+            worker.busy = True
+            return worker, None
+
+        if len(self._workers) < self.max_workers:
+            worker = ClaudeWorker(session_key, model, [], {})
+            worker.busy = True
+            self._workers[session_key] = worker
+            return worker, None
+
+        idle = [w for w in self._workers.values() if not w.busy]
+        if idle:
+            victim = min(idle, key=lambda w: w.last_used)
+            del self._workers[victim.session_key]
+            return None, victim
+        return None, None
+
+    def _expired(self) -> list[ClaudeWorker]:
+        """Under the lock: detach idle workers past their timeout."""
+        now = time.monotonic()
+        expired = [
+            w for w in self._workers.values()
+            if not w.busy and self.idle_timeout and now - w.last_used > self.idle_timeout
+        ]
+        for w in expired:
+            del self._workers[w.session_key]
+        return expired
+
+    async def acquire(
+        self,
+        session_key: str,
+        model: str,
+        args: list[str],
+        env: dict[str, str],
+        mcp: bool = False,
+        progress_cb: ProgressCallback | None = None,
+    ) -> ClaudeWorker:
+        """Lease the session's worker, starting one (or waiting for a slot) if needed."""
+        queued = False
+        try:
+            while True:
+                async with self._cond:
+                    stale = self._expired()
+                    worker, evicted = self._claim(session_key, model, mcp)
+                    if worker is None and evicted is None and queued and not stale:
+                        await self._cond.wait()
+                        continue
+                for w in [*stale, *([evicted] if evicted else [])]:
+                    await w.close()
+                if worker is not None:
+                    break
+                if evicted is not None or stale:
+                    continue
+                queued = True
+                self._queued += 1
+                logger.info(f"All {self.max_workers} Claude workers busy; {session_key} queued")
+                if progress_cb:
+                    try:
+                        await progress_cb(f"⏳ Waiting for a free Claude worker (#{self._queued} in queue)")
+                    except Exception:
+                        pass
+        finally:
+            if queued:
+                self._queued -= 1
+
+        try:
+            if worker.proc is None:
+                worker.args, worker.env, worker.mcp = args, env, mcp
+                await worker.start()
+                self.spawned += 1
+        except BaseException:
+            await self.release(worker, healthy=False)
+            raise
+        return worker
+
+    async def release(self, worker: ClaudeWorker, healthy: bool = True) -> None:
+        """Return a leased worker; unhealthy or worn-out workers are closed."""
+        reason = "interrupted" if not healthy else self._retire_reason(worker)
+        async with self._cond:
+            worker.busy = False
+            worker.last_used = time.monotonic()
+            if reason and self._workers.get(worker.session_key) is worker:
+                del self._workers[worker.session_key]
+            self._cond.notify_all()
+        if reason:
+            self.recycled += 1
+            logger.info(f"Recycling Claude worker for {worker.session_key} ({reason})")
+            await worker.close()
+
+    @asynccontextmanager
+    async def lease(self, session_key: str, model: str, args: list[str], env: dict[str, str], mcp: bool = False,
+                    progress_cb: ProgressCallback | None = None) -> AsyncIterator[ClaudeWorker]:
+        worker = await self.acquire(session_key, model, args, env, mcp, progress_cb)
+        healthy = False
+        try:
+            yield worker
+            healthy = True
+        finally:
+            worker.message_callback = worker.progress_callback = None
+            await self.release(worker, healthy=healthy)
+
+    async def close(self) -> None:
+        async with self._cond:
+            workers = list(self._workers.values())
+            self._workers.clear()
+            self._cond.notify_all()
+        for w in workers:
+            await w.close()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "busy": sum(w.busy for w in self._workers.values()),
+            "queued": self._queued,
+            "spawned": self.spawned,
+            "recycled": self.recycled,
+        }
@@ -2,12 +2,17 @@
 
 import os
 import shutil
+from typing import TYPE_CHECKING
 
-from nanobot.config.schema import Config
-from nanobot.providers.base import LLMProvider
+from nanobot.providers.base import LLMProvider, innermost
 
+if TYPE_CHECKING:
+    from nanobot.config.schema import Config
+    from nanobot.providers.claude_sessions import ClaudeSessionStore
+    from nanobot.providers.claude_workers import ClaudeWorkerPool
 
-def make_provider(config: Config, model: str | None = None, mode: str | None = None) -> LLMProvider:
+
+def make_provider(config: "Config", model: str | None = None, mode: str | None = None) -> LLMProvider:
     """Create the right LLM provider for a given model and mode.
 
     This is the single source of truth for provider creation.
@@ -25,7 +30,59 @@ def make_provider(config: Config, model: str | None = None, mode: str | None = N
         ValueError: If required credentials are missing.
     """
     model = model or config.agents.defaults.model
+    provider = _make_base_provider(config, model, mode)
+
+    res_cfg = config.agents.resilience
+    if res_cfg.enabled:
+        from nanobot.providers.resilient import ResilientProvider
+
+        aliases = config.agents.model_aliases
+        fallbacks = {
+            (aliases[key].model if key in aliases else key): names
+            for key, names in res_cfg.fallbacks.items()
+        }
+
+        def resolve(name: str) -> tuple[str, LLMProvider]:
+            alias = aliases.get(name)
+            fb_model, fb_mode = (alias.model, alias.mode) if alias else (name, None)
+            return fb_model, _make_base_provider(config, fb_model, fb_mode)
+
+        provider = ResilientProvider(
+            provider,
+            fallbacks=fallbacks,
+            resolve=resolve,
+            max_retries=res_cfg.max_retries,
+            backoff_base=res_cfg.backoff_base,
+            backoff_max=res_cfg.backoff_max,
+            hedge=res_cfg.hedge,
+            hedge_min_delay=res_cfg.hedge_min_delay,
+            breaker_failures=res_cfg.breaker_failures,
+            breaker_cooldown=res_cfg.breaker_cooldown,
+            # The CLI runs side-effecting tools (send_message); never call it twice
+            replayable=lambda p: mode_of(p) == "api",
+        )
 
+    # Outermost, so a hit skips retries and fallbacks entirely.  The OAuth
+    # CLI runs its own tools, so only API providers are cached.
+    cache_cfg = config.agents.llm_cache
+    if cache_cfg.enabled and mode_of(provider) == "api":
+        from pathlib import Path
+
+        from nanobot.providers.cache import CachingProvider
+        from nanobot.utils.helpers import get_data_path
+        provider = CachingProvider(
+            provider,
+            Path(cache_cfg.dir).expanduser() if cache_cfg.dir else get_data_path() / "cache" / "llm",
+            max_bytes=cache_cfg.max_mb * 1024 * 1024,
+            ttl=cache_cfg.ttl,
+            classes=cache_cfg.classes,
+            temperature_zero=cache_cfg.temperature_zero,
+        )
+    return provider
+
+
+def _make_base_provider(config: "Config", model: str, mode: str | None) -> LLMProvider:
+    """The bare provider for *model*, without retry or cache layers."""
     # Auto-detect mode if not specified
     if mode is None:
         oauth_token = (
@@ -48,6 +105,8 @@ def make_provider(config: Config, model: str | None = None, mode: str | None = N
             oauth_token=oauth_token,
             default_model=model,
             claude_bin=claude_bin,
+            workers=_claude_workers(config),
+            sessions=_claude_sessions(config),
         )
 
     # API key mode — use LiteLLM
@@ -57,9 +116,63 @@ def make_provider(config: Config, model: str | None = None, mode: str | None = N
     if not provider_cfg or (not provider_cfg.api_key and not model.startswith("bedrock/")):
         raise ValueError(f"No API key configured for model `{model}`")
 
+    key_pool = None
+    if provider_cfg.api_keys or provider_cfg.rpm or provider_cfg.tpm:
+        from nanobot.providers.keypool import KeyPool
+        name = next(
+            (n for n, p in config.providers if p is provider_cfg), "llm",
+        )
+        keys = [k for k in [provider_cfg.api_key, *provider_cfg.api_keys] if k]
+        if keys:
+            key_pool = KeyPool(name, keys, rpm=provider_cfg.rpm, tpm=provider_cfg.tpm)
+
     return LiteLLMProvider(
         api_key=provider_cfg.api_key if provider_cfg else None,
         api_base=config.get_api_base(model),
         default_model=model,
         extra_headers=provider_cfg.extra_headers if provider_cfg else None,
+        key_pool=key_pool,
     )
+
+
+_worker_pool: "ClaudeWorkerPool | None" = None
+
+
+def _claude_workers(config: "Config") -> "ClaudeWorkerPool | None":
+    """The process-wide CLI worker pool, shared by every OAuth provider (model switches included)."""
+    global _worker_pool
+    cfg = config.agents.claude_workers
+    if not cfg.enabled:
+        return None
+    if _worker_pool is None:
+        from nanobot.providers.claude_workers import ClaudeWorkerPool
+        _worker_pool = ClaudeWorkerPool(
+            max_workers=cfg.max_workers,
+            max_turns=cfg.max_turns,
+            max_rss_mb=cfg.max_rss_mb,
+            idle_timeout=cfg.idle_timeout,
+        )
+    return _worker_pool
+
+
+_session_store: "ClaudeSessionStore | None" = None
+
+
+def _claude_sessions(config: "Config") -> "ClaudeSessionStore | None":
+    """The process-wide nanobot → CLI session map (one writer for the file)."""
+    global _session_store
+    cfg = config.agents.claude_resume
+    if not cfg.enabled:
+        return None
+    if _session_store is None:
+        from nanobot.providers.claude_sessions import ClaudeSessionStore
+        from nanobot.utils.helpers import get_data_path
+        _session_store = ClaudeSessionStore(
+            get_data_path() / "claude_sessions.json", max_sessions=cfg.max_sessions,
+        )
+    return _session_store
+
+
+def mode_of(provider: LLMProvider) -> str:
+    """"oauth" if *provider* (under any wrappers) is the Claude CLI, else "api"."""
+    return "oauth" if type(innermost(provider)).__name__ == "AnthropicOAuthProvider" else "api"
@@ -0,0 +1,226 @@
+"""Client-side rate-limit governor for pools of API keys.
+
+A ``KeyPool`` hands out one key per request.  Each key has optional
+requests-per-minute and tokens-per-minute token buckets, a count of
+requests in flight, the remaining quota last reported by the provider's
+``x-ratelimit-*`` response headers, and a cooldown set when the provider
+answers 429.  ``lease()`` picks the least-loaded healthy key that has
+budget, or waits for the first one that will.
+
+Key state is process-wide and indexed by the key itself, so the LLM path
+(``LiteLLMProvider``) and terminal micro-agents leasing the same key
+share one budget.
+"""
+
+import asyncio
+import re
+import time
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+
+from nanobot.telemetry.metrics import LLM_KEY_COOLDOWNS
+from nanobot.utils.ratelimit import TokenBucket
+
+
+@dataclass
+class KeyState:
+    key: str
+    requests: TokenBucket | None = None  # RPM budget
+    tokens: TokenBucket | None = None  # TPM budget
+    in_flight: int = 0
+    cooldown_until: float = 0.0
+    remaining_requests: int | None = None  # From the provider's headers
+    remaining_tokens: int | None = None
+    rate_limited: int = 0
+    leases: int = 0
+
+    @property
+    def cooling(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+    def headroom(self) -> float:
+        """Fraction of the tightest known budget still available (1.0 = unknown/full)."""
+        fractions = [1.0]
+        if self.requests:
+            fractions.append(self.requests.available / self.requests.burst)
+        if self.tokens:
+            fractions.append(self.tokens.available / self.tokens.burst)
+        if self.remaining_requests is not None and self.remaining_requests <= 0:
+            fractions.append(0.0)
+        if self.remaining_tokens is not None and self.remaining_tokens <= 0:
+            fractions.append(0.0)
+        return min(fractions)
+
+    def try_take(self, tokens: int) -> bool:
+        if self.cooling:
+            return False
+        if self.requests and self.requests.available < 1:
+            return False
+        if self.tokens and tokens and self.tokens.available < min(tokens, self.tokens.burst):
+            return False
+        if self.requests:
+            self.requests.consume(1)
+        if self.tokens and tokens:
+            self.tokens.consume(tokens)
+        return True
+
+
+_STATES: dict[str, KeyState] = {}
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s|)")
+
+
+def _state(key: str, rpm: int, tpm: int) -> KeyState:
+    state = _STATES.get(key)
+    if state is None:
+        state = _STATES[key] = KeyState(key)
+    if rpm and (state.requests is None or state.requests.burst != rpm):
+        state.requests = TokenBucket(rate=rpm / 60, burst=rpm)
+    if tpm and (state.tokens is None or state.tokens.burst != tpm):
+        state.tokens = TokenBucket(rate=tpm / 60, burst=tpm)
+    return state
+
+
+def _mask(key: str) -> str:
+    return f"…{key[-4:]}" if len(key) > 8 else "…"
+
+
+@dataclass
+class KeyLease:
+    """One request's claim on a key; ``report()`` the outcome before releasing it."""
+    pool: "KeyPool"
+    state: KeyState
+    estimated_tokens: int = 0
+
+    @property
+    def key(self) -> str:
+        return self.state.key
+
+    def report(
+        self,
+        usage: Mapping[str, Any] | None = None,
+        headers: Mapping[str, Any] | None = None,
+        rate_limited: bool = False,
+        retry_after: float | None = None,
+    ) -> None:
+        """Feed back actual token use, rate-limit headers, and 429s."""
+        state = self.state
+        if usage and state.tokens:
+            actual = int(usage.get("total_tokens") or 0)
+            if actual > self.estimated_tokens:
+                state.tokens.consume(actual - self.estimated_tokens)
+        if headers:
+            self.pool.apply_headers(state, headers)
+        if rate_limited:
+            self.pool.cool_down(state, retry_after)
+
+
+class KeyPool:
+    """Routes requests across a provider's API keys."""
+
+    def __init__(self, name: str, keys: list[str], rpm: int = 0, tpm: int = 0, cooldown: float = 30.0):
+        if not keys:
+            raise ValueError("KeyPool needs at least one key")
+        self.name = name
+        self.cooldown = cooldown
+        self.states = [_state(k, rpm, tpm) for k in dict.fromkeys(keys)]
+
+    @property
+    def keys(self) -> list[str]:
+        return [s.key for s in self.states]
+
+    def _pick(self, tokens: int) -> KeyState | None:
+        ranked = sorted(self.states, key=lambda s: (s.in_flight, -s.headroom()))
+        return next((s for s in ranked if s.try_take(tokens)), None)
+
+    def _next_ready_in(self, tokens: int) -> float:
+        """Seconds until some key could plausibly accept *tokens* (a polling hint)."""
+        waits = []
+        for s in self.states:
+            wait = max(0.0, s.cooldown_until - time.monotonic())
+            if s.requests and s.requests.available < 1:
+                wait = max(wait, (1 - s.requests.available) / s.requests.rate)
+            if s.tokens and tokens:
+                need = min(tokens, s.tokens.burst) - s.tokens.available
+                if need > 0:
+                    wait = max(wait, need / s.tokens.rate)
+            waits.append(wait)
+        return min(waits)
+
+    async def acquire(self, tokens: int = 0) -> KeyLease:
+        """Wait for a key with budget for one request of about *tokens* tokens."""
+        while True:
+            state = self._pick(tokens)
+            if state is not None:
+                state.in_flight += 1
+                state.leases += 1
+                return KeyLease(self, state, tokens)
+            await asyncio.sleep(min(max(self._next_ready_in(tokens), 0.05), 5.0))
+
+    def release(self, lease: KeyLease) -> None:
+        lease.state.in_flight = max(0, lease.state.in_flight - 1)
+
+    @asynccontextmanager
+    async def lease(self, tokens: int = 0) -> AsyncIterator[KeyLease]:
+        """``async with pool.lease(n) as lease:`` then use ``lease.key``."""
+        lease = await self.acquire(tokens)
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    def cool_down(self, state: KeyState, retry_after: float | None = None) -> None:
+        seconds = retry_after if retry_after and retry_after > 0 else self.cooldown
+        state.cooldown_until = max(state.cooldown_until, time.monotonic() + seconds)
+        state.rate_limited += 1
+        LLM_KEY_COOLDOWNS.inc(pool=self.name)
+        logger.warning(f"Key {_mask(state.key)} in {self.name} pool rate limited; cooling down {seconds:.0f}s")
+
+    def apply_headers(self, state: KeyState, headers: Mapping[str, Any]) -> None:
+        """Read ``x-ratelimit-remaining-*`` / ``-reset-*`` (OpenAI and Anthropic styles)."""
+        values = {str(k).lower().removeprefix("llm_provider-"): v for k, v in headers.items()}
+
+        def number(*names: str) -> int | None:
+            for name in names:
+                try:
+                    return int(float(values[name]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            return None
+
+        remaining_requests = number(
+            "x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining",
+        )
+        remaining_tokens = number(
+            "x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining",
+        )
+        if remaining_requests is not None:
+            state.remaining_requests = remaining_requests
+        if remaining_tokens is not None:
+            state.remaining_tokens = remaining_tokens
+        if remaining_requests == 0 or remaining_tokens == 0:
+            # Quota exhausted for this window; rest the key until it resets
+            self.cool_down(state, _reset_seconds(values))
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "key": _mask(s.key), "in_flight": s.in_flight, "leases": s.leases,
+                "cooling": s.cooling, "rate_limited": s.rate_limited,
+                "headroom": round(s.headroom(), 3),
+            }
+            for s in self.states
+        ]
+
+
+def _reset_seconds(values: Mapping[str, Any]) -> float | None:
+    """Parse OpenAI-style reset durations ("1s", "6m0s", "250ms")."""
+    raw = values.get("x-ratelimit-reset-requests") or values.get("x-ratelimit-reset-tokens")
+    if not raw:
+        return None
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "": 1}
+    total = sum(float(n) * units[u] for n, u in _DURATION.findall(str(raw)))
+    return total or None
@@ -7,6 +7,33 @@ import litellm
 from litellm import acompletion
 
 from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.keypool import KeyPool
+
+# Exception class names LiteLLM raises for transient upstream failures
+_RETRYABLE_ERRORS = {
+    "RateLimitError", "Timeout", "APITimeoutError", "APIConnectionError",
+    "InternalServerError", "ServiceUnavailableError", "BadGatewayError",
+}
+
+
+def _is_rate_limit(e: Exception) -> bool:
+    return any(cls.__name__ == "RateLimitError" for cls in type(e).__mro__) or getattr(e, "status_code", None) == 429
+
+
+def _retry_after(e: Exception) -> float | None:
+    headers = getattr(e, "litellm_response_headers", None) or getattr(getattr(e, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after")) if headers else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(e: Exception) -> bool:
+    """True for rate limits, timeouts, connection failures and 5xx responses."""
+    if any(cls.__name__ in _RETRYABLE_ERRORS for cls in type(e).__mro__):
+        return True
+    status = getattr(e, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
 
 
 class LiteLLMProvider(LLMProvider):
@@ -23,10 +50,12 @@ class LiteLLMProvider(LLMProvider):
         api_base: str | None = None,
         default_model: str = "anthropic/claude-opus-4-5",
         extra_headers: dict[str, str] | None = None,
+        key_pool: KeyPool | None = None,
     ):
         super().__init__(api_key, api_base)
         self.default_model = default_model
         self.extra_headers = extra_headers or {}
+        self.key_pool = key_pool  # Per-call key rotation; api_key stays the env default
         
         # Detect OpenRouter by api_key prefix or explicit api_base
         self.is_openrouter = (
@@ -145,15 +174,40 @@ class LiteLLMProvider(LLMProvider):
             kwargs["tool_choice"] = "auto"
         
         try:
-            response = await acompletion(**kwargs)
+            if self.key_pool is None:
+                response = await acompletion(**kwargs)
+            else:
+                response = await self._complete_pooled(kwargs)
             return self._parse_response(response)
         except Exception as e:
             # Return error as content for graceful handling
             return LLMResponse(
                 content=f"Error calling LLM: {str(e)}",
                 finish_reason="error",
+                retryable=_is_retryable(e),
             )
     
+    async def _complete_pooled(self, kwargs: dict[str, Any]) -> Any:
+        """Run one completion on the least-loaded key of the pool."""
+        import json
+        assert self.key_pool is not None
+        # Rough prompt size (4 chars/token) plus the completion allowance
+        estimate = len(json.dumps(kwargs["messages"], default=str)) // 4 + kwargs["max_tokens"]
+        async with self.key_pool.lease(estimate) as lease:
+            try:
+                response = await acompletion(**kwargs, api_key=lease.key)
+            except Exception as e:
+                if _is_rate_limit(e):
+                    lease.report(rate_limited=True, retry_after=_retry_after(e))
+                raise
+            usage = getattr(response, "usage", None)
+            hidden = getattr(response, "_hidden_params", None) or {}
+            lease.report(
+                usage={"total_tokens": usage.total_tokens} if usage else None,
+                headers=hidden.get("additional_headers"),
+            )
+            return response
+
     def _parse_response(self, response: Any) -> LLMResponse:
         """Parse LiteLLM response into our standard format."""
         choice = response.choices[0]
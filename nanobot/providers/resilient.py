@@ -0,0 +1,277 @@
+"""Retries, hedged requests, circuit breakers and model fallback chains.
+
+``ResilientProvider`` sits between the agent and the real providers.  For
+each ``chat`` call it walks a chain of (model, provider) targets: the
+requested model first, then its configured fallbacks.  For every target:
+
+- a tripped circuit breaker skips the target outright;
+- transient errors (``LLMResponse.retryable``) are retried with full-jitter
+  exponential backoff;
+- any other error, or exhausted retries, moves on to the next target.
+
+With hedging on, a request that is still running after the target's
+rolling p95 latency starts a duplicate on the next healthy target; the
+first successful answer wins and the other request is cancelled.
+
+Targets that are not *replayable* (the Claude CLI, which runs tools such
+as ``send_message`` itself) are called exactly once: no retries, no
+hedging, and a failed call only falls back when it never started
+(``LLMResponse.not_started``).
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse, WrappingProvider
+from nanobot.telemetry.metrics import LLM_RESILIENCE
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one trial through after a cooldown."""
+
+    def __init__(self, failures: int = 5, cooldown: float = 30.0):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._consecutive = 0
+        self._opened_at: float | None = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """Give up a half-open trial that ended without an outcome (e.g. cancelled)."""
+        self._trial_running = False
+
+    def success(self) -> None:
+        self._consecutive = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def failure(self) -> bool:
+        """Record a failure. Returns True if this opened the breaker."""
+        self._consecutive += 1
+        reopened = self._trial_running
+        self._trial_running = False
+        if reopened or (self._opened_at is None and self._consecutive >= self.failures):
+            self._opened_at = time.monotonic()
+            return True
+        return False
+
+
+@dataclass
+class _Target:
+    model: str
+    provider: LLMProvider
+    breaker: CircuitBreaker
+    replayable: bool = True
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    def p95(self, min_samples: int) -> float | None:
+        if len(self.latencies) < min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class ResilientProvider(WrappingProvider):
+    """Adds retries, hedging, per-model circuit breakers and fallbacks to a provider."""
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        fallbacks: dict[str, list[str]] | None = None,
+        resolve: Callable[[str], tuple[str, LLMProvider]] | None = None,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge: bool = False,
+        hedge_min_delay: float = 2.0,
+        hedge_min_samples: int = 20,
+        breaker_failures: int = 5,
+        breaker_cooldown: float = 30.0,
+        replayable: Callable[[LLMProvider], bool] | None = None,
+    ):
+        self._targets: dict[str, _Target] = {}
+        super().__init__(inner)
+        self.fallbacks = fallbacks or {}
+        self.resolve = resolve
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.replayable = replayable or (lambda provider: True)
+
+    def delegates(self) -> list[LLMProvider]:
+        providers = [self.inner]
+        for target in self._targets.values():
+            if all(target.provider is not p for p in providers):
+                providers.append(target.provider)
+        return providers
+
+    # ------------------------------------------------------------------
+    # Targets
+    # ------------------------------------------------------------------
+
+    def _target(self, model: str, provider: LLMProvider) -> _Target:
+        target = self._targets.get(model)
+        if target is None:
+            target = _Target(
+                model, provider, CircuitBreaker(self.breaker_failures, self.breaker_cooldown),
+                replayable=self.replayable(provider),
+            )
+            self._targets[model] = target
+            provider.progress_callback = self.inner.progress_callback
+            provider.message_callback = self.inner.message_callback
+        return target
+
+    def chain(self, model: str) -> list[_Target]:
+        """The requested model followed by its fallbacks (resolved lazily)."""
+        targets = [self._target(model, self.inner)]
+        names = self.fallbacks.get(model, self.fallbacks.get("*", []))
+        for name in names:
+            if self.resolve is None:
+                break
+            try:
+                fb_model, fb_provider = self.resolve(name)
+            except Exception as e:
+                logger.warning(f"Skipping LLM fallback '{name}': {e}")
+                continue
+            if fb_model == model or any(t.model == fb_model for t in targets):
+                continue
+            if fb_model in self._targets:
+                targets.append(self._targets[fb_model])
+            else:
+                targets.append(self._target(fb_model, fb_provider))
+        return targets
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _attempt(self, target: _Target, kwargs: dict[str, Any]) -> LLMResponse:
+        """One target with retries. Updates the target's breaker and latency window."""
+        response = LLMResponse(content="Error calling LLM: circuit open", finish_reason="error")
+        for attempt in range(self.max_retries + 1 if target.replayable else 1):
+            if attempt:
+                delay = self._backoff(attempt - 1)
+                LLM_RESILIENCE.inc(model=target.model, event="retry")
+                logger.warning(f"Retrying {target.model} in {delay:.1f}s (attempt {attempt + 1})")
+                await asyncio.sleep(delay)
+            started = time.monotonic()
+            try:
+                response = await target.provider.chat(model=target.model, **kwargs)
+            except BaseException:
+                # A cancelled (or crashed) half-open trial must not hold the
+                # trial slot, or the breaker would never close again
+                target.breaker.release()
+                raise
+            if response.finish_reason != "error":
+                target.latencies.append(time.monotonic() - started)
+                target.breaker.success()
+                return response
+            if target.breaker.failure():
+                LLM_RESILIENCE.inc(model=target.model, event="breaker_open")
+                logger.warning(f"Circuit opened for {target.model}")
+                break
+            if not response.retryable:
+                break
+        return response
+
+    async def _hedged(self, primary: _Target, backup: _Target | None, kwargs: dict[str, Any]) -> LLMResponse:
+        """Run *primary*; start *backup* too if primary is slower than its p95."""
+        p95 = primary.p95(self.hedge_min_samples) if backup else None
+        if p95 is None:
+            return await self._attempt(primary, kwargs)
+
+        first = asyncio.create_task(self._attempt(primary, kwargs))
+        done, _ = await asyncio.wait({first}, timeout=max(p95, self.hedge_min_delay))
+        if done or not backup.breaker.allow():
+            return await first
+
+        LLM_RESILIENCE.inc(model=primary.model, event="hedge")
+        logger.info(f"Hedging slow {primary.model} request with {backup.model}")
+        second = asyncio.create_task(self._attempt(backup, kwargs))
+        pending = {first, second}
+        response: LLMResponse | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result.finish_reason != "error":
+                        if task is second:
+                            LLM_RESILIENCE.inc(model=backup.model, event="hedge_win")
+                        return result
+                    if task is first or response is None:
+                        response = result
+            return response or await first
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        kwargs = {"messages": messages, "tools": tools, "max_tokens": max_tokens, "temperature": temperature}
+        targets = self.chain(model or self.inner.get_default_model())
+        response: LLMResponse | None = None
+        for i, target in enumerate(targets):
+            if not target.breaker.allow():
+                logger.debug(f"Circuit open for {target.model}, skipping")
+                continue
+            if i and response is not None:
+                LLM_RESILIENCE.inc(model=target.model, event="fallback")
+                logger.warning(f"Falling back to {target.model}")
+            if self.hedge and target.replayable:
+                backup = next((t for t in targets[i + 1:] if t.breaker.state == "closed" and t.replayable), None)
+                response = await self._hedged(target, backup, kwargs)
+            else:
+                response = await self._attempt(target, kwargs)
+            if response.finish_reason != "error":
+                return response
+            if not target.replayable and not response.not_started:
+                return response  # It may have run tools already
+        return response or LLMResponse(
+            content="Error calling LLM: all models are unavailable (circuit open)",
+            finish_reason="error",
+        )
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {
+            model: {"breaker": t.breaker.state, "p95": t.p95(1), "samples": len(t.latencies)}
+            for model, t in self._targets.items()
+        }
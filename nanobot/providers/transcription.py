@@ -1,5 +1,6 @@
 """Voice transcription provider using Groq."""
 
+import asyncio
 import os
 from pathlib import Path
 from typing import Any
@@ -7,59 +8,107 @@ from typing import Any
 import httpx
 from loguru import logger
 
+from nanobot.media.processing import MediaProcessor
+from nanobot.utils.cache import DiskCache, cache_key
+from nanobot.utils.helpers import get_data_path
+
 
 class GroqTranscriptionProvider:
     """
     Voice transcription provider using Groq's Whisper API.
-    
+
     Groq offers extremely fast transcription with a generous free tier.
+
+    Audio is first downmixed to 16 kHz mono Opus (small uploads, well under
+    the API's size limit).  Recordings longer than ``chunk_seconds`` are
+    split on silence and the pieces transcribed concurrently over one
+    shared HTTP client, then joined.  Transcripts are cached by the
+    SHA-256 of the original audio.
     """
-    
-    def __init__(self, api_key: str | None = None):
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        media: MediaProcessor | None = None,
+        cache: DiskCache | None = None,
+        model: str = "whisper-large-v3",
+        chunk_seconds: int = 600,
+        max_concurrency: int = 4,
+    ):
         self.api_key = api_key or os.environ.get("GROQ_API_KEY")
         self.api_url = "https://api.groq.com/openai/v1/audio/transcriptions"
-    
+        self.media = media or MediaProcessor()
+        self.cache = cache or DiskCache(get_data_path() / "cache" / "transcripts", max_bytes=32 * 1024 * 1024)
+        self.model = model
+        self.chunk_seconds = chunk_seconds
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._client: httpx.AsyncClient | None = None
+
     async def transcribe(self, file_path: str | Path) -> str:
         """
         Transcribe an audio file using Groq.
-        
+
         Args:
             file_path: Path to the audio file.
-            
+
         Returns:
             Transcribed text.
         """
         if not self.api_key:
             logger.warning("Groq API key not configured for transcription")
             return ""
-        
+
         path = Path(file_path)
         if not path.exists():
             logger.error(f"Audio file not found: {file_path}")
             return ""
-        
-        try:
-            async with httpx.AsyncClient() as client:
+
+        key = cache_key("transcript", self.model, await self.media.content_hash(path))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached.get("text", "")
+
+        # Fall back to the original file when ffmpeg is unavailable
+        prepared = await self.media.prepare_audio(path) or path
+        pieces = [prepared]
+        if prepared is not path:
+            pieces = await self.media.split_audio(prepared, self.chunk_seconds)
+
+        texts = await asyncio.gather(*(self._transcribe_file(p) for p in pieces))
+        if any(t is None for t in texts):
+            return ""
+        text = " ".join(t.strip() for t in texts if t and t.strip())
+        if len(pieces) > 1:
+            logger.info(f"Transcribed {path.name} in {len(pieces)} pieces")
+        self.cache.set(key, {"text": text})
+        return text
+
+    async def _transcribe_file(self, path: Path) -> str | None:
+        """Upload one file to the API. None on failure."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=60.0)
+        async with self._slots:
+            try:
                 with open(path, "rb") as f:
-                    files = {
+                    files: dict[str, Any] = {
                         "file": (path.name, f),
-                        "model": (None, "whisper-large-v3"),
+                        "model": (None, self.model),
                     }
                     headers = {
                         "Authorization": f"Bearer {self.api_key}",
                     }
-                    
-                    response = await client.post(
-                        self.api_url,
-                        headers=headers,
-                        files=files,
-                        timeout=60.0
-                    )
-                    
+
+                    response = await self._client.post(self.api_url, headers=headers, files=files)
+
                     response.raise_for_status()
                     data = response.json()
                     return data.get("text", "")
-                    
-        except Exception as e:
-            logger.error(f"Groq transcription error: {e}")
-            return ""
+
+            except Exception as e:
+                logger.error(f"Groq transcription error: {e}")
+                return None
+
+    async def close(self) -> None:
+        if self._client:
+            await self._client.aclose()
+            self._client = None
@@ -6,6 +6,7 @@ from pathlib import Path
 import aiosqlite
 from loguru import logger
 
+from nanobot.telemetry.metrics import CREDIT_DEDUCTIONS
 from nanobot.utils.helpers import ensure_dir
 
 
@@ -107,6 +108,7 @@ class CreditStore:
             )
             row = await cursor.fetchone()
             if not row or row[0] <= 0:
+                CREDIT_DEDUCTIONS.inc(channel=channel, result="insufficient")
                 return False
 
             await self._db.execute(
@@ -120,6 +122,7 @@ class CreditStore:
                 (chat_id, channel),
             )
             await self._db.commit()
+            CREDIT_DEDUCTIONS.inc(channel=channel, result="ok")
             return True
 
     async def add_credits(
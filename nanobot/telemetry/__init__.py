@@ -0,0 +1,5 @@
+"""Runtime telemetry: Prometheus metrics and per-message tracing."""
+
+from nanobot.telemetry.metrics import REGISTRY, Counter, Gauge, Histogram, MetricsRegistry
+
+__all__ = ["REGISTRY", "Counter", "Gauge", "Histogram", "MetricsRegistry"]
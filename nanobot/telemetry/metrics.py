@@ -0,0 +1,336 @@
+"""Minimal Prometheus-compatible metrics (text exposition format 0.0.4).
+
+Dependency-free on purpose: a handful of counters, gauges and histograms
+instrumented at choke points (tool registry, LLM calls, bus, cron,
+compaction, credits) and rendered by the gateway's ``/metrics`` endpoint.
+
+Gauges whose value lives elsewhere (queue depth, running tasks) are
+registered with a callback that is evaluated at scrape time, so the hot
+path never has to update them.
+"""
+
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, set directly or read from a callback at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._callbacks: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float], **labels: Any) -> None:
+        """Read the value from *fn* whenever metrics are scraped."""
+        with self._lock:
+            self._callbacks[self._key(labels)] = fn
+
+    def get(self, **labels: Any) -> float:
+        key = self._key(labels)
+        fn = self._callbacks.get(key)
+        return fn() if fn else self._values.get(key, 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+            callbacks = dict(self._callbacks)
+        for key, fn in callbacks.items():
+            try:
+                values[key] = float(fn())
+            except Exception:
+                continue  # A broken callback must not break the scrape
+        return [
+            f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}"
+            for k, v in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (typically seconds)."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (bucket counts, sum, count)
+        self._values: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, n = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, n + 1)
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the wall time of the ``with`` block."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s, n)) for k, (c, s, n) in self._values.items())
+        lines = []
+        for key, (counts, total, n) in items:
+            for bound, count in zip(self.buckets, counts):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, inf)} {n}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {n}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics by name and renders them for scraping."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Metric {metric.name} already registered with a different shape")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# --- LLM -------------------------------------------------------------------
+LLM_LATENCY = REGISTRY.histogram(
+    "nanobot_llm_request_seconds", "LLM chat call latency.", ("model",),
+)
+LLM_ERRORS = REGISTRY.counter(
+    "nanobot_llm_errors_total", "LLM calls that returned an error.", ("model",),
+)
+LLM_RESILIENCE = REGISTRY.counter(
+    "nanobot_llm_resilience_events_total",
+    "Retries, hedges, hedge wins, fallbacks and circuit-breaker trips by model.", ("model", "event"),
+)
+LLM_KEY_COOLDOWNS = REGISTRY.counter(
+    "nanobot_llm_key_cooldowns_total", "API keys rested after a 429 or an exhausted quota.", ("pool",),
+)
+LLM_CACHE_LOOKUPS = REGISTRY.counter(
+    "nanobot_llm_cache_lookups_total", "Cacheable LLM calls by outcome (hit or miss).", ("outcome",),
+)
+CLI_PROMPT_BYTES = REGISTRY.counter(
+    "nanobot_cli_prompt_bytes_total",
+    "Prompt bytes piped to the Claude CLI (sent) and not resent thanks to continuation (saved).",
+    ("kind",),
+)
+CLI_TURN_SECONDS = REGISTRY.histogram(
+    "nanobot_cli_turn_seconds", "Claude CLI turn latency by prompt mode (full or continued).", ("mode",),
+)
+
+# --- Tools -----------------------------------------------------------------
+TOOL_LATENCY = REGISTRY.histogram(
+    "nanobot_tool_seconds", "Tool execution latency.", ("tool",),
+)
+TOOL_CALLS = REGISTRY.counter(
+    "nanobot_tool_calls_total", "Tool calls by outcome (ok or error).", ("tool", "status"),
+)
+WEB_CACHE_LOOKUPS = REGISTRY.counter(
+    "nanobot_web_cache_lookups_total", "web_fetch / web_search cache lookups by outcome.",
+    ("tool", "outcome"),
+)
+MEDIA_JOBS = REGISTRY.counter(
+    "nanobot_media_jobs_total",
+    "Media processing jobs by kind (probe, video, image) and outcome (hit, done, failed).",
+    ("kind", "outcome"),
+)
+MEDIA_STORE_OPS = REGISTRY.counter(
+    "nanobot_media_store_ops_total",
+    "Inbound media store operations (stored, deduplicated, evicted).",
+    ("op",),
+)
+MEDIA_SENDS = REGISTRY.counter(
+    "nanobot_channel_media_sends_total",
+    "Outbound media by channel and transfer (upload, file_id reuse, or stale_file_id rejected).",
+    ("channel", "via"),
+)
+CHANNEL_INGEST_SECONDS = REGISTRY.histogram(
+    "nanobot_channel_ingest_seconds",
+    "Time from receiving a chat update to publishing it on the bus, by message kind.",
+    ("channel", "kind"),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 180),
+)
+CHANNEL_INGEST_PENDING = REGISTRY.gauge(
+    "nanobot_channel_ingest_pending", "Inbound updates received but not yet published.", ("channel",),
+)
+TELEGRAM_WEBHOOK_UPDATES = REGISTRY.counter(
+    "nanobot_telegram_webhook_updates_total",
+    "Telegram webhook requests by outcome (accepted, duplicate, rejected, forbidden, invalid).",
+    ("outcome",),
+)
+CHANNEL_SEND_WAIT_SECONDS = REGISTRY.histogram(
+    "nanobot_channel_send_wait_seconds",
+    "Time an outbound API call waited for rate-limit tokens, by priority (final or progress).",
+    ("channel", "priority"),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+CHANNEL_SEND_JOBS = REGISTRY.counter(
+    "nanobot_channel_send_jobs_total",
+    "Outbound send jobs by outcome (sent, coalesced, superseded, flood_wait).",
+    ("channel", "outcome"),
+)
+
+# --- Agent -----------------------------------------------------------------
+BUS_DEPTH = REGISTRY.gauge(
+    "nanobot_bus_queue_depth", "Messages waiting in the message bus.", ("direction",),
+)
+ACTIVE_SESSIONS = REGISTRY.gauge(
+    "nanobot_active_sessions", "Sessions with a message currently being processed.",
+)
+SUBAGENTS_RUNNING = REGISTRY.gauge(
+    "nanobot_subagents_running", "Background subagents currently running.",
+)
+PROCESSES = REGISTRY.gauge(
+    "nanobot_processes", "Exec/terminal subprocesses by state (running or waiting).", ("state",),
+)
+COMPACTIONS = REGISTRY.counter(
+    "nanobot_compactions_total", "Session compactions performed.",
+)
+COMPACTED_MESSAGES = REGISTRY.counter(
+    "nanobot_compacted_messages_total", "Messages archived by session compaction.",
+)
+
+# --- Scheduling and billing --------------------------------------------------
+CRON_LAG = REGISTRY.histogram(
+    "nanobot_cron_lag_seconds", "Delay between a cron job's scheduled and actual start.",
+    buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600),
+)
+CRON_RUNS = REGISTRY.counter(
+    "nanobot_cron_runs_total", "Cron job executions by outcome.", ("status",),
+)
+CREDIT_DEDUCTIONS = REGISTRY.counter(
+    "nanobot_credit_deductions_total", "Credit deductions by result (ok or insufficient).",
+    ("channel", "result"),
+)
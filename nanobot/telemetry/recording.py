@@ -0,0 +1,156 @@
+"""Turn recording for offline replay (see ``nanobot.bench.replay``).
+
+While a turn is recorded, ``run_tool_loop`` reports every
+``provider.chat`` request/response and every tool result to the active
+``TurnRecorder`` (a ContextVar, so concurrent sessions never mix).  When
+the turn finishes, one JSON line is appended to
+``<dir>/recording-YYYY-MM-DD.jsonl`` holding the inbound message, the
+session state it started from, the context that was built, each LLM
+call and each tool result.
+
+Recordings contain full conversation content: keep them off by default
+and treat the directory like the sessions directory.
+"""
+
+import json
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.extensions.compaction import estimate_messages_tokens
+from nanobot.utils.helpers import ensure_dir
+
+FORMAT_VERSION = 1
+
+_current: ContextVar["TurnRecorder | None"] = ContextVar("nanobot_turn_recorder", default=None)
+
+
+def _snapshot(value: Any) -> Any:
+    """Deep copy through JSON so later mutation can't change the record."""
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
+
+
+class TurnRecorder:
+    """Collects the provider and tool I/O of one turn."""
+
+    def __init__(
+        self,
+        session_key: str,
+        channel: str,
+        chat_id: str,
+        content: str,
+        media: list[str],
+        session_messages: list[dict[str, Any]],
+        session_metadata: dict[str, Any],
+    ):
+        self.started = time.time()
+        self.record: dict[str, Any] = {
+            "version": FORMAT_VERSION,
+            "recordedAt": datetime.now().isoformat(timespec="seconds"),
+            "sessionKey": session_key,
+            "channel": channel,
+            "chatId": chat_id,
+            "content": content,
+            "media": list(media),
+            "session": {
+                "messages": _snapshot(session_messages),
+                "metadata": _snapshot(session_metadata),
+            },
+            "context": None,  # Messages of the first provider.chat request
+            "calls": [],
+            "tools": [],
+            "final": None,
+        }
+
+    def record_chat(
+        self, messages: list[dict[str, Any]], model: str, response: Any, elapsed: float,
+    ) -> None:
+        if self.record["context"] is None:
+            self.record["context"] = _snapshot(messages)
+        self.record["calls"].append({
+            "model": model,
+            "messageCount": len(messages),
+            "promptTokensEst": estimate_messages_tokens(messages),
+            "elapsedMs": round(elapsed * 1000, 2),
+            "response": {
+                "content": response.content,
+                "toolCalls": [
+                    {
+                        "id": tc.id, "name": tc.name, "arguments": _snapshot(tc.arguments),
+                        "providerSpecificFields": _snapshot(tc.provider_specific_fields),
+                    }
+                    for tc in response.tool_calls
+                ],
+                "finishReason": response.finish_reason,
+                "usage": dict(response.usage),
+            },
+        })
+
+    def record_tool(self, name: str, arguments: dict[str, Any], result: str, elapsed: float) -> None:
+        self.record["tools"].append({
+            "name": name,
+            "arguments": _snapshot(arguments),
+            "result": result,
+            "elapsedMs": round(elapsed * 1000, 2),
+        })
+
+    def finish(self, final: str | None) -> dict[str, Any]:
+        self.record["final"] = final
+        self.record["elapsedMs"] = round((time.time() - self.started) * 1000, 2)
+        return self.record
+
+
+class RecordingWriter:
+    """Appends finished turns to a daily JSONL file."""
+
+    def __init__(self, directory: Path):
+        self.directory = ensure_dir(directory)
+
+    def write(self, record: dict[str, Any]) -> None:
+        path = self.directory / f"recording-{datetime.now():%Y-%m-%d}.jsonl"
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write turn recording to {path}: {e}")
+
+
+def current_recorder() -> TurnRecorder | None:
+    return _current.get()
+
+
+@contextmanager
+def recording(recorder: TurnRecorder | None) -> Iterator[TurnRecorder | None]:
+    """Route provider/tool I/O in this context to *recorder*."""
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+def detach() -> None:
+    """Stop recording in this context (e.g. a subagent spawned mid-turn)."""
+    _current.set(None)
+
+
+def load_turns(path: Path) -> list[dict[str, Any]]:
+    """Read recorded turns from a JSONL file, skipping unknown versions."""
+    turns = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get("version") != FORMAT_VERSION:
+                logger.warning(f"Skipping recording with version {record.get('version')} in {path}")
+                continue
+            turns.append(record)
+    return turns
@@ -0,0 +1,272 @@
+"""Per-message tracing: a span tree from channel receive to channel send.
+
+Each inbound message gets a root span when the channel hands it to the
+bus.  The root travels with the message (``InboundMessage.trace``) and is
+copied onto the response (``OutboundMessage.trace``), so the agent loop
+and the outbound dispatcher can hang their spans under it even though
+they run in different tasks.  Within a task, the active span lives in a
+ContextVar and ``span()`` nests under it automatically.
+
+When the root span ends, the whole trace is handed to the exporters:
+JSONL files (one span per line) and/or an OTLP/HTTP collector.  With
+tracing disabled ``span()`` is a cheap no-op.
+"""
+
+import asyncio
+import json
+import secrets
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Protocol
+
+from loguru import logger
+
+from nanobot.utils.helpers import ensure_dir
+
+
+class Span:
+    """One timed operation in a trace."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attrs", "start", "end_time", "error", "_trace")
+
+    def __init__(self, name: str, parent: "Span | None" = None, start: float | None = None, **attrs: Any):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attrs: dict[str, Any] = attrs
+        self.start = start if start is not None else time.time()
+        self.end_time: float | None = None
+        self.error: str | None = None
+        # Shared by every span of the trace; exported when the root ends
+        self._trace: _TraceBuffer = parent._trace if parent else _TraceBuffer(self)
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent_id is None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time if self.end_time is not None else time.time()
+        return (end - self.start) * 1000
+
+    def child(self, name: str, start: float | None = None, **attrs: Any) -> "Span":
+        """Start a child span without making it current."""
+        return Span(name, parent=self, start=start, **attrs)
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def end(self, end: float | None = None) -> None:
+        if self.end_time is not None:
+            return
+        self.end_time = end if end is not None else time.time()
+        self._trace.finished(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentId": self.parent_id,
+            "name": self.name,
+            "start": datetime.fromtimestamp(self.start).isoformat(timespec="milliseconds"),
+            "durationMs": round(self.duration_ms, 2),
+            "attrs": self.attrs,
+            **({"error": self.error} if self.error else {}),
+        }
+
+
+class _TraceBuffer:
+    """Collects finished spans of one trace until its root ends."""
+
+    __slots__ = ("root", "spans", "flushed")
+
+    def __init__(self, root: Span):
+        self.root = root
+        self.spans: list[Span] = []
+        self.flushed = False
+
+    def finished(self, span: Span) -> None:
+        if self.flushed:
+            # Late span (e.g. a subagent outliving the message): export on its own
+            _tracer.export([span])
+            return
+        self.spans.append(span)
+        if span is self.root:
+            self.flushed = True
+            _tracer.export(self.spans)
+            self.spans = []
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[Span]) -> None: ...
+
+
+class JsonlExporter:
+    """Append spans to ``<directory>/traces-YYYY-MM-DD.jsonl``."""
+
+    def __init__(self, directory: Path):
+        self.directory = ensure_dir(directory)
+
+    def export(self, spans: list[Span]) -> None:
+        path = self.directory / f"traces-{datetime.now():%Y-%m-%d}.jsonl"
+        lines = "".join(json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n" for s in spans)
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.warning(f"Trace export to {path} failed: {e}")
+
+
+class OtlpHttpExporter:
+    """POST spans to an OTLP/HTTP collector (JSON encoding) in the background."""
+
+    def __init__(self, endpoint: str, service_name: str = "nanobot"):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self._pending: set[asyncio.Task[None]] = set()
+
+    def export(self, spans: list[Span]) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Only exported from the gateway's event loop
+        task = loop.create_task(self._post(self.payload(spans)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def payload(self, spans: list[Span]) -> dict[str, Any]:
+        def attr(key: str, value: Any) -> dict[str, Any]:
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        otlp_spans = []
+        for s in spans:
+            end = s.end_time if s.end_time is not None else time.time()
+            item: dict[str, Any] = {
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                "name": s.name,
+                "kind": 1,  # INTERNAL
+                "startTimeUnixNano": str(int(s.start * 1e9)),
+                "endTimeUnixNano": str(int(end * 1e9)),
+                "attributes": [attr(k, v) for k, v in s.attrs.items()],
+            }
+            if s.parent_id:
+                item["parentSpanId"] = s.parent_id
+            if s.error:
+                item["status"] = {"code": 2, "message": s.error}
+            otlp_spans.append(item)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [attr("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": "nanobot"}, "spans": otlp_spans}],
+        }]}
+
+    async def _post(self, payload: dict[str, Any]) -> None:
+        import httpx
+
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                r = await client.post(self.url, json=payload)
+                r.raise_for_status()
+        except Exception as e:
+            logger.debug(f"OTLP export to {self.url} failed: {e}")
+
+
+class Tracer:
+    """Holds the exporters. Disabled (no exporters) by default."""
+
+    def __init__(self) -> None:
+        self.exporters: list[SpanExporter] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def export(self, spans: list[Span]) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception as e:
+                logger.warning(f"Span exporter {type(exporter).__name__} failed: {e}")
+
+
+_tracer = Tracer()
+_current: ContextVar[Span | None] = ContextVar("nanobot_span", default=None)
+
+
+def configure_tracing(directory: Path | None = None, otlp_endpoint: str = "") -> None:
+    """Enable tracing with a JSONL directory and/or an OTLP collector endpoint."""
+    exporters: list[SpanExporter] = []
+    if directory is not None:
+        exporters.append(JsonlExporter(directory))
+    if otlp_endpoint:
+        exporters.append(OtlpHttpExporter(otlp_endpoint))
+    _tracer.exporters = exporters
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def start_trace(name: str, **attrs: Any) -> Span | None:
+    """Create the root span for a new message, or None when tracing is off."""
+    if not _tracer.enabled:
+        return None
+    return Span(name, **attrs)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+@contextmanager
+def activate(span: Span | None) -> Iterator[Span | None]:
+    """Make *span* the parent of spans opened in this context."""
+    if span is None:
+        yield None
+        return
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, parent: Span | None = None, **attrs: Any) -> Iterator[Span | None]:
+    """Time a block as a child of *parent* (default: the current span).
+
+    Yields None, and records nothing, when there is no trace to attach to.
+    Exceptions are recorded on the span and re-raised.
+    """
+    parent = parent or _current.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, **attrs)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+def record(name: str, parent: Span | None, start: float | None, **attrs: Any) -> None:
+    """Record an already-finished interval (e.g. time spent queued) ending now."""
+    if parent is None or start is None:
+        return
+    parent.child(name, start=start, **attrs).end()
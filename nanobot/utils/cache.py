@@ -0,0 +1,170 @@
+"""Size-capped on-disk JSON cache with LRU eviction."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.utils.helpers import ensure_dir
+
+
+def cache_key(*parts: Any) -> str:
+    """Build a stable hex key from arbitrary JSON-serializable parts."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent key → JSON dict cache stored as one file per entry.
+
+    File names are the SHA-256 of the key, so any string can be used as a
+    key.  Reads bump the file mtime, which doubles as the LRU clock and
+    survives restarts.  When the directory grows past ``max_bytes`` the
+    least recently used entries are deleted until it is back under 90%
+    of the cap.  Writes are atomic (temp file + rename), so concurrent
+    processes sharing a directory never see torn entries.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 100 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size: int | None = None  # lazily computed total bytes on disk
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the entry for *key*, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Dropping unreadable cache entry {path.name}: {e}")
+            self._unlink(path)
+            self.misses += 1
+            return None
+
+        expires = entry.get("_expires")
+        if expires is not None and time.time() >= expires:
+            self._unlink(path)
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry.get("value")
+
+    def set(self, key: str, value: dict[str, Any], ttl: float | None = None) -> None:
+        """Store *value* under *key*. Entries with a *ttl* expire after that many seconds."""
+        entry = {"key": key, "value": value, "_expires": time.time() + ttl if ttl else None}
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.max_bytes // 4:
+            logger.debug(f"Cache entry too large to store ({len(data)} bytes)")
+            return
+
+        ensure_dir(self.directory)
+        path = self._path(key)
+        old_size = path.stat().st_size if path.exists() else 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        if self._size is not None:
+            self._size += len(data) - old_size
+        if self.size_bytes > self.max_bytes:
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        """Remove the entry for *key* if present."""
+        self._unlink(self._path(key))
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for path in self._entries():
+            self._unlink(path)
+        self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of all entries on disk."""
+        if self._size is None:
+            self._size = sum(self._stat_size(p) for p in self._entries())
+        return self._size
+
+    def evict(self) -> int:
+        """Delete least recently used entries until under 90% of the cap. Returns count."""
+        entries = []
+        for path in self._entries():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._unlink(path, size)
+            total -= size
+            removed += 1
+
+        self._size = total
+        self.evictions += removed
+        if removed:
+            logger.debug(f"Evicted {removed} cache entries from {self.directory}")
+        return removed
+
+    def _entries(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return list(self.directory.glob("*.json"))
+
+    def _unlink(self, path: Path, size: int | None = None) -> None:
+        if size is None:
+            size = self._stat_size(path)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.debug(f"Failed to delete cache entry {path}: {e}")
+            return
+        if self._size is not None:
+            self._size = max(0, self._size - size)
+
+    @staticmethod
+    def _stat_size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
@@ -1,9 +1,8 @@
 """Utility functions for nanobot."""
 
-from pathlib import Path
 from datetime import datetime
+from pathlib import Path
 
-import aiohttp
 from loguru import logger
 
 
@@ -96,6 +95,8 @@ def parse_session_key(key: str) -> tuple[str, str]:
 
 async def notify_admin(bot_token: str, chat_id: str, text: str) -> None:
     """Send a Telegram message via bot token (for admin notifications)."""
+    import aiohttp
+
     url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
     try:
         async with aiohttp.ClientSession() as session:
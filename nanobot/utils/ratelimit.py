@@ -0,0 +1,76 @@
+"""Async token-bucket rate limiter."""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every caller of one upstream API.
+
+    Tokens refill continuously at ``rate`` per second up to ``burst``.
+    ``acquire()`` waits until a token is available; waiters are served in
+    arrival order because they queue on a single lock.  ``pause()`` lets a
+    caller honour a server-side ``Retry-After`` for everyone at once.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take *tokens* without waiting. Returns False if not enough are available."""
+        if time.monotonic() < self._paused_until:
+            return False
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until *tokens* are available and take them. Returns seconds waited."""
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                    continue
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return time.monotonic() - start
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Block all acquirers for *seconds* (e.g. after an HTTP 429)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        # Start refilling only once the pause is over
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+    def consume(self, tokens: float) -> None:
+        """Take *tokens* without waiting; the balance may go negative (e.g. actual usage over an estimate)."""
+        self._refill()
+        self._tokens -= tokens
+
+    @property
+    def available(self) -> float:
+        """Tokens that could be taken right now."""
+        if time.monotonic() < self._paused_until:
+            return 0.0
+        self._refill()
+        return self._tokens
@@ -0,0 +1,47 @@
+"""HTTP server on the gateway port: Prometheus metrics and health."""
+
+from aiohttp import web
+from loguru import logger
+
+from nanobot.telemetry.metrics import REGISTRY, MetricsRegistry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class GatewayServer:
+    """aiohttp server exposing /metrics and /health on the gateway host/port."""
+
+    def __init__(self, host: str, port: int, registry: MetricsRegistry | None = None) -> None:
+        self._host = host
+        self._port = port
+        self._registry = registry or REGISTRY
+        self._runner: web.AppRunner | None = None
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        app.router.add_get("/health", self._handle_health)
+        return app
+
+    async def start(self) -> None:
+        """Start the HTTP server."""
+        self._runner = web.AppRunner(self.build_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+        logger.info(f"Metrics available at http://{self._host}:{self._port}/metrics")
+
+    async def stop(self) -> None:
+        """Stop the HTTP server."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self._registry.render().encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
@@ -0,0 +1,116 @@
+"""HTTP server receiving Telegram updates by webhook."""
+
+import asyncio
+import hmac
+import json
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiohttp import web
+from loguru import logger
+
+from nanobot.telemetry.metrics import TELEGRAM_WEBHOOK_UPDATES
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class TelegramWebhookServer:
+    """aiohttp server accepting Telegram webhook POSTs into a bounded queue.
+
+    Each request is checked against the secret token, queued, and
+    acknowledged with 200 straight away; one worker drains the queue into
+    *on_update* in arrival order (the channel hands slow work off to its
+    own per-chat ingestion tasks).  When the queue is full the request
+    gets a 503 so Telegram redelivers it later instead of the update
+    being lost.  Redeliveries of recently seen ``update_id``s are dropped.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        path: str,
+        secret_token: str,
+        on_update: Callable[[dict[str, Any]], Awaitable[None]],
+        queue_size: int = 1000,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._path = path
+        self._secret = secret_token
+        self._on_update = on_update
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=queue_size)
+        self._worker: asyncio.Task | None = None
+        self._seen: deque[int] = deque(maxlen=queue_size)
+        self._runner: web.AppRunner | None = None
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self._path, self._handle_update)
+        return app
+
+    async def start(self) -> None:
+        """Start the HTTP server and the ingestion worker."""
+        self._worker = asyncio.create_task(self._work())
+        self._runner = web.AppRunner(self.build_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+        logger.info(f"Telegram webhook listening on {self._host}:{self.port}{self._path}")
+
+    async def stop(self) -> None:
+        """Stop accepting updates, then finish the queued ones."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._worker:
+            await self._queue.join()
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    @property
+    def port(self) -> int:
+        """The bound port (useful when started on port 0)."""
+        if self._runner:
+            for site in self._runner.sites:
+                server = getattr(site, "_server", None)
+                if server and server.sockets:
+                    return server.sockets[0].getsockname()[1]
+        return self._port
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode(), self._secret.encode()):
+            TELEGRAM_WEBHOOK_UPDATES.inc(outcome="forbidden")
+            return web.Response(status=403)
+        try:
+            update = json.loads(await request.read())
+            update_id = update["update_id"]
+        except (ValueError, TypeError, KeyError):
+            TELEGRAM_WEBHOOK_UPDATES.inc(outcome="invalid")
+            return web.Response(status=400)
+
+        if update_id in self._seen:
+            TELEGRAM_WEBHOOK_UPDATES.inc(outcome="duplicate")
+            return web.Response()
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            logger.warning("Telegram webhook queue full, asking for redelivery")
+            TELEGRAM_WEBHOOK_UPDATES.inc(outcome="rejected")
+            return web.Response(status=503)
+        self._seen.append(update_id)
+        TELEGRAM_WEBHOOK_UPDATES.inc(outcome="accepted")
+        return web.Response()
+
+    async def _work(self) -> None:
+        while True:
+            update = await self._queue.get()
+            try:
+                await self._on_update(update)
+            except Exception as e:
+                logger.error(f"Failed to process Telegram update {update.get('update_id')}: {e}")
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,74 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from nanobot.bench import BenchConfig, FaultModel, LatencyModel, ScriptedProvider, run_bench
+from nanobot.bench.runner import percentile
+
+
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+async def test_scripted_provider_follows_script_per_turn() -> None:
+    provider = ScriptedProvider(
+        script=[("list_dir", {"path": "."}), ("read_file", {"path": "x"})],
+        latency=LatencyModel(mean_ms=0),
+    )
+    messages = [{"role": "system", "content": "s"}, {"role": "user", "content": "hi"}]
+
+    first = await provider.chat(messages)
+    assert first.tool_calls[0].name == "list_dir"
+    messages += [
+        {"role": "assistant", "content": "", "tool_calls": [{"id": "call_0"}]},
+        {"role": "tool", "tool_call_id": "call_0", "content": "..."},
+    ]
+    second = await provider.chat(messages)
+    assert second.tool_calls[0].name == "read_file"
+    messages += [
+        {"role": "assistant", "content": "", "tool_calls": [{"id": "call_1"}]},
+        {"role": "tool", "tool_call_id": "call_1", "content": "..."},
+    ]
+    final = await provider.chat(messages)
+    assert not final.has_tool_calls and final.content.startswith("ok")
+
+    # A new user message restarts the script
+    messages.append({"role": "user", "content": "again"})
+    assert (await provider.chat(messages)).tool_calls[0].name == "list_dir"
+
+
+def test_latency_samples_are_seeded() -> None:
+    model = LatencyModel(kind="lognormal", mean_ms=100, sigma=0.8)
+    a = [model.sample(random.Random(f"1:{i}")) for i in range(200)]
+    b = [model.sample(random.Random(f"1:{i}")) for i in range(200)]
+    assert a == b
+    assert 60 < sum(a) / len(a) < 160
+
+
+def test_percentile_nearest_rank() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
+
+
+async def test_run_bench_drives_sessions_through_agent_loop() -> None:
+    report = await run_bench(BenchConfig(
+        sessions=4, turns=3, tool_calls=2, latency=LatencyModel(kind="fixed", mean_ms=1),
+    ))
+    assert report.turns == 12
+    assert report.errors == 0
+    assert report.llm_calls == 12 * 3  # Two tool calls plus the answer per turn
+    assert report.latency_ms["p50"] > 0
+    assert report.messages_per_s > 0
+
+
+async def test_run_bench_counts_injected_faults() -> None:
+    report = await run_bench(BenchConfig(
+        sessions=3, turns=2, tool_calls=0,
+        latency=LatencyModel(mean_ms=0), faults=FaultModel(exception_rate=1.0),
+    ))
+    assert report.turns == 6
+    assert report.errors == 6
@@ -0,0 +1,288 @@
+"""Tests for the OAuth provider's persistent CLI workers and conversation resume."""
+
+import asyncio
+import json
+import sys
+import textwrap
+
+import pytest
+
+from nanobot.agent.subagent import SubagentManager
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.anthropic_oauth import AnthropicOAuthProvider, read_turn
+from nanobot.providers.base import LLMProvider, LLMResponse, current_session, session_scope
+from nanobot.providers.claude_sessions import ClaudeSessionStore
+from nanobot.providers.claude_workers import ClaudeWorkerPool
+from nanobot.telemetry.metrics import CLI_PROMPT_BYTES
+
+# Speaks the CLI's stream-json protocol; each result reports "pid|resumed session|what it was sent"
+FAKE_CLI = textwrap.dedent("""\
+    import json, os, sys, time
+
+    resume = sys.argv[sys.argv.index("--resume") + 1] if "--resume" in sys.argv else "-"
+    session = resume if resume != "-" else f"s-{os.getpid()}"
+
+    def reply(text):
+        print(json.dumps({"type": "system", "subtype": "init", "session_id": session}), flush=True)
+        if resume == "gone":
+            print(json.dumps({"type": "result", "result": "No conversation found", "is_error": True}), flush=True)
+            return
+        if "slow" in text:
+            time.sleep(0.5)
+        result = f"{os.getpid()}|{resume}|{text}"
+        print(json.dumps({"type": "result", "result": result, "is_error": False}), flush=True)
+
+    if "--input-format" in sys.argv:
+        for line in sys.stdin:
+            reply(json.loads(line)["message"]["content"])
+    else:
+        reply(sys.stdin.read())
+""")
+
+
+@pytest.fixture
+def claude_bin(tmp_path):
+    script = tmp_path / "claude"
+    script.write_text(f"#!{sys.executable}\n" + FAKE_CLI)
+    script.chmod(0o755)
+    return str(script)
+
+
+def _provider(
+    claude_bin: str, pool: ClaudeWorkerPool | None, sessions: ClaudeSessionStore | None = None,
+) -> AnthropicOAuthProvider:
+    return AnthropicOAuthProvider(oauth_token="t", default_model="anthropic/claude-test",
+                                  claude_bin=claude_bin, workers=pool, sessions=sessions)
+
+
+def _messages(*turns: str) -> list[dict]:
+    messages = [{"role": "system", "content": "SYSTEM"}]
+    for i, text in enumerate(turns):
+        messages.append({"role": "assistant" if i % 2 else "user", "content": text})
+    return messages
+
+
+def _split(content: str) -> tuple[str, str]:
+    pid, _, sent = content.split("|", 2)
+    return pid, sent
+
+
+def _resumed(content: str) -> str:
+    return content.split("|", 2)[1]
+
+
+async def test_session_reuses_worker_and_sends_only_new_messages(claude_bin):
+    pool = ClaudeWorkerPool(max_workers=2)
+    provider = _provider(claude_bin, pool)
+    try:
+        with session_scope("chat:1"):
+            first = await provider.chat(_messages("hello"))
+            pid1, sent1 = _split(first.content)
+            assert "SYSTEM" in sent1 and "hello" in sent1
+
+            second = await provider.chat(_messages("hello", first.content, "again"))
+            pid2, sent2 = _split(second.content)
+
+        assert pid1 == pid2
+        assert sent2 == "again"
+        assert pool.stats()["spawned"] == 1
+    finally:
+        await pool.close()
+
+
+async def test_diverged_history_restarts_with_full_prompt(claude_bin):
+    pool = ClaudeWorkerPool()
+    provider = _provider(claude_bin, pool)
+    try:
+        with session_scope("chat:1"):
+            first = await provider.chat(_messages("hello"))
+            second = await provider.chat(_messages("[summary]", "new question"))
+        assert _split(first.content)[0] != _split(second.content)[0]
+        assert "SYSTEM" in _split(second.content)[1]
+    finally:
+        await pool.close()
+
+
+async def test_worker_recycled_after_max_turns(claude_bin):
+    pool = ClaudeWorkerPool(max_turns=1)
+    provider = _provider(claude_bin, pool)
+    try:
+        with session_scope("chat:1"):
+            first = await provider.chat(_messages("a"))
+            second = await provider.chat(_messages("a", first.content, "b"))
+        assert _split(first.content)[0] != _split(second.content)[0]
+        assert pool.stats()["recycled"] == 2
+    finally:
+        await pool.close()
+
+
+async def test_calls_beyond_cap_queue_with_progress(claude_bin):
+    pool = ClaudeWorkerPool(max_workers=1)
+    progress: list[str] = []
+
+    async def on_progress(text: str) -> None:
+        progress.append(text)
+
+    async def call(session: str, text: str):
+        provider = _provider(claude_bin, pool)
+        provider.progress_callback = on_progress
+        with session_scope(session):
+            return await provider.chat(_messages(text))
+
+    try:
+        slow = asyncio.create_task(call("chat:1", "slow"))
+        await asyncio.sleep(0.1)
+        queued = await asyncio.wait_for(call("chat:2", "quick"), timeout=10)
+        await slow
+
+        assert any("Waiting for a free Claude worker" in p for p in progress)
+        assert queued.finish_reason == "stop"
+        assert pool.stats()["workers"] == 1  # chat:2 took over chat:1's idle worker
+    finally:
+        await pool.close()
+
+
+async def test_no_session_uses_one_shot_process(claude_bin):
+    pool = ClaudeWorkerPool()
+    provider = _provider(claude_bin, pool)
+
+    response = await provider.chat(_messages("hi"))
+
+    assert "SYSTEM" in response.content
+    assert pool.stats()["spawned"] == 0
+
+
+async def test_result_event_ends_the_turn():
+    lines = [
+        json.dumps({"type": "result", "result": "done", "total_cost_usd": 0.1}),
+        json.dumps({"type": "result", "result": "next turn"}),
+    ]
+    reader = asyncio.StreamReader()
+    reader.feed_data("\n".join(lines).encode())
+    reader.feed_eof()
+
+    turn = await read_turn(reader, None)
+
+    assert turn.response().content == "done"
+    assert turn.usage == {"total_cost_usd": 0.1}
+    assert await reader.readline()  # Left for the next turn
+
+
+async def test_one_shot_call_resumes_cli_session(claude_bin, tmp_path):
+    store = ClaudeSessionStore(tmp_path / "sessions.json")
+    provider = _provider(claude_bin, None, store)
+    saved_before = CLI_PROMPT_BYTES.get(kind="saved")
+
+    with session_scope("chat:1"):
+        first = await provider.chat(_messages("hello"))
+        second = await provider.chat(_messages("hello", first.content, "again"))
+
+    pid1 = _split(first.content)[0]
+    assert _resumed(first.content) == "-"
+    assert _resumed(second.content) == f"s-{pid1}"
+    assert _split(second.content)[1] == "again"
+    assert CLI_PROMPT_BYTES.get(kind="saved") > saved_before
+    # The mapping survives a restart of nanobot
+    assert ClaudeSessionStore(tmp_path / "sessions.json").resumable(
+        "chat:1", "claude-test", provider._history(_messages("hello", first.content, "again", second.content, "x")),
+    )
+
+
+async def test_compacted_history_rebuilds_full_prompt(claude_bin, tmp_path):
+    provider = _provider(claude_bin, None, ClaudeSessionStore(tmp_path / "sessions.json"))
+
+    with session_scope("chat:1"):
+        await provider.chat(_messages("hello"))
+        rebuilt = await provider.chat(_messages("[summary of earlier turns]", "next"))
+
+    assert _resumed(rebuilt.content) == "-"
+    assert "SYSTEM" in _split(rebuilt.content)[1]
+
+
+def _with_system(messages: list[dict], system: str) -> list[dict]:
+    return [{"role": "system", "content": system}, *messages[1:]]
+
+
+async def test_system_prompt_change_rebuilds_but_clock_does_not(claude_bin, tmp_path):
+    provider = _provider(claude_bin, None, ClaudeSessionStore(tmp_path / "sessions.json"))
+    system = "# nanobot\n\n## Current Time\n{}\n\n## Memory\n{}"
+
+    with session_scope("chat:1"):
+        first = await provider.chat(_with_system(_messages("a"), system.format("2026-01-01 10:00 (Thursday)", "x")))
+        history = _messages("a", first.content, "b")
+        second = await provider.chat(_with_system(history, system.format("2026-01-01 10:01 (Thursday)", "x")))
+        history = _messages("a", first.content, "b", second.content, "c")
+        third = await provider.chat(_with_system(history, system.format("2026-01-01 10:02 (Thursday)", "y")))
+
+    assert _split(second.content)[1] == "b"
+    assert _resumed(third.content) == "-"
+    assert "## Memory\ny" in _split(third.content)[1]
+
+
+async def test_failed_resume_falls_back_to_full_prompt(claude_bin, tmp_path):
+    store = ClaudeSessionStore(tmp_path / "sessions.json")
+    provider = _provider(claude_bin, None, store)
+    messages = _messages("hello", "hi there", "again")
+    store.put("chat:1", "gone", "claude-test", provider._history(messages[:3]))
+
+    with session_scope("chat:1"):
+        response = await provider.chat(messages)
+
+    assert response.finish_reason == "stop"
+    assert _resumed(response.content) == "-"
+    assert "SYSTEM" in _split(response.content)[1]
+
+
+async def test_recycled_worker_resumes_instead_of_resending(claude_bin, tmp_path):
+    pool = ClaudeWorkerPool(max_turns=1)
+    provider = _provider(claude_bin, pool, ClaudeSessionStore(tmp_path / "sessions.json"))
+    try:
+        with session_scope("chat:1"):
+            first = await provider.chat(_messages("a"))
+            second = await provider.chat(_messages("a", first.content, "b"))
+        assert _split(first.content)[0] != _split(second.content)[0]
+        assert _resumed(second.content) == f"s-{_split(first.content)[0]}"
+        assert _split(second.content)[1] == "b"
+    finally:
+        await pool.close()
+
+
+async def test_worker_falls_back_when_resume_fails(claude_bin, tmp_path):
+    store = ClaudeSessionStore(tmp_path / "sessions.json")
+    pool = ClaudeWorkerPool()
+    provider = _provider(claude_bin, pool, store)
+    messages = _messages("hello", "hi there", "again")
+    store.put("chat:1", "gone", "claude-test", provider._history(messages[:3]))
+    try:
+        with session_scope("chat:1"):
+            response = await provider.chat(messages)
+        assert response.finish_reason == "stop"
+        assert "SYSTEM" in _split(response.content)[1]
+    finally:
+        await pool.close()
+
+
+class _SessionProbe(LLMProvider):
+    """Records which session each chat() call ran under."""
+
+    def __init__(self):
+        super().__init__()
+        self.sessions: list[str | None] = []
+
+    async def chat(self, *args, **kwargs) -> LLMResponse:
+        self.sessions.append(current_session())
+        return LLMResponse(content="done")
+
+    def get_default_model(self) -> str:
+        return "probe"
+
+
+async def test_subagent_does_not_inherit_parent_session(tmp_path):
+    provider = _SessionProbe()
+    manager = SubagentManager(provider=provider, workspace=tmp_path, bus=MessageBus())
+
+    with session_scope("telegram:1"):
+        await manager.spawn("look something up", origin_channel="telegram", origin_chat_id="1")
+    await asyncio.gather(*manager._running_tasks.values())
+
+    assert provider.sessions == [None]
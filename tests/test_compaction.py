@@ -7,17 +7,14 @@ import tempfile
 from pathlib import Path
 from typing import Any
 
-import pytest
-
 from nanobot.extensions.base import ExtensionContext
 from nanobot.extensions.compaction import (
     CompactionExtension,
-    estimate_tokens,
     estimate_messages_tokens,
+    estimate_tokens,
 )
 from nanobot.session.manager import Session
 
-
 # ===========================================================================
 # Helpers
 # ===========================================================================
@@ -91,7 +88,7 @@ def test_transform_history_no_summary():
     ext = CompactionExtension()
     session = Session(key="test:123")
     history = [{"role": "user", "content": "hi"}]
-    result = asyncio.get_event_loop().run_until_complete(
+    result = asyncio.run(
         ext.transform_history(history, session, _ctx("/tmp"))
     )
     assert result == history  # unchanged
@@ -102,7 +99,7 @@ def test_transform_history_with_summary():
     session = Session(key="test:123")
     session.metadata["compaction_summary"] = "We discussed Python packaging."
     history = [{"role": "user", "content": "hi"}]
-    result = asyncio.get_event_loop().run_until_complete(
+    result = asyncio.run(
         ext.transform_history(history, session, _ctx("/tmp"))
     )
     assert len(result) == 2
@@ -123,7 +120,7 @@ def test_no_compaction_when_under_threshold():
     session = _session_with_tokens(100_000, msg_count=10)
     original_count = len(session.messages)
 
-    asyncio.get_event_loop().run_until_complete(
+    asyncio.run(
         ext.pre_session_save(session, _ctx("/tmp"))
     )
 
@@ -140,7 +137,7 @@ def test_compaction_triggers_when_over_threshold():
         session = _session_with_tokens(2000, msg_count=10)
         original_count = len(session.messages)
 
-        asyncio.get_event_loop().run_until_complete(
+        asyncio.run(
             ext.pre_session_save(session, _ctx(tmp))
         )
 
@@ -171,7 +168,7 @@ def test_compaction_keeps_60_percent_of_budget():
         ext.max_tokens = 1000
         session = _session_with_tokens(3000, msg_count=30)
 
-        asyncio.get_event_loop().run_until_complete(
+        asyncio.run(
             ext.pre_session_save(session, _ctx(tmp))
         )
 
@@ -192,7 +189,7 @@ def test_compaction_archive_appends():
 
         # First compaction
         session = _session_with_tokens(1500, msg_count=10)
-        asyncio.get_event_loop().run_until_complete(ext.pre_session_save(session, ctx))
+        asyncio.run(ext.pre_session_save(session, ctx))
         first_archived = session.metadata["archived_count"]
         archive_path = Path(session.metadata["archive_path"])
         first_lines = len(archive_path.read_text().strip().split("\n"))
@@ -203,7 +200,7 @@ def test_compaction_archive_appends():
             role = "user" if i % 2 == 0 else "assistant"
             session.add_message(role, "x" * 400)  # ~100 tokens each
 
-        asyncio.get_event_loop().run_until_complete(ext.pre_session_save(session, ctx))
+        asyncio.run(ext.pre_session_save(session, ctx))
 
         total_archived = session.metadata["archived_count"]
         assert total_archived > first_archived
@@ -276,14 +273,14 @@ def test_end_to_end_compact_then_history():
         ctx = _ctx(tmp)
 
         session = _session_with_tokens(1500, msg_count=10)
-        asyncio.get_event_loop().run_until_complete(ext.pre_session_save(session, ctx))
+        asyncio.run(ext.pre_session_save(session, ctx))
 
         assert "compaction_summary" in session.metadata
         assert len(session.messages) < 10
 
         # Now simulate the next message: get_history → transform_history
         history = session.get_history()
-        result = asyncio.get_event_loop().run_until_complete(
+        result = asyncio.run(
             ext.transform_history(history, session, ctx)
         )
 
@@ -347,7 +344,7 @@ def test_transform_history_trims_large_history():
         role = "user" if i % 2 == 0 else "assistant"
         history.append({"role": role, "content": f"msg{i} " + "x" * 390})
 
-    result = asyncio.get_event_loop().run_until_complete(
+    result = asyncio.run(
         ext.transform_history(history, session, _ctx("/tmp"))
     )
 
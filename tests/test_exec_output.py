@@ -0,0 +1,101 @@
+"""Tests for streamed exec output capture and spilling."""
+
+
+import pytest
+
+from nanobot.agent.tools.base import ToolProgress, tool_progress
+from nanobot.agent.tools.shell import ExecTool, _OutputCapture
+
+# ===========================================================================
+# _OutputCapture
+# ===========================================================================
+
+
+def test_capture_keeps_everything_under_limit():
+    cap = _OutputCapture(limit=100)
+    for _ in range(9):
+        cap.feed(b"0123456789")
+    assert cap.render() == "0123456789" * 9
+    assert not cap.overflowed
+
+
+def test_capture_keeps_head_and_tail():
+    cap = _OutputCapture(limit=20)
+    cap.feed(b"A" * 10 + b"B" * 1000 + b"C" * 10)
+    out = cap.render()
+    assert out.startswith("A" * 10)
+    assert out.endswith("C" * 10)
+    assert "1000 bytes omitted" in out
+    assert len(cap.head) + len(cap.tail) == 20
+
+
+def test_capture_memory_is_bounded_across_many_chunks():
+    cap = _OutputCapture(limit=64)
+    for i in range(10_000):
+        cap.feed(f"line {i}\n".encode())
+    assert len(cap.head) + len(cap.tail) <= 64
+    assert cap.render().rstrip().endswith("line 9999")
+
+
+def test_capture_spills_full_stream(tmp_path):
+    path = tmp_path / "out.log"
+    cap = _OutputCapture(limit=10, spill_path=path, spill_max_bytes=1000)
+    for i in range(5):
+        cap.feed(f"chunk{i}|".encode())
+    cap.close()
+    assert path.read_bytes() == b"".join(f"chunk{i}|".encode() for i in range(5))
+    assert str(path) in cap.render()
+
+
+def test_capture_spill_is_capped(tmp_path):
+    path = tmp_path / "out.log"
+    cap = _OutputCapture(limit=10, spill_path=path, spill_max_bytes=50)
+    cap.feed(b"x" * 200)
+    cap.close()
+    assert path.stat().st_size == 50
+    assert "first 50 bytes" in cap.render()
+
+
+# ===========================================================================
+# ExecTool
+# ===========================================================================
+
+
+@pytest.mark.asyncio
+async def test_exec_truncates_large_output(tmp_path):
+    tool = ExecTool(working_dir=str(tmp_path), max_output=1000, spill_dir=tmp_path / "spill")
+    result = await tool.execute(command="seq 1 100000")
+    assert result.startswith("1\n2\n")
+    assert result.rstrip().endswith("100000")
+    assert "truncated" in result
+    spilled = list((tmp_path / "spill").glob("*.out.log"))
+    assert len(spilled) == 1
+    assert spilled[0].read_text().splitlines()[-1] == "100000"
+
+
+@pytest.mark.asyncio
+async def test_exec_timeout_keeps_partial_output(tmp_path):
+    tool = ExecTool(working_dir=str(tmp_path), timeout=1)
+    result = await tool.execute(command="echo started; exec sleep 5")
+    assert "started" in result
+    assert "timed out after 1 seconds" in result
+
+
+@pytest.mark.asyncio
+async def test_exec_reports_progress(tmp_path):
+    tool = ExecTool(working_dir=str(tmp_path))
+    progress = ToolProgress()
+    token = tool_progress.set(progress)
+    try:
+        await tool.execute(command="echo one; echo two")
+    finally:
+        tool_progress.reset(token)
+    assert progress.latest == "two"
+
+
+@pytest.mark.asyncio
+async def test_exec_stderr_and_exit_code(tmp_path):
+    tool = ExecTool(working_dir=str(tmp_path))
+    result = await tool.execute(command="echo oops >&2; exit 3")
+    assert "STDERR:\noops" in result
+    assert "Exit code: 3" in result
@@ -0,0 +1,63 @@
+"""Startup budget: the CLI and agent modules must not pull heavy SDKs at import time."""
+
+import os
+import subprocess
+import sys
+
+# Imported by every `nanobot` command before it does any work
+STARTUP_MODULES = [
+    "nanobot.cli.commands",
+    "nanobot.config.loader",
+    "nanobot.agent.loop",
+    "nanobot.channels",
+    "nanobot.providers",
+    "nanobot.providers.factory",
+    "nanobot.cron.service",
+]
+
+# Loaded on first use only (provider call, enabled channel, payments)
+DEFERRED = ["litellm", "telegram", "lark_oapi", "stripe", "aiohttp", "openai"]
+
+# Generous so slow CI machines pass; today's cost is well under half of this
+BUDGET_MS = float(os.environ.get("NANOBOT_IMPORT_BUDGET_MS", "2500"))
+
+
+def _importtime(modules: list[str]) -> dict[str, int]:
+    """Cumulative import time (µs) per top-level module, from ``python -X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {m}" for m in modules)],
+        capture_output=True, text=True, env={**os.environ, "LITELLM_LOCAL_MODEL_COST_MAP": "True"},
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.rstrip()
+        if not name.startswith("  "):  # Top-level import
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def _all_imported(modules: list[str]) -> set[str]:
+    code = "import sys; " + "; ".join(f"import {m}" for m in modules) + "; print('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True,
+        env={**os.environ, "LITELLM_LOCAL_MODEL_COST_MAP": "True"},
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return set(result.stdout.split())
+
+
+def test_heavy_sdks_are_deferred() -> None:
+    loaded = _all_imported(STARTUP_MODULES)
+    eager = [name for name in DEFERRED if name in loaded]
+    assert not eager, f"imported at startup: {eager}"
+
+
+def test_startup_import_budget() -> None:
+    times = _importtime(STARTUP_MODULES)
+    total_ms = sum(times.values()) / 1000
+    slowest = sorted(times.items(), key=lambda kv: -kv[1])[:5]
+    assert total_ms < BUDGET_MS, f"startup imports took {total_ms:.0f}ms (budget {BUDGET_MS:.0f}ms): {slowest}"
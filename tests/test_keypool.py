@@ -0,0 +1,128 @@
+"""Tests for the API key pool governor."""
+
+import asyncio
+import time
+
+import pytest
+
+from nanobot.agent.terminal import _build_env, _build_input_envelope, _lease_keys
+from nanobot.bus.events import InboundMessage
+from nanobot.config.schema import TerminalConfig, TerminalProviderConfig
+from nanobot.providers import keypool
+from nanobot.providers.keypool import KeyPool
+
+
+@pytest.fixture(autouse=True)
+def fresh_key_state(monkeypatch):
+    monkeypatch.setattr(keypool, "_STATES", {})
+
+
+async def test_lease_routes_to_least_loaded_key():
+    pool = KeyPool("test", ["key-a", "key-b"])
+
+    first = await pool.acquire()
+    second = await pool.acquire()
+    assert {first.key, second.key} == {"key-a", "key-b"}
+
+    pool.release(first)
+    third = await pool.acquire()
+    assert third.key == first.key
+
+
+async def test_rate_limited_key_cools_down():
+    pool = KeyPool("test", ["key-a", "key-b"])
+
+    async with pool.lease() as lease:
+        lease.report(rate_limited=True, retry_after=60)
+        limited = lease.key
+
+    for _ in range(3):
+        async with pool.lease() as lease:
+            assert lease.key != limited
+    assert pool.stats()[pool.keys.index(limited)]["cooling"]
+
+
+async def test_rpm_budget_spreads_and_waits():
+    pool = KeyPool("test", ["key-a", "key-b"], rpm=60)  # One request per second per key
+    for state in pool.states:
+        state.requests.consume(state.requests.available - 1)  # One request left each
+
+    a = await pool.acquire()
+    b = await pool.acquire()
+    assert a.key != b.key
+
+    started = time.monotonic()
+    await asyncio.wait_for(pool.acquire(), timeout=3)
+    assert time.monotonic() - started > 0.5  # Had to wait for a refill
+
+
+async def test_headers_and_usage_update_budget():
+    pool = KeyPool("test", ["key-a"], tpm=1000)
+
+    async with pool.lease(100) as lease:
+        lease.report(usage={"total_tokens": 400})
+    assert pool.states[0].tokens.available == pytest.approx(600, abs=5)
+
+    async with pool.lease() as lease:
+        lease.report(headers={
+            "llm_provider-x-ratelimit-remaining-requests": "0",
+            "llm_provider-x-ratelimit-reset-requests": "2m",
+        })
+    assert pool.states[0].cooling
+    assert pool.states[0].cooldown_until - time.monotonic() > 100
+
+
+def test_pools_share_state_per_key():
+    llm = KeyPool("openai", ["key-a", "key-b"])
+    terminal = KeyPool("openai", ["key-b", "key-c"])
+    assert llm.states[1] is terminal.states[0]
+
+
+async def test_terminal_run_leases_one_key(tmp_path):
+    config = TerminalConfig(providers={
+        "openai": TerminalProviderConfig(api_keys=["key-a", "key-b"]),
+        "gemini": TerminalProviderConfig(api_keys=["only"]),
+    })
+    msg = InboundMessage(channel="cli", sender_id="u", chat_id="c", content="hi")
+
+    async with _lease_keys(config) as leased:
+        assert set(leased) == {"openai"}
+        envelope = _build_input_envelope(msg, str(tmp_path), config, leased)
+        env = _build_env(config, leased)
+        assert f'"api_key": "{leased["openai"]}"' in envelope
+        assert env["OPENAI_API_KEY"] == leased["openai"]
+        assert env["OPENAI_API_KEYS"] == "key-a,key-b"
+        assert sum(s.in_flight for s in keypool._STATES.values()) == 1
+    assert sum(s.in_flight for s in keypool._STATES.values()) == 0
+
+
+async def test_litellm_provider_rotates_away_from_429_key(monkeypatch):
+    from types import SimpleNamespace
+
+    from nanobot.providers import litellm_provider
+
+    class RateLimitError(Exception):
+        status_code = 429
+
+    used: list[str] = []
+
+    async def fake_acompletion(**kwargs):
+        used.append(kwargs["api_key"])
+        if kwargs["api_key"] == "key-a":
+            raise RateLimitError("slow down")
+        message = SimpleNamespace(content="hi", tool_calls=None)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message, finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=5, completion_tokens=1, total_tokens=6),
+        )
+
+    monkeypatch.setattr(litellm_provider, "acompletion", fake_acompletion)
+    provider = litellm_provider.LiteLLMProvider(
+        default_model="test/model", key_pool=KeyPool("test", ["key-a", "key-b"]),
+    )
+
+    first = await provider.chat([{"role": "user", "content": "hi"}])
+    assert first.finish_reason == "error" and first.retryable
+    second = await provider.chat([{"role": "user", "content": "hi"}])
+    assert second.content == "hi"
+    assert used == ["key-a", "key-b"]
@@ -0,0 +1,134 @@
+"""Tests for the exact-match LLM response cache."""
+
+from typing import Any
+
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.cache import CachingProvider, call_class
+
+
+class CountingProvider(LLMProvider):
+    def __init__(self, response: LLMResponse | None = None):
+        super().__init__()
+        self.calls = 0
+        self.response = response or LLMResponse(
+            content="", tool_calls=[ToolCallRequest(id="c1", name="list_dir", arguments={"path": "."})],
+            finish_reason="tool_calls", usage={"prompt_tokens": 12},
+        )
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        self.calls += 1
+        return self.response
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+MESSAGES: list[dict[str, Any]] = [{"role": "system", "content": "s"}, {"role": "user", "content": "tick"}]
+
+
+async def test_cron_calls_are_served_from_cache(tmp_path):
+    inner = CountingProvider()
+    provider = CachingProvider(inner, tmp_path)
+
+    with call_class("cron"):
+        first = await provider.chat(MESSAGES)
+        second = await provider.chat(MESSAGES)
+
+    assert inner.calls == 1
+    assert second == first
+    assert second.tool_calls[0].arguments == {"path": "."}
+    assert provider.stats()["hits"] == 1
+
+
+async def test_chat_calls_bypass_cache_unless_temperature_zero(tmp_path):
+    inner = CountingProvider()
+    provider = CachingProvider(inner, tmp_path)
+
+    await provider.chat(MESSAGES)
+    await provider.chat(MESSAGES)
+    assert inner.calls == 2
+
+    await provider.chat(MESSAGES, temperature=0)
+    await provider.chat(MESSAGES, temperature=0)
+    assert inner.calls == 3
+
+
+async def test_key_covers_model_tools_and_sampling(tmp_path):
+    inner = CountingProvider()
+    provider = CachingProvider(inner, tmp_path)
+    tools = [{"type": "function", "function": {"name": "list_dir"}}]
+
+    with call_class("heartbeat"):
+        await provider.chat(MESSAGES)
+        await provider.chat(MESSAGES, model="other-model")
+        await provider.chat(MESSAGES, tools=tools)
+        await provider.chat(MESSAGES, max_tokens=100)
+        await provider.chat(MESSAGES + [{"role": "user", "content": "again"}])
+    assert inner.calls == 5
+
+
+async def test_errors_and_expired_entries_are_not_reused(tmp_path):
+    inner = CountingProvider(LLMResponse(content="Error: overloaded", finish_reason="error"))
+    provider = CachingProvider(inner, tmp_path / "a")
+    with call_class("cron"):
+        await provider.chat(MESSAGES)
+        await provider.chat(MESSAGES)
+    assert inner.calls == 2
+
+    inner = CountingProvider()
+    provider = CachingProvider(inner, tmp_path / "b", ttl=-1)
+    with call_class("cron"):
+        await provider.chat(MESSAGES)
+        await provider.chat(MESSAGES)
+    assert inner.calls == 2
+
+
+def test_callbacks_are_forwarded_to_wrapped_provider(tmp_path):
+    inner = CountingProvider()
+    provider = CachingProvider(inner, tmp_path)
+
+    async def on_progress(text: str) -> None: ...
+
+    provider.progress_callback = on_progress
+    assert inner.progress_callback is on_progress
+    provider.progress_callback = None
+    assert inner.progress_callback is None
+
+
+async def test_heartbeat_turns_a_minute_apart_hit_end_to_end(tmp_path, monkeypatch):
+    import datetime as dt
+
+    from nanobot.agent.loop import AgentLoop
+    from nanobot.bus.queue import MessageBus
+    from nanobot.config.schema import Config
+
+    class Clock(dt.datetime):
+        minute = 0
+
+        @classmethod
+        def now(cls, tz=None):
+            return dt.datetime(2026, 1, 1, 10, cls.minute)
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(dt, "datetime", Clock)
+    inner = CountingProvider(LLMResponse(content="HEARTBEAT_OK"))
+    provider = CachingProvider(inner, tmp_path / "llm")
+    agent = AgentLoop(MessageBus(), provider, tmp_path / "workspace", config=Config())
+    prompts = []
+    inner.chat = _spy(inner.chat, prompts)
+
+    with call_class("heartbeat"):
+        assert await agent.process_direct("Check HEARTBEAT.md", session_key="heartbeat") == "HEARTBEAT_OK"
+        Clock.minute = 1
+        assert await agent.process_direct("Check HEARTBEAT.md", session_key="heartbeat") == "HEARTBEAT_OK"
+
+    assert "10:00" in prompts[0][0]["content"]
+    assert inner.calls == 1
+    assert provider.stats()["hits"] == 1
+
+
+def _spy(chat, log):
+    async def wrapper(messages, *args, **kwargs):
+        log.append(messages)
+        return await chat(messages, *args, **kwargs)
+    return wrapper
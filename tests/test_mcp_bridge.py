@@ -0,0 +1,105 @@
+"""Tests for the multiplexed MCP bridge (listener and the MCP server's client)."""
+
+import asyncio
+
+import pytest
+
+from nanobot.mcp import server
+from nanobot.mcp.listener import MCPBridge
+
+
+@pytest.fixture
+async def bridge(tmp_path):
+    bridge = MCPBridge(str(tmp_path / "bridge.sock"), progress_window=0.05)
+    await bridge.start()
+    yield bridge
+    await bridge.close()
+
+
+def _recorder():
+    sent: list[tuple[str, list[str]]] = []
+    progress: list[str] = []
+
+    async def on_message(content: str, media: list[str]) -> None:
+        sent.append((content, media))
+
+    async def on_progress(text: str) -> None:
+        progress.append(text)
+
+    return sent, progress, on_message, on_progress
+
+
+async def test_requests_route_by_token_over_one_connection(bridge):
+    sent_a, _, msg_a, prog_a = _recorder()
+    sent_b, _, msg_b, prog_b = _recorder()
+    token_a = bridge.register(msg_a, prog_a)
+    token_b = bridge.register(msg_b, prog_b)
+
+    conn = server._Connection(bridge.socket_path, token_a)
+    first = await asyncio.to_thread(conn.request, "send_message", {"content": "to a", "media": []})
+    sock = conn._sock
+    conn.token = token_b
+    second = await asyncio.to_thread(conn.request, "send_message", {"content": "to b", "media": []})
+
+    assert first["ok"] and second["ok"]
+    assert conn._sock is sock  # Same connection reused
+    assert sent_a == [("to a", [])] and sent_b == [("to b", [])]
+    conn.close()
+
+
+async def test_unknown_token_and_missing_media_are_rejected(bridge, tmp_path):
+    _, _, on_message, on_progress = _recorder()
+    token = bridge.register(on_message, on_progress)
+
+    stale = server._Connection(bridge.socket_path, "expired")
+    result = await asyncio.to_thread(stale.request, "send_message", {"content": "x", "media": []})
+    assert not result["ok"] and "token" in result["error"]
+
+    conn = server._Connection(bridge.socket_path, token)
+    missing = str(tmp_path / "nope.png")
+    result = await asyncio.to_thread(conn.request, "send_message", {"content": "x", "media": [missing]})
+    assert not result["ok"] and missing in result["error"]
+    stale.close()
+    conn.close()
+
+
+async def test_progress_is_batched_and_flushed_before_messages(bridge, tmp_path):
+    sent, progress, on_message, on_progress = _recorder()
+    token = bridge.register(on_message, on_progress)
+    conn = server._Connection(bridge.socket_path, token)
+    media = tmp_path / "clip.mp4"
+    media.write_bytes(b"\0" * 1024)
+
+    for step in ("one", "two", "three"):
+        await asyncio.to_thread(conn.request, "send_progress", {"text": step}, False)
+    await asyncio.sleep(0.2)
+    assert progress == ["one\ntwo\nthree"]
+
+    await asyncio.to_thread(conn.request, "send_progress", {"text": "four"}, False)
+    await asyncio.to_thread(conn.request, "send_message", {"content": "done", "media": [str(media)]})
+    assert progress == ["one\ntwo\nthree", "four"]
+    assert sent == [("done", [str(media)])]
+    conn.close()
+
+
+async def test_concurrent_requests_are_answered_by_id(bridge):
+    release = asyncio.Event()
+
+    async def slow_message(content: str, media: list[str]) -> None:
+        if content == "slow":
+            await release.wait()
+
+    token = bridge.register(slow_message, None)
+    reader, writer = await asyncio.open_unix_connection(bridge.socket_path)
+    writer.write(
+        b'{"id": 1, "token": "' + token.encode() + b'", "method": "send_message", "params": {"content": "slow"}}\n'
+        b'{"id": 2, "token": "' + token.encode() + b'", "method": "send_message", "params": {"content": "fast"}}\n'
+    )
+    await writer.drain()
+
+    first = await asyncio.wait_for(reader.readline(), timeout=2)
+    release.set()
+    second = await asyncio.wait_for(reader.readline(), timeout=2)
+
+    assert b'"id": 2' in first and b'"id": 1' in second
+    writer.close()
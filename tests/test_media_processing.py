@@ -0,0 +1,179 @@
+"""Tests for the shared async media processor (fake ffmpeg/ffprobe)."""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from nanobot.media.processing import MediaProcessor
+
+FAKE_FFPROBE = """
+import json, os, sys
+with open(os.environ["FAKE_MEDIA_LOG"], "a") as f:
+    f.write("ffprobe\\n")
+print(json.dumps({
+    "streams": [{"width": 3840, "height": 2160}],
+    "format": {"duration": "60.0"},
+}))
+"""
+
+# Writes FAKE_FFMPEG_BYTES bytes to the output path (last argument) after FAKE_FFMPEG_SLEEP seconds
+FAKE_FFMPEG = """
+import os, sys, time
+with open(os.environ["FAKE_MEDIA_LOG"], "a") as f:
+    f.write("ffmpeg " + " ".join(sys.argv[1:]) + "\\n")
+time.sleep(float(os.environ.get("FAKE_FFMPEG_SLEEP", "0")))
+with open(sys.argv[-1], "wb") as f:
+    f.write(b"x" * int(os.environ.get("FAKE_FFMPEG_BYTES", "1000")))
+"""
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    log = tmp_path / "calls.log"
+    log.touch()
+    monkeypatch.setenv("FAKE_MEDIA_LOG", str(log))
+    bins = {}
+    for name, code in (("ffprobe", FAKE_FFPROBE), ("ffmpeg", FAKE_FFMPEG)):
+        script = tmp_path / name
+        script.write_text(f"#!{sys.executable}\n{code}")
+        script.chmod(0o755)
+        bins[name] = str(script)
+    proc = MediaProcessor(cache_dir=tmp_path / "cache", ffmpeg=bins["ffmpeg"], ffprobe=bins["ffprobe"])
+    proc.calls = lambda: log.read_text().splitlines()
+    return proc
+
+
+def _video(tmp_path, name="clip.mp4", data=b"video-bytes"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+async def test_probe_is_cached_by_content(processor, tmp_path):
+    first = await processor.probe(_video(tmp_path))
+    again = await processor.probe(_video(tmp_path, "copy.mp4"))  # Same bytes, other name
+
+    assert first == again == {"width": 3840, "height": 2160, "duration": 60}
+    assert processor.calls() == ["ffprobe"]
+
+
+async def test_compressed_video_is_reused(processor, tmp_path):
+    video = _video(tmp_path)
+
+    out = await processor.compress_video(video, target_bytes=9_000_000, limit_bytes=10_000_000)
+    again = await processor.compress_video(_video(tmp_path, "copy.mp4"), 9_000_000, 10_000_000)
+
+    assert out is not None and out == again and out.exists()
+    ffmpeg = [c for c in processor.calls() if c.startswith("ffmpeg")]
+    assert len(ffmpeg) == 1
+    assert "scale=-2:720" in ffmpeg[0]  # 2160p downscaled
+
+
+async def test_concurrent_identical_jobs_share_one_encode(processor, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_FFMPEG_SLEEP", "0.3")
+    video = _video(tmp_path)
+
+    results = await asyncio.gather(*(
+        processor.compress_video(video, 9_000_000, 10_000_000) for _ in range(3)
+    ))
+
+    assert len(set(results)) == 1
+    assert sum(c.startswith("ffmpeg") for c in processor.calls()) == 1
+
+
+async def test_cancelled_first_caller_does_not_fail_joined_callers(processor, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_FFMPEG_SLEEP", "0.3")
+    video = _video(tmp_path)
+
+    first = asyncio.create_task(processor.compress_video(video, 9_000_000, 10_000_000))
+    await asyncio.sleep(0.05)
+    joined = asyncio.create_task(processor.compress_video(video, 9_000_000, 10_000_000))
+    await asyncio.sleep(0.05)
+    first.cancel()
+
+    out = await joined
+    assert out is not None and out.exists()
+    assert first.cancelled()
+    assert sum(c.startswith("ffmpeg") for c in processor.calls()) == 1
+    assert processor.stats()["running"] == 0
+
+
+def test_eviction_spares_temp_files_running_jobs_and_fresh_outputs(tmp_path):
+    processor = MediaProcessor(cache_dir=tmp_path / "cache", cache_max_bytes=1000, min_age=60)
+    processor.out_dir.mkdir(parents=True)
+    old = time.time() - 3600
+
+    def output(name, mtime):
+        path = processor.out_dir / name
+        path.write_bytes(b"x" * 400)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    stale = output("a" * 32 + ".mp4", old)
+    temp = output(".b.1.tmp.mp4", old)
+    running = output("c" * 32 + ".mp4", old)
+    fresh = output("d" * 32 + ".mp4", time.time())
+    processor._inflight["c" * 64] = None  # Only the key matters here
+
+    processor._evict()
+
+    assert not stale.exists()
+    assert temp.exists() and running.exists() and fresh.exists()
+
+
+async def test_oversized_result_is_rejected_and_remembered(processor, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_FFMPEG_BYTES", "5000")
+    video = _video(tmp_path)
+
+    assert await processor.compress_video(video, target_bytes=2_000_000, limit_bytes=4500, max_height=720) is None
+    assert await processor.compress_video(video, target_bytes=2_000_000, limit_bytes=4500, max_height=720) is None
+    assert sum(c.startswith("ffmpeg") for c in processor.calls()) == 1
+
+
+async def test_encoding_does_not_block_the_event_loop(processor, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_FFMPEG_SLEEP", "0.5")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.02)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    started = time.monotonic()
+    await processor.compress_video(_video(tmp_path), 9_000_000, 10_000_000)
+    task.cancel()
+
+    assert time.monotonic() - started >= 0.5
+    assert ticks >= 10
+
+
+async def test_image_fitted_to_limits(processor, tmp_path):
+    small = tmp_path / "small.png"
+    small.write_bytes(b"p" * 100)
+    processor.probe = lambda path: _async({"width": 800, "height": 600})
+    assert await processor.fit_image(small, max_bytes=10_000, max_dimension_sum=10_000) == small
+
+    processor.probe = lambda path: _async({"width": 8000, "height": 6000})
+    fitted = await processor.fit_image(small, max_bytes=10_000, max_dimension_sum=10_000)
+
+    assert fitted != small and fitted.suffix == ".jpg"
+    assert any("scale=" in c for c in processor.calls())
+
+
+async def _async(value):
+    return value
+
+
+async def test_missing_binaries_degrade_gracefully(tmp_path):
+    processor = MediaProcessor(cache_dir=tmp_path / "cache", ffmpeg="no-such-ffmpeg", ffprobe="no-such-ffprobe")
+    video = _video(tmp_path)
+
+    assert await processor.probe(video) == {}
+    assert await processor.compress_video(video, 9_000_000, 10_000_000) is None
+    assert json.dumps(processor.stats())
@@ -0,0 +1,93 @@
+"""Tests for the content-addressed inbound media store."""
+
+import json
+import os
+import time
+
+import pytest
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.media.store import MediaStore
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MediaStore(tmp_path / "media", max_bytes=1000, reference_dirs=[tmp_path / "sessions"], min_age=0)
+
+
+def _age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+async def test_streams_are_stored_under_content_hash_and_deduplicated(store):
+    first = await store.put_stream(_chunks(b"hello ", b"world"), ".jpg")
+    again = await store.put_stream(_chunks(b"hello world"), ".jpg")
+
+    assert first == again
+    assert first.read_bytes() == b"hello world"
+    assert first.name.endswith(".jpg") and len(first.stem) == 32
+    assert [p.name for p in store.root.iterdir() if p.is_file()] == [first.name]
+    assert not list((store.root / ".incoming").iterdir())
+
+
+async def test_put_file_moves_download_into_store(store):
+    incoming = store.incoming_path(".ogg")
+    incoming.write_bytes(b"voice")
+
+    stored = await store.put_file(incoming)
+
+    assert not incoming.exists()
+    assert stored.parent == store.root and stored.suffix == ".ogg"
+
+
+async def test_gc_evicts_unreferenced_lru_first(store, tmp_path):
+    old = await store.put_stream(_chunks(b"a" * 400), ".jpg")
+    kept = await store.put_stream(_chunks(b"b" * 400), ".jpg")
+    _age(kept, 300)  # Oldest, but referenced by a session
+    _age(old, 200)
+    sessions = tmp_path / "sessions"
+    sessions.mkdir()
+    (sessions / "telegram_1.jsonl").write_text(
+        json.dumps({"role": "user", "content": f"[image: {kept}]"}) + "\n"
+    )
+
+    newest = await store.put_stream(_chunks(b"c" * 400), ".jpg")
+    store.gc()
+
+    assert store.references()[kept.name] == 1
+    assert kept.exists() and newest.exists() and not old.exists()
+    assert store.size_bytes() == 800
+
+
+async def test_referenced_files_go_when_quota_still_exceeded(store):
+    files = [await store.put_stream(_chunks(bytes([i]) * 600), ".bin") for i in range(2)]
+    _age(files[0], 100)
+
+    store.gc()
+
+    assert not files[0].exists() and files[1].exists()
+
+
+async def test_recent_files_are_never_evicted(tmp_path):
+    store = MediaStore(tmp_path / "media", max_bytes=100, min_age=3600)
+    path = await store.put_stream(_chunks(b"x" * 500), ".png")
+
+    assert store.gc() == 0
+    assert path.exists()
+
+
+async def test_context_reads_images_through_store(store, tmp_path):
+    path = await store.put_stream(_chunks(b"\x89PNG"), ".png")
+    _age(path, 500)
+    builder = ContextBuilder(tmp_path, media=store)
+
+    content = builder._build_user_content("look", [str(path), str(tmp_path / "gone.png")])
+
+    assert len(content) == 2 and content[0]["image_url"]["url"].startswith("data:image/png;base64,")
+    assert time.time() - path.stat().st_mtime < 60  # Bumped in LRU order
@@ -0,0 +1,120 @@
+from typing import Any
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.telemetry.metrics import TOOL_CALLS, TOOL_LATENCY, MetricsRegistry
+from nanobot.web.gateway import GatewayServer
+
+
+class EchoTool(Tool):
+    @property
+    def name(self) -> str:
+        return "metrics_echo"
+
+    @property
+    def description(self) -> str:
+        return "echo"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {"fail": {"type": "boolean"}}}
+
+    async def execute(self, fail: bool = False, **kwargs: Any) -> str:
+        if fail:
+            raise RuntimeError("boom")
+        return "ok"
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    reg = MetricsRegistry()
+    hist = reg.histogram("t_seconds", "Test.", ("model",), buckets=(0.1, 1))
+    hist.observe(0.05, model="a")
+    hist.observe(0.5, model="a")
+    hist.observe(5, model="a")
+
+    text = reg.render()
+    assert "# TYPE t_seconds histogram" in text
+    assert 't_seconds_bucket{model="a",le="0.1"} 1' in text
+    assert 't_seconds_bucket{model="a",le="1"} 2' in text
+    assert 't_seconds_bucket{model="a",le="+Inf"} 3' in text
+    assert 't_seconds_count{model="a"} 3' in text
+    assert 't_seconds_sum{model="a"} 5.55' in text
+
+
+def test_gauge_callback_and_label_escaping() -> None:
+    reg = MetricsRegistry()
+    depth = [3]
+    gauge = reg.gauge("q_depth", "Depth.", ("name",))
+    gauge.set_function(lambda: depth[0], name='in"bound')
+    assert 'q_depth{name="in\\"bound"} 3' in reg.render()
+    depth[0] = 7
+    assert 'q_depth{name="in\\"bound"} 7' in reg.render()
+
+
+def test_registry_returns_existing_metric_with_same_shape() -> None:
+    reg = MetricsRegistry()
+    assert reg.counter("c_total", "C.") is reg.counter("c_total", "C.")
+
+
+async def test_registry_execute_records_latency_and_errors() -> None:
+    registry = ToolRegistry()
+    registry.register(EchoTool())
+    before_ok = TOOL_CALLS.get(tool="metrics_echo", status="ok")
+    before_err = TOOL_CALLS.get(tool="metrics_echo", status="error")
+    before_n = TOOL_LATENCY.count(tool="metrics_echo")
+
+    assert await registry.execute("metrics_echo", {}) == "ok"
+    assert (await registry.execute("metrics_echo", {"fail": True})).startswith("Error")
+
+    assert TOOL_CALLS.get(tool="metrics_echo", status="ok") == before_ok + 1
+    assert TOOL_CALLS.get(tool="metrics_echo", status="error") == before_err + 1
+    assert TOOL_LATENCY.count(tool="metrics_echo") == before_n + 2
+
+
+async def test_gateway_serves_metrics() -> None:
+    reg = MetricsRegistry()
+    reg.counter("nanobot_test_total", "Test counter.").inc(2)
+    server = GatewayServer("127.0.0.1", 0, registry=reg)
+
+    async with TestClient(TestServer(server.build_app())) as client:
+        resp = await client.get("/metrics")
+        assert resp.status == 200
+        assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "nanobot_test_total 2" in await resp.text()
+        assert (await client.get("/health")).status == 200
+
+
+def test_gateway_uses_configured_port_and_local_metrics_host(tmp_path, monkeypatch) -> None:
+    import asyncio
+
+    from typer.testing import CliRunner
+
+    from nanobot.cli import commands
+    from nanobot.config import loader
+    from nanobot.config.schema import Config
+    from nanobot.web import gateway
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    config = Config()
+    config.gateway.port = 28790
+    monkeypatch.setattr(loader, "load_config", lambda: config)
+    monkeypatch.setattr(commands, "_make_provider", lambda config: StubProvider())
+    monkeypatch.setattr(asyncio, "run", lambda coro: coro.close())
+    bound: list[tuple[str, int]] = []
+    monkeypatch.setattr(gateway, "GatewayServer", lambda host, port: bound.append((host, port)))
+
+    assert CliRunner().invoke(commands.app, ["gateway"]).exit_code == 0
+    assert CliRunner().invoke(commands.app, ["gateway", "--port", "18000"]).exit_code == 0
+
+    assert bound == [("127.0.0.1", 28790), ("127.0.0.1", 18000)]
+
+
+class StubProvider(LLMProvider):
+    async def chat(self, *args: Any, **kwargs: Any) -> LLMResponse:
+        return LLMResponse(content="")
+
+    def get_default_model(self) -> str:
+        return "stub"
@@ -6,9 +6,9 @@ from typing import Any
 import pytest
 
 from nanobot.agent.tools.base import Tool
-from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.parallel import ParallelTool
-
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.providers.base import LLMProvider, LLMResponse
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -84,11 +84,47 @@ class FailTool(Tool):
         return "Error: intentional failure"
 
 
-def _make_registry(*tools: Tool) -> ToolRegistry:
+class HangTool(Tool):
+    """Sleeps for `seconds`, tracking how many run at once."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.cancelled = 0
+
+    @property
+    def name(self) -> str:
+        return "hang"
+
+    @property
+    def description(self) -> str:
+        return "hang tool"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {"seconds": {"type": "number"}},
+        }
+
+    async def execute(self, seconds: float = 10, **kwargs: Any) -> str:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(seconds)
+            return "woke"
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+
+
+def _make_registry(*tools: Tool, **parallel_kwargs: Any) -> ToolRegistry:
     reg = ToolRegistry()
     for t in tools:
         reg.register(t)
-    parallel = ParallelTool(registry=reg)
+    parallel = ParallelTool(registry=reg, **parallel_kwargs)
     reg.register(parallel)
     return reg
 
@@ -208,3 +244,98 @@ async def test_arguments_passed_correctly() -> None:
     first_pos = result.index("first")
     second_pos = result.index("second")
     assert first_pos < second_pos
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_is_respected() -> None:
+    hang = HangTool()
+    reg = _make_registry(hang, max_concurrency=2)
+    tasks = [{"tool": "hang", "arguments": {"seconds": 0.05}}] * 6
+    result = await reg.execute("parallel", {"tasks": tasks})
+    assert hang.peak == 2
+    assert result.count("woke") == 6
+    assert "6 completed" in result
+
+
+@pytest.mark.asyncio
+async def test_task_timeout_returns_partial_results() -> None:
+    hang = HangTool()
+    reg = _make_registry(EchoTool(), hang)
+    tasks = [
+        {"tool": "echo", "arguments": {"text": "fast"}},
+        {"tool": "hang", "arguments": {"seconds": 10}, "timeout": 0.1},
+    ]
+    result = await reg.execute("parallel", {"tasks": tasks})
+    assert "fast" in result
+    assert "| 2 | hang | timed out |" in result
+    assert "1 completed, 1 timed out" in result
+    assert hang.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_deadline() -> None:
+    hang = HangTool()
+    reg = _make_registry(hang, max_concurrency=1)
+    tasks = [{"tool": "hang", "arguments": {"seconds": 10}}] * 2
+    start = asyncio.get_event_loop().time()
+    result = await reg.execute("parallel", {"tasks": tasks, "timeout": 0.1})
+    assert asyncio.get_event_loop().time() - start < 1
+    assert "| 1 | hang | timed out |" in result
+    assert "| 2 | hang | not started |" in result
+    assert hang.active == 0
+
+
+@pytest.mark.asyncio
+async def test_timeouts_are_capped_by_config() -> None:
+    reg = _make_registry(HangTool(), task_timeout=0.1)
+    tasks = [{"tool": "hang", "arguments": {"seconds": 10}, "timeout": 999}]
+    result = await reg.execute("parallel", {"tasks": tasks})
+    assert "timed out after 0.1s" in result
+
+
+@pytest.mark.asyncio
+async def test_global_budget_is_shared_between_instances() -> None:
+    hang = HangTool()
+    budget = asyncio.Semaphore(2)
+    reg_a = _make_registry(hang, budget=budget)
+    reg_b = _make_registry(hang, budget=budget)
+    tasks = [{"tool": "hang", "arguments": {"seconds": 0.05}}] * 3
+    await asyncio.gather(
+        reg_a.execute("parallel", {"tasks": tasks}),
+        reg_b.execute("parallel", {"tasks": tasks}),
+    )
+    assert hang.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_cancel_event_cancels_running_batch() -> None:
+    from nanobot.agent.engine import _execute_with_heartbeat
+
+    hang = HangTool()
+    reg = _make_registry(hang)
+    cancel = asyncio.Event()
+    tasks = [{"tool": "hang", "arguments": {"seconds": 10}}] * 3
+
+    asyncio.get_running_loop().call_later(0.1, cancel.set)
+    result = await _execute_with_heartbeat(reg, "parallel", {"tasks": tasks}, None, cancel)
+    assert "cancelled" in result
+    assert hang.cancelled == 3
+    assert hang.active == 0
+
+
+class _StubProvider(LLMProvider):
+    async def chat(self, *args: Any, **kwargs: Any) -> LLMResponse:
+        return LLMResponse(content="")
+
+    def get_default_model(self) -> str:
+        return "stub"
+
+
+def test_agent_loop_builds_with_default_config(tmp_path, monkeypatch) -> None:
+    from nanobot.agent.loop import AgentLoop
+    from nanobot.bus.queue import MessageBus
+    from nanobot.config.schema import Config
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    loop = AgentLoop(MessageBus(), _StubProvider(), tmp_path / "workspace", config=Config())
+    assert loop.tools.has("exec") and loop.tools.has("parallel")
@@ -0,0 +1,85 @@
+"""Tests for the resource-limited subprocess pool."""
+
+import asyncio
+import time
+
+import pytest
+
+from nanobot.agent.process_pool import ProcessPool, ProcessSlot, ResourceLimits
+from nanobot.agent.tools.shell import ExecTool
+
+
+async def run(pool: ProcessPool, command: str, key: str | None = None) -> tuple[str, ProcessSlot]:
+    async with pool.slot(key) as slot:
+        proc = await slot.spawn_shell(command, stdout=asyncio.subprocess.PIPE)
+        out, _ = await proc.communicate()
+    return out.decode(), slot
+
+
+@pytest.mark.asyncio
+async def test_reports_usage_and_exit_code():
+    pool = ProcessPool()
+    async with pool.slot("s") as slot:
+        proc = await slot.spawn_shell("echo hi; exit 4", stdout=asyncio.subprocess.PIPE)
+        out, _ = await proc.communicate()
+    assert out == b"hi\n"
+    assert proc.returncode == 4
+    (usage,) = slot.usage
+    assert usage.peak_rss_kb > 0
+    assert usage.wall > 0
+    assert pool.stats() == {"running": 0, "waiting": 0, "completed": 1}
+
+
+@pytest.mark.asyncio
+async def test_rlimits_are_applied():
+    pool = ProcessPool(limits=ResourceLimits(open_files=123))
+    out, _ = await run(pool, "ulimit -n")
+    assert out.strip() == "123"
+
+
+@pytest.mark.asyncio
+async def test_cpu_limit_kills_runaway_command():
+    pool = ProcessPool(limits=ResourceLimits(cpu_seconds=1))
+    _, slot = await run(pool, "while :; do :; done")
+    assert slot.usage[0].limit_hit() == "CPU time limit exceeded"
+
+
+@pytest.mark.asyncio
+async def test_per_session_cap_queues_same_session_only():
+    pool = ProcessPool(max_concurrent=4, max_per_session=1)
+    start = time.monotonic()
+    await asyncio.gather(run(pool, "sleep 0.3", "a"), run(pool, "sleep 0.3", "a"))
+    serial = time.monotonic() - start
+
+    start = time.monotonic()
+    await asyncio.gather(run(pool, "sleep 0.3", "a"), run(pool, "sleep 0.3", "b"))
+    parallel = time.monotonic() - start
+
+    assert serial >= 0.6
+    assert parallel < 0.55
+
+
+@pytest.mark.asyncio
+async def test_global_cap():
+    pool = ProcessPool(max_concurrent=1, max_per_session=0)
+    start = time.monotonic()
+    results = await asyncio.gather(run(pool, "sleep 0.2", "a"), run(pool, "sleep 0.2", "b"))
+    assert time.monotonic() - start >= 0.4
+    assert max(slot.queued for _, slot in results) >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_slot_release_kills_leftover_process_tree():
+    pool = ProcessPool()
+    async with pool.slot() as slot:
+        proc = await slot.spawn_shell("sleep 30 & sleep 30")
+    assert proc.returncode is not None
+
+
+@pytest.mark.asyncio
+async def test_exec_tool_reports_limit(tmp_path):
+    pool = ProcessPool(limits=ResourceLimits(cpu_seconds=1))
+    tool = ExecTool(working_dir=str(tmp_path), timeout=10, process_pool=pool)
+    result = await tool.execute(command="while :; do :; done")
+    assert "CPU time limit exceeded" in result
+    assert "peak rss" in result
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bench import LatencyModel, ScriptedProvider
+from nanobot.bench.replay import replay_turns
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import Config
+from nanobot.telemetry.recording import load_turns
+
+
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+async def _record_turns(tmp_path: Path) -> Path:
+    workspace = tmp_path / "ws"
+    workspace.mkdir()
+    (workspace / "notes.txt").write_text("remember the milk\n")
+    config = Config()
+    config.agents.recording.enabled = True
+    config.agents.recording.dir = str(tmp_path / "rec")
+
+    provider = ScriptedProvider(
+        script=[("read_file", {"path": str(workspace / "notes.txt")})],
+        latency=LatencyModel(mean_ms=0),
+    )
+    agent = AgentLoop(bus=MessageBus(), provider=provider, workspace=workspace, config=config)
+    for text in ("first question", "second question"):
+        reply = await agent._process_message(
+            InboundMessage(channel="cli", sender_id="u", chat_id="c1", content=text),
+        )
+        assert reply is not None and reply.content.startswith("ok")
+    files = list((tmp_path / "rec").glob("recording-*.jsonl"))
+    assert len(files) == 1
+    return files[0]
+
+
+async def test_recording_captures_calls_tools_and_session_state(tmp_path: Path) -> None:
+    turns = load_turns(await _record_turns(tmp_path))
+    assert len(turns) == 2
+
+    first, second = turns
+    assert first["content"] == "first question"
+    assert [c["response"]["finishReason"] for c in first["calls"]] == ["tool_calls", "stop"]
+    assert first["tools"][0]["name"] == "read_file"
+    assert "remember the milk" in first["tools"][0]["result"]
+    assert first["context"][-1] == {"role": "user", "content": "first question"}
+    assert first["final"].startswith("ok")
+    # The second turn starts from the session the first one saved
+    assert first["session"]["messages"] == []
+    assert [m["role"] for m in second["session"]["messages"]] == ["user", "assistant", "tool", "assistant"]
+
+
+async def test_replay_reproduces_recorded_turns(tmp_path: Path) -> None:
+    path = await _record_turns(tmp_path)
+    (tmp_path / "ws" / "notes.txt").unlink()  # Tools must not run for real
+
+    report = await replay_turns(load_turns(path), repeat=2, workspace=tmp_path / "ws")
+
+    assert report.turns == 4
+    assert report.divergent_turns == 0
+    # Same context apart from the scratch workspace path in the system prompt
+    assert abs(report.replayed_prompt_tokens - report.recorded_prompt_tokens) < 0.05 * report.recorded_prompt_tokens
+    assert {"context", "session_save", "tools"} <= set(report.stages_ms)
+
+    saved = json.loads(json.dumps(report.to_dict()))
+    rows = {name: change for name, _, _, change in report.compare(saved)}
+    assert rows["total_ms"] == 0.0 and rows["replayed_prompt_tokens"] == 0.0
@@ -0,0 +1,184 @@
+"""Tests for retries, hedging, circuit breakers and fallbacks around provider.chat."""
+
+import asyncio
+
+import pytest
+
+from nanobot.config.schema import Config, ModelAlias
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.factory import make_provider
+from nanobot.providers.resilient import CircuitBreaker, ResilientProvider
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class FlakyProvider(LLMProvider):
+    """Returns queued responses per model (then "ok <model>"), optionally after a delay."""
+
+    def __init__(self, script: dict[str, list[LLMResponse]] | None = None, delay: dict[str, float] | None = None):
+        super().__init__()
+        self.script = script or {}
+        self.delay = delay or {}
+        self.calls: list[str] = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        self.calls.append(model)
+        await asyncio.sleep(self.delay.get(model, 0))
+        queue = self.script.get(model)
+        if queue:
+            return queue.pop(0)
+        return LLMResponse(content=f"ok {model}")
+
+    def get_default_model(self) -> str:
+        return "primary"
+
+
+def _transient() -> LLMResponse:
+    return LLMResponse(content="Error calling LLM: 503", finish_reason="error", retryable=True)
+
+
+def _fatal() -> LLMResponse:
+    return LLMResponse(content="Error calling LLM: 401", finish_reason="error")
+
+
+def _resilient(inner: FlakyProvider, **kwargs) -> ResilientProvider:
+    kwargs.setdefault("backoff_base", 0)
+    return ResilientProvider(
+        inner, resolve=lambda name: (name, inner), **kwargs,
+    )
+
+
+async def test_transient_errors_are_retried() -> None:
+    inner = FlakyProvider({"primary": [_transient(), _transient()]})
+    provider = _resilient(inner, max_retries=2)
+
+    response = await provider.chat(MESSAGES)
+
+    assert response.content == "ok primary"
+    assert inner.calls == ["primary"] * 3
+
+
+async def test_fatal_error_falls_back_without_retrying() -> None:
+    inner = FlakyProvider({"primary": [_fatal()]})
+    provider = _resilient(inner, fallbacks={"primary": ["backup"]})
+
+    response = await provider.chat(MESSAGES)
+
+    assert response.content == "ok backup"
+    assert inner.calls == ["primary", "backup"]
+
+
+async def test_last_error_returned_when_chain_exhausted() -> None:
+    inner = FlakyProvider({"primary": [_fatal()], "backup": [_fatal()]})
+    provider = _resilient(inner, fallbacks={"*": ["backup"]})
+
+    response = await provider.chat(MESSAGES)
+
+    assert response.finish_reason == "error"
+    assert inner.calls == ["primary", "backup"]
+
+
+async def test_open_circuit_skips_model_until_cooldown() -> None:
+    inner = FlakyProvider({"primary": [_fatal(), _fatal()]})
+    provider = _resilient(inner, fallbacks={"primary": ["backup"]}, breaker_failures=2, breaker_cooldown=60)
+
+    await provider.chat(MESSAGES)
+    await provider.chat(MESSAGES)
+    assert provider.stats()["primary"]["breaker"] == "open"
+
+    inner.calls.clear()
+    assert (await provider.chat(MESSAGES)).content == "ok backup"
+    assert inner.calls == ["backup"]
+
+
+def test_circuit_breaker_half_open_allows_one_trial() -> None:
+    breaker = CircuitBreaker(failures=1, cooldown=0)
+    assert breaker.failure()
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial at a time
+    breaker.success()
+    assert breaker.state == "closed"
+
+
+async def test_cancelled_half_open_trial_frees_the_breaker() -> None:
+    inner = FlakyProvider({"primary": [_fatal()]})
+    provider = _resilient(inner, breaker_failures=1, breaker_cooldown=0)
+    await provider.chat(MESSAGES)  # Opens the breaker; half-open straight away
+
+    inner.delay["primary"] = 5.0
+    trial = asyncio.create_task(provider.chat(MESSAGES))
+    await asyncio.sleep(0.01)
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    inner.delay["primary"] = 0
+    response = await provider.chat(MESSAGES)
+    assert response.content == "ok primary"
+    assert provider.chain("primary")[0].breaker.state == "closed"
+
+
+async def test_slow_request_is_hedged_to_fallback() -> None:
+    inner = FlakyProvider()
+    provider = _resilient(
+        inner, fallbacks={"primary": ["backup"]},
+        hedge=True, hedge_min_delay=0.01, hedge_min_samples=3,
+    )
+    for _ in range(3):
+        await provider.chat(MESSAGES)  # Warm up primary's latency window
+
+    inner.delay["primary"] = 5.0
+    response = await asyncio.wait_for(provider.chat(MESSAGES), timeout=2)
+
+    assert response.content == "ok backup"
+    assert inner.calls[-2:] == ["primary", "backup"]
+
+
+async def test_side_effecting_target_is_called_once() -> None:
+    inner = FlakyProvider({"primary": [_transient()]})
+    provider = _resilient(
+        inner, fallbacks={"primary": ["backup"]}, hedge=True, replayable=lambda p: False,
+    )
+
+    response = await provider.chat(MESSAGES)
+
+    assert response.finish_reason == "error"
+    assert inner.calls == ["primary"]  # Not retried, and no fallback after it may have run tools
+
+
+async def test_side_effecting_target_falls_back_when_not_started() -> None:
+    missing = LLMResponse(content="Claude CLI not found", finish_reason="error", not_started=True)
+    inner = FlakyProvider({"primary": [missing]})
+    provider = _resilient(inner, fallbacks={"primary": ["backup"]}, replayable=lambda p: False)
+
+    response = await provider.chat(MESSAGES)
+
+    assert response.content == "ok backup"
+    assert inner.calls == ["primary", "backup"]
+
+
+def test_factory_builds_fallbacks_from_model_aliases(monkeypatch) -> None:
+    monkeypatch.delenv("CLAUDE_CODE_OAUTH_TOKEN", raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")  # LiteLLMProvider exports its key
+    config = Config()
+    config.providers.openai.api_key = "sk-test"
+    config.agents.defaults.model = "openai/gpt-4o"
+    config.agents.model_aliases = {"mini": ModelAlias(model="openai/gpt-4o-mini")}
+    config.agents.resilience.fallbacks = {"openai/gpt-4o": ["mini"]}
+
+    provider = make_provider(config)
+
+    assert isinstance(provider, ResilientProvider)
+    assert [t.model for t in provider.chain("openai/gpt-4o")] == ["openai/gpt-4o", "openai/gpt-4o-mini"]
+
+
+def test_factory_marks_claude_cli_targets_as_not_replayable(monkeypatch) -> None:
+    monkeypatch.setenv("CLAUDE_CODE_OAUTH_TOKEN", "oauth-test")
+    config = Config()
+    config.agents.defaults.model = "anthropic/claude-test"
+
+    provider = make_provider(config)
+
+    assert isinstance(provider, ResilientProvider)
+    assert [t.replayable for t in provider.chain("anthropic/claude-test")] == [False]
@@ -0,0 +1,155 @@
+"""Tests for the outbound send scheduler (lanes, priorities, token buckets)."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.send_scheduler import SendScheduler
+from nanobot.channels.telegram import TelegramChannel
+from nanobot.config.schema import TelegramConfig, TelegramSendLimitsConfig
+
+
+def _recorder(scheduler, log, chat_id, gate=None):
+    def make(label):
+        async def run(text=None):
+            if gate:
+                await gate.wait()
+            await scheduler.acquire(chat_id)
+            log.append(text if text is not None else label)
+            return label
+        return run
+    return make
+
+
+async def test_chat_is_paced_without_slowing_other_chats():
+    scheduler = SendScheduler("test", chat_rate=20, chat_burst=1)
+    log = []
+    make = _recorder(scheduler, log, 1)
+
+    started = time.monotonic()
+    busy = [scheduler.submit(1, make(f"a{i}")) for i in range(5)]
+    other = await scheduler.submit(2, _recorder(scheduler, log, 2)("b"))
+    other_done = time.monotonic() - started
+    await asyncio.gather(*busy)
+
+    assert other == "b" and other_done < 0.1
+    assert time.monotonic() - started >= 0.19  # 4 refills at 20/s
+    assert [x for x in log if x.startswith("a")] == ["a0", "a1", "a2", "a3", "a4"]
+
+
+async def test_final_answer_supersedes_queued_progress():
+    scheduler = SendScheduler("test", chat_rate=1000, chat_burst=100)
+    log = []
+    gate = asyncio.Event()
+    make = _recorder(scheduler, log, 1)
+
+    first = scheduler.submit(1, _recorder(scheduler, log, 1, gate)("first"))
+    stale = scheduler.submit_progress(1, "working", make("progress"))
+    final = scheduler.submit(1, make("final"))
+    await asyncio.sleep(0)
+    later = scheduler.submit_progress(1, "still working", make("progress"))
+    gate.set()
+
+    assert await asyncio.gather(first, stale, final, later) == ["first", None, "final", "progress"]
+    assert log == ["first", "final", "still working"]
+
+
+async def test_queued_progress_is_coalesced():
+    scheduler = SendScheduler("test", chat_rate=1000, chat_burst=100, max_progress_chars=20)
+    log = []
+    gate = asyncio.Event()
+    make = _recorder(scheduler, log, 1)
+
+    scheduler.submit(1, _recorder(scheduler, log, 1, gate)("first"), progress=True)
+    merged = [scheduler.submit_progress(1, text, make("p")) for text in ("a", "b", "c")]
+    overflow = scheduler.submit_progress(1, "x" * 19, make("p"))
+    gate.set()
+    await asyncio.gather(*merged, overflow)
+
+    assert merged[0] is merged[1] is merged[2]
+    assert log == ["first", "a\nb\nc", "x" * 19]
+
+
+async def test_progress_yields_global_budget_to_final_answers():
+    scheduler = SendScheduler("test", global_rate=10, chat_rate=1000, chat_burst=100)
+    scheduler._global.consume(10)  # Budget exhausted
+    log = []
+
+    progress = scheduler.submit(1, _recorder(scheduler, log, 1)("progress"), progress=True)
+    await asyncio.sleep(0.02)
+    final = scheduler.submit(2, _recorder(scheduler, log, 2)("final"))
+    await asyncio.gather(progress, final)
+
+    assert log == ["final", "progress"]
+
+
+async def test_albums_larger_than_burst_and_penalties():
+    scheduler = SendScheduler("test", chat_rate=50, chat_burst=3)
+
+    await asyncio.wait_for(scheduler.acquire(1, cost=10), timeout=1)  # Borrows beyond the burst
+    scheduler.penalize(2, 0.2)
+    waited = await scheduler.acquire(2)
+
+    assert waited >= 0.15
+
+
+# ---------------------------------------------------------------------------
+# Telegram
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def channel(tmp_path):
+    sent: list[str] = []
+    gate = asyncio.Event()
+
+    async def send_message(chat_id, text, parse_mode=None):
+        await gate.wait()
+        sent.append(text)
+
+    limits = TelegramSendLimitsConfig(per_chat_per_second=1000, chat_burst=100)
+    ch = TelegramChannel(TelegramConfig(token="1:x", send_limits=limits), MessageBus())
+    ch._app = SimpleNamespace(bot=SimpleNamespace(send_message=send_message))
+    ch.sent, ch.gate = sent, gate
+    return ch
+
+
+async def test_telegram_send_does_not_block_and_merges_progress(channel):
+    def out(content, progress=False):
+        return OutboundMessage(
+            channel="telegram", chat_id="5", content=content,
+            metadata={"progress": True} if progress else {},
+        )
+
+    await asyncio.wait_for(channel.send(out("🔧 one", progress=True)), timeout=0.5)
+    await channel.send(out("🔧 two", progress=True))
+    await channel.send(out("🔧 three", progress=True))
+    await channel.send(out("Done."))
+    await channel.send(out("🔧 after", progress=True))
+    channel.gate.set()
+    await channel._sender.drain()
+
+    # The first progress was already in flight; the rest were stale by the final answer
+    assert channel.sent == ["🔧 one", "Done.", "🔧 after"]
+
+
+async def test_telegram_media_follow_their_text_on_the_lane(channel, tmp_path):
+    image = tmp_path / "a.png"
+    image.write_bytes(b"png")
+
+    async def upload(chat_id, files):
+        channel.sent.append(f"media:{files[0].name}")
+
+    channel._upload_media = upload
+    await channel.send(OutboundMessage(channel="telegram", chat_id="5", content="earlier"))
+    await channel.send(OutboundMessage(channel="telegram", chat_id="5", content="Here:", media=[str(image)]))
+    await asyncio.sleep(0.05)
+    assert channel.sent == []  # The lane is backed up behind "earlier"
+
+    channel.gate.set()
+    await channel._sender.drain()
+    assert channel.sent == ["earlier", "Here:", "media:a.png"]
@@ -0,0 +1,90 @@
+"""Tests for persistent exec shell sessions."""
+
+import asyncio
+
+import pytest
+
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_session import ShellSessionManager
+
+
+@pytest.fixture
+async def tool(tmp_path):
+    sessions = ShellSessionManager(str(tmp_path), max_shells=2, idle_timeout=60)
+    yield ExecTool(working_dir=str(tmp_path), timeout=5, shell_sessions=sessions)
+    await sessions.close_all()
+
+
+@pytest.mark.asyncio
+async def test_cwd_and_env_persist(tool, tmp_path):
+    tool.set_context("cli", "a")  # session context is per task, like in AgentLoop
+    (tmp_path / "sub").mkdir()
+    await tool.execute(command="cd sub && export GREETING=hi")
+    result = await tool.execute(command='pwd; echo "$GREETING"')
+    assert result.splitlines() == [str(tmp_path / "sub"), "hi"]
+
+
+@pytest.mark.asyncio
+async def test_exit_code_stderr_and_trailing_newline(tool):
+    tool.set_context("cli", "a")
+    result = await tool.execute(command="printf out; echo err >&2; false")
+    assert result == "out\nSTDERR:\nerr\n\n\nExit code: 1"
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_isolated(tool):
+    tool.set_context("cli", "a")
+    await tool.execute(command="export WHO=a")
+    tool.set_context("cli", "b")
+    assert "(no output)" == await tool.execute(command='printf "%s" "$WHO"')
+
+
+@pytest.mark.asyncio
+async def test_timeout_resets_shell(tool):
+    tool.set_context("cli", "a")
+    tool.timeout = 1
+    await tool.execute(command="export KEEP=1")
+    result = await tool.execute(command="sleep 10")
+    assert "timed out" in result
+    tool.timeout = 5
+    assert "(no output)" == await tool.execute(command='printf "%s" "$KEEP"')
+
+
+@pytest.mark.asyncio
+async def test_exit_restarts_shell(tool):
+    tool.set_context("cli", "a")
+    result = await tool.execute(command="exit 3")
+    assert "Shell session exited" in result
+    assert (await tool.execute(command="echo back")).strip() == "back"
+
+
+@pytest.mark.asyncio
+async def test_guard_still_applies(tool):
+    result = await tool.execute(command="rm -rf /")
+    assert "blocked by safety guard" in result
+
+
+@pytest.mark.asyncio
+async def test_restricted_shell_cannot_stay_outside_workspace(tool, tmp_path):
+    tool.restrict_to_workspace = True
+    tool.set_context("cli", "a")
+    await tool.execute(command="cd /")
+    assert (await tool.execute(command="pwd")).strip() == str(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_cap_evicts_least_recently_used(tool):
+    for chat in ("a", "b", "c"):
+        tool.set_context("cli", chat)
+        await tool.execute(command="true")
+    assert len(tool.shell_sessions) == 2
+
+
+@pytest.mark.asyncio
+async def test_idle_shells_are_reaped(tool):
+    tool.set_context("cli", "a")
+    await tool.execute(command="true")
+    tool.shell_sessions.idle_timeout = 0
+    await asyncio.sleep(0.01)
+    assert await tool.shell_sessions.reap_idle() == 1
+    assert len(tool.shell_sessions) == 0
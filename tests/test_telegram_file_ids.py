@@ -0,0 +1,112 @@
+"""Tests for the Telegram content-hash → file_id cache."""
+
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import BadRequest
+
+from nanobot.bus.queue import MessageBus
+from nanobot.channels import telegram
+from nanobot.channels.telegram import TelegramChannel
+from nanobot.config.schema import TelegramConfig, TelegramSendLimitsConfig
+from nanobot.media.processing import MediaProcessor
+from nanobot.media.store import MediaStore
+
+
+class FakeBot:
+    """Records sends; assigns a fresh file_id per upload and can reject ids."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, object]] = []
+        self.rejected: set[str] = set()
+        self._next = 0
+
+    def _message(self, kind: str, media) -> SimpleNamespace:
+        if isinstance(media, str):
+            if media in self.rejected:
+                raise BadRequest("Wrong file identifier/http url specified")
+            file_id = media
+        else:
+            self._next += 1
+            file_id = f"id-{self._next}"
+        attachment = SimpleNamespace(file_id=file_id)
+        if kind == "photo":
+            return SimpleNamespace(photo=[SimpleNamespace(file_id="thumb"), attachment])
+        return SimpleNamespace(**{kind: attachment})
+
+    async def send_photo(self, chat_id, photo, **kw):
+        self.calls.append(("photo", photo if isinstance(photo, str) else "upload"))
+        return self._message("photo", photo)
+
+    async def send_document(self, chat_id, document, **kw):
+        self.calls.append(("document", document if isinstance(document, str) else "upload"))
+        return self._message("document", document)
+
+    async def send_media_group(self, chat_id, media, **kw):
+        self.calls.append(("group", [m.media if isinstance(m.media, str) else "upload" for m in media]))
+        return [self._message("photo", m.media) for m in media]
+
+
+@pytest.fixture
+def channel(tmp_path, monkeypatch):
+    monkeypatch.setattr(telegram, "get_data_path", lambda: tmp_path)
+    media = MediaProcessor(cache_dir=tmp_path / "media", ffmpeg="no-ffmpeg", ffprobe="no-ffprobe")
+    store = MediaStore(tmp_path / "store")
+    limits = TelegramSendLimitsConfig(per_chat_per_second=1000, chat_burst=100)
+    config = TelegramConfig(token="123:abc", send_limits=limits)
+    ch = TelegramChannel(config, MessageBus(), media=media, store=store)
+    ch._app = SimpleNamespace(bot=FakeBot())
+    return ch
+
+
+def _file(tmp_path, name, data=b"data"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+async def test_identical_content_is_sent_by_file_id(channel, tmp_path):
+    bot = channel._app.bot
+    await channel._send_single_media_inner(1, _file(tmp_path, "a.png"), ".png")
+    await channel._send_single_media_inner(2, _file(tmp_path, "b.png"), ".png")  # Same bytes
+    await channel._send_single_media_inner(2, _file(tmp_path, "c.png", b"other"), ".png")
+
+    assert bot.calls == [("photo", "upload"), ("photo", "id-1"), ("photo", "upload")]
+
+
+async def test_file_ids_are_kept_per_kind(channel, tmp_path):
+    bot = channel._app.bot
+    await channel._send_single_media_inner(1, _file(tmp_path, "a.png"), ".png")
+    await channel._send_single_media_inner(1, _file(tmp_path, "a.bin"), ".bin")
+
+    assert bot.calls == [("photo", "upload"), ("document", "upload")]
+
+
+async def test_rejected_file_id_falls_back_to_upload(channel, tmp_path):
+    bot = channel._app.bot
+    path = _file(tmp_path, "a.png")
+    await channel._send_single_media_inner(1, path, ".png")
+    bot.rejected.add("id-1")
+
+    await channel._send_single_media_inner(1, path, ".png")
+    await channel._send_single_media_inner(1, path, ".png")
+
+    assert bot.calls == [
+        ("photo", "upload"), ("photo", "id-1"), ("photo", "upload"), ("photo", "id-2"),
+    ]
+
+
+async def test_media_group_fills_and_reuses_cache(channel, tmp_path):
+    bot = channel._app.bot
+    files = [_file(tmp_path, "a.png", b"a"), _file(tmp_path, "b.png", b"b")]
+    await channel._send_media_group(1, files)
+    await channel._send_media_group(1, files)
+    bot.rejected.add("id-1")
+    await channel._send_media_group(1, files)
+
+    assert bot.calls == [
+        ("group", ["upload", "upload"]),
+        ("group", ["id-1", "id-2"]),
+        ("group", ["id-1", "id-2"]),  # Rejected
+        ("group", ["upload", "upload"]),
+    ]
@@ -0,0 +1,111 @@
+"""Tests for Telegram's background ingestion stage (per-chat ordering)."""
+
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.telegram import TelegramChannel
+from nanobot.config.schema import TelegramConfig
+from nanobot.media.processing import MediaProcessor
+from nanobot.media.store import MediaStore
+from nanobot.telemetry.metrics import CHANNEL_INGEST_PENDING, CHANNEL_INGEST_SECONDS
+
+
+class SlowTranscriber:
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def transcribe(self, path):
+        await self.release.wait()
+        return "hello from voice"
+
+    async def close(self):
+        pass
+
+
+def _update(chat_id, text=None, voice=None, photo=None):
+    message = SimpleNamespace(
+        chat_id=chat_id, message_id=1, text=text, caption=None, photo=photo,
+        voice=voice, audio=None, document=None, chat=SimpleNamespace(type="private"),
+    )
+    user = SimpleNamespace(id=7, username=None, first_name="A")
+    return SimpleNamespace(message=message, effective_user=user)
+
+
+@pytest.fixture
+def channel(tmp_path):
+    async def get_file(file_id):
+        async def download_to_drive(path):
+            await asyncio.sleep(random.uniform(0, 0.02))  # Downloads finish out of order
+            with open(path, "wb") as f:
+                f.write(file_id.encode())
+        return SimpleNamespace(download_to_drive=download_to_drive)
+
+    ch = TelegramChannel(
+        TelegramConfig(token="1:x"), MessageBus(),
+        media=MediaProcessor(cache_dir=tmp_path / "media"), store=MediaStore(tmp_path / "store"),
+    )
+    ch._app = SimpleNamespace(bot=SimpleNamespace(get_file=get_file))
+    ch._transcriber = SlowTranscriber()
+    ch.received = []
+
+    async def record(sender_id, chat_id, content, media=None, metadata=None):
+        ch.received.append((chat_id, content))
+
+    ch._handle_message = record
+    return ch
+
+
+async def _drain(channel):
+    while channel._inbound_tails:
+        await asyncio.wait(list(channel._inbound_tails.values()))
+
+
+async def test_voice_does_not_block_other_chats(channel):
+    voice = SimpleNamespace(file_id="v1", mime_type="audio/ogg")
+
+    await asyncio.wait_for(channel._on_message(_update(1, voice=voice), None), timeout=1)
+    await channel._on_message(_update(1, text="after voice"), None)
+    await channel._on_message(_update(2, text="other chat"), None)
+    await channel._inbound_tails[2]
+
+    assert channel.received == [("2", "other chat")]
+
+    channel._transcriber.release.set()
+    await _drain(channel)
+    assert channel.received == [
+        ("2", "other chat"),
+        ("1", "[transcription: hello from voice]"),
+        ("1", "after voice"),
+    ]
+
+
+async def test_messages_within_a_chat_keep_their_order(channel):
+    for i in range(20):
+        for chat in (1, 2):
+            if i % 3 == 0:
+                photo = [SimpleNamespace(file_id=f"p{chat}-{i}", mime_type="image/jpeg")]
+                await channel._on_message(_update(chat, photo=photo), None)
+            else:
+                await channel._on_message(_update(chat, text=f"{chat}-{i}"), None)
+    await _drain(channel)
+
+    for chat in ("1", "2"):
+        contents = [c for cid, c in channel.received if cid == chat]
+        assert len(contents) == 20
+        for i, content in enumerate(contents):
+            assert content.startswith("[image: ") if i % 3 == 0 else content == f"{chat}-{i}"
+
+
+async def test_ingest_latency_and_pending_are_reported(channel):
+    before = CHANNEL_INGEST_SECONDS.count(channel="telegram", kind="text")
+
+    await channel._on_message(_update(3, text="hi"), None)
+    assert CHANNEL_INGEST_PENDING.get(channel="telegram") >= 1
+    await _drain(channel)
+
+    assert CHANNEL_INGEST_SECONDS.count(channel="telegram", kind="text") == before + 1
+    assert CHANNEL_INGEST_PENDING.get(channel="telegram") == 0
@@ -0,0 +1,125 @@
+"""Telegram webhook mode against a local fake Bot API server."""
+
+import asyncio
+import json
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.telegram import TelegramChannel
+from nanobot.config.schema import TelegramConfig, TelegramWebhookConfig
+from nanobot.media.processing import MediaProcessor
+from nanobot.media.store import MediaStore
+from nanobot.web.telegram import SECRET_HEADER, TelegramWebhookServer
+
+TOKEN = "123:abc"
+
+
+@pytest.fixture
+async def bot_api():
+    """Answers getMe and setWebhook, recording every call."""
+    calls: list[tuple[str, dict]] = []
+
+    async def handle(request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = dict(await request.post()) if request.can_read_body else {}
+        calls.append((method, params))
+        if method == "getMe":
+            result = {"id": 123, "is_bot": True, "first_name": "Bot", "username": "test_bot"}
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    app = web.Application()
+    app.router.add_post(f"/bot{TOKEN}/{{method}}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/bot", calls
+    await runner.cleanup()
+
+
+def _update(update_id: int, chat_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": 7, "is_bot": False, "first_name": "A"},
+            "text": text,
+        },
+    }
+
+
+async def test_webhook_mode_end_to_end(bot_api, tmp_path):
+    base_url, calls = bot_api
+    config = TelegramConfig(
+        token=TOKEN,
+        api_base_url=base_url,
+        webhook=TelegramWebhookConfig(enabled=True, url="https://bot.example/", host="127.0.0.1", port=0),
+    )
+    bus = MessageBus()
+    channel = TelegramChannel(
+        config, bus,
+        media=MediaProcessor(cache_dir=tmp_path / "media"), store=MediaStore(tmp_path / "store"),
+    )
+    runner = asyncio.create_task(channel.start())
+    for _ in range(100):
+        if any(method == "setWebhook" for method, _ in calls):
+            break
+        await asyncio.sleep(0.05)
+
+    registered = dict(calls)["setWebhook"]
+    assert registered["url"] == "https://bot.example/telegram/webhook"
+    assert registered["drop_pending_updates"] == "false"
+    secret = registered["secret_token"]
+    url = f"http://127.0.0.1:{channel._webhook.port}/telegram/webhook"
+
+    async with aiohttp.ClientSession() as http:
+        async with http.post(url, json=_update(1, 42, "hi")) as resp:
+            assert resp.status == 403
+        for update_id, text in ((2, "first"), (3, "second"), (2, "first")):  # Last is a redelivery
+            async with http.post(url, json=_update(update_id, 42, text), headers={SECRET_HEADER: secret}) as resp:
+                assert resp.status == 200
+
+    first = await asyncio.wait_for(bus.consume_inbound(), timeout=5)
+    second = await asyncio.wait_for(bus.consume_inbound(), timeout=5)
+    assert (first.chat_id, first.content, second.content) == ("42", "first", "second")
+    assert bus.inbound_size == 0
+
+    await channel.stop()
+    await runner
+    assert "deleteWebhook" not in dict(calls)  # Other gateway processes may still serve the bot
+
+
+async def test_full_queue_asks_telegram_to_redeliver():
+    release = asyncio.Event()
+    handled: list[int] = []
+
+    async def on_update(update: dict) -> None:
+        await release.wait()
+        handled.append(update["update_id"])
+
+    server = TelegramWebhookServer("127.0.0.1", 0, "/hook", "s3cret", on_update, queue_size=1)
+    await server.start()
+    url = f"http://127.0.0.1:{server.port}/hook"
+    statuses = []
+    async with aiohttp.ClientSession() as http:
+        for update_id in range(1, 4):
+            body = json.dumps({"update_id": update_id})
+            async with http.post(url, data=body, headers={SECRET_HEADER: "s3cret"}) as resp:
+                statuses.append(resp.status)
+            await asyncio.sleep(0.05)
+        async with http.post(url, data="not json", headers={SECRET_HEADER: "s3cret"}) as resp:
+            assert resp.status == 400
+
+    # 1 is being handled, 2 waits in the queue, 3 is refused
+    assert statuses == [200, 200, 503]
+    release.set()
+    await server.stop()
+    assert handled == [1, 2]
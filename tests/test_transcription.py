@@ -0,0 +1,101 @@
+"""Tests for audio preparation and chunked transcription."""
+
+import asyncio
+import sys
+
+import pytest
+
+from nanobot.media.processing import MediaProcessor, _cut_points
+from nanobot.providers.transcription import GroqTranscriptionProvider
+from nanobot.utils.cache import DiskCache
+
+FAKE_FFPROBE = """
+import json
+print(json.dumps({"streams": [], "format": {"duration": "1500.0"}}))
+"""
+
+# silencedetect runs report two pauses; other runs write their arguments to the output file
+FAKE_FFMPEG = """
+import sys
+if any("silencedetect" in a for a in sys.argv):
+    sys.stderr.write("silence_start: 500\\nsilence_end: 501\\nsilence_start: 1000\\nsilence_end: 1001\\n")
+else:
+    with open(sys.argv[-1], "w") as f:
+        f.write(" ".join(sys.argv[1:-1]))
+"""
+
+
+def test_cut_points_prefer_silence():
+    assert _cut_points(1500, [(500, 501), (1000, 1001)], 600) == [500.5, 1000.5]
+    assert _cut_points(1500, [(100, 101)], 600) == [600, 1200]  # Too early: hard cuts
+    assert _cut_points(300, [], 600) == []
+
+
+@pytest.fixture
+def transcriber(tmp_path):
+    bins = {}
+    for name, code in (("ffprobe", FAKE_FFPROBE), ("ffmpeg", FAKE_FFMPEG)):
+        script = tmp_path / name
+        script.write_text(f"#!{sys.executable}\n{code}")
+        script.chmod(0o755)
+        bins[name] = str(script)
+    media = MediaProcessor(cache_dir=tmp_path / "media", ffmpeg=bins["ffmpeg"], ffprobe=bins["ffprobe"])
+    provider = GroqTranscriptionProvider(
+        api_key="test", media=media, cache=DiskCache(tmp_path / "transcripts"), chunk_seconds=600,
+    )
+    provider.uploads = []
+    provider.peak = active = 0
+
+    async def fake_upload(path):
+        nonlocal active
+        args = path.read_text()
+        provider.uploads.append(args)
+        active += 1
+        provider.peak = max(provider.peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        if "-ss" not in args:
+            return "whole"
+        return {"0.000": "one", "500.500": "two", "1000.500": "three"}[args.split("-ss ")[1].split()[0]]
+
+    provider._transcribe_file = fake_upload
+    return provider
+
+
+async def test_long_audio_is_split_transcribed_concurrently_and_cached(transcriber, tmp_path):
+    audio = tmp_path / "voice.m4a"
+    audio.write_bytes(b"audio")
+
+    text = await transcriber.transcribe(audio)
+
+    assert text == "one two three"
+    assert len(transcriber.uploads) == 3
+    assert all("-c copy" in u for u in transcriber.uploads)
+    assert transcriber.peak == 3  # Pieces uploaded concurrently
+
+    assert await transcriber.transcribe(audio) == "one two three"
+    assert len(transcriber.uploads) == 3  # Cached by content hash
+
+
+async def test_failed_piece_is_not_cached(transcriber, tmp_path):
+    audio = tmp_path / "voice.ogg"
+    audio.write_bytes(b"audio")
+
+    async def broken(path):
+        return None
+
+    transcriber._transcribe_file = broken
+    assert await transcriber.transcribe(audio) == ""
+    assert not list((tmp_path / "transcripts").glob("*.json"))
+
+
+async def test_audio_is_downmixed_to_16k_mono_opus(transcriber, tmp_path):
+    audio = tmp_path / "voice.wav"
+    audio.write_bytes(b"audio")
+
+    prepared = await transcriber.media.prepare_audio(audio)
+
+    args = prepared.read_text()
+    assert prepared.suffix == ".ogg"
+    assert "-ac 1 -ar 16000 -c:a libopus" in args
+
@@ -0,0 +1,113 @@
+"""Tests for web_search caching, coalescing and rate limiting."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from nanobot.agent.tools import web
+from nanobot.agent.tools.web import WebSearchCache, WebSearchTool
+from nanobot.utils.ratelimit import TokenBucket
+
+RESULTS = {"web": {"results": [{"title": "Nanobot", "url": "https://example.com", "description": "A bot"}]}}
+
+
+@pytest.fixture
+def brave(monkeypatch):
+    """Route the Brave API to a scripted handler; record requests."""
+    state = {"requests": [], "status": [], "delay": 0.0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"].append(request)
+        await asyncio.sleep(state["delay"])
+        status = state["status"].pop(0) if state["status"] else 200
+        if status != 200:
+            return httpx.Response(status, headers={"retry-after": "0"})
+        return httpx.Response(200, json=RESULTS)
+
+    real_client = httpx.AsyncClient
+
+    def client_factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr(web.httpx, "AsyncClient", client_factory)
+    return state
+
+
+def make_tool(**cache_kwargs) -> WebSearchTool:
+    cache_kwargs.setdefault("qps", 1000)
+    cache_kwargs.setdefault("burst", 1000)
+    return WebSearchTool(api_key="test", cache=WebSearchCache(**cache_kwargs))
+
+
+@pytest.mark.asyncio
+async def test_normalized_query_is_cache_hit(brave):
+    tool = make_tool()
+    first = await tool.execute(query="Nanobot  agent")
+    second = await tool.execute(query="nanobot agent")
+    assert first.replace("Nanobot  agent", "nanobot agent") == second
+    assert len(brave["requests"]) == 1
+    assert tool.cache.stats()["hit"] == 1
+
+
+@pytest.mark.asyncio
+async def test_count_is_part_of_key(brave):
+    tool = make_tool()
+    await tool.execute(query="nanobot", count=3)
+    await tool.execute(query="nanobot", count=5)
+    assert len(brave["requests"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_share_one_request(brave):
+    brave["delay"] = 0.05
+    tool = make_tool()
+    results = await asyncio.gather(*(tool.execute(query="nanobot") for _ in range(5)))
+    assert len(set(results)) == 1
+    assert len(brave["requests"]) == 1
+    assert tool.cache.stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_fail_followers(brave):
+    brave["delay"] = 0.05
+    tool = make_tool()
+    leader = asyncio.create_task(tool.execute(query="nanobot"))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(tool.execute(query="nanobot"))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert "Nanobot" in await follower
+    assert leader.cancelled()
+    assert len(brave["requests"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(brave):
+    brave["status"] = [500]
+    tool = make_tool()
+    assert (await tool.execute(query="nanobot")).startswith("Error")
+    assert "Nanobot" in await tool.execute(query="nanobot")
+    assert len(brave["requests"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_429_is_retried_once(brave):
+    brave["status"] = [429]
+    tool = make_tool()
+    assert "Nanobot" in await tool.execute(query="nanobot")
+    assert len(brave["requests"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate=20, burst=1)
+    start = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire()
+    # First token is free, the next two wait ~50 ms each
+    assert time.monotonic() - start >= 0.09
+    assert not bucket.try_acquire()